@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Unter ASGI die async Lese-Views verwenden (siehe questionnaires/async_views.py)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+# Periodische Jobs im App-Prozess (nur mit SCHEDULER_ENABLED=True)
+from questionnaires import scheduler  # noqa: E402
+
+scheduler.start_if_enabled()
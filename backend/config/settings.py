@@ -85,6 +85,18 @@ if os.environ.get('USE_SQLITE', 'False') == 'True':
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Worker (run_worker) und runserver schreiben parallel: Schreibsperre
+            # gleich bei BEGIN holen und bis zu 20 s darauf warten statt
+            # "database is locked" zu werfen
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+            # Test-DB als Datei statt Shared-Cache-In-Memory: dort greifen
+            # Sperr-Timeouts nicht (Nebenläufigkeitstests der Task-Queue)
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 else:
@@ -149,11 +161,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson-basiert, fällt ohne orjson auf die DRF-Standardklassen zurück
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'questionnaires.fastjson.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'questionnaires.fastjson.FastJSONParser',
     ],
     # Brute-Force-Bremse (u.a. gegen Raten des Admin-API-Keys)
     'DEFAULT_THROTTLE_CLASSES': [
@@ -167,6 +180,16 @@ REST_FRAMEWORK = {
 # Fragebogen: Gültigkeitsdauer der Token-Links in Tagen (Admin-, GDT- und Model-Default)
 SESSION_VALIDITY_DAYS = int(os.environ.get('SESSION_VALIDITY_DAYS', '14'))
 
+# Template-Registry: wie oft (Sekunden) ein Worker prüft, ob ein anderer
+# Worker die gecachten Templates invalidiert hat (0 = bei jedem Zugriff)
+TEMPLATE_REGISTRY_CHECK_SECONDS = float(os.environ.get('TEMPLATE_REGISTRY_CHECK_SECONDS', '2'))
+
+# Druck-Viewmodel (/api/print/<token>/): Lebensdauer im Cache in Sekunden
+PRINT_CACHE_SECONDS = int(os.environ.get('PRINT_CACHE_SECONDS', '3600'))
+
+# Druck-Tickets der PDF-Pipeline: Gültigkeit in Sekunden
+PRINT_TICKET_SECONDS = int(os.environ.get('PRINT_TICKET_SECONDS', '120'))
+
 # Basis-URL des Frontends (für Einladungs-Links)
 APP_URL = os.environ.get('APP_URL', 'http://localhost:3000')
 
@@ -194,3 +217,58 @@ EMAIL_USE_SSL = os.environ.get('EMAIL_USE_SSL', 'False') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 EMAIL_FROM = os.environ.get('EMAIL_FROM', EMAIL_HOST_USER)
+# SMTP-Timeout in Sekunden (sonst wartet der Outbox-Worker unbegrenzt)
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '30'))
+
+# E-Mail-Outbox (manage.py send_outbox): Wiederholungen mit exponentiellem
+# Abstand, danach Dead-Letter (Status 'dead', im Django-Admin sichtbar)
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '8'))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.environ.get('EMAIL_OUTBOX_BACKOFF_SECONDS', '60'))
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = int(os.environ.get('EMAIL_OUTBOX_MAX_BACKOFF_SECONDS', '21600'))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.environ.get('EMAIL_OUTBOX_LEASE_SECONDS', '300'))
+# Höchstens so viele Mails pro Minute (0 = unbegrenzt); web.de drosselt Massenversand
+EMAIL_OUTBOX_RATE_PER_MINUTE = int(os.environ.get('EMAIL_OUTBOX_RATE_PER_MINUTE', '30'))
+
+# Erinnerungen (manage.py send_reminders): Stunden nach Zustellung der Einladung
+REMINDER_AFTER_HOURS = int(os.environ.get('REMINDER_AFTER_HOURS', '72'))
+
+# Task-Queue (manage.py run_worker): Wiederholungsabstand bei Fehlern
+TASK_RETRY_BACKOFF_SECONDS = int(os.environ.get('TASK_RETRY_BACKOFF_SECONDS', '10'))
+TASK_RETRY_MAX_BACKOFF_SECONDS = int(os.environ.get('TASK_RETRY_MAX_BACKOFF_SECONDS', '3600'))
+
+# Ereignisse (questionnaires/events.py): Handler direkt nach dem Commit in einem
+# Thread-Pool des Web-Prozesses ausführen; sonst (und bei Fehlern) per run_worker
+EVENTS_IN_PROCESS = os.environ.get('EVENTS_IN_PROCESS', 'True') == 'True'
+EVENTS_THREADS = int(os.environ.get('EVENTS_THREADS', '2'))
+# Periodischer Job events.redeliver: fällige/liegen gebliebene Ereignis-Jobs nachholen
+EVENTS_REDELIVER_SECONDS = int(os.environ.get('EVENTS_REDELIVER_SECONDS', '60'))
+
+# Webhooks (questionnaires/webhooks.py): abgeschlossene Fragebögen HMAC-signiert und
+# gebündelt an die im Django-Admin eingetragenen Abonnements melden (Job webhooks.deliver)
+WEBHOOK_INTERVAL_SECONDS = int(os.environ.get('WEBHOOK_INTERVAL_SECONDS', '30'))
+WEBHOOK_BATCH_SIZE = int(os.environ.get('WEBHOOK_BATCH_SIZE', '50'))
+WEBHOOK_TIMEOUT_SECONDS = int(os.environ.get('WEBHOOK_TIMEOUT_SECONDS', '10'))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', '10'))
+WEBHOOK_BACKOFF_SECONDS = int(os.environ.get('WEBHOOK_BACKOFF_SECONDS', '30'))
+WEBHOOK_MAX_BACKOFF_SECONDS = int(os.environ.get('WEBHOOK_MAX_BACKOFF_SECONDS', '21600'))
+# Reservierung eines Stapels; muss länger sein als WEBHOOK_TIMEOUT_SECONDS
+WEBHOOK_LEASE_SECONDS = int(os.environ.get('WEBHOOK_LEASE_SECONDS', '120'))
+
+# Eingebauter Scheduler (questionnaires/scheduler.py): startet mit dem App-Server,
+# pro Job und Zeitfenster läuft genau ein Knoten (Advisory Lock bzw. Dateisperre)
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'False') == 'True'
+SCHEDULER_TICK_SECONDS = int(os.environ.get('SCHEDULER_TICK_SECONDS', '30'))
+SCHEDULER_LOCK_DIR = os.environ.get('SCHEDULER_LOCK_DIR', str(BASE_DIR))
+SCHEDULER_HISTORY_DAYS = int(os.environ.get('SCHEDULER_HISTORY_DAYS', '30'))
+
+# Async-Views für Session/Answers/GDT-Result/i18n (questionnaires/async_views.py);
+# config/asgi.py schaltet sie ein, unter WSGI bleiben die DRF-Views aktiv
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# Sammel-Einladungen: maximale Einträge pro Aufruf
+BULK_INVITE_MAX = int(os.environ.get('BULK_INVITE_MAX', '1000'))
+
+# Sammel-Abfrage der GDT-Bridge (POST /api/gdt/results/): maximale Tokens pro Aufruf
+GDT_RESULTS_BATCH_MAX = int(os.environ.get('GDT_RESULTS_BATCH_MAX', '500'))
+# Abschluss-Feed (GET /api/gdt/completions/): maximale Ereignisse pro Seite
+GDT_COMPLETIONS_PAGE_SIZE = int(os.environ.get('GDT_COMPLETIONS_PAGE_SIZE', '200'))
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Periodische Jobs im App-Prozess (nur mit SCHEDULER_ENABLED=True)
+from questionnaires import scheduler  # noqa: E402
+
+scheduler.start_if_enabled()
@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import QuestionnaireTemplate, QuestionnaireSession, AnswerSet
+from django.utils import timezone
+
+from .models import (
+    QuestionnaireTemplate, QuestionnaireSession, AnswerSet, OutboxEmail, Task, JobRun,
+    WebhookSubscription, WebhookEvent, WebhookDelivery,
+)
 
 
 @admin.register(QuestionnaireTemplate)
@@ -31,3 +36,68 @@ class AnswerSetAdmin(admin.ModelAdmin):
     list_filter = ['ess_band', 'created_at']
     search_fields = ['session__token__exact', 'session__patient_last_name']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['to_email', 'session__token__exact']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    actions = ['retry_now']
+
+    @admin.action(description='Erneut zustellen (sofort fällig)')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'finished_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['created_at', 'finished_at', 'locked_by', 'locked_until', 'last_error']
+    actions = ['retry_now']
+
+    @admin.action(description='Erneut ausführen (sofort fällig)')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=Task.STATUS_RUNNING).update(
+            status=Task.STATUS_QUEUED, attempts=0, run_at=timezone.now(), last_error='',
+        )
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ['name', 'tick', 'status', 'node', 'duration_ms', 'started_at']
+    list_filter = ['status', 'name']
+    readonly_fields = [f.name for f in JobRun._meta.fields]
+
+
+@admin.register(WebhookSubscription)
+class WebhookSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'url', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    readonly_fields = ['created_at']
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subscription', 'event', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'subscription']
+    search_fields = ['session__token__exact']
+    readonly_fields = ['payload', 'created_at', 'sent_at', 'last_error']
+    actions = ['retry_now']
+
+    @admin.action(description='Erneut zustellen (sofort fällig)')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=WebhookEvent.STATUS_SENT).update(
+            status=WebhookEvent.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['delivery_id', 'subscription', 'ok', 'status_code', 'duration_ms', 'created_at']
+    list_filter = ['ok', 'subscription']
+    readonly_fields = [f.name for f in WebhookDelivery._meta.fields]
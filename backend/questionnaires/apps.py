@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class QuestionnairesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'questionnaires'
+
+    def ready(self):
+        # Signal-Empfänger der Template-Registry registrieren
+        from . import registry  # noqa: F401
+        # Eingebaute Hintergrund-Jobs der Task-Queue registrieren
+        from . import jobs  # noqa: F401
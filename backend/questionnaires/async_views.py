@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Native async-Varianten der meistgenutzten Lese-Endpunkte (ASGI-Profil).
+
+  GET /api/session/<token>/      AsyncQuestionnaireSessionView
+  GET /api/answers/<token>/      AsyncAnswersView
+  GET /api/gdt/result/<token>/   AsyncGdtResultView
+  GET /api/i18n/[<lang>/]        AsyncTranslationView
+
+Unter ASGI (config/asgi.py setzt ASYNC_VIEWS=True) ersetzen sie die
+DRF-Views gleichen Namens in urls.py. Ein Worker bedient dann viele
+gleichzeitige Bridge-Polls und Patientenaufrufe, statt pro Request einen
+Thread/Prozess zu blockieren. Unter WSGI bleiben die DRF-Views aktiv.
+
+Antworten, Statuscodes, ETags und Drosselung (DEFAULT_THROTTLE_CLASSES)
+entsprechen den DRF-Views; Daten werden über das async ORM geladen, die
+gemeinsame (synchrone) Aufbereitung mit Template-Registry läuft per
+sync_to_async im Request-Thread.
+
+Lasttest WSGI gegen ASGI: python manage.py loadtest_api
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+
+from . import fastjson
+from .models import AnswerSet, QuestionnaireSession
+from .gdt_payload import gdt_pending_payload, gdt_result_payload
+from .printing import answers_etag, answers_model
+from .translations import available_languages, load_translation
+from .views import (
+    AdminApiKeyPermission,
+    etag_matches,
+    printable_problem,
+    session_payload,
+    session_problem,
+    wants_full_texts,
+)
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    """JSON-Response im Format des FastJSONRenderer."""
+    return HttpResponse(
+        fastjson.dumps(data) if data is not None else b'',
+        status=status_code,
+        content_type='application/json',
+        headers=headers,
+    )
+
+
+def _error(problem):
+    return json_response({'error': problem[1]}, problem[0])
+
+
+class _ThrottleRequest:
+    """Minimaler Request für DRF-Throttles (anonym, ohne Authentifizierung)."""
+    user = None
+
+    def __init__(self, request):
+        self.META = request.META
+
+
+class AsyncApiView(View):
+    """Basis: DRF-kompatible Rechteprüfung, Drosselung und 404-Antworten."""
+    http_method_names = ['get', 'head', 'options']
+    permission_classes = ()
+
+    def check_request(self, request):
+        """Fehler-Response bei fehlender Berechtigung bzw. Drosselung, sonst None."""
+        for permission_class in self.permission_classes:
+            if not permission_class().has_permission(request, self):
+                return json_response(
+                    {'detail': exceptions.PermissionDenied.default_detail},
+                    status.HTTP_403_FORBIDDEN,
+                )
+        throttle_request = _ThrottleRequest(request)
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if not throttle.allow_request(throttle_request, self):
+                wait = throttle.wait()
+                headers = {'Retry-After': '%d' % wait} if wait else None
+                return json_response(
+                    {'detail': exceptions.Throttled(wait).detail},
+                    status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers,
+                )
+        return None
+
+    @staticmethod
+    def not_found(exc):
+        return json_response({'detail': str(exc)}, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncQuestionnaireSessionView(AsyncApiView):
+    """GET: Fragebogen-Session samt Template (wie QuestionnaireSessionView)."""
+
+    async def get(self, request, token):
+        denied = self.check_request(request)
+        if denied is not None:
+            return denied
+        try:
+            session = await aget_object_or_404(QuestionnaireSession, token=token)
+        except Http404 as exc:
+            return self.not_found(exc)
+        problem = session_problem(session)
+        if problem is not None:
+            return _error(problem)
+        return json_response(await sync_to_async(session_payload)(session))
+
+
+class AsyncAnswersView(AsyncApiView):
+    """GET: Antworten + Auswertung mit ETag/304 (wie AnswersView)."""
+
+    async def get(self, request, token):
+        denied = self.check_request(request)
+        if denied is not None:
+            return denied
+        try:
+            session = await aget_object_or_404(QuestionnaireSession, token=token)
+        except Http404 as exc:
+            return self.not_found(exc)
+        problem = printable_problem(session)
+        if problem is not None:
+            return _error(problem)
+        texts = wants_full_texts(request)
+        etag = await sync_to_async(answers_etag)(session, texts=texts)
+        if etag_matches(request, etag):
+            response = json_response(None, status.HTTP_304_NOT_MODIFIED)
+        else:
+            answer_set = await AnswerSet.objects.filter(session_id=session.pk).afirst()
+            if answer_set is None:
+                return json_response(
+                    {'error': 'Keine Antworten gefunden.'}, status.HTTP_404_NOT_FOUND
+                )
+            session.answers = answer_set
+            response = json_response(await sync_to_async(answers_model)(session, texts=texts))
+        response['ETag'] = etag
+        # Gesundheitsdaten: nur im Client cachen und immer revalidieren
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class AsyncGdtResultView(AsyncApiView):
+    """GET: Ergebnis für die GDT-Bridge (wie GdtResultView), eine Abfrage inkl. Antworten."""
+    permission_classes = (AdminApiKeyPermission,)
+
+    async def get(self, request, token):
+        denied = self.check_request(request)
+        if denied is not None:
+            return denied
+        try:
+            session = await aget_object_or_404(
+                QuestionnaireSession.objects.select_related('answers'), token=token
+            )
+        except Http404 as exc:
+            return self.not_found(exc)
+
+        if not session.completed:
+            if session.is_expired():
+                # Abgelaufen und nie ausgefüllt: Bridge soll den Eintrag verwerfen
+                return json_response({'error': 'Session abgelaufen.'}, status.HTTP_410_GONE)
+            return json_response(gdt_pending_payload(session), status.HTTP_202_ACCEPTED)
+
+        try:
+            answer_set = session.answers
+        except AnswerSet.DoesNotExist:
+            return json_response({'error': 'Antworten nicht gefunden.'}, status.HTTP_404_NOT_FOUND)
+        return json_response(gdt_result_payload(session, answer_set))
+
+
+class AsyncTranslationView(AsyncApiView):
+    """GET: Sprachliste bzw. Sprachdatei (wie TranslationView)."""
+
+    async def get(self, request, lang=None):
+        denied = self.check_request(request)
+        if denied is not None:
+            return denied
+        if lang is None:
+            return json_response({'languages': available_languages()})
+        data = await sync_to_async(load_translation, thread_sensitive=False)(lang)
+        if data is None:
+            return json_response(
+                {'error': f'Sprache "{lang}" nicht verfügbar.'}, status.HTTP_404_NOT_FOUND
+            )
+        response = json_response(data)
+        # Sprachdateien ändern sich nur mit Deployments – aggressiv cachen
+        response['Cache-Control'] = 'public, max-age=3600'
+        return response
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Sammel-Einladungen (Arbeitsmedizin-Verträge mit 200+ Fahrern).
+
+invite_many() prüft alle Zeilen, legt die gültigen Sessions mit einem
+bulk_create an und schreibt die Einladungen – aus dem vorkompilierten
+Template in outbox.py gerendert – ebenfalls per bulk_create in die Outbox.
+Zugestellt wird wie bei Einzel-Einladungen durch send_outbox über eine
+SMTP-Verbindung mit EMAIL_OUTBOX_RATE_PER_MINUTE; das Kommando
+bulk_invite --send stellt eine Kampagne direkt zu.
+
+Ergebnis je Zeile (in Eingabereihenfolge):
+  {"index": 0, "status": "queued" | "created" | "invalid",
+   "token": "...", "patient_email": "...", "error": "..."}
+  created = Session ohne E-Mail-Adresse (Link manuell weitergeben)
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .models import OutboxEmail, QuestionnaireSession
+from .serializers import parse_birth_date
+
+STATUS_QUEUED = 'queued'
+STATUS_CREATED = 'created'
+STATUS_INVALID = 'invalid'
+
+
+def clean_row(row):
+    """
+    Eine Eingabezeile prüfen → (Felder, None) bzw. (None, Fehlermeldung).
+    Gleiche Regeln wie die Einzelanlage im Admin.
+    """
+    if not isinstance(row, dict):
+        return None, 'Ungültiger Eintrag.'
+    last_name = str(row.get('patient_last_name') or '').strip()
+    first_name = str(row.get('patient_first_name') or '').strip()
+    email = str(row.get('patient_email') or '').strip()
+    if not last_name or not first_name:
+        return None, 'Name und Vorname sind erforderlich.'
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            return None, 'Ungültige E-Mail-Adresse.'
+    try:
+        birth_date = parse_birth_date(str(row.get('patient_birth_date') or ''))
+    except ValueError:
+        return None, 'Ungültiges Datumsformat.'
+    return {
+        'patient_last_name': last_name,
+        'patient_first_name': first_name,
+        'patient_email': email,
+        'patient_birth_date': birth_date,
+    }, None
+
+
+def invite_many(rows, template):
+    """
+    Sessions + Outbox-Einträge für alle gültigen Zeilen anlegen (eine Transaktion).
+
+    Rückgabe: (Ergebnisliste je Zeile, Liste der Outbox-IDs)
+    """
+    results = []
+    sessions = []
+    expires_at = timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS)
+    for index, row in enumerate(rows):
+        fields, error = clean_row(row)
+        if error:
+            results.append({
+                'index': index,
+                'status': STATUS_INVALID,
+                'token': None,
+                'patient_email': (row.get('patient_email') or '') if isinstance(row, dict) else '',
+                'error': error,
+            })
+            continue
+        session = QuestionnaireSession(template_id=template.pk, expires_at=expires_at, **fields)
+        sessions.append(session)
+        results.append({
+            'index': index,
+            'status': STATUS_QUEUED if session.patient_email else STATUS_CREATED,
+            'token': str(session.token),
+            'patient_email': session.patient_email,
+            'error': None,
+        })
+
+    with transaction.atomic():
+        sessions = QuestionnaireSession.objects.bulk_create(sessions)
+        mails = OutboxEmail.objects.bulk_create([
+            outbox.invitation_email(s) for s in sessions if s.patient_email
+        ])
+    # PostgreSQL und SQLite ≥ 3.35 liefern die Primärschlüssel aus bulk_create
+    return results, [m.pk for m in mails]
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Abschluss-Feed für GDT-Konsumenten (GET /api/gdt/completions/?since=<cursor>).
+
+Statt jede offene Session einzeln abzufragen, fragt die Bridge nur "was ist
+seit <cursor> abgeschlossen worden?" – ein Request pro Zyklus, egal wie
+viele Sessions offen sind.
+
+- Jede abgeschlossene Session erhält eine fortlaufende completion_seq
+  (eindeutig, indiziert). Vergeben wird sie vom Event-Handler
+  'completions.sequence' (jobs.py) nach dem Commit des Abschlusses – der
+  Submit selbst bleibt ein bedingtes UPDATE plus INSERT (submission.py).
+- Der Zähler ist die Zeile CacheVersion('completion_seq'). Das UPDATE darauf
+  sperrt sie bis zum Commit: Nummern werden in Commit-Reihenfolge vergeben,
+  ein Leser sieht nie Nummer n+1 vor Nummer n. Eine Autoincrement-ID könnte
+  das nicht garantieren (parallele Transaktionen committen in beliebiger
+  Reihenfolge) – der Konsument würde Abschlüsse überspringen.
+- Der Cursor ist opak (base64 von "v1:<seq>"); Lücken sind möglich (etwa
+  nach gelöschten Sessions), die Reihenfolge ist streng monoton.
+"""
+import base64
+import binascii
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import CacheVersion, QuestionnaireSession
+
+SEQUENCE_KEY = 'completion_seq'
+CURSOR_PREFIX = 'v1:'
+# since=latest: keine Ereignisse, nur der aktuelle Stand (Einstieg ohne Altbestand)
+LATEST = 'latest'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(seq):
+    return base64.urlsafe_b64encode(f'{CURSOR_PREFIX}{seq}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor → Sequenznummer (leerer Cursor = Anfang); InvalidCursor bei ungültigem Wert."""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        if not raw.startswith(CURSOR_PREFIX):
+            raise ValueError(raw)
+        seq = int(raw[len(CURSOR_PREFIX):])
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor) from None
+    if seq < 0:
+        raise InvalidCursor(cursor)
+    return seq
+
+
+def head():
+    """Höchste bereits vergebene (committete) Sequenznummer."""
+    return (
+        CacheVersion.objects.filter(key=SEQUENCE_KEY)
+        .values_list('version', flat=True)
+        .first()
+    ) or 0
+
+
+def _next_seq():
+    """Zähler erhöhen und sperren (bis zum Ende der umgebenden Transaktion)."""
+    bump = CacheVersion.objects.filter(key=SEQUENCE_KEY)
+    if not bump.update(version=F('version') + 1):
+        _, created = CacheVersion.objects.get_or_create(key=SEQUENCE_KEY, defaults={'version': 1})
+        if not created:
+            bump.update(version=F('version') + 1)
+    return head()
+
+
+def assign(session_id):
+    """Abgeschlossener Session ihre completion_seq geben → Nummer (None, wenn schon vergeben)."""
+    pending = QuestionnaireSession.objects.filter(
+        pk=session_id, completed=True, completion_seq__isnull=True,
+    )
+    if not pending.exists():
+        return None   # Wiederholung des Handlers (at-least-once) oder Session gelöscht
+    with transaction.atomic():
+        seq = _next_seq()
+        if not pending.update(completion_seq=seq):
+            transaction.set_rollback(True)   # paralleler Handler war schneller
+            return None
+    return seq
+
+
+def since(seq, limit):
+    """Abgeschlossene Sessions nach `seq` (inkl. Antworten), höchstens limit + 1 (für has_more)."""
+    return list(
+        QuestionnaireSession.objects.select_related('answers')
+        .filter(completion_seq__gt=seq)
+        .order_by('completion_seq')[:limit + 1]
+    )
@@ -12,8 +12,16 @@ Schweregrade:
              ausschließt oder regelhaft ausschließen kann
   pruefen  – eignungsrelevanter Befund, der Abklärung/Unterlagen erfordert
   hinweis  – beurteilungsrelevante Zusatzinformation
+
+Jeder Befund verweist auf eine stabile Regel-ID aus RULES. Die langen Texte
+(befund/konsequenz, Disclaimer) ändern sich nie zwischen zwei Aufrufen und
+werden deshalb über den versionierten Regelkatalog ausgeliefert; die API
+schickt je Befund nur id, schwere und ggf. params (z.B. den ESS-Wert).
 """
 
+import hashlib
+import json
+
 SCHWERE_ORDER = {"kritisch": 0, "pruefen": 1, "hinweis": 2}
 
 GRUPPE2_ANLAESSE = {"lkw", "bus", "fahrgast"}
@@ -28,9 +36,8 @@ def is_gruppe2(answers):
     return any(c in GRUPPE2_KLASSEN for c in classes)
 
 
-def _f(schwere, bereich, kapitel, befund, konsequenz):
+def _rule(bereich, kapitel, befund, konsequenz):
     return {
-        "schwere": schwere,
         "bereich": bereich,
         "kapitel": kapitel,
         "befund": befund,
@@ -38,8 +45,475 @@ def _f(schwere, bereich, kapitel, befund, konsequenz):
     }
 
 
-def evaluate_answers(answers):  # noqa: C901 - bewusst ein flaches Regelwerk
-    """Antworten → Liste eignungsrelevanter Befunde mit Leitlinien-Bezug."""
+# Regelkatalog: stabile Regel-ID → Texte. Die IDs sind Teil der API (kompakte
+# Befunde verweisen nur auf sie) und dürfen nicht umbenannt werden; Platzhalter
+# wie {ess} werden aus den params des Befunds gefüllt.
+RULES = {
+    # ── Anfälle & Epilepsie (Kap. 3.9.6) ─────────────────────────────────────
+    "anfall_unter3m": _rule(
+        "Epileptische Anfälle", "3.9.6",
+        "Anfall vor weniger als 3 Monaten",
+        "Mindest-Anfallsfreiheit nicht erreicht (Gruppe 1: je nach Konstellation 3–12 "
+        "Monate; Gruppe 2: mindestens 6 Monate bis 5 Jahre). Derzeit keine Fahreignung "
+        "anzunehmen."),
+    "anfall_3bis6m": _rule(
+        "Epileptische Anfälle", "3.9.6",
+        "Anfallsfreiheit 3–6 Monate",
+        "Gruppe 1 nur nach provoziertem Anfall mit vermeidbarem Auslöser (3 Monate) "
+        "möglich; nach unprovoziertem Anfall 6 Monate erforderlich. Gruppe 2: Frist "
+        "nicht erreicht."),
+    "anfall_6bis12m": _rule(
+        "Epileptische Anfälle", "3.9.6",
+        "Anfallsfreiheit 6–12 Monate",
+        "Gruppe 1: nach erstmaligem unprovoziertem Anfall erfüllt; bei Epilepsie erst "
+        "ab 1 Jahr. Gruppe 2: nach erstmaligem unprovoziertem Anfall sind 2 Jahre "
+        "gefordert."),
+    "epilepsie_g2": _rule(
+        "Epilepsie", "3.9.6",
+        "Diagnostizierte Epilepsie (Gruppe-2-Untersuchung)",
+        "Gruppe 2: grundsätzlich keine Eignung; einzige Ausnahme 5 Jahre "
+        "Anfallsfreiheit ohne antiepileptische Behandlung."),
+    "epilepsie": _rule(
+        "Epilepsie", "3.9.6",
+        "Diagnostizierte Epilepsie",
+        "Gruppe 1: mindestens 1 Jahr Anfallsfreiheit erforderlich (auch unter "
+        "Medikation möglich); jährliche fachneurologische Kontrollen."),
+    "antiepileptika_reduktion": _rule(
+        "Antiepileptika", "3.9.6",
+        "Antiepileptika werden reduziert bzw. wurden vor <3 Monaten beendet",
+        "Während der Reduzierung des letzten Medikaments und in den ersten 3 Monaten "
+        "ohne Medikation besteht keine Fahreignung."),
+    "antiepileptika_g2": _rule(
+        "Antiepileptika", "3.9.6",
+        "Antiepileptika-Einnahme (Gruppe-2-Untersuchung)",
+        "Gruppe 2 ist nur ohne Einnahme von Antiepileptika möglich."),
+
+    # ── Synkopen (Kap. 3.4.11) ───────────────────────────────────────────────
+    "synkope_wiederholt_kuerzlich": _rule(
+        "Synkopen", "3.4.11",
+        "Wiederholte Ohnmachten, letzte vor <6 Monaten",
+        "Bei wiederholter unklarer Synkope Gruppe 1 mindestens 6 Monate keine "
+        "Fahreignung; Gruppe 2 in der Regel keine Eignung. Erneute Diagnostik "
+        "erforderlich."),
+    "synkope_wiederholt": _rule(
+        "Synkopen", "3.4.11",
+        "Wiederholte Ohnmachten in der Vorgeschichte",
+        "Ursache und Rezidivrisiko klären; Gruppe 2 bei unklarer Ursache in der Regel "
+        "keine Eignung (Ausnahme: Synkopen mit geringem Risiko am Steuer)."),
+    "synkope_ohne_prodromi": _rule(
+        "Synkopen", "3.4.11",
+        "Ohnmachten ohne Vorboten (Prodromi)",
+        "Fehlende Prodromi verschärfen die Beurteilung – rechtzeitiges Anhalten ist "
+        "nicht möglich."),
+    "synkope_einmalig": _rule(
+        "Synkopen", "3.4.11",
+        "Einmalige Ohnmacht in der Vorgeschichte",
+        "Nach erster Synkope bleibt die Eignung in der Regel erhalten, sofern kein "
+        "sehr hohes Wiederholungsrisiko vorliegt (Ursache dokumentieren)."),
+
+    # ── Tagesschläfrigkeit / ESS / OSAS (Kap. 3.11) ──────────────────────────
+    "ess_ausgepraegt": _rule(
+        "Tagesschläfrigkeit", "3.11.1",
+        "ESS {ess}/24 – ausgeprägte Tagesschläfrigkeit",
+        "Unbehandelte/therapierefraktäre schwere Tagesschläfrigkeit schließt die "
+        "Fahreignung aus; schlafmedizinische Abklärung (Stufe 2) zwingend."),
+    "ess_auffaellig": _rule(
+        "Tagesschläfrigkeit", "3.11.1",
+        "ESS {ess}/24 – auffällige Tagesschläfrigkeit (Grenzwert 11)",
+        "Weitere schlafmedizinische Abklärung (Stufe 2, ggf. Fahrprobe) erforderlich, "
+        "bevor die Fahreignung bejaht wird."),
+    "sekundenschlaf": _rule(
+        "Tagesschläfrigkeit", "3.11.1",
+        "Ungewolltes Einschlafen / Sekundenschlaf",
+        "Kernsymptom auffälliger Tagesschläfrigkeit mit hohem Unfallrisiko – vor "
+        "Bejahung der Fahreignung abklären und behandeln; Details (am Steuer?) "
+        "erfragen."),
+    "monotonie_intoleranz": _rule(
+        "Tagesschläfrigkeit", "3.11.1",
+        "Monotonie-Intoleranz (Wachbleiben in eintönigen Situationen schwer)",
+        "Stufe-1-Kriterium der Leitlinie – ESS-Ergebnis und Fremdanamnese "
+        "berücksichtigen, ggf. schlafmedizinische Abklärung."),
+    "osas_ohne_therapie": _rule(
+        "Schlafapnoe", "3.11.2",
+        "Diagnostiziertes OSAS ohne konsequent genutzte Therapie",
+        "Mittel-/schweres OSAS mit Tagesschläfrigkeit schließt die Fahreignung aus; "
+        "Eignung nur bei eingehaltener Therapie mit gebesserter Wachheit. "
+        "Therapieadhärenz und AHI klären."),
+    "osas_therapie": _rule(
+        "Schlafapnoe", "3.11.2",
+        "OSAS unter regelmäßiger Therapie (z.B. CPAP)",
+        "Regelmäßige ärztliche Kontrollen erforderlich: Gruppe 2 mindestens jährlich, "
+        "Gruppe 1 höchstens alle 3 Jahre."),
+    "schnarchen": _rule(
+        "Schlafapnoe", "3.11.2",
+        "Fremdanamnestisch lautes Schnarchen / Atempausen",
+        "OSAS-Verdacht – bei Verdacht ist vor Erteilung/Erneuerung der Fahrerlaubnis "
+        "eine schlafmedizinische Untersuchung erforderlich."),
+
+    # ── Diabetes (Kap. 3.5) ──────────────────────────────────────────────────
+    "hypoglykaemie_fremdhilfe": _rule(
+        "Diabetes", "3.5",
+        "Schwere Unterzuckerung mit Fremdhilfe in den letzten 12 Monaten",
+        "Bei wiederholter schwerer Hypoglykämie im Wachzustand in der Regel 3 Monate "
+        "keine Eignung ab letzter Episode; Gruppe 2: keine wiederholte schwere "
+        "Hypoglykämie in den letzten 12 Monaten. Anzahl und Umstände (wach/Schlaf) "
+        "klären."),
+    "hypoglykaemie_wahrnehmung": _rule(
+        "Diabetes", "3.5",
+        "Hypoglykämie-Wahrnehmungsstörung",
+        "Schließt die Fahreignung beider Gruppen aus, bis die Wahrnehmung (Training, "
+        "Therapieumstellung) wiederhergestellt ist."),
+    "diabetes_therapie_g2": _rule(
+        "Diabetes", "3.5",
+        "Therapie mit Hypoglykämierisiko (Gruppe-2-Untersuchung)",
+        "Gruppe 2: fachärztlich-diabetologische Begutachtung alle 3 Jahre, stabile "
+        "Stoffwechselführung über 3 Monate, Glukoseselbstkontrollen mindestens zweimal "
+        "täglich sowie zu fahrrelevanten Zeiten."),
+    "glukose_selbstkontrolle": _rule(
+        "Diabetes", "3.5",
+        "Unzureichende Glukose-Selbstkontrollen unter risikobehafteter Therapie",
+        "Geforderte Selbstkontrollen (insbesondere zu fahrrelevanten Zeiten) werden "
+        "nicht eingehalten – Schulung/Auflagen erwägen."),
+    "diabetes_entgleisung": _rule(
+        "Diabetes", "3.5",
+        "Kürzliche Neueinstellung oder Stoffwechselentgleisung",
+        "Fahrpause bis zum Abschluss der Einstellphase (sichere "
+        "Hypoglykämiewahrnehmung, normalisiertes Sehvermögen); Gruppe 2: stabile "
+        "Stoffwechselführung über 3 Monate nachweisen."),
+
+    # ── Herz-Kreislauf (Kap. 3.4) ────────────────────────────────────────────
+    "icd_g2": _rule(
+        "Defibrillator (ICD)", "3.4.1.4",
+        "ICD-Träger (Gruppe-2-Untersuchung)",
+        "Fahrer der Gruppe 2 mit ICD sind in der Regel nicht geeignet."),
+    "icd": _rule(
+        "Defibrillator (ICD)", "3.4.1.4",
+        "ICD-Träger",
+        "Wartefristen beachten (primärpräventiv 1–2 Wochen, sekundärpräventiv 3 "
+        "Monate); regelmäßige ICD-Kontrollen erforderlich."),
+    "icd_schock": _rule(
+        "Defibrillator (ICD)", "3.4.1.4",
+        "ICD-Schockabgabe in den letzten 3 Monaten",
+        "Nach adäquater Schockabgabe 3 Monate keine Fahreignung; inadäquate Schocks "
+        "müssen sicher verhindert sein (kardiologische Stellungnahme)."),
+    "herzinfarkt": _rule(
+        "Koronare Herzkrankheit", "3.4.4",
+        "Herzinfarkt / Stent / Bypass in der Vorgeschichte",
+        "Wartefristen und Pumpfunktion prüfen (Gruppe 1: ab Entlassung bzw. 4 Wochen "
+        "bei EF ≤35 %; Gruppe 2: 6 Wochen und nur bei EF >35 %, nach Bypass 3 Monate). "
+        "Aktuellen kardiologischen Befund anfordern."),
+    "nyha_iv": _rule(
+        "Herzinsuffizienz", "3.4.5",
+        "Beschwerden bereits in Ruhe (entspricht NYHA IV)",
+        "Keine Fahreignung für beide Gruppen."),
+    "nyha_iii": _rule(
+        "Herzinsuffizienz", "3.4.5",
+        "Beschwerden bei leichter Belastung (entspricht NYHA III)",
+        "Gruppe 2: keine Fahreignung. Gruppe 1: nur bei stabilem NYHA III nach "
+        "fachärztlicher Untersuchung."),
+    "blutdruck_schwindel": _rule(
+        "Blutdrucktherapie", "3.4.2",
+        "Schwindel/Schwarzwerden unter Blutdruckmedikation",
+        "Therapiebedingter Blutdruckabfall kann zum Kontrollverlust am Steuer führen – "
+        "Medikation überprüfen."),
+    "rhythmusstoerung": _rule(
+        "Herzrhythmusstörungen", "3.4.1",
+        "Bekannte Herzrhythmusstörungen",
+        "Kardiologische Untersuchung inkl. Langzeit-EKG; rhythmogene Synkopen "
+        "schließen die Eignung aus. Gruppe 2: AV-Block III/Mobitz II und "
+        "alternierender Schenkelblock schließen die Eignung aus."),
+    "herz_sonstige": _rule(
+        "Herz-/Gefäßerkrankung", "3.4.7–3.4.12",
+        "Klappenfehler / angeborener Herzfehler / Kardiomyopathie / "
+        "Ionenkanalerkrankung / Aneurysma / Karotisstenose angegeben",
+        "Je nach Diagnose gelten eigene Fristen und Gruppe-2-Ausschlüsse – "
+        "kardiologische Unterlagen anfordern und nach dem jeweiligen Kapitel "
+        "beurteilen."),
+    "familie_herztod": _rule(
+        "Familienanamnese", "3.4.9/3.4.10",
+        "Plötzlicher Herztod bei Verwandten 1. Grades",
+        "Risikokriterium (u.a. bei hypertropher Kardiomyopathie für Gruppe 2) – bei "
+        "kardialen Diagnosen in die Beurteilung einbeziehen."),
+
+    # ── Gehirn (Kap. 3.9.4 / 3.9.5) ──────────────────────────────────────────
+    "schlaganfall_ausfaelle": _rule(
+        "Schlaganfall/TIA", "3.9.4",
+        "Zustand nach Schlaganfall/Hirnblutung/TIA mit fortbestehenden Ausfällen",
+        "Relevante neurologische/neuropsychologische Ausfälle schließen die Eignung "
+        "beider Gruppen aus, bis sie erfolgreich behandelt bzw. kompensiert sind."),
+    "schlaganfall": _rule(
+        "Schlaganfall/TIA", "3.9.4",
+        "Zustand nach Schlaganfall/Hirnblutung/TIA",
+        "Gruppe 2: die Belastungen sind Betroffenen generell nicht zuzumuten. Gruppe "
+        "1: Wiedererlangung nach erfolgreicher Therapie möglich; Nachuntersuchungen "
+        "nach 1, 2 und 4 Jahren."),
+    "hirnverletzung_frisch": _rule(
+        "Hirnverletzung/-operation", "3.9.5",
+        "Hirnverletzung oder -operation vor weniger als 3 Monaten",
+        "Im Allgemeinen 3 Monate keine Eignung für beide Gruppen; Ausnahme nur bei "
+        "neurologisch nachgewiesener Störungsfreiheit."),
+    "hirnverletzung_folgen": _rule(
+        "Hirnverletzung/-operation", "3.9.5",
+        "Folgebeschwerden nach Hirnverletzung/-operation",
+        "Hirnorganische Leistungsstörungen bzw. Anfallskomplikationen abklären "
+        "(neurologisch, ggf. neuropsychologisch; vgl. 3.9.6/3.12.2)."),
+
+    # ── Nervensystem (Kap. 3.9.1–3.9.3) ──────────────────────────────────────
+    "parkinson": _rule(
+        "Parkinson/Extrapyramidal", "3.9.3",
+        "Parkinson-Krankheit bzw. Bewegungs-/Koordinationsstörung",
+        "Gruppe 2: bei erkennbarer Symptomatik in der Regel keine Eignung. Gruppe 1: "
+        "nur bei erfolgreicher Therapie/leichten Fällen; Nachuntersuchungen nach 1, 2 "
+        "und 4 Jahren."),
+    "rueckenmark_ms": _rule(
+        "Rückenmark/MS", "3.9.1",
+        "Rückenmarkserkrankung/-verletzung bzw. Multiple Sklerose",
+        "Ausmaß der motorischen Behinderung und Kompensierbarkeit (Fahrzeugumbau) "
+        "prüfen; Gruppe 2 bei relevanter Behinderung in der Regel ausgeschlossen; bei "
+        "progredienten Verläufen Nachuntersuchungen."),
+    "neuromuskulaer": _rule(
+        "Neuromuskulär", "3.9.2",
+        "Muskel-/Nervenerkrankung (Myasthenie, Muskelschwund, Polyneuropathie)",
+        "Bei relevanter motorischer Beeinträchtigung Gruppe 2 ausgeschlossen; Gruppe 1 "
+        "im Einzelfall neurologisch nachweisen; ggf. Nachuntersuchungen nach 1, 2 und "
+        "4 Jahren."),
+    "laehmungsattacken": _rule(
+        "Anfallsartige Lähmungen", "3.9.2",
+        "Anfallsartige Lähmungen / plötzliche Muskelschwäche",
+        "Mit Anfallsleiden vergleichbar – Eignung setzt Anfallsfreiheit oder "
+        "nachweislich langsam einsetzende, kontrollierbare Lähmungen voraus."),
+    "motorik": _rule(
+        "Motorik", "3.3/3.9",
+        "Lähmungen/Gefühlsstörungen mit möglicher Fahrrelevanz",
+        "Kompensation nach den Sicherheitsmaßnahmen für körperbehinderte Kraftfahrer "
+        "(Anhang B) prüfen; ggf. Fahrprobe und Fahrzeugauflagen."),
+
+    # ── Gleichgewicht/Schwindel (Kap. 3.10) ──────────────────────────────────
+    "schwindel_ohne_vorboten": _rule(
+        "Schwindel", "3.10",
+        "Schwindelattacken ohne Vorboten, letzte vor <3 Monaten",
+        "Attackenfreier Beobachtungszeitraum von mindestens 3 Monaten (je nach "
+        "Krankheitsbild länger) nicht erfüllt – derzeit keine Fahreignung anzunehmen."),
+    "schwindel_kuerzlich": _rule(
+        "Schwindel", "3.10",
+        "Kürzliche Schwindelattacken",
+        "Krankheitsbild und attackenfreie Fristen klären (z.B. Menière: Gruppe 1 6–12 "
+        "Monate, Gruppe 2 2–4 Jahre; HNO-fachärztliche Untersuchung)."),
+    "lagerungsschwindel": _rule(
+        "Schwindel", "3.10.1",
+        "Lageabhängiger Schwindel (V.a. gutartiger Lagerungsschwindel)",
+        "Fahreignung erst nach erfolgreicher Therapie/Spontanremission (Nachweis per "
+        "Lagerungsprüfung)."),
+    "morbus_meniere": _rule(
+        "Schwindel", "3.10.1",
+        "Drehschwindel mit Ohrsymptomen (V.a. Morbus Menière)",
+        "Fristen abhängig von Prodromi und Gruppe (6 Monate bis 4 Jahre "
+        "Attackenfreiheit); fachärztliche Abklärung."),
+
+    # ── Psyche (Kap. 3.12) ───────────────────────────────────────────────────
+    "psychose": _rule(
+        "Psychose", "3.12.5",
+        "Schizophrenie/Psychose in der Vorgeschichte",
+        "Gruppe 2: nach schizophrener Erkrankung in der Regel dauerhaft keine Eignung. "
+        "Gruppe 1: möglich, wenn keine das Realitätsurteil beeinträchtigenden "
+        "Störungen mehr nachweisbar sind; fachpsychiatrische Beurteilung."),
+    "affektive_stoerung": _rule(
+        "Affektive Störung", "3.12.4",
+        "Stationäre Behandlung / Manie / Suizidalität in der Vorgeschichte",
+        "Sehr schwere Phasen schließen die Eignung während der Phase aus; bei mehreren "
+        "Phasen nur mit belegter Prophylaxe und regelmäßigen psychiatrischen "
+        "Kontrollen. Gruppe 2: Symptomfreiheit gefordert, nach mehreren Phasen in der "
+        "Regel keine Eignung."),
+    "kognition": _rule(
+        "Kognition/Demenz", "3.12.2/3.12.3",
+        "Zunehmende Gedächtnis-/Orientierungsprobleme (auch fremdanamnestisch)",
+        "Demenz-Abklärung (ggf. neuropsychologisch, Fahrprobe); ausgeprägte Demenz "
+        "schließt beide Gruppen aus, Gruppe 2 bereits bei geringeren Einschränkungen."),
+
+    # ── Alkohol, Drogen, Medikamente (Kap. 3.13/3.14) ────────────────────────
+    "alkohol_abhaengigkeit": _rule(
+        "Alkohol", "3.13.2",
+        "Alkoholabhängigkeit bzw. Entgiftung/Entwöhnung in der Vorgeschichte",
+        "Bei Abhängigkeit keine Eignung; Wiedererlangung erst nach erfolgreicher "
+        "Entwöhnung und in der Regel einjähriger, ärztlich (inkl. Labor) belegter "
+        "Abstinenz."),
+    "alkohol_verkehr": _rule(
+        "Alkohol", "3.13.1",
+        "Verkehrsauffälligkeit unter Alkohol (Trunkenheitsfahrt/MPU)",
+        "Missbrauchsverdacht – sichere Trennung von Konsum und Fahren klären; "
+        "Wiederherstellung erst nach stabil geändertem Trinkverhalten (in der Regel 1 "
+        "Jahr, mindestens 6 Monate)."),
+    "alkohol_kontrollverlust": _rule(
+        "Alkohol", "3.13.1",
+        "Kontrollverlust über den Alkoholkonsum angegeben",
+        "Leitlinien-Kriterium für Missbrauch – Konsummuster und Abhängigkeitskriterien "
+        "(ICD-10) explorieren."),
+    "alkohol_taeglich": _rule(
+        "Alkohol", "3.13.1",
+        "(Fast) täglicher Alkoholkonsum",
+        "Konsummuster hinsichtlich Gewöhnung/Missbrauch explorieren (Labor: z.B. "
+        "CDT/GGT erwägen)."),
+    "cannabis_regelmaessig": _rule(
+        "Betäubungsmittel", "3.14.1",
+        "Regelmäßiger (täglicher/gewohnheitsmäßiger) Cannabiskonsum",
+        "Schließt die Eignung in der Regel aus. Bei gelegentlichem Konsum: Trennung "
+        "von Konsum und Fahren, kein Beigebrauch."),
+    "drogen": _rule(
+        "Betäubungsmittel", "3.14.1",
+        "Drogenkonsum aktuell oder in der Vorgeschichte",
+        "Aktuelle BtM-Einnahme schließt die Eignung aus (außer ärztlich verordnet); "
+        "nach Abhängigkeit einjährige Abstinenz mit unangekündigten Laborkontrollen "
+        "nachweisen."),
+    "substitution": _rule(
+        "Substitution", "3.14.1",
+        "Laufende Substitutionsbehandlung (z.B. Methadon)",
+        "In der Regel keine Eignung; seltene Ausnahmen erfordern u.a. über einjährige "
+        "Substitution, stabile Integration und ein Jahr nachgewiesene "
+        "Beigebrauchsfreiheit."),
+    "medikation_nebenwirkungen": _rule(
+        "Dauermedikation", "3.14.2",
+        "Spürbare Nebenwirkungen (Müdigkeit, Verlangsamung, Schwindel) unter "
+        "Dauermedikation",
+        "Erhebliche unerwünschte Wirkungen wie Verlangsamung und "
+        "Konzentrationsstörungen schließen die Eignung aus – Medikation anpassen und "
+        "neu beurteilen."),
+    "medikation_sedierend": _rule(
+        "Dauermedikation", "3.14.2",
+        "Dauerbehandlung mit potenziell sedierenden Medikamenten",
+        "Psychoaktive Dauermedikation kann die Eignung unabhängig vom Grundleiden "
+        "beeinträchtigen; regelmäßige ärztliche Überwachung mit Nachweis erforderlich."),
+    "schlafmittel_regelmaessig": _rule(
+        "Dauermedikation", "3.14.2",
+        "Regelmäßige Einnahme von Schlaf-/Beruhigungsmitteln über Monate",
+        "Risiko einer Low-dose-Abhängigkeit (auch bei kleinen abendlichen Mengen) – "
+        "Entzugssymptome explorieren, Ausschleichen erwägen."),
+    "medikation_umstellung": _rule(
+        "Dauermedikation", "3.14.2",
+        "Kürzlich neu angesetztes/umgestelltes Medikament",
+        "In der Initialphase einer Behandlung ist besondere Vorsicht geboten."),
+
+    # ── Sehen & Hören (Kap. 3.1/3.2) ─────────────────────────────────────────
+    "sehvermoegen": _rule(
+        "Sehvermögen", "3.1",
+        "Angegeben: {details}",
+        "Sehanforderungen nach § 12 / Anlage 6 FeV prüfen (Gruppe 2 deutlich strenger, "
+        "ggf. augenärztliche Untersuchung); Kompensation z.B. Verzicht auf "
+        "Nachtfahrten möglich."),
+    "hoervermoegen_g2": _rule(
+        "Hörvermögen", "3.2",
+        "Hochgradige Schwerhörigkeit/Gehörlosigkeit (Gruppe-2-Untersuchung)",
+        "HNO-fachärztliche Eignungsuntersuchung, regelmäßige Kontrollen und Nachweis "
+        "von 3 Jahren Fahrpraxis mit Klasse B erforderlich; Begleitstörungen "
+        "(Gleichgewicht/Sehen) ausschließen."),
+
+    # ── Innere Organe (Kap. 3.6–3.8) ─────────────────────────────────────────
+    "dialyse": _rule(
+        "Niere", "3.6",
+        "Dialysepflichtige Niereninsuffizienz",
+        "Gruppe 2: in der Regel keine Eignung (Ausnahme nur nach nephrologischer "
+        "Einzelbegutachtung). Gruppe 1: nur unter ständiger ärztlicher Betreuung und "
+        "Kontrolle."),
+    "niere": _rule(
+        "Niere", "3.6",
+        "Chronische Nierenerkrankung",
+        "Maßgeblich ist die tatsächliche Beeinträchtigung von Allgemeinbefinden und "
+        "Leistungsfähigkeit; nephrologische Betreuung dokumentieren."),
+    "transplantation": _rule(
+        "Transplantation", "3.6/3.7",
+        "Zustand nach Organtransplantation",
+        "Organfunktion, Immunsuppressions-Nebenwirkungen und Nachsorge prüfen; nach "
+        "Nierentransplantation jährliche Nachbegutachtung, Herz: Gruppe 2 in der Regel "
+        "keine Eignung (<5 Jahre)."),
+    "hustensynkope": _rule(
+        "Lunge", "3.8",
+        "Hustensynkopen (Schwindel/Bewusstlosigkeit bei Hustenanfall)",
+        "Können die Fähigkeit zum sicheren Führen von Kraftfahrzeugen aufheben – "
+        "internistische Abklärung vor Bejahung der Eignung."),
+    "atemnot": _rule(
+        "Lunge", "3.8",
+        "Atemnot bei leichter Belastung/in Ruhe bzw. Sauerstofftherapie",
+        "Hinweis auf fortgeschrittene Erkrankung mit möglicher respiratorischer "
+        "Insuffizienz – Lungenfunktion/Blutgase und kardiale Rückwirkungen (Cor "
+        "pulmonale, vgl. 3.4.5) klären."),
+
+    # ── Allgemeines ──────────────────────────────────────────────────────────
+    "anamnese_verkuerzt": _rule(
+        "Anamnese", "2.5",
+        "Patient verneint Vorerkrankungen, dauerhafte Einschränkungen und laufende "
+        "ärztliche Behandlung",
+        "Verkürzter Fragensatz: Diagnose-Blöcke wurden übersprungen; Symptom- und "
+        "Ereignis-Screening (Anfälle, Synkopen, Tagesschläfrigkeit, Substanzen) wurde "
+        "vollständig erhoben."),
+    "fahrerlaubnisentzug": _rule(
+        "Verkehrsvorgeschichte", "3.13/3.17",
+        "Früherer Fahrerlaubnisentzug bzw. MPU",
+        "Anlass und Ausgang klären; körperliche/psychische Ursachen der damaligen "
+        "Auffälligkeit dürfen nicht fortbestehen."),
+    "psych_leistungstest": _rule(
+        "Fahrgastbeförderung/Bus", "3.19",
+        "Psychologischer Leistungstest noch nicht absolviert",
+        "Für Klassen D/D1 und Fahrgastbeförderung ist der Nachweis der psychischen "
+        "Leistungsfähigkeit nach Anlage 5 Nr. 2 FeV erforderlich."),
+    "kumulation": _rule(
+        "Kumulation", "2.7",
+        "Mehrere Erkrankungen gleichzeitig angegeben",
+        "Kumulierte Auffälligkeiten können in ihrer Summe Eignungszweifel begründen, "
+        "auch wenn jede einzelne unbedenklich wäre."),
+    "fahranamnese": _rule(
+        "Fahranamnese", "2.5",
+        "Unfälle/Beinahe-Unfälle in den letzten 24 Monaten",
+        "Unfallhergang auf mögliche medizinische Ursachen (Sekundenschlaf, Synkope, "
+        "Seh-/Reaktionsdefizit) prüfen."),
+}
+
+DISCLAIMER = (
+    "Automatisch erzeugte Hinweise nach den Begutachtungsleitlinien zur "
+    "Kraftfahreignung (BASt, Stand 2022). Entscheidungsunterstützung – die "
+    "abschließende Beurteilung obliegt der Ärztin/dem Arzt."
+)
+
+# Inhalts-Hash des Katalogs: ändert sich automatisch mit jedem Text
+RULES_VERSION = hashlib.sha256(
+    json.dumps(
+        {"rules": RULES, "disclaimer": DISCLAIMER}, sort_keys=True, ensure_ascii=False
+    ).encode("utf-8")
+).hexdigest()[:12]
+
+
+def rules_catalog():
+    """Regelkatalog für /api/evaluation/rules/ (Texte aller Befunde + Disclaimer)."""
+    return {"version": RULES_VERSION, "disclaimer": DISCLAIMER, "rules": RULES}
+
+
+def _f(rule_id, schwere, **params):
+    finding = {"id": rule_id, "schwere": schwere}
+    if params:
+        finding["params"] = params
+    return finding
+
+
+def render_finding(finding):
+    """Kompakter Befund (id, schwere, params) → Befund mit vollständigen Texten."""
+    rule = RULES[finding["id"]]
+    params = finding.get("params") or {}
+    return {
+        "id": finding["id"],
+        "schwere": finding["schwere"],
+        "bereich": rule["bereich"],
+        "kapitel": rule["kapitel"],
+        "befund": rule["befund"].format(**params) if params else rule["befund"],
+        "konsequenz": rule["konsequenz"],
+    }
+
+
+def evaluate_answers(answers, texts=True):  # noqa: C901 - bewusst ein flaches Regelwerk
+    """
+    Antworten → Liste eignungsrelevanter Befunde mit Leitlinien-Bezug.
+
+    texts=True liefert jeden Befund mit vollständigen Texten plus Disclaimer
+    (bisheriges Format); texts=False nur Regel-ID, Schweregrad und params –
+    die Texte stehen einmalig im Regelkatalog (rules_catalog, RULES_VERSION).
+    """
     a = answers
     g2 = is_gruppe2(a)
     out = []
@@ -51,370 +525,161 @@ def evaluate_answers(answers):  # noqa: C901 - bewusst ein flaches Regelwerk
     if yes("seizure_ever"):
         frei = a.get("seizure_free")
         if frei == "unter3m":
-            out.append(_f("kritisch", "Epileptische Anfälle", "3.9.6",
-                "Anfall vor weniger als 3 Monaten",
-                "Mindest-Anfallsfreiheit nicht erreicht (Gruppe 1: je nach Konstellation "
-                "3–12 Monate; Gruppe 2: mindestens 6 Monate bis 5 Jahre). Derzeit keine "
-                "Fahreignung anzunehmen."))
+            out.append(_f("anfall_unter3m", "kritisch"))
         elif frei == "3bis6m":
-            out.append(_f("kritisch" if g2 else "pruefen", "Epileptische Anfälle", "3.9.6",
-                "Anfallsfreiheit 3–6 Monate",
-                "Gruppe 1 nur nach provoziertem Anfall mit vermeidbarem Auslöser (3 Monate) "
-                "möglich; nach unprovoziertem Anfall 6 Monate erforderlich. Gruppe 2: Frist "
-                "nicht erreicht."))
+            out.append(_f("anfall_3bis6m", "kritisch" if g2 else "pruefen"))
         elif frei == "6bis12m":
-            out.append(_f("kritisch" if g2 else "pruefen", "Epileptische Anfälle", "3.9.6",
-                "Anfallsfreiheit 6–12 Monate",
-                "Gruppe 1: nach erstmaligem unprovoziertem Anfall erfüllt; bei Epilepsie "
-                "erst ab 1 Jahr. Gruppe 2: nach erstmaligem unprovoziertem Anfall sind "
-                "2 Jahre gefordert."))
+            out.append(_f("anfall_6bis12m", "kritisch" if g2 else "pruefen"))
         if a.get("epilepsy") == "yes":
             if g2:
-                out.append(_f("kritisch", "Epilepsie", "3.9.6",
-                    "Diagnostizierte Epilepsie (Gruppe-2-Untersuchung)",
-                    "Gruppe 2: grundsätzlich keine Eignung; einzige Ausnahme 5 Jahre "
-                    "Anfallsfreiheit ohne antiepileptische Behandlung."))
+                out.append(_f("epilepsie_g2", "kritisch"))
             else:
-                out.append(_f("pruefen", "Epilepsie", "3.9.6",
-                    "Diagnostizierte Epilepsie",
-                    "Gruppe 1: mindestens 1 Jahr Anfallsfreiheit erforderlich (auch unter "
-                    "Medikation möglich); jährliche fachneurologische Kontrollen."))
+                out.append(_f("epilepsie", "pruefen"))
         ae = a.get("antiepileptics")
         if ae in ("reduktion", "ende_unter3m"):
-            out.append(_f("kritisch", "Antiepileptika", "3.9.6",
-                "Antiepileptika werden reduziert bzw. wurden vor <3 Monaten beendet",
-                "Während der Reduzierung des letzten Medikaments und in den ersten "
-                "3 Monaten ohne Medikation besteht keine Fahreignung."))
+            out.append(_f("antiepileptika_reduktion", "kritisch"))
         elif ae == "aktuell" and g2:
-            out.append(_f("kritisch", "Antiepileptika", "3.9.6",
-                "Antiepileptika-Einnahme (Gruppe-2-Untersuchung)",
-                "Gruppe 2 ist nur ohne Einnahme von Antiepileptika möglich."))
+            out.append(_f("antiepileptika_g2", "kritisch"))
 
     # ── Synkopen (Kap. 3.4.11) ───────────────────────────────────────────────
     if a.get("syncope") == "mehrmals":
         if yes("syncope_recent"):
-            out.append(_f("kritisch", "Synkopen", "3.4.11",
-                "Wiederholte Ohnmachten, letzte vor <6 Monaten",
-                "Bei wiederholter unklarer Synkope Gruppe 1 mindestens 6 Monate keine "
-                "Fahreignung; Gruppe 2 in der Regel keine Eignung. Erneute Diagnostik "
-                "erforderlich."))
+            out.append(_f("synkope_wiederholt_kuerzlich", "kritisch"))
         else:
-            out.append(_f("pruefen", "Synkopen", "3.4.11",
-                "Wiederholte Ohnmachten in der Vorgeschichte",
-                "Ursache und Rezidivrisiko klären; Gruppe 2 bei unklarer Ursache in der "
-                "Regel keine Eignung (Ausnahme: Synkopen mit geringem Risiko am Steuer)."))
+            out.append(_f("synkope_wiederholt", "pruefen"))
         if yes("syncope_prodromi") is False and a.get("syncope_prodromi") == "no":
-            out.append(_f("pruefen", "Synkopen", "3.4.11",
-                "Ohnmachten ohne Vorboten (Prodromi)",
-                "Fehlende Prodromi verschärfen die Beurteilung – rechtzeitiges Anhalten "
-                "ist nicht möglich."))
+            out.append(_f("synkope_ohne_prodromi", "pruefen"))
     elif a.get("syncope") == "einmal":
-        out.append(_f("hinweis", "Synkopen", "3.4.11",
-            "Einmalige Ohnmacht in der Vorgeschichte",
-            "Nach erster Synkope bleibt die Eignung in der Regel erhalten, sofern kein "
-            "sehr hohes Wiederholungsrisiko vorliegt (Ursache dokumentieren)."))
+        out.append(_f("synkope_einmalig", "hinweis"))
 
     # ── Tagesschläfrigkeit / ESS / OSAS (Kap. 3.11) ──────────────────────────
     ess = a.get("ess_total")
     if isinstance(ess, int):
         if ess >= 16:
-            out.append(_f("kritisch", "Tagesschläfrigkeit", "3.11.1",
-                f"ESS {ess}/24 – ausgeprägte Tagesschläfrigkeit",
-                "Unbehandelte/therapierefraktäre schwere Tagesschläfrigkeit schließt die "
-                "Fahreignung aus; schlafmedizinische Abklärung (Stufe 2) zwingend."))
+            out.append(_f("ess_ausgepraegt", "kritisch", ess=ess))
         elif ess >= 11:
-            out.append(_f("pruefen", "Tagesschläfrigkeit", "3.11.1",
-                f"ESS {ess}/24 – auffällige Tagesschläfrigkeit (Grenzwert 11)",
-                "Weitere schlafmedizinische Abklärung (Stufe 2, ggf. Fahrprobe) "
-                "erforderlich, bevor die Fahreignung bejaht wird."))
+            out.append(_f("ess_auffaellig", "pruefen", ess=ess))
     if yes("microsleep"):
-        out.append(_f("kritisch", "Tagesschläfrigkeit", "3.11.1",
-            "Ungewolltes Einschlafen / Sekundenschlaf",
-            "Kernsymptom auffälliger Tagesschläfrigkeit mit hohem Unfallrisiko – vor "
-            "Bejahung der Fahreignung abklären und behandeln; Details (am Steuer?) "
-            "erfragen."))
+        out.append(_f("sekundenschlaf", "kritisch"))
     elif yes("daytime_sleepiness"):
-        out.append(_f("pruefen", "Tagesschläfrigkeit", "3.11.1",
-            "Monotonie-Intoleranz (Wachbleiben in eintönigen Situationen schwer)",
-            "Stufe-1-Kriterium der Leitlinie – ESS-Ergebnis und Fremdanamnese "
-            "berücksichtigen, ggf. schlafmedizinische Abklärung."))
+        out.append(_f("monotonie_intoleranz", "pruefen"))
     if yes("osas"):
         cpap = a.get("cpap")
         if cpap in ("keine", "abgebrochen", "unregelmaessig"):
-            out.append(_f("kritisch", "Schlafapnoe", "3.11.2",
-                "Diagnostiziertes OSAS ohne konsequent genutzte Therapie",
-                "Mittel-/schweres OSAS mit Tagesschläfrigkeit schließt die Fahreignung "
-                "aus; Eignung nur bei eingehaltener Therapie mit gebesserter Wachheit. "
-                "Therapieadhärenz und AHI klären."))
+            out.append(_f("osas_ohne_therapie", "kritisch"))
         else:
-            out.append(_f("hinweis", "Schlafapnoe", "3.11.2",
-                "OSAS unter regelmäßiger Therapie (z.B. CPAP)",
-                "Regelmäßige ärztliche Kontrollen erforderlich: Gruppe 2 mindestens "
-                "jährlich, Gruppe 1 höchstens alle 3 Jahre."))
+            out.append(_f("osas_therapie", "hinweis"))
     elif yes("snoring"):
-        out.append(_f("pruefen", "Schlafapnoe", "3.11.2",
-            "Fremdanamnestisch lautes Schnarchen / Atempausen",
-            "OSAS-Verdacht – bei Verdacht ist vor Erteilung/Erneuerung der Fahrerlaubnis "
-            "eine schlafmedizinische Untersuchung erforderlich."))
+        out.append(_f("schnarchen", "pruefen"))
 
     # ── Diabetes (Kap. 3.5) ──────────────────────────────────────────────────
     if a.get("diabetes_type") not in (None, "", "none"):
         if yes("hypoglycemia"):
-            out.append(_f("kritisch", "Diabetes", "3.5",
-                "Schwere Unterzuckerung mit Fremdhilfe in den letzten 12 Monaten",
-                "Bei wiederholter schwerer Hypoglykämie im Wachzustand in der Regel "
-                "3 Monate keine Eignung ab letzter Episode; Gruppe 2: keine wiederholte "
-                "schwere Hypoglykämie in den letzten 12 Monaten. Anzahl und Umstände "
-                "(wach/Schlaf) klären."))
+            out.append(_f("hypoglykaemie_fremdhilfe", "kritisch"))
         if yes("hypo_awareness"):
-            out.append(_f("kritisch", "Diabetes", "3.5",
-                "Hypoglykämie-Wahrnehmungsstörung",
-                "Schließt die Fahreignung beider Gruppen aus, bis die Wahrnehmung "
-                "(Training, Therapieumstellung) wiederhergestellt ist."))
+            out.append(_f("hypoglykaemie_wahrnehmung", "kritisch"))
         therapie = a.get("diabetes_therapy")
         if therapie in ("insulin", "tabl_high"):
             if g2:
-                out.append(_f("pruefen", "Diabetes", "3.5",
-                    "Therapie mit Hypoglykämierisiko (Gruppe-2-Untersuchung)",
-                    "Gruppe 2: fachärztlich-diabetologische Begutachtung alle 3 Jahre, "
-                    "stabile Stoffwechselführung über 3 Monate, Glukoseselbstkontrollen "
-                    "mindestens zweimal täglich sowie zu fahrrelevanten Zeiten."))
+                out.append(_f("diabetes_therapie_g2", "pruefen"))
             if a.get("glucose_monitoring") in ("seltener", "nein"):
-                out.append(_f("pruefen", "Diabetes", "3.5",
-                    "Unzureichende Glukose-Selbstkontrollen unter risikobehafteter Therapie",
-                    "Geforderte Selbstkontrollen (insbesondere zu fahrrelevanten Zeiten) "
-                    "werden nicht eingehalten – Schulung/Auflagen erwägen."))
+                out.append(_f("glukose_selbstkontrolle", "pruefen"))
         if yes("diabetes_derailment"):
-            out.append(_f("pruefen", "Diabetes", "3.5",
-                "Kürzliche Neueinstellung oder Stoffwechselentgleisung",
-                "Fahrpause bis zum Abschluss der Einstellphase (sichere "
-                "Hypoglykämiewahrnehmung, normalisiertes Sehvermögen); Gruppe 2: "
-                "stabile Stoffwechselführung über 3 Monate nachweisen."))
+            out.append(_f("diabetes_entgleisung", "pruefen"))
 
     # ── Herz-Kreislauf (Kap. 3.4) ────────────────────────────────────────────
     if a.get("pacemaker_icd") == "icd":
         if g2:
-            out.append(_f("kritisch", "Defibrillator (ICD)", "3.4.1.4",
-                "ICD-Träger (Gruppe-2-Untersuchung)",
-                "Fahrer der Gruppe 2 mit ICD sind in der Regel nicht geeignet."))
+            out.append(_f("icd_g2", "kritisch"))
         else:
-            out.append(_f("pruefen", "Defibrillator (ICD)", "3.4.1.4",
-                "ICD-Träger",
-                "Wartefristen beachten (primärpräventiv 1–2 Wochen, sekundärpräventiv "
-                "3 Monate); regelmäßige ICD-Kontrollen erforderlich."))
+            out.append(_f("icd", "pruefen"))
         if yes("icd_shock"):
-            out.append(_f("kritisch", "Defibrillator (ICD)", "3.4.1.4",
-                "ICD-Schockabgabe in den letzten 3 Monaten",
-                "Nach adäquater Schockabgabe 3 Monate keine Fahreignung; inadäquate "
-                "Schocks müssen sicher verhindert sein (kardiologische Stellungnahme)."))
+            out.append(_f("icd_schock", "kritisch"))
     if yes("heart_attack"):
-        out.append(_f("pruefen", "Koronare Herzkrankheit", "3.4.4",
-            "Herzinfarkt / Stent / Bypass in der Vorgeschichte",
-            "Wartefristen und Pumpfunktion prüfen (Gruppe 1: ab Entlassung bzw. "
-            "4 Wochen bei EF ≤35 %; Gruppe 2: 6 Wochen und nur bei EF >35 %, nach "
-            "Bypass 3 Monate). Aktuellen kardiologischen Befund anfordern."))
+        out.append(_f("herzinfarkt", "pruefen"))
     belastung = a.get("exertion_symptoms")
     if belastung == "ruhe":
-        out.append(_f("kritisch", "Herzinsuffizienz", "3.4.5",
-            "Beschwerden bereits in Ruhe (entspricht NYHA IV)",
-            "Keine Fahreignung für beide Gruppen."))
+        out.append(_f("nyha_iv", "kritisch"))
     elif belastung == "leicht":
-        out.append(_f("kritisch" if g2 else "pruefen", "Herzinsuffizienz", "3.4.5",
-            "Beschwerden bei leichter Belastung (entspricht NYHA III)",
-            "Gruppe 2: keine Fahreignung. Gruppe 1: nur bei stabilem NYHA III nach "
-            "fachärztlicher Untersuchung."))
+        out.append(_f("nyha_iii", "kritisch" if g2 else "pruefen"))
     if yes("bp_dizziness"):
-        out.append(_f("pruefen", "Blutdrucktherapie", "3.4.2",
-            "Schwindel/Schwarzwerden unter Blutdruckmedikation",
-            "Therapiebedingter Blutdruckabfall kann zum Kontrollverlust am Steuer "
-            "führen – Medikation überprüfen."))
+        out.append(_f("blutdruck_schwindel", "pruefen"))
     if yes("arrhythmia"):
-        out.append(_f("pruefen", "Herzrhythmusstörungen", "3.4.1",
-            "Bekannte Herzrhythmusstörungen",
-            "Kardiologische Untersuchung inkl. Langzeit-EKG; rhythmogene Synkopen "
-            "schließen die Eignung aus. Gruppe 2: AV-Block III/Mobitz II und "
-            "alternierender Schenkelblock schließen die Eignung aus."))
+        out.append(_f("rhythmusstoerung", "pruefen"))
     if yes("heart_other"):
-        out.append(_f("pruefen", "Herz-/Gefäßerkrankung", "3.4.7–3.4.12",
-            "Klappenfehler / angeborener Herzfehler / Kardiomyopathie / "
-            "Ionenkanalerkrankung / Aneurysma / Karotisstenose angegeben",
-            "Je nach Diagnose gelten eigene Fristen und Gruppe-2-Ausschlüsse – "
-            "kardiologische Unterlagen anfordern und nach dem jeweiligen Kapitel "
-            "beurteilen."))
+        out.append(_f("herz_sonstige", "pruefen"))
     if yes("family_sudden_death"):
-        out.append(_f("hinweis", "Familienanamnese", "3.4.9/3.4.10",
-            "Plötzlicher Herztod bei Verwandten 1. Grades",
-            "Risikokriterium (u.a. bei hypertropher Kardiomyopathie für Gruppe 2) – "
-            "bei kardialen Diagnosen in die Beurteilung einbeziehen."))
+        out.append(_f("familie_herztod", "hinweis"))
 
     # ── Gehirn (Kap. 3.9.4 / 3.9.5) ──────────────────────────────────────────
     if yes("stroke"):
         if yes("stroke_residuals"):
-            out.append(_f("kritisch", "Schlaganfall/TIA", "3.9.4",
-                "Zustand nach Schlaganfall/Hirnblutung/TIA mit fortbestehenden Ausfällen",
-                "Relevante neurologische/neuropsychologische Ausfälle schließen die "
-                "Eignung beider Gruppen aus, bis sie erfolgreich behandelt bzw. "
-                "kompensiert sind."))
+            out.append(_f("schlaganfall_ausfaelle", "kritisch"))
         else:
-            out.append(_f("kritisch" if g2 else "pruefen", "Schlaganfall/TIA", "3.9.4",
-                "Zustand nach Schlaganfall/Hirnblutung/TIA",
-                "Gruppe 2: die Belastungen sind Betroffenen generell nicht zuzumuten. "
-                "Gruppe 1: Wiedererlangung nach erfolgreicher Therapie möglich; "
-                "Nachuntersuchungen nach 1, 2 und 4 Jahren."))
+            out.append(_f("schlaganfall", "kritisch" if g2 else "pruefen"))
     if yes("head_injury"):
         if yes("head_injury_recent"):
-            out.append(_f("kritisch", "Hirnverletzung/-operation", "3.9.5",
-                "Hirnverletzung oder -operation vor weniger als 3 Monaten",
-                "Im Allgemeinen 3 Monate keine Eignung für beide Gruppen; Ausnahme nur "
-                "bei neurologisch nachgewiesener Störungsfreiheit."))
+            out.append(_f("hirnverletzung_frisch", "kritisch"))
         if yes("brain_residuals"):
-            out.append(_f("pruefen", "Hirnverletzung/-operation", "3.9.5",
-                "Folgebeschwerden nach Hirnverletzung/-operation",
-                "Hirnorganische Leistungsstörungen bzw. Anfallskomplikationen abklären "
-                "(neurologisch, ggf. neuropsychologisch; vgl. 3.9.6/3.12.2)."))
+            out.append(_f("hirnverletzung_folgen", "pruefen"))
 
     # ── Nervensystem (Kap. 3.9.1–3.9.3) ──────────────────────────────────────
     if yes("parkinson"):
-        out.append(_f("kritisch" if g2 else "pruefen", "Parkinson/Extrapyramidal", "3.9.3",
-            "Parkinson-Krankheit bzw. Bewegungs-/Koordinationsstörung",
-            "Gruppe 2: bei erkennbarer Symptomatik in der Regel keine Eignung. "
-            "Gruppe 1: nur bei erfolgreicher Therapie/leichten Fällen; "
-            "Nachuntersuchungen nach 1, 2 und 4 Jahren."))
+        out.append(_f("parkinson", "kritisch" if g2 else "pruefen"))
     if yes("ms_spinal"):
-        out.append(_f("pruefen", "Rückenmark/MS", "3.9.1",
-            "Rückenmarkserkrankung/-verletzung bzw. Multiple Sklerose",
-            "Ausmaß der motorischen Behinderung und Kompensierbarkeit (Fahrzeugumbau) "
-            "prüfen; Gruppe 2 bei relevanter Behinderung in der Regel ausgeschlossen; "
-            "bei progredienten Verläufen Nachuntersuchungen."))
+        out.append(_f("rueckenmark_ms", "pruefen"))
     if yes("muscle_nerve"):
-        out.append(_f("pruefen", "Neuromuskulär", "3.9.2",
-            "Muskel-/Nervenerkrankung (Myasthenie, Muskelschwund, Polyneuropathie)",
-            "Bei relevanter motorischer Beeinträchtigung Gruppe 2 ausgeschlossen; "
-            "Gruppe 1 im Einzelfall neurologisch nachweisen; ggf. Nachuntersuchungen "
-            "nach 1, 2 und 4 Jahren."))
+        out.append(_f("neuromuskulaer", "pruefen"))
     if yes("paralysis_attacks"):
-        out.append(_f("kritisch", "Anfallsartige Lähmungen", "3.9.2",
-            "Anfallsartige Lähmungen / plötzliche Muskelschwäche",
-            "Mit Anfallsleiden vergleichbar – Eignung setzt Anfallsfreiheit oder "
-            "nachweislich langsam einsetzende, kontrollierbare Lähmungen voraus."))
+        out.append(_f("laehmungsattacken", "kritisch"))
     if yes("motor_limits"):
-        out.append(_f("pruefen", "Motorik", "3.3/3.9",
-            "Lähmungen/Gefühlsstörungen mit möglicher Fahrrelevanz",
-            "Kompensation nach den Sicherheitsmaßnahmen für körperbehinderte "
-            "Kraftfahrer (Anhang B) prüfen; ggf. Fahrprobe und Fahrzeugauflagen."))
+        out.append(_f("motorik", "pruefen"))
 
     # ── Gleichgewicht/Schwindel (Kap. 3.10) ──────────────────────────────────
     if yes("vertigo"):
         letzte = a.get("vertigo_last")
         prodromi = a.get("vertigo_prodromi")
         if letzte == "unter3m" and prodromi == "nie":
-            out.append(_f("kritisch", "Schwindel", "3.10",
-                "Schwindelattacken ohne Vorboten, letzte vor <3 Monaten",
-                "Attackenfreier Beobachtungszeitraum von mindestens 3 Monaten (je nach "
-                "Krankheitsbild länger) nicht erfüllt – derzeit keine Fahreignung "
-                "anzunehmen."))
+            out.append(_f("schwindel_ohne_vorboten", "kritisch"))
         elif letzte in ("unter3m", "3bis6m"):
-            out.append(_f("pruefen", "Schwindel", "3.10",
-                "Kürzliche Schwindelattacken",
-                "Krankheitsbild und attackenfreie Fristen klären (z.B. Menière: "
-                "Gruppe 1 6–12 Monate, Gruppe 2 2–4 Jahre; HNO-fachärztliche "
-                "Untersuchung)."))
+            out.append(_f("schwindel_kuerzlich", "pruefen"))
         if yes("vertigo_positional"):
-            out.append(_f("pruefen", "Schwindel", "3.10.1",
-                "Lageabhängiger Schwindel (V.a. gutartiger Lagerungsschwindel)",
-                "Fahreignung erst nach erfolgreicher Therapie/Spontanremission "
-                "(Nachweis per Lagerungsprüfung)."))
+            out.append(_f("lagerungsschwindel", "pruefen"))
         if yes("vertigo_ear"):
-            out.append(_f("pruefen", "Schwindel", "3.10.1",
-                "Drehschwindel mit Ohrsymptomen (V.a. Morbus Menière)",
-                "Fristen abhängig von Prodromi und Gruppe (6 Monate bis 4 Jahre "
-                "Attackenfreiheit); fachärztliche Abklärung."))
+            out.append(_f("morbus_meniere", "pruefen"))
 
     # ── Psyche (Kap. 3.12) ───────────────────────────────────────────────────
     if yes("psychosis"):
-        out.append(_f("kritisch" if g2 else "pruefen", "Psychose", "3.12.5",
-            "Schizophrenie/Psychose in der Vorgeschichte",
-            "Gruppe 2: nach schizophrener Erkrankung in der Regel dauerhaft keine "
-            "Eignung. Gruppe 1: möglich, wenn keine das Realitätsurteil "
-            "beeinträchtigenden Störungen mehr nachweisbar sind; fachpsychiatrische "
-            "Beurteilung."))
+        out.append(_f("psychose", "kritisch" if g2 else "pruefen"))
     if yes("psychiatric_severe"):
-        out.append(_f("pruefen", "Affektive Störung", "3.12.4",
-            "Stationäre Behandlung / Manie / Suizidalität in der Vorgeschichte",
-            "Sehr schwere Phasen schließen die Eignung während der Phase aus; bei "
-            "mehreren Phasen nur mit belegter Prophylaxe und regelmäßigen "
-            "psychiatrischen Kontrollen. Gruppe 2: Symptomfreiheit gefordert, nach "
-            "mehreren Phasen in der Regel keine Eignung."))
+        out.append(_f("affektive_stoerung", "pruefen"))
     if yes("memory_problems"):
-        out.append(_f("pruefen", "Kognition/Demenz", "3.12.2/3.12.3",
-            "Zunehmende Gedächtnis-/Orientierungsprobleme (auch fremdanamnestisch)",
-            "Demenz-Abklärung (ggf. neuropsychologisch, Fahrprobe); ausgeprägte "
-            "Demenz schließt beide Gruppen aus, Gruppe 2 bereits bei geringeren "
-            "Einschränkungen."))
+        out.append(_f("kognition", "pruefen"))
 
     # ── Alkohol, Drogen, Medikamente (Kap. 3.13/3.14) ────────────────────────
     if yes("alcohol_dependence"):
-        out.append(_f("kritisch", "Alkohol", "3.13.2",
-            "Alkoholabhängigkeit bzw. Entgiftung/Entwöhnung in der Vorgeschichte",
-            "Bei Abhängigkeit keine Eignung; Wiedererlangung erst nach erfolgreicher "
-            "Entwöhnung und in der Regel einjähriger, ärztlich (inkl. Labor) belegter "
-            "Abstinenz."))
+        out.append(_f("alkohol_abhaengigkeit", "kritisch"))
     if yes("alcohol_traffic"):
-        out.append(_f("pruefen", "Alkohol", "3.13.1",
-            "Verkehrsauffälligkeit unter Alkohol (Trunkenheitsfahrt/MPU)",
-            "Missbrauchsverdacht – sichere Trennung von Konsum und Fahren klären; "
-            "Wiederherstellung erst nach stabil geändertem Trinkverhalten (in der "
-            "Regel 1 Jahr, mindestens 6 Monate)."))
+        out.append(_f("alkohol_verkehr", "pruefen"))
     if yes("alcohol_control"):
-        out.append(_f("pruefen", "Alkohol", "3.13.1",
-            "Kontrollverlust über den Alkoholkonsum angegeben",
-            "Leitlinien-Kriterium für Missbrauch – Konsummuster und "
-            "Abhängigkeitskriterien (ICD-10) explorieren."))
+        out.append(_f("alkohol_kontrollverlust", "pruefen"))
     elif a.get("alcohol") == "taeglich":
-        out.append(_f("pruefen", "Alkohol", "3.13.1",
-            "(Fast) täglicher Alkoholkonsum",
-            "Konsummuster hinsichtlich Gewöhnung/Missbrauch explorieren (Labor: "
-            "z.B. CDT/GGT erwägen)."))
+        out.append(_f("alkohol_taeglich", "pruefen"))
     if yes("drugs"):
         if a.get("cannabis") == "regelmaessig":
-            out.append(_f("kritisch", "Betäubungsmittel", "3.14.1",
-                "Regelmäßiger (täglicher/gewohnheitsmäßiger) Cannabiskonsum",
-                "Schließt die Eignung in der Regel aus. Bei gelegentlichem Konsum: "
-                "Trennung von Konsum und Fahren, kein Beigebrauch."))
+            out.append(_f("cannabis_regelmaessig", "kritisch"))
         else:
-            out.append(_f("pruefen", "Betäubungsmittel", "3.14.1",
-                "Drogenkonsum aktuell oder in der Vorgeschichte",
-                "Aktuelle BtM-Einnahme schließt die Eignung aus (außer ärztlich "
-                "verordnet); nach Abhängigkeit einjährige Abstinenz mit unangekündigten "
-                "Laborkontrollen nachweisen."))
+            out.append(_f("drogen", "pruefen"))
         if yes("substitution"):
-            out.append(_f("kritisch", "Substitution", "3.14.1",
-                "Laufende Substitutionsbehandlung (z.B. Methadon)",
-                "In der Regel keine Eignung; seltene Ausnahmen erfordern u.a. über "
-                "einjährige Substitution, stabile Integration und ein Jahr "
-                "nachgewiesene Beigebrauchsfreiheit."))
+            out.append(_f("substitution", "kritisch"))
     if yes("med_side_effects"):
-        out.append(_f("kritisch", "Dauermedikation", "3.14.2",
-            "Spürbare Nebenwirkungen (Müdigkeit, Verlangsamung, Schwindel) unter "
-            "Dauermedikation",
-            "Erhebliche unerwünschte Wirkungen wie Verlangsamung und "
-            "Konzentrationsstörungen schließen die Eignung aus – Medikation "
-            "anpassen und neu beurteilen."))
+        out.append(_f("medikation_nebenwirkungen", "kritisch"))
     elif yes("sedating_meds"):
-        out.append(_f("pruefen", "Dauermedikation", "3.14.2",
-            "Dauerbehandlung mit potenziell sedierenden Medikamenten",
-            "Psychoaktive Dauermedikation kann die Eignung unabhängig vom "
-            "Grundleiden beeinträchtigen; regelmäßige ärztliche Überwachung mit "
-            "Nachweis erforderlich."))
+        out.append(_f("medikation_sedierend", "pruefen"))
     if yes("benzo_regular"):
-        out.append(_f("pruefen", "Dauermedikation", "3.14.2",
-            "Regelmäßige Einnahme von Schlaf-/Beruhigungsmitteln über Monate",
-            "Risiko einer Low-dose-Abhängigkeit (auch bei kleinen abendlichen "
-            "Mengen) – Entzugssymptome explorieren, Ausschleichen erwägen."))
+        out.append(_f("schlafmittel_regelmaessig", "pruefen"))
     if yes("med_recent_change"):
-        out.append(_f("hinweis", "Dauermedikation", "3.14.2",
-            "Kürzlich neu angesetztes/umgestelltes Medikament",
-            "In der Initialphase einer Behandlung ist besondere Vorsicht geboten."))
+        out.append(_f("medikation_umstellung", "hinweis"))
 
     # ── Sehen & Hören (Kap. 3.1/3.2) ─────────────────────────────────────────
     if yes("eye_disease") or yes("one_eyed") or yes("night_vision"):
@@ -423,89 +688,46 @@ def evaluate_answers(answers):  # noqa: C901 - bewusst ein flaches Regelwerk
             ("einseitig stark gemindertes Sehen", "one_eyed"),
             ("Probleme bei Dämmerung/Blendung", "night_vision"),
         ) if yes(k)]
-        out.append(_f("pruefen", "Sehvermögen", "3.1",
-            "Angegeben: " + ", ".join(details),
-            "Sehanforderungen nach § 12 / Anlage 6 FeV prüfen (Gruppe 2 deutlich "
-            "strenger, ggf. augenärztliche Untersuchung); Kompensation z.B. Verzicht "
-            "auf Nachtfahrten möglich."))
+        out.append(_f("sehvermoegen", "pruefen", details=", ".join(details)))
     if yes("hearing_impaired") and g2:
-        out.append(_f("pruefen", "Hörvermögen", "3.2",
-            "Hochgradige Schwerhörigkeit/Gehörlosigkeit (Gruppe-2-Untersuchung)",
-            "HNO-fachärztliche Eignungsuntersuchung, regelmäßige Kontrollen und "
-            "Nachweis von 3 Jahren Fahrpraxis mit Klasse B erforderlich; "
-            "Begleitstörungen (Gleichgewicht/Sehen) ausschließen."))
+        out.append(_f("hoervermoegen_g2", "pruefen"))
 
     # ── Innere Organe (Kap. 3.6–3.8) ─────────────────────────────────────────
     if yes("dialysis"):
-        out.append(_f("kritisch" if g2 else "pruefen", "Niere", "3.6",
-            "Dialysepflichtige Niereninsuffizienz",
-            "Gruppe 2: in der Regel keine Eignung (Ausnahme nur nach nephrologischer "
-            "Einzelbegutachtung). Gruppe 1: nur unter ständiger ärztlicher Betreuung "
-            "und Kontrolle."))
+        out.append(_f("dialyse", "kritisch" if g2 else "pruefen"))
     elif yes("kidney_disease"):
-        out.append(_f("pruefen", "Niere", "3.6",
-            "Chronische Nierenerkrankung",
-            "Maßgeblich ist die tatsächliche Beeinträchtigung von Allgemeinbefinden "
-            "und Leistungsfähigkeit; nephrologische Betreuung dokumentieren."))
+        out.append(_f("niere", "pruefen"))
     if yes("transplant"):
-        out.append(_f("pruefen", "Transplantation", "3.6/3.7",
-            "Zustand nach Organtransplantation",
-            "Organfunktion, Immunsuppressions-Nebenwirkungen und Nachsorge prüfen; "
-            "nach Nierentransplantation jährliche Nachbegutachtung, Herz: Gruppe 2 "
-            "in der Regel keine Eignung (<5 Jahre)."))
+        out.append(_f("transplantation", "pruefen"))
     if yes("cough_syncope"):
-        out.append(_f("kritisch", "Lunge", "3.8",
-            "Hustensynkopen (Schwindel/Bewusstlosigkeit bei Hustenanfall)",
-            "Können die Fähigkeit zum sicheren Führen von Kraftfahrzeugen aufheben – "
-            "internistische Abklärung vor Bejahung der Eignung."))
+        out.append(_f("hustensynkope", "kritisch"))
     if yes("dyspnea"):
-        out.append(_f("pruefen", "Lunge", "3.8",
-            "Atemnot bei leichter Belastung/in Ruhe bzw. Sauerstofftherapie",
-            "Hinweis auf fortgeschrittene Erkrankung mit möglicher respiratorischer "
-            "Insuffizienz – Lungenfunktion/Blutgase und kardiale Rückwirkungen "
-            "(Cor pulmonale, vgl. 3.4.5) klären."))
+        out.append(_f("atemnot", "pruefen"))
 
     # ── Allgemeines ──────────────────────────────────────────────────────────
     if a.get("has_conditions") == "no":
-        out.append(_f("hinweis", "Anamnese", "2.5",
-            "Patient verneint Vorerkrankungen, dauerhafte Einschränkungen und "
-            "laufende ärztliche Behandlung",
-            "Verkürzter Fragensatz: Diagnose-Blöcke wurden übersprungen; Symptom- "
-            "und Ereignis-Screening (Anfälle, Synkopen, Tagesschläfrigkeit, "
-            "Substanzen) wurde vollständig erhoben."))
+        out.append(_f("anamnese_verkuerzt", "hinweis"))
     if yes("license_withdrawn"):
-        out.append(_f("pruefen", "Verkehrsvorgeschichte", "3.13/3.17",
-            "Früherer Fahrerlaubnisentzug bzw. MPU",
-            "Anlass und Ausgang klären; körperliche/psychische Ursachen der damaligen "
-            "Auffälligkeit dürfen nicht fortbestehen."))
+        out.append(_f("fahrerlaubnisentzug", "pruefen"))
     if a.get("psych_test_done") == "no":
-        out.append(_f("pruefen", "Fahrgastbeförderung/Bus", "3.19",
-            "Psychologischer Leistungstest noch nicht absolviert",
-            "Für Klassen D/D1 und Fahrgastbeförderung ist der Nachweis der "
-            "psychischen Leistungsfähigkeit nach Anlage 5 Nr. 2 FeV erforderlich."))
+        out.append(_f("psych_leistungstest", "pruefen"))
     if yes("multiple_conditions"):
-        out.append(_f("hinweis", "Kumulation", "2.7",
-            "Mehrere Erkrankungen gleichzeitig angegeben",
-            "Kumulierte Auffälligkeiten können in ihrer Summe Eignungszweifel "
-            "begründen, auch wenn jede einzelne unbedenklich wäre."))
+        out.append(_f("kumulation", "hinweis"))
     if yes("accidents"):
-        out.append(_f("hinweis", "Fahranamnese", "2.5",
-            "Unfälle/Beinahe-Unfälle in den letzten 24 Monaten",
-            "Unfallhergang auf mögliche medizinische Ursachen (Sekundenschlaf, "
-            "Synkope, Seh-/Reaktionsdefizit) prüfen."))
+        out.append(_f("fahranamnese", "hinweis"))
 
     out.sort(key=lambda f: SCHWERE_ORDER.get(f["schwere"], 9))
     counts = {"kritisch": 0, "pruefen": 0, "hinweis": 0}
     for f in out:
         counts[f["schwere"]] += 1
 
-    return {
+    result = {
         "gruppe2": g2,
         "findings": out,
         "zusammenfassung": counts,
-        "disclaimer": (
-            "Automatisch erzeugte Hinweise nach den Begutachtungsleitlinien zur "
-            "Kraftfahreignung (BASt, Stand 2022). Entscheidungsunterstützung – die "
-            "abschließende Beurteilung obliegt der Ärztin/dem Arzt."
-        ),
+        "rules_version": RULES_VERSION,
     }
+    if texts:
+        result["findings"] = [render_finding(f) for f in out]
+        result["disclaimer"] = DISCLAIMER
+    return result
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Interner Event-Bus für Folgearbeiten nach Datenbank-Änderungen.
+
+  @events.subscribe('questionnaire.completed', name='print.prewarm')
+  def prewarm(data): ...
+
+  events.publish('questionnaire.completed', {'session_id': 1, ...})
+
+publish() muss innerhalb der Transaktion aufgerufen werden, die das
+Ereignis auslöst (z.B. der Abschluss in submission.complete()):
+
+- Je Handler wird ein Job 'events.handle' der Task-Queue angelegt – ein
+  INSERT in derselben Transaktion (Outbox-Prinzip). Rollt sie zurück, gibt
+  es kein Ereignis; wird sie committet, geht es nicht mehr verloren.
+- transaction.on_commit() übergibt die Jobs danach einem Thread-Pool im
+  selben Prozess (EVENTS_IN_PROCESS, Default True), der sie sofort
+  reserviert und ausführt – die Antwort an den Patienten wartet nicht darauf.
+- Stirbt der Prozess vorher oder schlägt ein Handler fehl, übernimmt
+  `manage.py run_worker` den Job (Retries mit Backoff wie alle Tasks;
+  Compose-Dienst `worker`). Zusätzlich holt der periodische Job
+  'events.redeliver' fällige und liegen gebliebene Ereignis-Jobs nach –
+  auch ohne laufenden Worker, solange der Scheduler aktiv ist.
+
+Zustellung: at-least-once je Handler – Handler müssen idempotent sein.
+"""
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import taskqueue
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+HANDLE_TASK = 'events.handle'
+
+Handler = namedtuple("Handler", "event name func")
+
+_handlers = {}          # {event: {name: Handler}}
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def subscribe(event, name=None):
+    """Funktion als Handler für `event` registrieren (Aufruf mit dem Event-Payload)."""
+    def decorator(func):
+        handler_name = name or f"{func.__module__}.{func.__name__}"
+        _handlers.setdefault(event, {})[handler_name] = Handler(event, handler_name, func)
+        return func
+    return decorator
+
+
+def handlers(event):
+    return dict(_handlers.get(event, {}))
+
+
+def publish(event, data):
+    """
+    Ereignis veröffentlichen → Liste der angelegten Tasks (ein Job je Handler).
+
+    Die Handler laufen erst nach dem Commit der umgebenden Transaktion.
+    """
+    registered = _handlers.get(event)
+    if not registered:
+        return []
+    spec = taskqueue.registered()[HANDLE_TASK]
+    now = timezone.now()
+    tasks = Task.objects.bulk_create([
+        Task(
+            name=HANDLE_TASK,
+            payload={'event': event, 'handler': handler_name, 'data': data},
+            priority=spec.priority,
+            max_attempts=spec.max_attempts,
+            run_at=now,
+        )
+        for handler_name in registered
+    ])
+    if getattr(settings, 'EVENTS_IN_PROCESS', True):
+        ids = [task.pk for task in tasks]
+        transaction.on_commit(lambda: _submit(ids))
+    return tasks
+
+
+@taskqueue.task(name=HANDLE_TASK, priority=3, max_attempts=8, timeout=300)
+def handle(event, handler, data):
+    """Einen Handler für ein veröffentlichtes Ereignis ausführen."""
+    spec = _handlers.get(event, {}).get(handler)
+    if spec is None:
+        raise LookupError(f'Kein Handler {handler} für {event}')
+    return spec.func(data)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EVENTS_THREADS', 2),
+                thread_name_prefix='events',
+            )
+        return _executor
+
+
+def _run(ids):
+    """Gerade eingeplante Jobs reservieren und ausführen (Pool-Thread)."""
+    worker_id = f"{taskqueue.default_worker_id()}/events"
+    try:
+        for task_obj in taskqueue.claim(worker_id, limit=len(ids), ids=ids):
+            taskqueue.execute(task_obj, worker_id)
+    except Exception:
+        # Jobs bleiben in der Queue – run_worker übernimmt sie
+        logger.exception('Ereignis-Jobs %s konnten nicht sofort ausgeführt werden', ids)
+    finally:
+        close_old_connections()
+
+
+def _submit(ids):
+    future = _get_executor().submit(_run, ids)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+
+
+def redeliver(limit=100):
+    """
+    Fällige (Retry) und liegen gebliebene (Visibility-Timeout abgelaufen)
+    Ereignis-Jobs ausführen → Anzahl. Sicherheitsnetz für Betrieb ohne run_worker.
+    """
+    now = timezone.now()
+    ids = list(
+        Task.objects.filter(name=HANDLE_TASK)
+        .filter(
+            Q(status=Task.STATUS_QUEUED, run_at__lte=now)
+            | Q(status=Task.STATUS_RUNNING, locked_until__lt=now)
+        )
+        .order_by('run_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not ids:
+        return 0
+    worker_id = f"{taskqueue.default_worker_id()}/redeliver"
+    claimed = taskqueue.claim(worker_id, limit=len(ids), ids=ids)
+    for task_obj in claimed:
+        taskqueue.execute(task_obj, worker_id)
+    return len(claimed)
+
+
+def flush(timeout=None):
+    """Auf alle im Prozess laufenden Ereignis-Jobs warten (Tests, Shutdown)."""
+    wait(list(_pending), timeout=timeout)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Schneller JSON-Pfad für die API (Renderer + Parser auf Basis von orjson).
+
+Die Session- und Answers-Antworten bestehen zum Großteil aus dem
+Template-Schema (~90 Fragen); der Standard-Encoder von DRF (json.dumps mit
+Python-Encoder-Klasse) ist dafür der teuerste Schritt pro Request.
+
+orjson ist optional: Ist es nicht installiert, verhalten sich Renderer und
+Parser exakt wie rest_framework.renderers.JSONRenderer/JSONParser.
+Ausgabe-kompatibel mit DRF: kompakt, UTF-8, U+2028/U+2029 escaped; Typen,
+die orjson nicht selbst kennt (datetime/date/time im DRF-Format, Decimal,
+timedelta, Lazy-Strings, QuerySets …), übernimmt DRFs JSONEncoder.
+
+Ganzzahlen jenseits von 64 Bit kann orjson weder schreiben (TypeError, ohne
+default zu fragen) noch lesen (wird stillschweigend float). Dann gilt der
+Weg über die Standardbibliothek: dumps() fällt bei TypeError auf DRFs
+Renderer zurück, loads() und der Parser lesen Eingaben mit einer Ziffernfolge
+ab 19 Stellen mit json (langsamer, aber exakt).
+
+Benchmark mit dem echten Katalog: python manage.py bench_json
+"""
+import io
+import json
+import re
+
+from django.conf import settings
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - abhängig von der Installation
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+# Datumswerte an DRFs Encoder durchreichen (Millisekunden, "Z" statt +00:00),
+# damit sich die Ausgabe durch den Renderer-Wechsel nicht ändert
+_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+)
+_drf_default = encoders.JSONEncoder().default
+
+# Ab 19 Ziffern kann eine Zahl außerhalb von int64/uint64 liegen
+_LONG_DIGITS = re.compile(rb'\d{19}')
+
+
+def dumps(data):
+    """Python-Daten → JSON-Bytes (orjson, sonst Standardbibliothek im DRF-Format)."""
+    if HAS_ORJSON:
+        try:
+            ret = orjson.dumps(data, default=_drf_default, option=_OPTIONS)
+        except TypeError:
+            # z.B. "Integer exceeds 64-bit range" – DRF schreibt das problemlos
+            return JSONRenderer().render(data)
+        # Wie DRF: U+2028/U+2029 escapen, damit das Ergebnis gültiges JavaScript ist
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+    return JSONRenderer().render(data)
+
+
+def loads(raw):
+    """JSON (bytes/str) → Python-Daten; ValueError bei ungültigem JSON."""
+    if HAS_ORJSON and not _long_digits(raw):
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _long_digits(raw):
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    return _LONG_DIGITS.search(raw) is not None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer mit orjson; eingerückte Ausgabe (Browsable API) bleibt bei DRF."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not HAS_ORJSON or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser mit orjson (lehnt NaN/Infinity wie STRICT_JSON ab)."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if not HAS_ORJSON or encoding.lower().replace('_', '-') != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        raw = stream.read()
+        if _long_digits(raw):
+            # orjson würde große Ganzzahlen zu float machen
+            return super().parse(io.BytesIO(raw), media_type, parser_context)
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
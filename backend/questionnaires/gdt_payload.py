@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Ergebnisdaten für GDT-Konsumenten.
+
+Gemeinsames Format von GET /api/gdt/result/<token>/, POST /api/gdt/results/,
+dem Abschluss-Feed (GET /api/gdt/completions/) und den Webhooks
+(webhooks.py). Eigenes Modul ohne DRF-Abhängigkeit, damit Hintergrundjobs
+nicht das View-Modul importieren müssen.
+"""
+from .evaluation import evaluate_answers
+
+ESS_BAND_TEXTS = {
+    'normal':      'Normal (0–9)',
+    'erhöht':      'Erhöht (10–15)',
+    'ausgeprägt':  'Ausgeprägt (≥16) – ärztliche Abklärung erforderlich',
+}
+
+
+def gdt_pending_payload(session):
+    """Antwort (202) für eine noch offene Session; expires_at dient der Bridge als Planungshinweis."""
+    return {'completed': False, 'expires_at': session.expires_at.isoformat()}
+
+
+def gdt_result_payload(session, answer_set):
+    """Ergebnis einer abgeschlossenen Session im Format von GET /api/gdt/result/."""
+    # Nur die Zählwerte werden gebraucht – Texte nicht aufbauen
+    evaluation = evaluate_answers(answer_set.answers_json, texts=False)
+
+    return {
+        'completed':          True,
+        'auswertung_kritisch': evaluation['zusammenfassung']['kritisch'],
+        'auswertung_pruefen':  evaluation['zusammenfassung']['pruefen'],
+        'auswertung_hinweis':  evaluation['zusammenfassung']['hinweis'],
+        'completed_at':       session.completed_at.strftime('%d.%m.%Y') if session.completed_at else '',
+        'gdt_patient_id':     session.gdt_patient_id,
+        'gdt_request_id':     session.gdt_request_id,
+        'patient_last_name':  session.patient_last_name,
+        'patient_first_name': session.patient_first_name,
+        'patient_birth_date': session.patient_birth_date.strftime('%d.%m.%Y') if session.patient_birth_date else '',
+        'ess_total':          answer_set.ess_total,
+        'ess_band':           answer_set.ess_band,
+        'ess_band_text':      ESS_BAND_TEXTS.get(answer_set.ess_band or '', answer_set.ess_band or ''),
+    }
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Eingebaute Hintergrund-Jobs (Registrierung beim App-Start, siehe apps.py).
+
+Einplanen z.B. mit taskqueue.enqueue('reminders.enqueue'); ausgeführt von
+`manage.py run_worker`. Mit @periodic markierte Jobs führt zusätzlich der
+eingebaute Scheduler regelmäßig aus (siehe scheduler.py), mit
+@events.subscribe markierte Handler laufen nach dem jeweiligen Ereignis
+(siehe events.py).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import completions, events, outbox, printing, registry, reminders, webhooks
+from .models import QuestionnaireSession
+from .scheduler import periodic
+from .schema import is_v2_schema
+from .taskqueue import task
+
+
+@task(name='outbox.deliver', priority=5, timeout=600)
+def deliver_outbox(batch_size=50):
+    """Fällige Outbox-Mails zustellen (eine SMTP-Verbindung je Stapel)."""
+    return outbox.deliver_due(batch_size=batch_size)
+
+
+@periodic('webhooks.deliver', every=getattr(settings, 'WEBHOOK_INTERVAL_SECONDS', 30))
+@task(name='webhooks.deliver', priority=3, timeout=600)
+def deliver_webhooks(batch_size=None):
+    """Fällige Webhook-Ereignisse gebündelt je Abonnement zustellen."""
+    return webhooks.deliver_due(batch_size=batch_size)
+
+
+@periodic('reminders.enqueue', every=600)
+@task(name='reminders.enqueue', timeout=300)
+def enqueue_reminders(batch_size=100):
+    """Fällige Erinnerungen in die Outbox legen."""
+    return reminders.enqueue_due(batch_size=batch_size)
+
+
+@periodic('sessions.purge', every=86400)
+@task(name='sessions.purge', priority=-5, timeout=900)
+def purge_sessions(days=30):
+    """Sessions löschen, deren Link seit mehr als `days` Tagen abgelaufen ist (DSGVO) → Anzahl."""
+    _, per_model = purgeable_sessions(days).delete()
+    return per_model.get(QuestionnaireSession._meta.label, 0)
+
+
+def purgeable_sessions(days=30):
+    """QuerySet der Sessions, die purge_sessions löschen würde (Retention-Regel)."""
+    return QuestionnaireSession.objects.filter(expires_at__lt=timezone.now() - timedelta(days=days))
+
+
+@periodic('events.redeliver', every=getattr(settings, 'EVENTS_REDELIVER_SECONDS', 60))
+def redeliver_events(limit=100):
+    """Fehlgeschlagene bzw. liegen gebliebene Ereignis-Jobs nachholen (auch ohne run_worker)."""
+    return events.redeliver(limit=limit)
+
+
+@events.subscribe('questionnaire.completed', name='print.prewarm')
+def prewarm_print(data):
+    """Auswertung und Druck-Viewmodel vorberechnen – der erste PDF-Abruf kommt aus dem Cache."""
+    session = QuestionnaireSession.objects.filter(pk=data['session_id']).first()
+    if session is None or not is_v2_schema(registry.get_template(session.template_id).schema):
+        return None
+    printing.print_model(session)
+    return session.pk
+
+
+@events.subscribe('questionnaire.completed', name='completions.sequence')
+def assign_completion_seq(data):
+    """Position im Abschluss-Feed vergeben (GET /api/gdt/completions/)."""
+    return completions.assign(data['session_id'])
+
+
+@events.subscribe('questionnaire.completed', name='webhooks.enqueue')
+def enqueue_webhooks(data):
+    """Abgeschlossene Session für die Webhook-Abonnements vormerken (Versand: webhooks.deliver)."""
+    return webhooks.enqueue_completed(data)
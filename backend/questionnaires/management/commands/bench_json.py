@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Standard-JSON von DRF gegen den orjson-Pfad (questionnaires.fastjson)
+mit den echten API-Payloads auf Basis des Leitlinien-Katalogs:
+
+  session  – GET /api/session/<token>/   (Session + komplettes Schema)
+  answers  – GET /api/answers/<token>/   (Schema + Antworten + Auswertung)
+  submit   – POST /api/submit/<token>/   (Antworten, nur Parser)
+
+Ausgabe: Größe und Mikrosekunden pro Request für Encode und Decode.
+Braucht keine Datenbank.
+"""
+import io
+import time
+import uuid
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from questionnaires import fastjson
+from questionnaires.catalog import CATALOG
+from questionnaires.evaluation import evaluate_answers
+from questionnaires.schema import ESS_KEYS, iter_questions
+
+
+def _sample_answers():
+    """Vollständig (auch auffällig) beantworteter Katalog – worst case für die Größe."""
+    answers = {}
+    for _section, q in iter_questions(CATALOG):
+        qtype = q.get("type")
+        if qtype == "yes_no":
+            answers[q["id"]] = "yes"
+            if q.get("followup"):
+                answers[q["followup"]["id"]] = "Angaben zum Verlauf, Medikation und Befunde " * 3
+        elif qtype == "choice":
+            answers[q["id"]] = q["options"][0]["value"]
+        elif qtype == "multi_choice":
+            answers[q["id"]] = [o["value"] for o in q["options"][:3]]
+        elif qtype in ("text", "textarea"):
+            answers[q["id"]] = "Freitext mit Umlauten: Übelkeit, Schwindel, Müdigkeit"
+        elif qtype == "consent":
+            answers[q["id"]] = True
+        elif qtype == "ess_matrix":
+            for key in ESS_KEYS:
+                answers[key] = 2
+    answers["ess_total"] = 16
+    answers["ess_band"] = "ausgeprägt"
+    return answers
+
+
+def _payloads():
+    token = uuid.uuid4()
+    answers = _sample_answers()
+    session = {
+        "session": {
+            "token": token,
+            "template_slug": "verkehrsmedizin-leitlinien",
+            "created_at": timezone.now(),
+            "expires_at": timezone.now(),
+            "completed": False,
+            "is_valid": True,
+        },
+        "template": CATALOG,
+    }
+    answers_payload = {
+        "answers": answers,
+        "schema": CATALOG,
+        "evaluation": evaluate_answers(answers, texts=False),
+        "ess_total": 16,
+        "ess_band": "ausgeprägt",
+        "completed_at": date.today().strftime("%d.%m.%Y"),
+        "token": str(token),
+        "patient_last_name": "Mustermann",
+        "patient_first_name": "Max",
+        "patient_birth_date": "21.03.1975",
+    }
+    return {"session": session, "answers": answers_payload, "submit": answers}
+
+
+def _per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+class Command(BaseCommand):
+    help = "Vergleicht DRF-JSON mit dem orjson-Renderer/-Parser auf echten Katalog-Payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=2000,
+            help="Wiederholungen je Messung (Default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        if not fastjson.HAS_ORJSON:
+            raise CommandError("orjson ist nicht installiert – kein schneller Pfad zum Vergleichen.")
+        n = options["iterations"]
+        std_renderer, fast_renderer = JSONRenderer(), fastjson.FastJSONRenderer()
+        std_parser, fast_parser = JSONParser(), fastjson.FastJSONParser()
+
+        self.stdout.write(
+            f"{'Payload':<9}{'Größe':>10}  {'Encode DRF':>11}{'orjson':>9}{'Ersparnis':>11}"
+            f"  {'Decode DRF':>11}{'orjson':>9}{'Ersparnis':>11}"
+        )
+        for name, data in _payloads().items():
+            raw = std_renderer.render(data)
+            if fastjson.loads(fast_renderer.render(data)) != fastjson.loads(raw):
+                raise CommandError(f"{name}: Ausgabe weicht vom DRF-Renderer ab")
+
+            enc_std = _per_call_us(lambda: std_renderer.render(data), n)
+            enc_fast = _per_call_us(lambda: fast_renderer.render(data), n)
+            dec_std = _per_call_us(lambda: std_parser.parse(io.BytesIO(raw)), n)
+            dec_fast = _per_call_us(lambda: fast_parser.parse(io.BytesIO(raw)), n)
+            self.stdout.write(
+                f"{name:<9}{len(raw) / 1024:>8.1f}kB  "
+                f"{enc_std:>9.0f}µs{enc_fast:>7.0f}µs{enc_std - enc_fast:>9.0f}µs  "
+                f"{dec_std:>9.0f}µs{dec_fast:>7.0f}µs{dec_std - dec_fast:>9.0f}µs"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Mittelwerte über {n} Durchläufe, Ersparnis = Zeitgewinn pro Request."
+        ))
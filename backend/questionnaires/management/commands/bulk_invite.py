@@ -0,0 +1,132 @@
+"""
+Sammel-Einladung aus einer CSV-Datei (z.B. Fahrerliste eines Betriebs).
+
+Spalten (Kopfzeile, Trennzeichen ; oder ,):
+  Nachname;Vorname;E-Mail;Geburtsdatum
+  (alternativ patient_last_name, patient_first_name, patient_email, patient_birth_date)
+
+  python manage.py bulk_invite fahrer.csv
+  python manage.py bulk_invite fahrer.csv --send      # sofort zustellen
+  python manage.py bulk_invite fahrer.csv --dry-run   # nur prüfen
+
+Ohne --send übernimmt der mailer-Container (send_outbox) die Zustellung.
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from questionnaires import bulk, outbox, registry
+from questionnaires.models import QuestionnaireSession
+
+COLUMNS = {
+    'nachname': 'patient_last_name',
+    'vorname': 'patient_first_name',
+    'e-mail': 'patient_email',
+    'email': 'patient_email',
+    'geburtsdatum': 'patient_birth_date',
+}
+
+
+class ExcelSemicolon(csv.excel):
+    delimiter = ';'
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        sample = fh.read(4096)
+        fh.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,')
+        except csv.Error:
+            dialect = ExcelSemicolon
+        rows = []
+        for raw in csv.DictReader(fh, dialect=dialect):
+            row = {}
+            for key, value in raw.items():
+                if key is None:
+                    continue
+                key = key.strip().lower()
+                row[COLUMNS.get(key, key)] = (value or '').strip()
+            rows.append(row)
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Legt Sessions für alle Zeilen einer CSV an und stellt die Einladungen in die Outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV mit Nachname;Vorname;E-Mail;Geburtsdatum')
+        parser.add_argument('--template', default='', help='Template-Slug (Default: aktives Template)')
+        parser.add_argument(
+            '--send',
+            action='store_true',
+            help='Einladungen sofort über eine SMTP-Verbindung zustellen (gedrosselt)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Nur prüfen, nichts anlegen')
+
+    def handle(self, *args, **options):
+        try:
+            rows = read_rows(options['csv_path'])
+        except OSError as exc:
+            raise CommandError(f'CSV nicht lesbar: {exc}')
+        if not rows:
+            raise CommandError('CSV enthält keine Einträge.')
+
+        if options['dry_run']:
+            invalid = 0
+            for index, row in enumerate(rows):
+                _, error = bulk.clean_row(row)
+                if error:
+                    invalid += 1
+                    self.stdout.write(f'Zeile {index + 2}: {error}')
+            self.stdout.write(f'{len(rows) - invalid} gültig, {invalid} ungültig.')
+            return
+
+        template = registry.active_template(options['template'])
+        if not template:
+            raise CommandError('Kein aktiver Fragebogen-Template gefunden.')
+
+        results, mail_ids = bulk.invite_many(rows, template)
+        delivery = {}
+        if options['send'] and mail_ids:
+            # Stapelweise (je Stapel eine SMTP-Verbindung, gedrosselt), jeder
+            # Stapel passt in die Reservierung – sonst übernimmt der mailer-
+            # Container die restlichen Mails und stellt sie ein zweites Mal zu.
+            # Fehlschläge bleiben in der Outbox und wiederholt send_outbox
+            tokens = dict(
+                QuestionnaireSession.objects.filter(outbox_emails__id__in=mail_ids)
+                .values_list('pk', 'token')
+            )
+
+            done = set()
+
+            def on_result(mail, status, error):
+                done.add(mail.pk)
+                delivery[str(tokens[mail.session_id])] = (status, error)
+
+            remaining = list(mail_ids)
+            while remaining:
+                stats = outbox.deliver_due(batch_size=len(remaining), ids=remaining, on_result=on_result)
+                if not any(stats.values()):
+                    break  # Rest nicht fällig (Backoff) oder bei einem anderen Worker
+                remaining = [pk for pk in remaining if pk not in done]
+
+        for result in results:
+            line = f"Zeile {result['index'] + 2}: {result['status']}"
+            if result['token']:
+                line += f" {result['token']}"
+            if result['patient_email']:
+                line += f" <{result['patient_email']}>"
+            if result['token'] in delivery:
+                status, error = delivery[result['token']]
+                line += f" → {status}" + (f' ({error})' if error else '')
+            elif result['error']:
+                line += f" – {result['error']}"
+            self.stdout.write(line)
+
+        queued = sum(r['status'] == bulk.STATUS_QUEUED for r in results)
+        invalid = sum(r['status'] == bulk.STATUS_INVALID for r in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(results) - invalid} Session(s) angelegt, {queued} Einladung(en) in der Outbox, '
+            f'{invalid} ungültig.'
+        ))
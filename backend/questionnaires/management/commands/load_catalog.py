@@ -4,10 +4,13 @@ Lädt den Leitlinien-Fragenkatalog (catalog.py) als aktives Fragebogen-Template.
 Idempotent: Bei erneutem Aufruf wird das bestehende Template aktualisiert.
 Alle anderen Templates werden deaktiviert, damit neue Sessions immer den
 aktuellen Katalog verwenden. Bereits angelegte Sessions behalten ihr Template.
+Danach wird die Template-Registry aller Worker invalidiert (das Deaktivieren
+per update() löst keine Signale aus).
 """
 from django.core.management.base import BaseCommand
 
 from questionnaires.catalog import CATALOG
+from questionnaires import registry
 from questionnaires.models import QuestionnaireTemplate
 
 SLUG = "verkehrsmedizin-leitlinien"
@@ -30,6 +33,7 @@ class Command(BaseCommand):
             .filter(is_active=True)
             .update(is_active=False)
         )
+        registry.invalidate_on_commit()
 
         n_sections = len(CATALOG["sections"])
         n_questions = sum(len(s["questions"]) for s in CATALOG["sections"])
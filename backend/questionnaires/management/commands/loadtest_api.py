@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Lasttest der heißen Lese-Endpunkte gegen laufende Server, z.B. WSGI
+(gunicorn, Port 8000) gegen das ASGI-Profil (gunicorn + UvicornWorker,
+docker-compose.asgi.yml, Port 8001):
+
+  python manage.py loadtest_api --url http://localhost:8000 --url http://localhost:8001 \\
+      --api-key $ADMIN_API_KEY --concurrency 64 --duration 15
+
+  session  – GET /api/session/<token>/      (offene Session)
+  answers  – GET /api/answers/<token>/      (abgeschlossene Session)
+  gdt      – GET /api/gdt/result/<token>/   (Bridge-Poll, braucht --api-key)
+  i18n     – GET /api/i18n/de/
+
+Ohne --open-token/--done-token legt der Befehl je eine Test-Session in der
+Datenbank an (die Server müssen dieselbe Datenbank verwenden) und löscht sie
+danach wieder. Die anonyme Drosselung (ANON_THROTTLE_RATE, Default 60/min)
+greift auch hier – für den Test auf den Servern z.B. ANON_THROTTLE_RATE=1000000/min
+setzen; gedrosselte Requests (429) werden getrennt ausgewiesen.
+
+Ausgabe je URL und Endpunkt: Requests/s, Latenz p50/p95/p99, Fehler.
+"""
+import http.client
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from questionnaires import registry
+from questionnaires.models import AnswerSet, QuestionnaireSession
+
+ENDPOINTS = {
+    'session': '/api/session/{open}/',
+    'answers': '/api/answers/{done}/',
+    'gdt': '/api/gdt/result/{done}/',
+    'i18n': '/api/i18n/de/',
+}
+
+SAMPLE_ANSWERS = {
+    'ess_1': 2, 'ess_2': 1, 'ess_3': 0, 'ess_4': 3,
+    'ess_5': 2, 'ess_6': 0, 'ess_7': 1, 'ess_8': 2,
+    'ess_total': 11, 'ess_band': 'erhöht',
+    'consent_truth': True, 'consent_privacy': True,
+}
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Client(threading.Thread):
+    """Ein virtueller Nutzer: eine Keep-Alive-Verbindung, Requests im Kreis."""
+
+    def __init__(self, base, paths, headers, deadline, results):
+        super().__init__(daemon=True)
+        self.base = base
+        self.paths = paths
+        self.headers = headers
+        self.deadline = deadline
+        self.results = results
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.base.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.base.hostname, self.base.port, timeout=30)
+
+    def run(self):
+        conn = self._connect()
+        latencies = defaultdict(list)
+        codes = defaultdict(Counter)
+        i = 0
+        while time.monotonic() < self.deadline:
+            name, path = self.paths[i % len(self.paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=self.headers)
+                response = conn.getresponse()
+                response.read()
+                code = response.status
+            except (OSError, http.client.HTTPException):
+                # Verbindungsfehler zählen nicht in Durchsatz und Latenz
+                conn.close()
+                conn = self._connect()
+                codes[name]['conn'] += 1
+                continue
+            latencies[name].append(time.perf_counter() - started)
+            codes[name][code] += 1
+        conn.close()
+        self.results.append((latencies, codes))
+
+
+class Command(BaseCommand):
+    help = 'Lasttest der Lese-Endpunkte (WSGI gegen ASGI) mit parallelen Keep-Alive-Clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            default=None,
+            help='Basis-URL des Servers, mehrfach angebbar (Default: http://localhost:8000)',
+        )
+        parser.add_argument('--concurrency', type=int, default=32, help='Parallele Clients (Default: 32)')
+        parser.add_argument('--duration', type=float, default=10.0, help='Dauer je URL in Sekunden (Default: 10)')
+        parser.add_argument(
+            '--endpoints',
+            default='session,answers,gdt,i18n',
+            help=f'Kommagetrennt aus {",".join(ENDPOINTS)} (Default: alle)',
+        )
+        parser.add_argument('--api-key', default='', help='ADMIN_API_KEY für den gdt-Endpunkt')
+        parser.add_argument('--open-token', default=None, help='Token einer offenen Session')
+        parser.add_argument('--done-token', default=None, help='Token einer abgeschlossenen Session')
+
+    def handle(self, *args, **options):
+        urls = options['url'] or ['http://localhost:8000']
+        names = [n.strip() for n in options['endpoints'].split(',') if n.strip()]
+        unknown = set(names) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f'Unbekannte Endpunkte: {", ".join(sorted(unknown))}')
+        if 'gdt' in names and not options['api_key']:
+            names.remove('gdt')
+            self.stdout.write(self.style.WARNING('gdt übersprungen (kein --api-key).'))
+
+        created = []
+        open_token = options['open_token']
+        done_token = options['done_token']
+        if not open_token or not done_token:
+            created = self._create_sessions()
+            open_token = open_token or str(created[0].token)
+            done_token = done_token or str(created[1].token)
+        try:
+            paths = [(n, ENDPOINTS[n].format(open=open_token, done=done_token)) for n in names]
+            headers = {'Authorization': f'Bearer {options["api_key"]}'} if options['api_key'] else {}
+            summary = []
+            for url in urls:
+                total = self._run(url, paths, headers, options['concurrency'], options['duration'])
+                summary.append((url, total))
+        finally:
+            for session in created:
+                session.delete()
+
+        if len(summary) > 1:
+            self.stdout.write('\nVergleich (Requests/s gesamt):')
+            baseline = summary[0][1] or 1
+            for url, total in summary:
+                self.stdout.write(f'  {url:<32} {total:>9.0f}   ×{total / baseline:.2f}')
+
+    def _create_sessions(self):
+        template = registry.active_template()
+        if template is None:
+            raise CommandError('Kein aktives Template – zuerst load_catalog ausführen.')
+        expires = timezone.now() + timedelta(days=1)
+        open_session = QuestionnaireSession.objects.create(
+            template_id=template.pk, expires_at=expires, patient_identifier='LOADTEST',
+        )
+        done_session = QuestionnaireSession.objects.create(
+            template_id=template.pk, expires_at=expires, patient_identifier='LOADTEST',
+            completed=True, completed_at=timezone.now(),
+        )
+        AnswerSet.objects.create(
+            session=done_session, answers_json=SAMPLE_ANSWERS, ess_total=11, ess_band='erhöht',
+        )
+        return [open_session, done_session]
+
+    def _run(self, url, paths, headers, concurrency, duration):
+        base = urlsplit(url)
+        results = []
+        deadline = time.monotonic() + duration
+        clients = [_Client(base, paths, headers, deadline, results) for _ in range(max(concurrency, 1))]
+        started = time.monotonic()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.monotonic() - started
+
+        latencies = defaultdict(list)
+        codes = defaultdict(Counter)
+        for client_latencies, client_codes in results:
+            for name, values in client_latencies.items():
+                latencies[name].extend(values)
+            for name, counter in client_codes.items():
+                codes[name].update(counter)
+
+        self.stdout.write(f'\n{url}  ({concurrency} Clients, {elapsed:.1f} s)')
+        self.stdout.write(
+            f'  {"Endpunkt":<9} {"Req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}  Status'
+        )
+        total = 0.0
+        for name, _path in paths:
+            values = sorted(latencies[name])
+            rate = len(values) / elapsed if elapsed else 0.0
+            total += rate
+            status_info = ', '.join(f'{code}×{count}' for code, count in sorted(codes[name].items(), key=str))
+            self.stdout.write(
+                f'  {name:<9} {rate:>8.0f} {_percentile(values, 50) * 1000:>8.1f} '
+                f'{_percentile(values, 95) * 1000:>8.1f} {_percentile(values, 99) * 1000:>8.1f}  {status_info}'
+            )
+            if codes[name].get(429):
+                self.stdout.write(self.style.WARNING(
+                    f'  {name}: gedrosselt (429) – ANON_THROTTLE_RATE auf dem Server erhöhen.'
+                ))
+        if latencies:
+            all_values = [v for values in latencies.values() for v in values]
+            self.stdout.write(f'  gesamt    {total:>8.0f}   Mittel {statistics.fmean(all_values) * 1000:.1f} ms')
+        return total
@@ -5,15 +5,14 @@ Gelöscht werden Sessions, deren Zugangslink seit mehr als --days Tagen
 abgelaufen ist (Default: 30). Die Antworten (AnswerSet) hängen per
 on_delete=CASCADE an der Session und werden mitgelöscht.
 
-Empfohlener Einsatz: täglicher Cron/Scheduled Task, z.B.
-  docker-compose exec backend python manage.py purge_sessions
+Die Regel steht in questionnaires/jobs.py (purge_sessions); dort läuft
+sie auch täglich über den eingebauten Scheduler (Job 'sessions.purge').
+Manuell z.B.
+  docker-compose exec backend python manage.py purge_sessions --dry-run
 """
-from datetime import timedelta
-
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 
-from questionnaires.models import QuestionnaireSession
+from questionnaires import jobs
 
 
 class Command(BaseCommand):
@@ -33,15 +32,13 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        cutoff = timezone.now() - timedelta(days=options['days'])
-        qs = QuestionnaireSession.objects.filter(expires_at__lt=cutoff)
-        count = qs.count()
-
+        days = options['days']
         if options['dry_run']:
-            self.stdout.write(f'{count} Session(s) würden gelöscht (expires_at < {cutoff:%d.%m.%Y}).')
+            count = jobs.purgeable_sessions(days).count()
+            self.stdout.write(f'{count} Session(s) würden gelöscht (Link seit mehr als {days} Tagen abgelaufen).')
             return
 
-        qs.delete()
+        count = jobs.purge_sessions(days=days)
         self.stdout.write(self.style.SUCCESS(
-            f'{count} abgelaufene Session(s) gelöscht (expires_at < {cutoff:%d.%m.%Y}).'
+            f'{count} abgelaufene Session(s) gelöscht (Link seit mehr als {days} Tagen abgelaufen).'
         ))
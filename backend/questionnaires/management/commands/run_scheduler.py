@@ -0,0 +1,55 @@
+"""
+Führt die periodischen Jobs aus (siehe questionnaires/scheduler.py).
+
+  python manage.py run_scheduler            # läuft dauerhaft
+  python manage.py run_scheduler --once     # fällige Jobs einmal prüfen, dann beenden
+  python manage.py run_scheduler --list     # registrierte Jobs und letzte Läufe anzeigen
+
+Alternative zu SCHEDULER_ENABLED=True im App-Server. Mehrere Instanzen
+dürfen parallel laufen; pro Job und Zeitfenster arbeitet genau eine.
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from questionnaires import scheduler
+from questionnaires.models import JobRun
+
+
+class Command(BaseCommand):
+    help = 'Führt periodische Jobs aus (eingebauter Scheduler)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Nur einen Durchlauf ausführen')
+        parser.add_argument('--list', action='store_true', help='Registrierte Jobs anzeigen')
+        parser.add_argument(
+            '--tick',
+            type=int,
+            default=None,
+            help='Prüfintervall in Sekunden (Default: SCHEDULER_TICK_SECONDS)',
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for job in scheduler.registered().values():
+                last = JobRun.objects.filter(name=job.name).first()
+                last_info = f'{last.started_at:%d.%m.%Y %H:%M} {last.status}' if last else '-'
+                self.stdout.write(f'{job.name:<28} alle {job.every:>6} s   letzter Lauf: {last_info}')
+            return
+
+        if options['once']:
+            runs = scheduler.run_due()
+            for run in runs:
+                self.stdout.write(f'{run.name}: {run.status} ({run.duration_ms} ms)')
+            self.stdout.write(self.style.SUCCESS(f'{len(runs)} Job(s) ausgeführt.'))
+            return
+
+        stop_event = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        self.stdout.write('Scheduler läuft (Strg+C zum Beenden) …')
+        try:
+            scheduler.Scheduler(tick_seconds=options['tick']).run(stop_event)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,48 @@
+"""
+Führt Jobs der Datenbank-Warteschlange aus (siehe questionnaires/taskqueue.py).
+
+  python manage.py run_worker                 # ein Worker, läuft dauerhaft
+  python manage.py run_worker --threads 4     # vier Worker in einem Prozess
+  python manage.py run_worker --burst         # abarbeiten, was fällig ist, dann beenden
+
+Mehrere Prozesse/Container dürfen parallel laufen (SKIP LOCKED).
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from questionnaires import taskqueue
+
+
+class Command(BaseCommand):
+    help = 'Führt Hintergrund-Jobs aus der Datenbank-Warteschlange aus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=1, help='Worker-Threads (Default: 1)')
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=1.0,
+            help='Pause in Sekunden, wenn die Queue leer ist (Default: 1)',
+        )
+        parser.add_argument('--batch', type=int, default=1, help='Jobs je Reservierung (Default: 1)')
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Beenden, sobald keine fälligen Jobs mehr vorhanden sind',
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            # docker stop → SIGTERM: laufende Jobs fertig ausführen, dann beenden
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        processed = taskqueue.run_workers(
+            max(options['threads'], 1),
+            poll_interval=options['poll'],
+            batch=max(options['batch'], 1),
+            burst=options['burst'],
+            stop_event=stop_event,
+        )
+        self.stdout.write(self.style.SUCCESS(f'{sum(processed)} Job(s) ausgeführt.'))
@@ -0,0 +1,56 @@
+"""
+Stellt E-Mails aus der Outbox zu (Einladungen, siehe questionnaires/outbox.py).
+
+Dauerbetrieb (eigener Container/Prozess neben gunicorn):
+  python manage.py send_outbox
+Einmaliger Lauf, z.B. per Cron:
+  python manage.py send_outbox --once
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from questionnaires import outbox
+
+
+class Command(BaseCommand):
+    help = 'Stellt ausstehende E-Mails aus der Outbox zu (Retry/Backoff, Dead-Letter)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Alle fälligen Mails zustellen und beenden',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=50,
+            help='Mails je SMTP-Verbindung (Default: 50, begrenzt durch EMAIL_OUTBOX_LEASE_SECONDS)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Pause in Sekunden, wenn nichts fällig ist (Default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = outbox.deliver_due(batch_size=options['batch'])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"{stats['sent']} versendet, {stats['retry']} erneut geplant, "
+                    f"{stats['dead']} endgültig fehlgeschlagen."
+                )
+            if stats['sent'] + stats['retry'] + stats['dead'] >= outbox.claim_limit(options['batch']):
+                continue  # volle Stapel: sofort weiter
+            if options['once']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox: {outbox.pending_count()} Mail(s) ausstehend.'
+        ))
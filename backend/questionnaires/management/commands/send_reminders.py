@@ -0,0 +1,34 @@
+"""
+Plant Erinnerungen für offene Fragebögen ein (siehe questionnaires/reminders.py).
+
+Gefahrlos alle paar Minuten ausführbar (Cron/Scheduled Task), z.B.
+  */10 * * * *  docker-compose exec -T backend python manage.py send_reminders
+Zugestellt wird durch den mailer-Container (send_outbox).
+"""
+from django.core.management.base import BaseCommand
+
+from questionnaires import reminders
+
+
+class Command(BaseCommand):
+    help = 'Legt Erinnerungs-Mails für offene, nicht erinnerte Sessions in die Outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=100,
+            help='Sessions pro Transaktion (Default: 100)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Nur anzeigen, wie viele Erinnerungen fällig sind',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{reminders.due_sessions().count()} Erinnerung(en) fällig.')
+            return
+        count = reminders.enqueue_due(batch_size=options['batch'])
+        self.stdout.write(self.style.SUCCESS(f'{count} Erinnerung(en) eingeplant.'))
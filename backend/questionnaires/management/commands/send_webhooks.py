@@ -0,0 +1,55 @@
+"""
+Stellt ausstehende Webhook-Ereignisse zu (siehe questionnaires/webhooks.py).
+
+Im Normalbetrieb übernimmt das der Scheduler (Job webhooks.deliver).
+Einmaliger Lauf, z.B. zum Test gegen einen lokalen Empfänger:
+  python manage.py send_webhooks --once
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from questionnaires import webhooks
+
+
+class Command(BaseCommand):
+    help = 'Stellt ausstehende Webhook-Ereignisse gebündelt zu (HMAC-signiert, Retry/Backoff)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Alle fälligen Ereignisse zustellen und beenden',
+        )
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=None,
+            help='Ereignisse je POST (Default: WEBHOOK_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Pause in Sekunden, wenn nichts fällig ist (Default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = webhooks.deliver_due(batch_size=options['batch'])
+            if stats['posts']:
+                self.stdout.write(
+                    f"{stats['posts']} POST(s): {stats['sent']} zugestellt, "
+                    f"{stats['retry']} erneut geplant, {stats['dead']} endgültig fehlgeschlagen."
+                )
+            if stats['sent'] and not (stats['retry'] or stats['dead']):
+                continue  # evtl. weitere volle Stapel: sofort weiter
+            if options['once']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f'Webhooks: {webhooks.pending_count()} Ereignis(se) ausstehend.'
+        ))
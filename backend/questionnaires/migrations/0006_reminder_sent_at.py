@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaires', '0005_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnairesession',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='questionnairesession',
+            index=models.Index(
+                condition=models.Q(completed=False, reminder_sent_at__isnull=True),
+                fields=['invitation_sent_at'],
+                name='reminder_due_idx',
+            ),
+        ),
+    ]
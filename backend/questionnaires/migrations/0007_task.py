@@ -0,0 +1,37 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaires', '0006_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('priority', models.SmallIntegerField(default=0, help_text='Höhere Werte werden zuerst ausgeführt')),
+                ('status', models.CharField(choices=[('queued', 'Wartend'), ('running', 'Läuft'), ('done', 'Erledigt'), ('failed', 'Fehlgeschlagen')], default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-priority', 'run_at', 'id'],
+                'indexes': [
+                    models.Index(condition=models.Q(status='queued'), fields=['-priority', 'run_at'], name='task_queued_idx'),
+                    models.Index(condition=models.Q(status='running'), fields=['locked_until'], name='task_running_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaires', '0007_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('tick', models.DateTimeField(help_text='Beginn des Zeitfensters, für das der Lauf gilt')),
+                ('node', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('running', 'Läuft'), ('ok', 'Erfolgreich'), ('error', 'Fehler')], default='running', max_length=10)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'constraints': [models.UniqueConstraint(fields=('name', 'tick'), name='jobrun_once_per_tick')],
+            },
+        ),
+    ]
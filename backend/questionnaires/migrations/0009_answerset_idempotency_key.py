@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaires', '0008_jobrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answerset',
+            name='idempotency_key',
+            field=models.CharField(blank=True, default='', help_text='Idempotency-Key des Submits – Wiederholungen erhalten die ursprüngliche Antwort', max_length=255),
+        ),
+    ]
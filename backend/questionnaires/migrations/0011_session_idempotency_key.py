@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaires', '0010_webhooks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnairesession',
+            name='idempotency_key',
+            field=models.CharField(blank=True, default='', help_text='Idempotency-Key der Anlage (GDT-Bridge) – Wiederholungen erhalten dieselbe Session', max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='questionnairesession',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key', ''), _negated=True), fields=('idempotency_key',), name='session_idempotency_key_uniq'),
+        ),
+    ]
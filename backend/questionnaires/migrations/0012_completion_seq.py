@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+
+def backfill_completion_seq(apps, schema_editor):
+    """Bereits abgeschlossene Sessions in Abschluss-Reihenfolge nummerieren, Zähler nachziehen."""
+    QuestionnaireSession = apps.get_model('questionnaires', 'QuestionnaireSession')
+    CacheVersion = apps.get_model('questionnaires', 'CacheVersion')
+    seq = 0
+    batch = []
+    for session in (
+        QuestionnaireSession.objects.filter(completed=True)
+        .order_by('completed_at', 'pk')
+        .only('pk')
+        .iterator()
+    ):
+        seq += 1
+        session.completion_seq = seq
+        batch.append(session)
+        if len(batch) >= 500:
+            QuestionnaireSession.objects.bulk_update(batch, ['completion_seq'])
+            batch = []
+    if batch:
+        QuestionnaireSession.objects.bulk_update(batch, ['completion_seq'])
+    CacheVersion.objects.update_or_create(key='completion_seq', defaults={'version': seq})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionnaires', '0011_session_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionnairesession',
+            name='completion_seq',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Position im Abschluss-Feed (GET /api/gdt/completions/), in Commit-Reihenfolge vergeben', null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_completion_seq, migrations.RunPython.noop),
+    ]
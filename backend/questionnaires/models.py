@@ -1,4 +1,5 @@
 from django.db import models
+import secrets
 import uuid
 from datetime import timedelta
 from django.conf import settings
@@ -52,6 +53,7 @@ class QuestionnaireSession(models.Model):
     patient_email = models.EmailField(blank=True)
     patient_birth_date = models.DateField(null=True, blank=True)
     invitation_sent_at = models.DateTimeField(null=True, blank=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
 
     # Legacy
     patient_identifier = models.CharField(
@@ -71,9 +73,38 @@ class QuestionnaireSession(models.Model):
         blank=True,
         help_text="GDT Feld 8315 – Anforderungskennung für Rückantwort"
     )
+    idempotency_key = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="Idempotency-Key der Anlage (GDT-Bridge) – Wiederholungen erhalten dieselbe Session"
+    )
+    completion_seq = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        help_text="Position im Abschluss-Feed (GET /api/gdt/completions/), in Commit-Reihenfolge vergeben"
+    )
     
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'],
+                condition=~models.Q(idempotency_key=''),
+                name='session_idempotency_key_uniq',
+            ),
+        ]
+        indexes = [
+            # Erinnerungs-Job: nur offene, noch nicht erinnerte Sessions im
+            # (Teil-)Index – bleibt klein, egal wie groß die Tabelle wird
+            models.Index(
+                fields=['invitation_sent_at'],
+                condition=models.Q(completed=False, reminder_sent_at__isnull=True),
+                name='reminder_due_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"Session {self.token} - {self.template.slug}"
@@ -121,6 +152,12 @@ class AnswerSet(models.Model):
             ('ausgeprägt', 'Ausgeprägt (≥16)'),
         ]
     )
+    idempotency_key = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="Idempotency-Key des Submits – Wiederholungen erhalten die ursprüngliche Antwort"
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -132,3 +169,269 @@ class AnswerSet(models.Model):
     
     def __str__(self):
         return f"Answers for {self.session.token}"
+
+
+class CacheVersion(models.Model):
+    """
+    Versionszähler für prozesslokale Caches (z.B. Template-Registry).
+
+    Jeder Worker merkt sich den zuletzt gesehenen Stand und verwirft seinen
+    Cache, sobald der Zähler in der Datenbank davon abweicht – ein einzelner
+    Primärschlüssel-Lookup statt eines gemeinsamen Cache-Servers.
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} (v{self.version})"
+
+
+class OutboxEmail(models.Model):
+    """
+    Ausgehende E-Mail (Transactional Outbox).
+
+    Wird in derselben Transaktion wie die Session angelegt; zugestellt
+    wird asynchron durch `manage.py send_outbox` über eine wiederverwendete
+    SMTP-Verbindung (siehe outbox.py). Fehlgeschlagene Zustellungen werden
+    mit wachsendem Abstand wiederholt und nach EMAIL_OUTBOX_MAX_ATTEMPTS
+    Versuchen als 'dead' abgelegt.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+
+    session = models.ForeignKey(
+        QuestionnaireSession,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbox_emails'
+    )
+    kind = models.CharField(max_length=30, default='invitation')
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=10,
+        default=STATUS_PENDING,
+        choices=[
+            (STATUS_PENDING, 'Ausstehend'),
+            (STATUS_SENT, 'Versendet'),
+            (STATUS_DEAD, 'Endgültig fehlgeschlagen'),
+        ]
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} → {self.to_email} ({self.status})"
+
+
+class Task(models.Model):
+    """
+    Hintergrund-Job der Datenbank-Warteschlange (siehe taskqueue.py).
+
+    Worker (`manage.py run_worker`) holen Jobs mit SELECT … FOR UPDATE
+    SKIP LOCKED nach Priorität und Fälligkeit. Ein laufender Job ist bis
+    locked_until reserviert (Visibility-Timeout); stirbt der Worker, wird er
+    danach erneut vergeben.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(
+        default=0,
+        help_text="Höhere Werte werden zuerst ausgeführt"
+    )
+    status = models.CharField(
+        max_length=10,
+        default=STATUS_QUEUED,
+        choices=[
+            (STATUS_QUEUED, 'Wartend'),
+            (STATUS_RUNNING, 'Läuft'),
+            (STATUS_DONE, 'Erledigt'),
+            (STATUS_FAILED, 'Fehlgeschlagen'),
+        ]
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['-priority', 'run_at'],
+                condition=models.Q(status='queued'),
+                name='task_queued_idx',
+            ),
+            models.Index(
+                fields=['locked_until'],
+                condition=models.Q(status='running'),
+                name='task_running_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class JobRun(models.Model):
+    """
+    Ausführungsprotokoll periodischer Jobs (siehe scheduler.py).
+
+    (name, tick) ist eindeutig: Je Zeitfenster läuft ein Job höchstens
+    einmal, egal wie viele Backend-Instanzen den Scheduler gestartet haben.
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_OK = 'ok'
+    STATUS_ERROR = 'error'
+
+    name = models.CharField(max_length=100)
+    tick = models.DateTimeField(help_text="Beginn des Zeitfensters, für das der Lauf gilt")
+    node = models.CharField(max_length=100, blank=True)
+    status = models.CharField(
+        max_length=10,
+        default=STATUS_RUNNING,
+        choices=[
+            (STATUS_RUNNING, 'Läuft'),
+            (STATUS_OK, 'Erfolgreich'),
+            (STATUS_ERROR, 'Fehler'),
+        ]
+    )
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'tick'], name='jobrun_once_per_tick'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} @ {self.tick:%d.%m.%Y %H:%M} ({self.status})"
+
+
+def generate_webhook_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookSubscription(models.Model):
+    """
+    Webhook-Abonnement eines Partnersystems (siehe webhooks.py).
+
+    Erhält abgeschlossene Fragebögen gebündelt per POST an `url`, signiert
+    mit HMAC-SHA256 über `secret`.
+    """
+    name = models.CharField(max_length=100)
+    url = models.URLField(max_length=500)
+    secret = models.CharField(
+        max_length=200,
+        default=generate_webhook_secret,
+        help_text="Schlüssel für die HMAC-SHA256-Signatur (X-Webhook-Signature)"
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.url})"
+
+
+class WebhookEvent(models.Model):
+    """
+    Ausstehendes bzw. zugestelltes Ereignis für ein Abonnement.
+
+    Je (Abonnement, Session, Ereignis) genau eine Zeile; mit der Session
+    gelöscht (Löschfrist), da `payload` Patientendaten enthält.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+
+    subscription = models.ForeignKey(
+        WebhookSubscription,
+        on_delete=models.CASCADE,
+        related_name='events'
+    )
+    session = models.ForeignKey(
+        QuestionnaireSession,
+        on_delete=models.CASCADE,
+        related_name='webhook_events'
+    )
+    event = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=10,
+        default=STATUS_PENDING,
+        choices=[
+            (STATUS_PENDING, 'Ausstehend'),
+            (STATUS_SENT, 'Zugestellt'),
+            (STATUS_DEAD, 'Endgültig fehlgeschlagen'),
+        ]
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['subscription', 'session', 'event'], name='webhook_event_once'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='webhook_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.pk} → {self.subscription_id} ({self.status})"
+
+
+class WebhookDelivery(models.Model):
+    """Protokoll je Zustellversuch (ein POST mit einem Stapel von Ereignissen)."""
+    subscription = models.ForeignKey(
+        WebhookSubscription,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    delivery_id = models.UUIDField(default=uuid.uuid4)
+    event_ids = models.JSONField(default=list)
+    ok = models.BooleanField(default=False)
+    status_code = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    duration_ms = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.delivery_id} → {self.subscription_id} ({self.status_code or self.error})"
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+E-Mail-Outbox: Einladungen asynchron zustellen.
+
+Die Views schreiben nur noch eine OutboxEmail-Zeile – in derselben
+Transaktion wie die Session, damit weder Mails zu nicht existierenden
+Sessions noch Sessions ohne Mail entstehen. Ein langsamer oder hängender
+SMTP-Server (web.de) blockiert so weder gunicorn-Worker noch den
+HTTP-Timeout der GDT-Bridge.
+
+Zustellung: `python manage.py send_outbox` (Dauerbetrieb) bzw.
+`--once` (Cron). deliver_due() holt fällige Mails, reserviert sie für
+EMAIL_OUTBOX_LEASE_SECONDS (mehrere Worker stellen nichts doppelt zu)
+und versendet sie über eine gemeinsame SMTP-Verbindung. Vor jeder Mail
+wird die Reservierung verlängert; ist sie inzwischen an einen anderen
+Worker gegangen, wird die Mail übersprungen. Fehlschläge
+werden mit exponentiellem Abstand wiederholt (EMAIL_OUTBOX_BACKOFF_SECONDS
+· 2^(Versuch-1), höchstens EMAIL_OUTBOX_MAX_BACKOFF_SECONDS) und nach
+EMAIL_OUTBOX_MAX_ATTEMPTS Versuchen als 'dead' abgelegt.
+EMAIL_OUTBOX_RATE_PER_MINUTE begrenzt die Versandrate (Provider-Limits).
+invitation_sent_at der Session wird erst bei tatsächlicher Zustellung gesetzt.
+"""
+import logging
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import OutboxEmail, QuestionnaireSession
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# Vorkompilierte Einladung: statische Teile (Signatur, Markup) stehen fest,
+# je Empfänger werden nur noch Name, Link und Datum eingesetzt
+_SIGNATURE_TEXT = (
+    "Mit freundlichen Grüßen\n"
+    "Dr. med. Björn Micka\n"
+    "Betriebsmedizin · Notfallmedizin\n"
+    "Christoph-Dassler-Str. 22, 91074 Herzogenaurach"
+)
+_SIGNATURE_HTML = (
+    "<hr><p style='font-size:12px;color:#666;'>"
+    "Dr. med. Björn Micka · Betriebsmedizin · Notfallmedizin<br>"
+    "Christoph-Dassler-Str. 22, 91074 Herzogenaurach</p>"
+)
+INVITATION_SUBJECT = "Ihr verkehrsmedizinischer Fragebogen"
+INVITATION_TEXT = (
+    "Sehr geehrte/r {name},\n\n"
+    "bitte füllen Sie vor Ihrem Termin den beigefügten Fragebogen aus:\n\n"
+    "{url}\n\n"
+    "Der Link ist bis zum {valid_until} gültig.\n\n"
+    + _SIGNATURE_TEXT
+).format_map
+INVITATION_HTML = (
+    "<p>Sehr geehrte/r {name},</p>"
+    "<p>bitte füllen Sie vor Ihrem Termin den folgenden Fragebogen aus:</p>"
+    '<p><a href="{url}" style="font-size:16px;font-weight:bold;">Fragebogen öffnen</a></p>'
+    '<p style="color:#666;font-size:12px;">Direktlink: {url}</p>'
+    "<p>Der Link ist bis zum {valid_until} gültig.</p>"
+    + _SIGNATURE_HTML
+).format_map
+
+
+REMINDER_SUBJECT = "Erinnerung: Ihr verkehrsmedizinischer Fragebogen"
+REMINDER_TEXT = (
+    "Sehr geehrte/r {name},\n\n"
+    "Ihr Fragebogen ist noch nicht ausgefüllt. Bitte nehmen Sie sich vor Ihrem "
+    "Termin ein paar Minuten Zeit:\n\n"
+    "{url}\n\n"
+    "Der Link ist bis zum {valid_until} gültig.\n\n"
+    + _SIGNATURE_TEXT
+).format_map
+REMINDER_HTML = (
+    "<p>Sehr geehrte/r {name},</p>"
+    "<p>Ihr Fragebogen ist noch nicht ausgefüllt. Bitte nehmen Sie sich vor Ihrem "
+    "Termin ein paar Minuten Zeit:</p>"
+    '<p><a href="{url}" style="font-size:16px;font-weight:bold;">Fragebogen öffnen</a></p>'
+    '<p style="color:#666;font-size:12px;">Direktlink: {url}</p>'
+    "<p>Der Link ist bis zum {valid_until} gültig.</p>"
+    + _SIGNATURE_HTML
+).format_map
+
+_TEMPLATES = {
+    'invitation': (INVITATION_SUBJECT, INVITATION_TEXT, INVITATION_HTML),
+    'reminder': (REMINDER_SUBJECT, REMINDER_TEXT, REMINDER_HTML),
+}
+
+
+def render(session, kind='invitation'):
+    """Betreff, Text- und HTML-Teil einer Patienten-Mail ('invitation' | 'reminder')."""
+    subject, text, html = _TEMPLATES[kind]
+    url = f"{settings.APP_URL}/q/{session.token}"
+    patient_name = f"{session.patient_first_name} {session.patient_last_name}".strip()
+    valid_until = timezone.localtime(session.expires_at).strftime('%d.%m.%Y')
+    return (
+        subject,
+        text({"name": patient_name, "url": url, "valid_until": valid_until}),
+        html({"name": escape(patient_name), "url": url, "valid_until": valid_until}),
+    )
+
+
+def render_invitation(session):
+    """Betreff, Text- und HTML-Teil der Einladungs-E-Mail."""
+    return render(session, 'invitation')
+
+
+def patient_email(session, kind='invitation'):
+    """Ungespeicherte OutboxEmail an den Patienten (für bulk_create)."""
+    subject, text_body, html_body = render(session, kind)
+    return OutboxEmail(
+        session=session,
+        kind=kind,
+        to_email=session.patient_email,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+    )
+
+
+def invitation_email(session):
+    """Ungespeicherte Einladungs-OutboxEmail (für bulk_create)."""
+    return patient_email(session, 'invitation')
+
+
+def enqueue_invitation(session):
+    """Einladungs-Mail für die Session in die Outbox legen (kein SMTP-Kontakt)."""
+    mail = invitation_email(session)
+    mail.save()
+    return mail
+
+
+def backoff_seconds(attempts):
+    """Wartezeit vor dem nächsten Versuch nach `attempts` Fehlschlägen (mit ±10 % Jitter)."""
+    base = _setting('EMAIL_OUTBOX_BACKOFF_SECONDS', 60)
+    cap = _setting('EMAIL_OUTBOX_MAX_BACKOFF_SECONDS', 6 * 3600)
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return delay * random.uniform(0.9, 1.1)
+
+
+class RateLimiter:
+    """
+    Mindestabstand zwischen zwei Mails (per_minute ≤ 0: unbegrenzt).
+
+    Provider wie web.de drosseln bzw. sperren bei zu vielen Mails pro
+    Minute; Kampagnen mit 200+ Einladungen werden so gleichmäßig verteilt.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 60.0 / per_minute if per_minute and per_minute > 0 else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._last = None
+
+    def wait(self):
+        if self.interval and self._last is not None:
+            remaining = self._last + self.interval - self.clock()
+            if remaining > 0:
+                self.sleep(remaining)
+        self._last = self.clock()
+
+
+def default_rate_limiter():
+    return RateLimiter(_setting('EMAIL_OUTBOX_RATE_PER_MINUTE', 0))
+
+
+def claim_limit(batch_size):
+    """
+    Stapelgröße, die sicher innerhalb der Reservierung abgearbeitet wird:
+    EMAIL_OUTBOX_LEASE_SECONDS ÷ (EMAIL_TIMEOUT + Abstand des Ratenlimits),
+    höchstens batch_size, mindestens 1. Sonst läuft die Reservierung bei
+    hängendem SMTP-Server ab, während der Stapel noch versendet wird, und
+    ein zweiter Worker stellt dieselben Mails erneut zu.
+    """
+    lease = _setting('EMAIL_OUTBOX_LEASE_SECONDS', 300)
+    rate = _setting('EMAIL_OUTBOX_RATE_PER_MINUTE', 0)
+    per_mail = (_setting('EMAIL_TIMEOUT', None) or 30) + (60.0 / rate if rate and rate > 0 else 0)
+    return max(1, min(batch_size, int(lease // per_mail)))
+
+
+def _claim(batch_size, ids=None):
+    """
+    Fällige Mails reservieren: next_attempt_at in die Zukunft schieben,
+    bevor außerhalb der Transaktion versendet wird. Stirbt der Worker,
+    werden die Mails nach Ablauf der Reservierung erneut versucht.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=_setting('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+    with transaction.atomic():
+        qs = OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now,
+        )
+        if ids is not None:
+            qs = qs.filter(id__in=ids)
+        ids = list(qs.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+        if ids:
+            OutboxEmail.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+    return list(OutboxEmail.objects.filter(id__in=ids).order_by('next_attempt_at', 'id'))
+
+
+def _held(mail):
+    """Die Zeile, solange die Reservierung noch beim Aufrufer liegt (next_attempt_at unverändert)."""
+    return OutboxEmail.objects.filter(
+        pk=mail.pk, status=OutboxEmail.STATUS_PENDING, next_attempt_at=mail.next_attempt_at,
+    )
+
+
+def _renew(mail):
+    """
+    Reservierung unmittelbar vor dem Versand neu starten. False, wenn sie
+    abgelaufen und von einem anderen Worker übernommen worden ist.
+    """
+    lease_until = timezone.now() + timedelta(seconds=_setting('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+    if not _held(mail).update(next_attempt_at=lease_until):
+        return False
+    mail.next_attempt_at = lease_until
+    return True
+
+
+def _mark_sent(mail):
+    now = timezone.now()
+    if not _held(mail).update(
+        status=OutboxEmail.STATUS_SENT, sent_at=now, attempts=mail.attempts + 1, last_error='',
+    ):
+        logger.warning('E-Mail %s: Reservierung verloren, Versand nicht verbucht', mail.pk)
+        return False
+    # Versandzeitpunkt an der Session = tatsächliche Zustellung
+    sent_field = {'invitation': 'invitation_sent_at', 'reminder': 'reminder_sent_at'}.get(mail.kind)
+    if mail.session_id and sent_field:
+        QuestionnaireSession.objects.filter(pk=mail.session_id).update(**{sent_field: now})
+    return True
+
+
+def _mark_failed(mail, error):
+    attempts = mail.attempts + 1
+    if attempts >= _setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 8):
+        logger.error('E-Mail %s an %s endgültig fehlgeschlagen: %s', mail.pk, mail.to_email, error)
+        _held(mail).update(
+            status=OutboxEmail.STATUS_DEAD, attempts=attempts, last_error=error,
+        )
+        return OutboxEmail.STATUS_DEAD
+    logger.warning('E-Mail %s an %s fehlgeschlagen (Versuch %s): %s', mail.pk, mail.to_email, attempts, error)
+    _held(mail).update(
+        attempts=attempts,
+        last_error=error,
+        next_attempt_at=timezone.now() + timedelta(seconds=backoff_seconds(attempts)),
+    )
+    return OutboxEmail.STATUS_PENDING
+
+
+def deliver_due(batch_size=50, connection=None, limiter=None, ids=None, on_result=None):
+    """
+    Einen Stapel fälliger Mails zustellen.
+
+    Alle Mails des Stapels teilen sich eine SMTP-Verbindung (connection
+    oder get_connection()); nach einem Fehler wird sie geschlossen und
+    für die nächste Mail neu aufgebaut. Reserviert werden höchstens
+    claim_limit(batch_size) Mails. limiter (RateLimiter, Default aus
+    EMAIL_OUTBOX_RATE_PER_MINUTE) begrenzt die Versandrate, ids schränkt
+    auf bestimmte Outbox-Zeilen ein (Kampagnen). on_result(mail, status,
+    error) wird je Mail aufgerufen (status: 'sent' | 'pending' | 'dead');
+    Mails, deren Reservierung inzwischen ein anderer Worker hält, werden
+    weder versendet noch gezählt.
+    Rückgabe: {'sent': n, 'retry': n, 'dead': n}
+    """
+    stats = {'sent': 0, 'retry': 0, 'dead': 0}
+    limiter = limiter or default_rate_limiter()
+    mails = _claim(claim_limit(batch_size), ids=ids)
+    if not mails:
+        return stats
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        for mail in mails:
+            message = EmailMultiAlternatives(
+                subject=mail.subject,
+                body=mail.text_body,
+                from_email=settings.EMAIL_FROM,
+                to=[mail.to_email],
+                connection=connection,
+            )
+            if mail.html_body:
+                message.attach_alternative(mail.html_body, 'text/html')
+            limiter.wait()
+            if not _renew(mail):
+                # Reservierung abgelaufen, ein anderer Worker stellt zu
+                logger.warning('E-Mail %s: Reservierung verloren, übersprungen', mail.pk)
+                continue
+            try:
+                # Hält die Verbindung über den Stapel offen (no-op, wenn schon offen)
+                connection.open()
+                if not connection.send_messages([message]):
+                    raise RuntimeError('SMTP-Server hat die Nachricht nicht angenommen.')
+            except Exception as exc:
+                # Verbindung verwerfen; open() baut sie für die nächste Mail neu auf
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                error = str(exc) or exc.__class__.__name__
+                result = _mark_failed(mail, error)
+                stats['dead' if result == OutboxEmail.STATUS_DEAD else 'retry'] += 1
+                if on_result:
+                    on_result(mail, result, error)
+                continue
+            if not _mark_sent(mail):
+                continue
+            stats['sent'] += 1
+            if on_result:
+                on_result(mail, OutboxEmail.STATUS_SENT, '')
+    finally:
+        connection.close()
+    return stats
+
+
+def pending_count():
+    return OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).count()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Druck-Viewmodel für die Print-Page (/print/<token>, Puppeteer-PDF).
+
+Statt Schema + Rohantworten auszuliefern und Sichtbarkeit, Anzeigetexte und
+Folgefragen im Browser nachzubauen, liefert GET /api/print/<token>/ eine
+flache, druckfertige Struktur:
+
+{
+  "title": "...", "basis": "...",
+  "patient_last_name": "...", "patient_first_name": "...",
+  "patient_birth_date": "TT.MM.JJJJ", "completed_at": "TT.MM.JJJJ",
+  "token": "...", "ess_total": 8, "ess_band": "normal",
+  "evaluation": {... Befunde mit Volltexten, siehe evaluation.py ...},
+  "sections": [
+    {"id": "...", "number": 1, "title": "...", "pdf_note": "...",
+     "rows": [
+       {"id": "...", "type": "yes_no", "label": "...", "value": "yes",
+        "display": "Ja", "highlight": true,
+        "followup": {"label": "...", "text": "..."}},          # optional
+       {"id": "ess", "type": "ess_matrix", "total": 8,
+        "items": [{"id": "ess_1", "label": "...", "value": 1}, ...]}
+     ]}
+  ]
+}
+
+Nur sichtbare Fragen (show_if) und Abschnitte mit mindestens einer sichtbaren
+Frage. Der teure Teil (Sektionen + Auswertung) wird je (Token, Template-Stand,
+Regelkatalog-Version) gecacht; Patientendaten kommen bei jedem Aufruf frisch
+aus der Session, damit spätere Korrekturen im Admin sofort im PDF landen.
+
+Druck-Tickets (PDF-Pipeline): Die puppeteer-pdf-Route validiert die Session
+per POST /api/print/<token>/ticket/ und erhält ein signiertes, kurzlebiges
+Ticket; die fertige Druckansicht liegt solange unter dem Ticket im Cache.
+Chromium lädt /print/<token>?ticket=… und die Print-Page holt die Daten mit
+GET /api/print/ticket/<ticket>/ – ohne zweite Session-/Antwort-Abfrage und
+ohne zweite Auswertung.
+"""
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from . import registry
+from .evaluation import RULES_VERSION, evaluate_answers
+from .models import QuestionnaireSession
+from .schema import ESS_KEYS, answer_display, is_v2_schema, is_visible
+
+TICKET_SALT = "questionnaires.print-ticket"
+
+
+def _followup(question, answers):
+    follow = question.get("followup")
+    if not follow or answers.get(question["id"]) != follow.get("when", "yes"):
+        return None
+    raw = answers.get(follow["id"])
+    if not isinstance(raw, str) or not raw.strip():
+        return None
+    return {"label": follow.get("label") or "Beschreibung", "text": raw.strip()}
+
+
+def _row(question, answers):
+    qtype = question.get("type")
+    if qtype == "ess_matrix":
+        items = question.get("items") or [{"id": key, "label": key} for key in ESS_KEYS]
+        return {
+            "id": question["id"],
+            "type": qtype,
+            "label": question.get("label", ""),
+            "total": answers.get("ess_total"),
+            "items": [
+                {"id": item["id"], "label": item["label"], "value": answers.get(item["id"])}
+                for item in items
+            ],
+        }
+    value = answers.get(question["id"])
+    row = {
+        "id": question["id"],
+        "type": qtype,
+        "label": question.get("label", ""),
+        "value": value,
+        "display": answer_display(question, value),
+        "highlight": qtype == "yes_no" and value == "yes",
+    }
+    followup = _followup(question, answers)
+    if followup:
+        row["followup"] = followup
+    return row
+
+
+def build_sections(schema, answers):
+    """Sichtbare Abschnitte/Fragen als flache Zeilen (Nummerierung fortlaufend)."""
+    sections = []
+    for section in schema.get("sections", []):
+        rows = [
+            _row(q, answers)
+            for q in section.get("questions", [])
+            if is_visible(q, answers)
+        ]
+        if not rows:
+            continue
+        sections.append({
+            "id": section["id"],
+            "number": len(sections) + 1,
+            "title": section.get("title", ""),
+            "pdf_note": section.get("pdf_note", ""),
+            "rows": rows,
+        })
+    return sections
+
+
+def _cache_key(session, template):
+    return (
+        f"print:{session.token}:{template.pk}:{template.version}:"
+        f"{registry.generation()}:{RULES_VERSION}"
+    )
+
+
+def _build_body(session, template):
+    answer_set = session.answers
+    answers = answer_set.answers_json
+    schema = template.schema
+    return {
+        "title": schema.get("title") or "Verkehrsmedizinischer Fragebogen",
+        "basis": schema.get("basis", ""),
+        "completed_at": (
+            session.completed_at.strftime('%d.%m.%Y') if session.completed_at else None
+        ),
+        "ess_total": answer_set.ess_total,
+        "ess_band": answer_set.ess_band,
+        "evaluation": evaluate_answers(answers),
+        "sections": build_sections(schema, answers),
+    }
+
+
+def _patient_header(session):
+    return {
+        "token": str(session.token),
+        "patient_last_name": session.patient_last_name,
+        "patient_first_name": session.patient_first_name,
+        "patient_birth_date": (
+            session.patient_birth_date.strftime('%d.%m.%Y')
+            if session.patient_birth_date else ''
+        ),
+    }
+
+
+def print_model(session):
+    """
+    Viewmodel für eine abgeschlossene Session mit v2-Template.
+
+    Raises AnswerSet.DoesNotExist, wenn (noch) keine Antworten existieren.
+    """
+    template = registry.get_template(session.template_id)
+    key = _cache_key(session, template)
+    body = cache.get(key)
+    if body is None:
+        body = _build_body(session, template)
+        cache.set(key, body, getattr(settings, 'PRINT_CACHE_SECONDS', 3600))
+    return {**_patient_header(session), **body}
+
+
+def answers_model(session, texts=False):
+    """
+    Antwort-Payload von /api/answers/ (Rohantworten + Schema + Auswertung).
+
+    Raises AnswerSet.DoesNotExist, wenn (noch) keine Antworten existieren.
+    """
+    answer_set = session.answers
+    return {
+        "answers": answer_set.answers_json,
+        "schema": registry.get_template(session.template_id).schema,
+        "evaluation": evaluate_answers(answer_set.answers_json, texts=texts),
+        "ess_total": answer_set.ess_total,
+        "ess_band": answer_set.ess_band,
+        "completed_at": (
+            session.completed_at.strftime('%d.%m.%Y') if session.completed_at else None
+        ),
+        **_patient_header(session),
+    }
+
+
+def answers_etag(session, texts=False):
+    """
+    ETag für /api/answers/ – ändert sich mit completed_at, Template-Stand und
+    Regelkatalog sowie bei korrigierten Patientendaten (ohne AnswerSet zu laden).
+    """
+    template = registry.get_template(session.template_id)
+    parts = (
+        str(session.token),
+        session.completed_at.isoformat() if session.completed_at else "",
+        f"{template.pk}.{template.version}.{registry.generation()}" if template else "",
+        RULES_VERSION,
+        "full" if texts else "compact",
+        session.patient_last_name,
+        session.patient_first_name,
+        str(session.patient_birth_date or ""),
+    )
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def document(session):
+    """
+    Vollständige Druckdaten: {"kind": "v2", "data": Viewmodel} bzw. für
+    Legacy-Templates {"kind": "legacy", "data": Answers-Payload mit Volltexten}.
+    """
+    if is_v2_schema(registry.get_template(session.template_id).schema):
+        return {"kind": "v2", "data": print_model(session)}
+    return {"kind": "legacy", "data": answers_model(session, texts=True)}
+
+
+def _ticket_key(nonce):
+    return f"print-ticket:{nonce}"
+
+
+def ticket_seconds():
+    return getattr(settings, 'PRINT_TICKET_SECONDS', 120)
+
+
+def issue_ticket(session):
+    """
+    Druckdaten berechnen, unter einem neuen Ticket cachen und das signierte
+    Ticket zurückgeben. Raises AnswerSet.DoesNotExist wie print_model().
+    """
+    doc = document(session)
+    nonce = secrets.token_urlsafe(12)
+    cache.set(_ticket_key(nonce), doc, ticket_seconds())
+    return signing.dumps({"t": str(session.token), "n": nonce}, salt=TICKET_SALT)
+
+
+def redeem_ticket(ticket):
+    """
+    Druckdaten zu einem Ticket.
+
+    Raises signing.SignatureExpired (abgelaufen) bzw. signing.BadSignature
+    (manipuliert). Fehlt der Cache-Eintrag (z.B. anderer Worker mit lokalem
+    Cache), werden die Daten aus der im Ticket signierten Session neu
+    berechnet; ist diese inzwischen gelöscht oder abgelaufen, liefert die
+    Funktion None.
+    """
+    payload = signing.loads(ticket, salt=TICKET_SALT, max_age=ticket_seconds())
+    doc = cache.get(_ticket_key(payload["n"]))
+    if doc is not None:
+        return doc
+    session = QuestionnaireSession.objects.filter(token=payload["t"]).first()
+    if session is None or session.is_expired() or not session.completed:
+        return None
+    return document(session)
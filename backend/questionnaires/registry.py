@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Prozessweiter Cache für Fragebogen-Templates.
+
+Das Template-Schema (schema_json) ist groß und ändert sich nur mit
+load_catalog bzw. Änderungen im Django-Admin. Statt es bei jeder
+Session-Anlage und jedem Patientenaufruf neu aus der Datenbank zu laden,
+hält jeder Worker geparste, unveränderliche Templates vor:
+
+  active_template(slug)  – neuestes aktives Template (optional je Slug)
+  get_template(pk)       – Template per Primärschlüssel (auch inaktive,
+                           bestehende Sessions behalten ihr Template)
+
+Invalidierung: post_save/post_delete am Template sowie load_catalog rufen
+invalidate() auf – erst nach dem Commit der Transaktion (on_commit). Das
+verwirft den lokalen Cache und erhöht den Zähler CacheVersion('templates');
+alle anderen Worker vergleichen ihren Stand höchstens alle
+TEMPLATE_REGISTRY_CHECK_SECONDS mit diesem Zähler. Vor dem Commit würde ein
+paralleler Request (ASGI: ein Thread je Request) noch die alte Zeile laden
+und unter dem neuen Zählerstand cachen.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CacheVersion, QuestionnaireTemplate
+
+VERSION_KEY = "templates"
+
+CachedTemplate = namedtuple("CachedTemplate", "pk slug version schema")
+
+
+class _FrozenDict(dict):
+    """dict, der Änderungen verweigert – JSON-Encoder behandeln ihn wie dict."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Gecachtes Template-Schema ist unveränderlich.")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # copy/deepcopy liefern eine normale, veränderbare Kopie
+        return dict, (dict(self),)
+
+
+def freeze(value):
+    """JSON-Struktur rekursiv unveränderlich machen (dict → _FrozenDict, list → tuple)."""
+    if isinstance(value, dict):
+        return _FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _to_cached(template):
+    return CachedTemplate(
+        pk=template.pk,
+        slug=template.slug,
+        version=template.version,
+        schema=freeze(template.schema_json),
+    )
+
+
+_lock = threading.Lock()
+_by_pk = {}
+_active = {}          # {slug | None: CachedTemplate | None}
+_seen_version = None
+_checked_at = 0.0
+
+
+def current_version(key=VERSION_KEY):
+    """Zählerstand aus der Datenbank (0, solange nie invalidiert wurde)."""
+    return (
+        CacheVersion.objects.filter(key=key)
+        .values_list("version", flat=True)
+        .first()
+    ) or 0
+
+
+def bump_version(key=VERSION_KEY):
+    """Zähler erhöhen (legt die Zeile beim ersten Aufruf an)."""
+    updated = CacheVersion.objects.filter(key=key).update(version=F("version") + 1)
+    if not updated:
+        CacheVersion.objects.get_or_create(key=key, defaults={"version": 1})
+    return current_version(key)
+
+
+def _sync():
+    """Lokalen Cache verwerfen, wenn ein anderer Worker invalidiert hat."""
+    global _seen_version, _checked_at
+    now = time.monotonic()
+    interval = getattr(settings, "TEMPLATE_REGISTRY_CHECK_SECONDS", 2)
+    if _seen_version is not None and now - _checked_at < interval:
+        return
+    version = current_version()
+    with _lock:
+        if version != _seen_version:
+            _by_pk.clear()
+            _active.clear()
+            _seen_version = version
+        _checked_at = now
+
+
+def reset():
+    """Nur den Cache dieses Prozesses verwerfen, ohne Zähler (Tests, deren Transaktion nie committet)."""
+    global _seen_version, _checked_at
+    with _lock:
+        _by_pk.clear()
+        _active.clear()
+        _seen_version = None
+        _checked_at = 0.0
+
+
+def invalidate():
+    """Cache in diesem Prozess leeren und alle anderen Worker benachrichtigen."""
+    global _seen_version, _checked_at
+    version = bump_version()
+    with _lock:
+        _by_pk.clear()
+        _active.clear()
+        _seen_version = version
+        _checked_at = time.monotonic()
+
+
+def invalidate_on_commit():
+    """invalidate() nach dem Commit der laufenden Transaktion (ohne Transaktion sofort)."""
+    transaction.on_commit(invalidate)
+
+
+def generation():
+    """Zuletzt gesehener Zählerstand – Bestandteil abgeleiteter Cache-Schlüssel."""
+    _sync()
+    return _seen_version
+
+
+def get_template(pk):
+    """Template per pk als CachedTemplate; None, wenn es nicht existiert."""
+    _sync()
+    hit = _by_pk.get(pk)
+    if hit is not None:
+        return hit
+    template = QuestionnaireTemplate.objects.filter(pk=pk).first()
+    if template is None:
+        return None
+    cached = _to_cached(template)
+    with _lock:
+        _by_pk[pk] = cached
+    return cached
+
+
+def active_template(slug=None):
+    """Neuestes aktives Template (je Slug oder insgesamt); None, wenn keines aktiv ist."""
+    slug = slug or None
+    _sync()
+    if slug in _active:
+        return _active[slug]
+    qs = QuestionnaireTemplate.objects.filter(is_active=True)
+    if slug:
+        qs = qs.filter(slug=slug)
+    template = qs.order_by("-version").first()
+    cached = _to_cached(template) if template is not None else None
+    with _lock:
+        _active[slug] = cached
+        if cached is not None:
+            _by_pk[cached.pk] = cached
+    return cached
+
+
+@receiver(post_save, sender=QuestionnaireTemplate)
+@receiver(post_delete, sender=QuestionnaireTemplate)
+def _template_changed(sender, **kwargs):
+    invalidate_on_commit()
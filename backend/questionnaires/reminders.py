@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Erinnerungen an nicht ausgefüllte Fragebögen.
+
+Fällig ist eine Session, wenn sie offen und nicht abgelaufen ist, eine
+E-Mail-Adresse hat, die Einladung vor mehr als REMINDER_AFTER_HOURS
+zugestellt wurde und noch keine Erinnerung erhalten hat. Die Abfrage läuft
+über den Teilindex reminder_due_idx (invitation_sent_at WHERE completed =
+false AND reminder_sent_at IS NULL) – es werden nie erledigte oder bereits
+erinnerte Sessions gescannt, der Job kann also alle paar Minuten laufen.
+
+Je Stapel werden die Sessions gesperrt (SKIP LOCKED, parallele Läufe
+überspringen sie), reminder_sent_at als Markierung gesetzt und die Mails
+per bulk_create in die Outbox gelegt; zugestellt wird durch send_outbox,
+das reminder_sent_at dann auf den tatsächlichen Versandzeitpunkt setzt.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .models import OutboxEmail, QuestionnaireSession
+
+
+def due_sessions(now=None):
+    """QuerySet der fälligen Sessions (älteste Einladung zuerst)."""
+    now = now or timezone.now()
+    threshold = now - timedelta(hours=getattr(settings, 'REMINDER_AFTER_HOURS', 72))
+    return (
+        QuestionnaireSession.objects
+        .filter(
+            completed=False,
+            reminder_sent_at__isnull=True,
+            invitation_sent_at__lte=threshold,
+            expires_at__gt=now,
+        )
+        .exclude(patient_email='')
+        .order_by('invitation_sent_at')
+    )
+
+
+def enqueue_batch(batch_size=100, now=None):
+    """Einen Stapel fälliger Erinnerungen in die Outbox legen → Anzahl."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        sessions = list(
+            due_sessions(now).select_for_update(skip_locked=True, of=('self',))[:batch_size]
+        )
+        if not sessions:
+            return 0
+        QuestionnaireSession.objects.filter(pk__in=[s.pk for s in sessions]).update(
+            reminder_sent_at=now,
+        )
+        OutboxEmail.objects.bulk_create([outbox.patient_email(s, 'reminder') for s in sessions])
+    return len(sessions)
+
+
+def enqueue_due(batch_size=100, max_batches=None):
+    """Alle fälligen Erinnerungen stapelweise einplanen → Gesamtanzahl."""
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = enqueue_batch(batch_size)
+        total += count
+        batches += 1
+        if count < batch_size:
+            break
+    return total
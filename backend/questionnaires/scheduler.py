@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Eingebauter Scheduler für wiederkehrende Jobs (ersetzt externe Cron-Einträge).
+
+Registrierung per Dekorator (siehe jobs.py):
+
+  @scheduler.periodic('sessions.purge', every=86400)
+  def purge_sessions(days=30): ...
+
+Gestartet wird er als Daemon-Thread mit der App (config/wsgi.py bzw.
+config/asgi.py, wenn SCHEDULER_ENABLED=True) oder eigenständig per
+`python manage.py run_scheduler`. Jede Instanz prüft alle
+SCHEDULER_TICK_SECONDS, welche Jobs fällig sind.
+
+Cluster-sicher: Die Zeit ist je Job in feste Fenster der Länge `every`
+geteilt (tick = Fensterbeginn). Pro Job und Fenster läuft genau ein Knoten:
+
+- Sperre je Job: pg_try_advisory_lock (PostgreSQL) bzw. flock auf eine Datei
+  in SCHEDULER_LOCK_DIR (SQLite, nur ein Host); wer sie nicht bekommt,
+  überspringt den Job.
+- Unter der Sperre wird geprüft, ob es für (name, tick) schon einen JobRun
+  gibt; der UniqueConstraint auf (name, tick) sichert zusätzlich ab.
+
+Jeder Lauf wird mit Knoten, Dauer, Ergebnis bzw. Fehler in JobRun
+protokolliert (Django-Admin → Job-Läufe).
+"""
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import JobRun
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+PeriodicJob = namedtuple("PeriodicJob", "name func every kwargs")
+
+_registry = {}
+
+
+def periodic(name=None, every=3600, **kwargs):
+    """Funktion als periodischen Job registrieren (Aufruf mit kwargs, alle `every` Sekunden)."""
+    def decorator(func):
+        job_name = name or f"{func.__module__}.{func.__name__}"
+        _registry[job_name] = PeriodicJob(job_name, func, int(every), kwargs)
+        return func
+    return decorator
+
+
+def registered():
+    return dict(_registry)
+
+
+def current_tick(every, now=None):
+    """Beginn des Zeitfensters (Vielfaches von `every` seit der Epoche), in dem `now` liegt."""
+    now = now or timezone.now()
+    epoch = int(now.timestamp()) // every * every
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+
+
+def _advisory_key(name):
+    """Stabiler, vorzeichenbehafteter 64-Bit-Schlüssel für pg_advisory_lock."""
+    digest = hashlib.sha256(f"scheduler:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _lock_dir():
+    return Path(getattr(settings, 'SCHEDULER_LOCK_DIR', None) or settings.BASE_DIR)
+
+
+@contextmanager
+def _file_lock(name):
+    path = _lock_dir() / f".scheduler-{name}.lock"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a+b")
+    try:
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        handle.close()
+
+
+@contextmanager
+def _advisory_lock(name):
+    key = _advisory_key(name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+def job_lock(name):
+    """Nicht blockierende Sperre je Job → Kontextmanager, liefert True/False."""
+    if connection.vendor == 'postgresql':
+        return _advisory_lock(name)
+    return _file_lock(name)
+
+
+def default_node():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _json_result(value):
+    return value if isinstance(value, (bool, int, float, str, list, dict)) else None
+
+
+def run_job(job, tick, node):
+    """
+    Job für das Fenster `tick` ausführen, falls kein anderer Knoten es tut
+    → JobRun bzw. None (übersprungen).
+    """
+    with job_lock(job.name) as acquired:
+        if not acquired:
+            return None
+        if JobRun.objects.filter(name=job.name, tick=tick).exists():
+            return None
+        try:
+            with transaction.atomic():
+                run = JobRun.objects.create(name=job.name, tick=tick, node=node)
+        except IntegrityError:
+            return None
+        started = time.monotonic()
+        try:
+            result = job.func(**job.kwargs)
+        except Exception as exc:
+            logger.exception('Periodischer Job %s fehlgeschlagen', job.name)
+            run.status = JobRun.STATUS_ERROR
+            run.error = f'{exc.__class__.__name__}: {exc}'
+        else:
+            run.status = JobRun.STATUS_OK
+            run.result = _json_result(result)
+        run.finished_at = timezone.now()
+        run.duration_ms = int((time.monotonic() - started) * 1000)
+        run.save(update_fields=['status', 'error', 'result', 'finished_at', 'duration_ms'])
+        return run
+
+
+def run_due(now=None, node=None, names=None):
+    """Alle fälligen Jobs einmal prüfen/ausführen → Liste der hier ausgeführten JobRuns."""
+    now = now or timezone.now()
+    node = node or default_node()
+    runs = []
+    for job in list(_registry.values()):
+        if names is not None and job.name not in names:
+            continue
+        run = run_job(job, current_tick(job.every, now), node)
+        if run is not None:
+            runs.append(run)
+    return runs
+
+
+def prune_history(days=None):
+    """JobRuns löschen, die älter als SCHEDULER_HISTORY_DAYS sind."""
+    days = days or getattr(settings, 'SCHEDULER_HISTORY_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = JobRun.objects.filter(started_at__lt=cutoff).delete()
+    return deleted
+
+
+periodic('scheduler.prune_history', every=86400)(prune_history)
+
+
+class Scheduler:
+    """Prüft alle tick_seconds die fälligen Jobs, bis stop_event gesetzt ist."""
+
+    def __init__(self, tick_seconds=None, node=None):
+        self.tick_seconds = tick_seconds or getattr(settings, 'SCHEDULER_TICK_SECONDS', 30)
+        self.node = node or default_node()
+
+    def run(self, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                close_old_connections()
+                try:
+                    run_due(node=self.node)
+                except Exception:
+                    # Datenbank kurz weg o.ä. – im nächsten Takt erneut versuchen
+                    logger.exception('Scheduler-Durchlauf fehlgeschlagen')
+                stop_event.wait(self.tick_seconds)
+        finally:
+            close_old_connections()
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def start_if_enabled():
+    """Scheduler-Thread im App-Prozess starten (einmal je Prozess, nur mit SCHEDULER_ENABLED)."""
+    global _thread
+    if not getattr(settings, 'SCHEDULER_ENABLED', False):
+        return None
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=Scheduler().run, name='scheduler', daemon=True)
+            _thread.start()
+    return _thread
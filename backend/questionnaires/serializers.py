@@ -1,4 +1,7 @@
+from datetime import datetime
+
 from rest_framework import serializers
+from . import registry
 from .models import QuestionnaireSession
 
 
@@ -21,8 +24,21 @@ def get_ess_band(total):
         return "normal"
 
 
+def parse_birth_date(value):
+    """'YYYY-MM-DD' oder 'TT.MM.YYYY' → date | None (None auch bei leerem String)."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d', '%d.%m.%Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Ungültiges Datumsformat: {value}')
+
+
 class QuestionnaireSessionSerializer(serializers.ModelSerializer):
-    template_slug = serializers.CharField(source='template.slug', read_only=True)
+    template_slug = serializers.SerializerMethodField()
     is_valid = serializers.SerializerMethodField()
     
     class Meta:
@@ -33,6 +49,10 @@ class QuestionnaireSessionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['token', 'created_at']
     
+    def get_template_slug(self, obj):
+        # Slug aus der Template-Registry – vermeidet das Laden von schema_json
+        return registry.get_template(obj.template_id).slug
+
     def get_is_valid(self, obj):
         return obj.is_valid()
 
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Abschluss einer Fragebogen-Session (POST /api/submit/<token>/).
+
+Die Session wird mit einem einzigen bedingten UPDATE beansprucht:
+
+  UPDATE questionnaires_questionnairesession
+     SET completed = true, completed_at = now
+   WHERE id = ? AND completed = false AND expires_at > now
+
+Nur wer die Zeile dabei tatsächlich ändert (rowcount 1), legt in derselben
+Transaktion das AnswerSet an. Parallele Doppel-Submits warten höchstens auf
+dieses eine UPDATE, sehen danach completed = true und ändern nichts – ohne
+SELECT … FOR UPDATE und ohne session.save(), das alle Spalten neu schreibt.
+Der UniqueConstraint auf AnswerSet.session bleibt als zweite Absicherung.
+
+Nach dem Commit folgt das Ereignis 'questionnaire.completed' (events.py);
+dessen Handler laufen außerhalb des Requests.
+
+Idempotenz: Schickt der Client einen Idempotency-Key mit, wird er mit dem
+AnswerSet gespeichert. Eine Wiederholung mit demselben Key (Netzabbruch
+nach dem Absenden) erhält per replay() die ursprüngliche 201-Antwort –
+eine indizierte Abfrage, ohne erneute Validierung und ohne Zeilensperre.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import events
+from .models import AnswerSet, QuestionnaireSession
+
+CLAIMED = 'claimed'
+EXPIRED = 'expired'
+ALREADY_COMPLETED = 'completed'
+
+COMPLETED_EVENT = 'questionnaire.completed'
+
+# Wie im IETF-Entwurf "The Idempotency-Key HTTP Header Field": opak, typ. UUID
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+def result_payload(ess_total, ess_band):
+    """Antwort auf einen erfolgreichen Submit (201)."""
+    return {
+        'success': True,
+        'ess_total': ess_total,
+        'ess_band': ess_band,
+        'message': 'Fragebogen erfolgreich eingereicht.'
+    }
+
+
+def replay(token, idempotency_key):
+    """Ursprüngliche Antwort, wenn der Submit mit diesem Key schon gespeichert ist, sonst None."""
+    if not idempotency_key:
+        return None
+    stored = (
+        AnswerSet.objects
+        .filter(session__token=token, idempotency_key=idempotency_key)
+        .values('ess_total', 'ess_band')
+        .first()
+    )
+    return result_payload(**stored) if stored else None
+
+
+def complete(session, validated_data, idempotency_key=''):
+    """
+    Session abschließen und Antworten speichern → (Status, AnswerSet | None).
+
+    Status ist CLAIMED (gespeichert), EXPIRED (Link abgelaufen) oder
+    ALREADY_COMPLETED (ein anderer Submit war schneller). `session` muss nur
+    pk, token und expires_at enthalten; bei Erfolg werden completed/completed_at
+    auf dem Objekt nachgezogen und COMPLETED_EVENT veröffentlicht.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            claimed = QuestionnaireSession.objects.filter(
+                pk=session.pk, completed=False, expires_at__gt=now,
+            ).update(completed=True, completed_at=now)
+            if not claimed:
+                return (EXPIRED if session.expires_at <= now else ALREADY_COMPLETED), None
+            answer_set = AnswerSet.objects.create(
+                session_id=session.pk,
+                answers_json=validated_data,
+                ess_total=validated_data['ess_total'],
+                ess_band=validated_data['ess_band'],
+                idempotency_key=idempotency_key,
+            )
+            # Folgearbeiten (Druckdaten, Webhooks …) erst nach dem Commit (events.py)
+            events.publish(COMPLETED_EVENT, {
+                'session_id': session.pk,
+                'token': str(session.token),
+                'completed_at': now.isoformat(),
+            })
+    except IntegrityError:
+        return ALREADY_COMPLETED, None
+    session.completed = True
+    session.completed_at = now
+    return CLAIMED, answer_set
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Hintergrund-Warteschlange in der Datenbank (ohne Redis/Celery).
+
+Jobs sind Zeilen der Tabelle Task; registriert werden sie per Dekorator:
+
+  @taskqueue.task(name='outbox.deliver', priority=5, timeout=120)
+  def deliver(batch_size=50): ...
+
+  taskqueue.enqueue('outbox.deliver', {'batch_size': 20}, delay=30)
+
+Ausgeführt werden sie von `python manage.py run_worker` (beliebig viele
+Prozesse/Threads, auch auf mehreren Hosts):
+
+- Vergabe: SELECT … FOR UPDATE SKIP LOCKED (PostgreSQL) nach Priorität
+  (höher zuerst) und Fälligkeit; parallele Worker überspringen gesperrte
+  Zeilen statt zu warten. Zusätzlich ist die Übernahme ein bedingtes UPDATE
+  auf (status, attempts) – auf SQLite (kein SKIP LOCKED) gewinnt so ebenfalls
+  genau ein Worker.
+- Visibility-Timeout: Ein laufender Job gehört seinem Worker bis
+  locked_until (timeout des Jobs). Stirbt der Worker, wird er danach neu
+  vergeben; Abschluss/Fehler eines Workers, dessen Reservierung inzwischen
+  weitergegeben wurde, werden verworfen.
+- Retries: Fehler → erneut fällig nach TASK_RETRY_BACKOFF_SECONDS · 2^(n-1)
+  (± Jitter, höchstens TASK_RETRY_MAX_BACKOFF_SECONDS), nach max_attempts
+  Versuchen Status 'failed'.
+
+Jobs müssen idempotent sein (at-least-once bei abgelaufenem Timeout).
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+TaskSpec = namedtuple("TaskSpec", "name func priority max_attempts timeout")
+
+_registry = {}
+
+
+def task(name=None, priority=0, max_attempts=5, timeout=300):
+    """Funktion als Job registrieren (Aufruf mit dem Payload als Keyword-Argumente)."""
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        _registry[task_name] = TaskSpec(task_name, func, priority, max_attempts, timeout)
+        func.task_name = task_name
+        return func
+    return decorator
+
+
+def registered():
+    return dict(_registry)
+
+
+def enqueue(name, payload=None, priority=None, delay=0, max_attempts=None):
+    """Job einplanen → Task. name ist der registrierte Name (oder die Funktion)."""
+    name = getattr(name, 'task_name', name)
+    spec = _registry.get(name)
+    if spec is None:
+        raise LookupError(f'Unbekannter Job: {name}')
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=spec.priority if priority is None else priority,
+        max_attempts=max_attempts or spec.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def backoff_seconds(attempts):
+    base = getattr(settings, 'TASK_RETRY_BACKOFF_SECONDS', 10)
+    cap = getattr(settings, 'TASK_RETRY_MAX_BACKOFF_SECONDS', 3600)
+    return min(base * 2 ** max(attempts - 1, 0), cap) * random.uniform(0.9, 1.1)
+
+
+def _timeout(name):
+    spec = _registry.get(name)
+    return spec.timeout if spec else getattr(settings, 'TASK_DEFAULT_TIMEOUT_SECONDS', 300)
+
+
+def claim(worker_id, limit=1, ids=None):
+    """
+    Bis zu `limit` fällige Jobs für worker_id reservieren → Liste von Task.
+    ids beschränkt auf bestimmte Jobs (z.B. direkt nach dem Einplanen).
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        qs = Task.objects.select_for_update(skip_locked=True).filter(
+            Q(status=Task.STATUS_QUEUED, run_at__lte=now)
+            | Q(status=Task.STATUS_RUNNING, locked_until__lt=now)
+        )
+        if ids is not None:
+            qs = qs.filter(id__in=ids)
+        candidates = list(
+            qs.order_by('-priority', 'run_at', 'id')
+            .values('id', 'name', 'status', 'attempts', 'max_attempts')[:limit]
+        )
+        for row in candidates:
+            current = Task.objects.filter(id=row['id'], status=row['status'], attempts=row['attempts'])
+            if row['status'] == Task.STATUS_RUNNING and row['attempts'] >= row['max_attempts']:
+                # Letzter Versuch ist im Timeout hängen geblieben
+                current.update(
+                    status=Task.STATUS_FAILED, locked_until=None, finished_at=now,
+                    last_error='Visibility-Timeout überschritten (Worker abgebrochen?)',
+                )
+                continue
+            won = current.update(
+                status=Task.STATUS_RUNNING,
+                attempts=F('attempts') + 1,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=_timeout(row['name'])),
+            )
+            if won:
+                claimed.append(row['id'])
+    return list(Task.objects.filter(id__in=claimed).order_by('-priority', 'run_at', 'id'))
+
+
+def _owned(task_obj, worker_id):
+    """QuerySet auf den Job, solange worker_id ihn noch reserviert hat."""
+    return Task.objects.filter(
+        pk=task_obj.pk, status=Task.STATUS_RUNNING,
+        locked_by=worker_id, attempts=task_obj.attempts,
+    )
+
+
+def execute(task_obj, worker_id):
+    """Reservierten Job ausführen und Ergebnis verbuchen → True bei Erfolg."""
+    spec = _registry.get(task_obj.name)
+    try:
+        if spec is None:
+            raise LookupError(f'Unbekannter Job: {task_obj.name}')
+        spec.func(**task_obj.payload)
+    except Exception as exc:
+        error = f'{exc.__class__.__name__}: {exc}'
+        if task_obj.attempts >= task_obj.max_attempts or spec is None:
+            logger.error('Job %s #%s endgültig fehlgeschlagen: %s', task_obj.name, task_obj.pk, error)
+            updated = _owned(task_obj, worker_id).update(
+                status=Task.STATUS_FAILED, locked_until=None,
+                finished_at=timezone.now(), last_error=error,
+            )
+        else:
+            logger.warning('Job %s #%s fehlgeschlagen (Versuch %s): %s',
+                           task_obj.name, task_obj.pk, task_obj.attempts, error)
+            updated = _owned(task_obj, worker_id).update(
+                status=Task.STATUS_QUEUED, locked_until=None, last_error=error,
+                run_at=timezone.now() + timedelta(seconds=backoff_seconds(task_obj.attempts)),
+            )
+        if not updated:
+            logger.warning('Job %s #%s: Reservierung verloren, Ergebnis verworfen', task_obj.name, task_obj.pk)
+        return False
+    if not _owned(task_obj, worker_id).update(
+        status=Task.STATUS_DONE, locked_until=None, finished_at=timezone.now(), last_error='',
+    ):
+        logger.warning('Job %s #%s: Reservierung verloren, Ergebnis verworfen', task_obj.name, task_obj.pk)
+    return True
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class Worker:
+    """Holt und führt Jobs aus, bis stop_event gesetzt ist (bzw. die Queue leer, burst=True)."""
+
+    def __init__(self, worker_id=None, poll_interval=1.0, batch=1):
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.batch = batch
+        self.processed = 0
+
+    def run_once(self):
+        """Einen Stapel reservieren und ausführen → Anzahl ausgeführter Jobs."""
+        tasks = claim(self.worker_id, self.batch)
+        for task_obj in tasks:
+            execute(task_obj, self.worker_id)
+        self.processed += len(tasks)
+        return len(tasks)
+
+    def run(self, stop_event=None, burst=False):
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                close_old_connections()
+                if self.run_once():
+                    continue
+                if burst:
+                    break
+                stop_event.wait(self.poll_interval)
+        finally:
+            close_old_connections()
+        return self.processed
+
+
+def run_workers(count, poll_interval=1.0, batch=1, burst=False, stop_event=None):
+    """count Worker-Threads starten und auf ihr Ende warten → Jobs je Worker."""
+    stop_event = stop_event or threading.Event()
+    base_id = default_worker_id()
+    workers = [Worker(f"{base_id}/{i}", poll_interval, batch) for i in range(count)]
+    threads = [
+        threading.Thread(target=w.run, args=(stop_event, burst), name=f"worker-{i}", daemon=True)
+        for i, w in enumerate(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    return [w.processed for w in workers]
@@ -3,20 +3,51 @@ API-Tests für den Fragebogen-Kern: Submit, Ablauf, Escaping, Admin-Schutz, Purg
 
 Ausführen mit: python manage.py test questionnaires
 """
+import io
 import os
-from datetime import timedelta
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
 from unittest import mock
 
+from django.core.cache import cache
 from django.core.management import call_command
-from django.test import TestCase
+from django.db import connection, transaction
+from django.test import TestCase as DjangoTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from rest_framework.exceptions import ParseError
+from rest_framework.throttling import AnonRateThrottle
 from django.utils import timezone
 
+from . import (
+    async_views, completions, events, fastjson, outbox, printing, registry, reminders, scheduler, submission,
+    taskqueue, webhooks,
+)
 from .catalog import CATALOG
-from .evaluation import evaluate_answers
-from .models import AnswerSet, QuestionnaireSession, QuestionnaireTemplate
+from .evaluation import RULES, RULES_VERSION, evaluate_answers, render_finding
+from .models import (
+    AnswerSet, CacheVersion, JobRun, OutboxEmail, QuestionnaireSession, QuestionnaireTemplate,
+    Task, WebhookDelivery, WebhookEvent, WebhookSubscription,
+)
 from .schema import ESS_KEYS, is_visible, iter_questions
 
 
+class TestCase(DjangoTestCase):
+    """
+    TestCase mit leerer Template-Registry je Test: Die Transaktion eines
+    TestCase wird nie committet, registry.invalidate_on_commit() greift hier
+    also nicht – ohne reset() blieben Templates anderer Tests im Cache.
+    """
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        registry.reset()
+
+
 def make_session(**kwargs):
     template = QuestionnaireTemplate.objects.filter(slug='test-v1').first()
     if template is None:
@@ -75,6 +106,391 @@ class SubmitTests(TestCase):
         res = self.client.get(f'/api/session/{session.token}/')
         self.assertEqual(res.status_code, 410)
 
+    def test_submit_auf_abgelaufenen_link_gibt_410(self):
+        session = make_session(expires_at=timezone.now() - timedelta(minutes=1))
+        res = self.client.post(
+            f'/api/submit/{session.token}/', valid_submit_payload(), content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 410)
+        self.assertFalse(AnswerSet.objects.filter(session=session).exists())
+
+    def test_abschluss_per_bedingtem_update(self):
+        session = make_session()
+        registry.get_template(session.template_id)  # Registry warm, zählt nicht mit
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(
+                f'/api/submit/{session.token}/', valid_submit_payload(), content_type='application/json',
+            )
+        self.assertEqual(res.status_code, 201)
+        sql = [q['sql'] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertFalse([q for q in sql if 'FOR UPDATE' in q])
+        updates = [q for q in sql if q.startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        where = updates[0].split('WHERE')[1]
+        self.assertIn('"completed"', where)
+        self.assertIn('"expires_at"', where)
+        self.assertNotIn('patient_last_name', updates[0])
+        self.assertLessEqual(len(sql), 4)  # SELECT (Schema), [Registry], UPDATE, INSERT
+
+    def test_claim_verliert_gegen_schnelleren_submit(self):
+        session = make_session()
+        QuestionnaireSession.objects.filter(pk=session.pk).update(completed=True)
+        outcome, answer_set = submission.complete(session, valid_submit_payload(ess_total=8, ess_band='normal'))
+        self.assertEqual(outcome, submission.ALREADY_COMPLETED)
+        self.assertIsNone(answer_set)
+        self.assertFalse(AnswerSet.objects.filter(session=session).exists())
+
+
+class IdempotenterSubmitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def post(self, session, key=None, payload=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(
+            f'/api/submit/{session.token}/', payload or valid_submit_payload(),
+            content_type='application/json', **headers,
+        )
+
+    def test_wiederholung_liefert_urspruengliche_antwort(self):
+        session = make_session()
+        first = self.post(session, key='abc-123')
+        self.assertEqual(first.status_code, 201)
+        with CaptureQueriesContext(connection) as ctx:
+            retry = self.post(session, key='abc-123', payload={'kaputt': True})
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        # eine Abfrage, keine Sperre, keine Validierung
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('FOR UPDATE', ctx.captured_queries[0]['sql'])
+        self.assertEqual(AnswerSet.objects.get(session=session).idempotency_key, 'abc-123')
+
+    def test_anderer_key_oder_ohne_key_bleibt_400(self):
+        session = make_session()
+        self.assertEqual(self.post(session, key='erster').status_code, 201)
+        self.assertEqual(self.post(session, key='zweiter').status_code, 400)
+        self.assertEqual(self.post(session).status_code, 400)
+
+    def test_key_gilt_nur_fuer_seine_session(self):
+        session, andere = make_session(), make_session()
+        self.assertEqual(self.post(session, key='k1').status_code, 201)
+        res = self.post(andere, key='k1')
+        self.assertEqual(res.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', res)
+        self.assertEqual(AnswerSet.objects.count(), 2)
+
+    def test_zu_langer_key(self):
+        session = make_session()
+        self.assertEqual(self.post(session, key='x' * 300).status_code, 400)
+        self.assertFalse(AnswerSet.objects.exists())
+
+
+@mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+class GdtSessionIdempotenzTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_session()  # legt das aktive Template an
+
+    def post(self, key=None, **extra):
+        headers = {'HTTP_AUTHORIZATION': 'Bearer test-key'}
+        if key:
+            headers['HTTP_IDEMPOTENCY_KEY'] = key
+        payload = {
+            'patient_last_name': 'Muster', 'patient_first_name': 'Erika',
+            'patient_email': 'erika@example.com', 'gdt_patient_id': '4711',
+        }
+        payload.update(extra)
+        return self.client.post('/api/gdt/session/', payload, content_type='application/json', **headers)
+
+    def test_wiederholung_liefert_dieselbe_session(self):
+        first = self.post(key='bridge-1')
+        self.assertEqual(first.status_code, 201)
+        retry = self.post(key='bridge-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json()['token'], first.json()['token'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(QuestionnaireSession.objects.filter(gdt_patient_id='4711').count(), 1)
+        self.assertEqual(OutboxEmail.objects.count(), 1)  # keine zweite Einladung
+
+    def test_ohne_oder_mit_anderem_key_neue_session(self):
+        self.assertEqual(self.post(key='a').status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', self.post(key='b'))
+        self.post()
+        self.post()
+        self.assertEqual(QuestionnaireSession.objects.filter(gdt_patient_id='4711').count(), 4)
+
+    def test_zu_langer_key(self):
+        self.assertEqual(self.post(key='x' * 300).status_code, 400)
+
+
+@mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+class GdtResultBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.open = make_session()
+        self.expired = make_session(expires_at=timezone.now() - timedelta(days=1))
+        self.done = []
+        for patient_id in ('4711', '4712', '4713'):
+            session = make_session(completed=True, completed_at=timezone.now(), gdt_patient_id=patient_id)
+            AnswerSet.objects.create(
+                session=session, answers_json=valid_submit_payload(ess_total=8, ess_band='normal'),
+                ess_total=8, ess_band='normal',
+            )
+            self.done.append(session)
+
+    def post(self, tokens, auth=True):
+        headers = {'HTTP_AUTHORIZATION': 'Bearer test-key'} if auth else {}
+        return self.client.post('/api/gdt/results/', {'tokens': tokens}, content_type='application/json', **headers)
+
+    def test_alle_faelle_in_einer_abfrage(self):
+        unknown = str(uuid.uuid4())
+        tokens = [str(s.token) for s in [self.open, self.expired, *self.done]] + [unknown]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.post(tokens)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        results = res.json()['results']
+        self.assertEqual(results[str(self.open.token)]['status'], 'pending')
+        self.assertEqual(results[str(self.open.token)]['expires_at'], self.open.expires_at.isoformat())
+        self.assertEqual(results[str(self.expired.token)], {'status': 'expired'})
+        self.assertEqual(results[unknown], {'status': 'not_found'})
+        # Abgeschlossene: gleiche Nutzdaten wie GET /api/gdt/result/<token>/
+        single = self.client.get(f'/api/gdt/result/{self.done[0].token}/', HTTP_AUTHORIZATION='Bearer test-key')
+        self.assertEqual(results[str(self.done[0].token)], {'status': 'completed', **single.json()})
+        self.assertEqual(results[str(self.done[2].token)]['gdt_patient_id'], '4713')
+
+    def test_ungueltige_anfragen(self):
+        self.assertEqual(self.post([str(self.open.token)], auth=False).status_code, 403)
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post(['kein-token']).status_code, 400)
+        with override_settings(GDT_RESULTS_BATCH_MAX=2):
+            self.assertEqual(self.post([str(s.token) for s in self.done]).status_code, 400)
+
+
+@mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+class GdtCompletionFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def complete(self, **kwargs):
+        session = make_session(**kwargs)
+        res = self.client.post(
+            f'/api/submit/{session.token}/', valid_submit_payload(), content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 201)
+        return session
+
+    def feed(self, **params):
+        return self.client.get('/api/gdt/completions/', params, HTTP_AUTHORIZATION='Bearer test-key')
+
+    def test_feed_ab_cursor(self):
+        start = self.feed(since='latest').json()
+        self.assertEqual(start['events'], [])
+        first = self.complete(gdt_patient_id='4711')
+        second = self.complete(gdt_patient_id='4712')
+        self.assertEqual(self.feed(since=start['cursor']).json()['events'], [])  # Handler noch nicht gelaufen
+        taskqueue.Worker(batch=10).run_once()   # u.a. completions.sequence
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.feed(since=start['cursor']).json()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual([e['token'] for e in data['events']], [str(first.token), str(second.token)])
+        self.assertEqual(data['events'][1]['gdt_patient_id'], '4712')
+        self.assertEqual(data['events'][1]['ess_total'], 8)
+        self.assertEqual(data['cursor'], data['events'][1]['cursor'])
+        self.assertFalse(data['has_more'])
+        # Nichts Neues: leerer Feed, Cursor bleibt
+        self.assertEqual(self.feed(since=data['cursor']).json(), {'events': [], 'cursor': data['cursor'], 'has_more': False})
+        self.assertEqual(self.feed(since='latest').json()['cursor'], data['cursor'])
+
+    def test_seiten_und_ungueltiger_cursor(self):
+        sessions = [self.complete() for _ in range(3)]
+        for session in sessions:
+            completions.assign(session.pk)
+        self.assertIsNone(completions.assign(sessions[0].pk))  # Wiederholung: keine neue Nummer
+        page = self.feed(limit=2).json()
+        self.assertTrue(page['has_more'])
+        rest = self.feed(since=page['cursor'], limit=2).json()
+        self.assertEqual(
+            [e['token'] for e in page['events'] + rest['events']], [str(s.token) for s in sessions],
+        )
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(self.feed(since='kaputt').status_code, 400)
+        self.assertEqual(self.client.get('/api/gdt/completions/').status_code, 403)
+
+
+_event_calls = []
+
+
+@events.subscribe('test.event', name='test.collect')
+def _collect(data):
+    _event_calls.append(data)
+    if data.get('fail'):
+        raise RuntimeError('Handler kaputt')
+
+
+_flaky_calls = []
+
+
+@events.subscribe('test.flaky', name='test.flaky')
+def _flaky(data):
+    """Schlägt beim ersten Aufruf fehl, danach nicht mehr."""
+    _flaky_calls.append(data)
+    if len(_flaky_calls) == 1:
+        raise RuntimeError('erster Versuch kaputt')
+
+
+class EventBusTests(TestCase):
+    def setUp(self):
+        _event_calls.clear()
+
+    @override_settings(EVENTS_IN_PROCESS=False)
+    def test_redeliver_holt_liegen_gebliebene_jobs_nach(self):
+        """Prozess nach dem Commit gestorben: Job bleibt 'running', nach dem Timeout übernimmt redeliver."""
+        task, = events.publish('test.event', {'n': 4})
+        Task.objects.filter(pk=task.pk).update(
+            status=Task.STATUS_RUNNING, attempts=1, locked_by='tot',
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(events.redeliver(), 1)
+        self.assertEqual(_event_calls, [{'n': 4}])
+        self.assertEqual(Task.objects.get(pk=task.pk).status, Task.STATUS_DONE)
+        self.assertIn('events.redeliver', scheduler.registered())
+
+    def test_handler_laufen_erst_nach_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            tasks = events.publish('test.event', {'n': 1})
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].payload['handler'], 'test.collect')
+        self.assertEqual(_event_calls, [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_rollback_verwirft_ereignis(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                events.publish('test.event', {'n': 1})
+                raise RuntimeError('Abbruch')
+        self.assertFalse(Task.objects.filter(name=events.HANDLE_TASK).exists())
+
+    @override_settings(EVENTS_IN_PROCESS=False)
+    def test_worker_fuehrt_handler_aus_und_wiederholt_fehler(self):
+        events.publish('test.event', {'n': 1})
+        events.publish('test.event', {'fail': True})
+        taskqueue.Worker(batch=5).run_once()
+        self.assertIn({'n': 1}, _event_calls)
+        failed = Task.objects.get(payload__data__fail=True)
+        self.assertEqual(failed.status, Task.STATUS_QUEUED)  # Retry mit Backoff
+        self.assertIn('Handler kaputt', failed.last_error)
+
+    def test_submit_veroeffentlicht_completed(self):
+        session = make_session()
+        with self.captureOnCommitCallbacks() as callbacks:
+            res = self.client.post(
+                f'/api/submit/{session.token}/', valid_submit_payload(), content_type='application/json',
+            )
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+        task = Task.objects.get(name=events.HANDLE_TASK, payload__handler='print.prewarm')
+        self.assertEqual(task.payload['event'], submission.COMPLETED_EVENT)
+        self.assertEqual(task.payload['data']['token'], str(session.token))
+
+
+class EventBusInProcessTests(TransactionTestCase):
+    def setUp(self):
+        _event_calls.clear()
+        _flaky_calls.clear()
+
+    @override_settings(TASK_RETRY_BACKOFF_SECONDS=0)
+    def test_fehlgeschlagener_handler_wird_wiederholt(self):
+        with transaction.atomic():
+            events.publish('test.flaky', {'n': 3})
+        events.flush(timeout=5)
+        task = Task.objects.get(name=events.HANDLE_TASK)
+        self.assertEqual(task.status, Task.STATUS_QUEUED)
+        self.assertIn('erster Versuch kaputt', task.last_error)
+        self.assertEqual(events.redeliver(), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.STATUS_DONE, 2))
+        self.assertEqual(_flaky_calls, [{'n': 3}, {'n': 3}])
+
+    def test_handler_laufen_im_prozess_nach_commit(self):
+        with transaction.atomic():
+            events.publish('test.event', {'n': 2})
+            self.assertEqual(_event_calls, [])
+        events.flush(timeout=5)
+        self.assertEqual(_event_calls, [{'n': 2}])
+        self.assertEqual(Task.objects.get(name=events.HANDLE_TASK).status, Task.STATUS_DONE)
+
+    def test_submit_waermt_druckcache_vor(self):
+        template = QuestionnaireTemplate.objects.create(
+            slug='katalog-test', version=1, schema_json=CATALOG, is_active=True,
+        )
+        session = make_session(template=template)
+        answers = build_valid_answers(CATALOG)
+        res = self.client.post(f'/api/submit/{session.token}/', answers, content_type='application/json')
+        self.assertEqual(res.status_code, 201)
+        events.flush(timeout=5)
+        session.refresh_from_db()
+        with mock.patch('questionnaires.printing.evaluate_answers') as evaluate:
+            printing.print_model(session)
+        evaluate.assert_not_called()
+
+@mock.patch.object(AnonRateThrottle, 'THROTTLE_RATES', {'anon': None})
+@override_settings(EVENTS_IN_PROCESS=False)
+class DoppelSubmitStressTests(TransactionTestCase):
+    """Parallele Submits auf denselben Token: genau einer gewinnt."""
+
+    def test_parallele_submits(self):
+        for _round in range(5):
+            session = make_session()
+            barrier = threading.Barrier(8)
+            codes = []
+
+            def submit():
+                client = self.client_class()
+                barrier.wait()
+                res = client.post(
+                    f'/api/submit/{session.token}/', valid_submit_payload(), content_type='application/json',
+                )
+                codes.append(res.status_code)
+                connection.close()
+
+            threads = [threading.Thread(target=submit) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(sorted(codes), [201] + [400] * 7)
+            self.assertEqual(AnswerSet.objects.filter(session=session).count(), 1)
+            session.refresh_from_db()
+            self.assertTrue(session.completed)
+            self.assertIsNotNone(session.completed_at)
+
+    def test_parallele_wiederholungen_mit_idempotency_key(self):
+        session = make_session()
+        barrier = threading.Barrier(6)
+        responses = []
+
+        def submit():
+            client = self.client_class()
+            barrier.wait()
+            res = client.post(
+                f'/api/submit/{session.token}/', valid_submit_payload(),
+                content_type='application/json', HTTP_IDEMPOTENCY_KEY='retry-1',
+            )
+            responses.append((res.status_code, res.json()))
+            connection.close()
+
+        threads = [threading.Thread(target=submit) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([code for code, _ in responses], [201] * 6)
+        self.assertEqual(len({str(body) for _, body in responses}), 1)
+        self.assertEqual(AnswerSet.objects.filter(session=session).count(), 1)
+
 
 class ErgebnisZugriffTests(TestCase):
     def _completed_session(self, **kwargs):
@@ -111,7 +527,25 @@ class ErgebnisZugriffTests(TestCase):
         evaluation = res.json()['evaluation']
         self.assertIn('findings', evaluation)
         self.assertIn('zusammenfassung', evaluation)
+        self.assertEqual(evaluation['rules_version'], RULES_VERSION)
+        # Texte kommen aus dem Regelkatalog, nicht mit jeder Antwort
+        self.assertNotIn('disclaimer', evaluation)
+
+    def test_answers_kompatibilitaet_mit_volltexten(self):
+        session = self._completed_session(
+            template=QuestionnaireTemplate.objects.create(
+                slug='test-v2', version=1, schema_json={'sections': ['ess']}
+            )
+        )
+        answer_set = session.answers
+        answer_set.answers_json = valid_submit_payload(ess_total=16, microsleep='yes')
+        answer_set.save()
+        res = self.client.get(f'/api/answers/{session.token}/?texts=full')
+        evaluation = res.json()['evaluation']
         self.assertIn('disclaimer', evaluation)
+        ess = next(f for f in evaluation['findings'] if f['id'] == 'ess_ausgepraegt')
+        self.assertEqual(ess['kapitel'], '3.11.1')
+        self.assertTrue(ess['befund'].startswith('ESS 16/24'))
 
 
 class AdminApiKeyTests(TestCase):
@@ -128,6 +562,11 @@ class AdminApiKeyTests(TestCase):
         expired = make_session(expires_at=timezone.now() - timedelta(days=1))
         res = self.client.get(f'/api/gdt/result/{expired.token}/', **auth)
         self.assertEqual(res.status_code, 410)
+        # Offen: 202 mit Ablaufzeitpunkt als Planungshinweis für die Bridge
+        open_session = make_session()
+        res = self.client.get(f'/api/gdt/result/{open_session.token}/', **auth)
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(res.json(), {'completed': False, 'expires_at': open_session.expires_at.isoformat()})
 
     @mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key-123'})
     def test_falscher_key_403(self):
@@ -333,7 +772,941 @@ class AuswertungTests(TestCase):
         self.assertGreaterEqual(res.json()['auswertung_kritisch'], 1)
 
 
+class RegelkatalogTests(TestCase):
+    def test_kompakte_befunde_tragen_id_und_params(self):
+        answers = build_valid_answers(CATALOG, overrides={'microsleep': 'yes'})
+        answers['ess_total'] = 12
+        result = evaluate_answers(answers, texts=False)
+        self.assertNotIn('disclaimer', result)
+        ids = {f['id'] for f in result['findings']}
+        self.assertIn('sekundenschlaf', ids)
+        ess = next(f for f in result['findings'] if f['id'] == 'ess_auffaellig')
+        self.assertEqual(ess, {'id': 'ess_auffaellig', 'schwere': 'pruefen', 'params': {'ess': 12}})
+        # Aufgelöst entspricht der kompakte Befund exakt dem Volltext-Format
+        self.assertEqual(
+            [render_finding(f) for f in result['findings']],
+            evaluate_answers(answers)['findings'],
+        )
+
+    def test_katalog_endpunkt_versioniert_und_cachebar(self):
+        res = self.client.get('/api/evaluation/rules/')
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data['version'], RULES_VERSION)
+        self.assertEqual(set(data['rules']), set(RULES))
+        self.assertIn('disclaimer', data)
+        self.assertEqual(res['Cache-Control'], 'public, max-age=3600')
+
+        res = self.client.get(f'/api/evaluation/rules/?v={RULES_VERSION}')
+        self.assertIn('immutable', res['Cache-Control'])
+
+        res = self.client.get('/api/evaluation/rules/', HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, 304)
+
+
+class FastJsonTests(TestCase):
+    def payload(self):
+        return {
+            'token': uuid.uuid4(),
+            'datum': date(2026, 3, 21),
+            'zeitpunkt': timezone.now(),
+            'wert': Decimal('1.50'),
+            'text': 'Müller \u2028 Zeile',
+            'schema': registry.freeze({'sections': [{'id': 'a', 'questions': []}]}),
+        }
+
+    def test_renderer_ausgabe_identisch_zu_drf(self):
+        from rest_framework.renderers import JSONRenderer
+        data = self.payload()
+        self.assertEqual(
+            fastjson.FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_fallback_ohne_orjson(self):
+        data = self.payload()
+        expected = fastjson.FastJSONRenderer().render(data)
+        with mock.patch.object(fastjson, 'HAS_ORJSON', False):
+            self.assertEqual(fastjson.FastJSONRenderer().render(data), expected)
+            parsed = fastjson.FastJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}'))
+        self.assertEqual(parsed, {'a': [1, 2]})
+
+    def test_ganzzahlen_ueber_64_bit(self):
+        from rest_framework.renderers import JSONRenderer
+        big = 123456789012345678901234567890
+        data = {'a': big, 'b': -(2 ** 63) - 1, 'text': 'Zeile \u2028'}
+        self.assertEqual(fastjson.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(fastjson.dumps(data), JSONRenderer().render(data))
+
+        raw = b'{"a": 123456789012345678901234567890, "b": [18446744073709551616], "c": 1.5}'
+        for parsed in (fastjson.FastJSONParser().parse(io.BytesIO(raw)), fastjson.loads(raw)):
+            self.assertEqual(parsed, {'a': big, 'b': [2 ** 64], 'c': 1.5})
+            self.assertIsInstance(parsed['a'], int)
+        with self.assertRaises(ParseError):
+            fastjson.FastJSONParser().parse(io.BytesIO(b'{"a": 12345678901234567890, "b": NaN}'))
+
+    def test_ungueltiges_json_gibt_400(self):
+        session = make_session()
+        res = self.client.post(
+            f'/api/submit/{session.token}/', '{"ess_1": ', content_type='application/json'
+        )
+        self.assertEqual(res.status_code, 400)
+        res = self.client.post(
+            f'/api/submit/{session.token}/', '{"ess_1": NaN}', content_type='application/json'
+        )
+        self.assertEqual(res.status_code, 400)
+
+
+class PrintViewTests(TestCase):
+    def setUp(self):
+        call_command('load_catalog', verbosity=0)
+        self.session = QuestionnaireSession.objects.create(
+            template=QuestionnaireTemplate.objects.get(slug='verkehrsmedizin-leitlinien'),
+            patient_last_name='Mustermann', patient_first_name='Max',
+            expires_at=timezone.now() + timedelta(days=14),
+        )
+        answers = build_valid_answers(CATALOG, overrides={
+            'microsleep': 'yes', 'microsleep_desc': '  am Steuer  ',
+        })
+        res = self.client.post(
+            f'/api/submit/{self.session.token}/', answers, content_type='application/json'
+        )
+        self.assertEqual(res.status_code, 201, res.json())
+
+    def rows(self, data):
+        return {row['id']: row for section in data['sections'] for row in section['rows']}
+
+    def test_viewmodel_nur_sichtbare_fragen_mit_anzeigetexten(self):
+        res = self.client.get(f'/api/print/{self.session.token}/')
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        rows = self.rows(data)
+        # exam_occasion=pkw → Busfrage unsichtbar; Gateway nein → Diagnoseblöcke fehlen
+        self.assertNotIn('psych_test_done', rows)
+        self.assertNotIn('heart_disease', rows)
+        self.assertEqual(rows['exam_occasion']['display'], 'PKW / andere Klasse')
+        self.assertEqual(rows['microsleep']['display'], 'Ja')
+        self.assertTrue(rows['microsleep']['highlight'])
+        self.assertEqual(rows['microsleep']['followup']['text'], 'am Steuer')
+        self.assertEqual(rows['ess']['total'], 8)
+        self.assertEqual(len(rows['ess']['items']), 8)
+        self.assertEqual(
+            [s['number'] for s in data['sections']], list(range(1, len(data['sections']) + 1))
+        )
+        self.assertIn('disclaimer', data['evaluation'])
+        self.assertEqual(data['patient_last_name'], 'Mustermann')
+        answers = self.client.get(f'/api/answers/{self.session.token}/?texts=full')
+        self.assertLess(len(res.content), len(answers.content))
+
+    def test_viewmodel_wird_gecacht_patientendaten_bleiben_aktuell(self):
+        self.client.get(f'/api/print/{self.session.token}/')
+        QuestionnaireSession.objects.filter(pk=self.session.pk).update(patient_last_name='Neu')
+        # Nur noch der Session-Lookup, keine Antworten/Auswertung
+        with self.assertNumQueries(1):
+            res = self.client.get(f'/api/print/{self.session.token}/')
+        self.assertEqual(res.json()['patient_last_name'], 'Neu')
+
+    def test_offene_und_legacy_sessions(self):
+        offen = make_session()
+        self.assertEqual(self.client.get(f'/api/print/{offen.token}/').status_code, 400)
+        offen.completed = True
+        offen.save()
+        AnswerSet.objects.create(session=offen, answers_json=valid_submit_payload(), ess_total=8)
+        self.assertEqual(self.client.get(f'/api/print/{offen.token}/').status_code, 409)
+
+
+class DruckTicketTests(TestCase):
+    def setUp(self):
+        call_command('load_catalog', verbosity=0)
+        self.session = QuestionnaireSession.objects.create(
+            template=QuestionnaireTemplate.objects.get(slug='verkehrsmedizin-leitlinien'),
+            patient_last_name='Mustermann',
+            expires_at=timezone.now() + timedelta(days=14),
+        )
+        res = self.client.post(
+            f'/api/submit/{self.session.token}/',
+            build_valid_answers(CATALOG), content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 201, res.json())
+
+    def issue(self):
+        res = self.client.post(f'/api/print/{self.session.token}/ticket/')
+        self.assertEqual(res.status_code, 201)
+        return res.json()['ticket']
+
+    def test_ticket_liefert_druckdaten_ohne_neue_abfragen(self):
+        ticket = self.issue()
+        with self.assertNumQueries(0):
+            res = self.client.get(f'/api/print/ticket/{ticket}/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['kind'], 'v2')
+        self.assertEqual(res.json()['data']['patient_last_name'], 'Mustermann')
+        self.assertIn('disclaimer', res.json()['data']['evaluation'])
+
+    def test_manipuliertes_und_abgelaufenes_ticket(self):
+        ticket = self.issue()
+        self.assertEqual(self.client.get(f'/api/print/ticket/{ticket}x/').status_code, 403)
+        with override_settings(PRINT_TICKET_SECONDS=-1):
+            self.assertEqual(self.client.get(f'/api/print/ticket/{ticket}/').status_code, 410)
+
+    def test_cache_verlust_berechnet_aus_signierter_session_neu(self):
+        ticket = self.issue()
+        cache.clear()
+        res = self.client.get(f'/api/print/ticket/{ticket}/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['data']['token'], str(self.session.token))
+
+    def test_offene_session_bekommt_kein_ticket(self):
+        offen = make_session()
+        self.assertEqual(self.client.post(f'/api/print/{offen.token}/ticket/').status_code, 400)
+
+    def test_answers_etag_304(self):
+        url = f'/api/answers/{self.session.token}/'
+        res = self.client.get(url)
+        etag = res['ETag']
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+        # Volltexte sind eine andere Repräsentation
+        self.assertNotEqual(self.client.get(url + '?texts=full')['ETag'], etag)
+        # Korrigierte Patientendaten → neuer ETag
+        QuestionnaireSession.objects.filter(pk=self.session.pk).update(patient_last_name='Neu')
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['patient_last_name'], 'Neu')
+
+
+class FakeSmtpConnection:
+    """Zählt open()-Aufrufe; scheitert für Empfänger in `failing`."""
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.opened = 0
+        self.is_open = False
+        self.sent = []
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        self.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise OSError('421 Service not available')
+            self.sent.append(message)
+        return len(messages)
+
+
+@mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+@override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_RATE_PER_MINUTE=0)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.template = QuestionnaireTemplate.objects.create(
+            slug='outbox', version=1, schema_json={}, is_active=True,
+        )
+
+    def create(self, email):
+        res = self.client.post(
+            '/api/admin/sessions/',
+            {'patient_last_name': 'Muster', 'patient_first_name': 'Max', 'patient_email': email},
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer test-key',
+        )
+        self.assertEqual(res.status_code, 201)
+        self.assertTrue(res.json()['email_queued'])
+        return QuestionnaireSession.objects.get(token=res.json()['token'])
+
+    def test_anlage_schreibt_nur_outbox(self):
+        with mock.patch('django.core.mail.get_connection') as get_connection:
+            session = self.create('max@example.com')
+        get_connection.assert_not_called()
+        self.assertIsNone(session.invitation_sent_at)
+        mail_row = OutboxEmail.objects.get(session=session)
+        self.assertIn(str(session.token), mail_row.text_body)
+
+    def test_stapel_nutzt_eine_verbindung_und_setzt_versandzeit(self):
+        sessions = [self.create(f'p{i}@example.com') for i in range(3)]
+        conn = FakeSmtpConnection()
+        stats = outbox.deliver_due(connection=conn)
+        self.assertEqual(stats, {'sent': 3, 'retry': 0, 'dead': 0})
+        self.assertEqual(conn.opened, 1)
+        self.assertEqual(len(conn.sent), 3)
+        for session in sessions:
+            session.refresh_from_db()
+            self.assertIsNotNone(session.invitation_sent_at)
+        # Nichts mehr fällig
+        self.assertEqual(outbox.deliver_due(connection=FakeSmtpConnection())['sent'], 0)
+
+    @override_settings(EMAIL_OUTBOX_LEASE_SECONDS=60, EMAIL_TIMEOUT=30)
+    def test_stapel_passt_in_die_reservierung(self):
+        for i in range(3):
+            self.create(f'p{i}@example.com')
+        # 60 s Reservierung ÷ 30 s SMTP-Timeout → höchstens 2 Mails je Stapel
+        self.assertEqual(outbox.claim_limit(50), 2)
+        self.assertEqual(outbox.deliver_due(connection=FakeSmtpConnection())['sent'], 2)
+        self.assertEqual(outbox.deliver_due(connection=FakeSmtpConnection())['sent'], 1)
+        with override_settings(EMAIL_OUTBOX_RATE_PER_MINUTE=2):
+            self.assertEqual(outbox.claim_limit(50), 1)
+
+    def test_verlorene_reservierung_wird_nicht_zugestellt(self):
+        first, second = self.create('a@example.com'), self.create('b@example.com')
+        other_lease = timezone.now() + timedelta(seconds=600)
+
+        class SlowConnection(FakeSmtpConnection):
+            def send_messages(self, messages):
+                # Während die erste Mail hängt, läuft die Reservierung ab und
+                # ein anderer Worker übernimmt beide Zeilen
+                OutboxEmail.objects.update(next_attempt_at=other_lease)
+                return super().send_messages(messages)
+
+        conn = SlowConnection()
+        with self.assertLogs('questionnaires.outbox', 'WARNING') as logs:
+            stats = outbox.deliver_due(connection=conn)
+        self.assertEqual(stats, {'sent': 0, 'retry': 0, 'dead': 0})
+        self.assertEqual(len(conn.sent), 1)   # die zweite Mail wurde gar nicht erst versendet
+        self.assertEqual(len(logs.records), 2)
+        for session in (first, second):
+            mail_row = OutboxEmail.objects.get(session=session)
+            self.assertEqual((mail_row.status, mail_row.next_attempt_at), ('pending', other_lease))
+            session.refresh_from_db()
+            self.assertIsNone(session.invitation_sent_at)
+
+    def test_backoff_und_dead_letter(self):
+        session = self.create('kaputt@example.com')
+        ok = self.create('ok@example.com')
+        conn = FakeSmtpConnection(failing={'kaputt@example.com'})
+        with self.assertLogs('questionnaires.outbox', 'WARNING'):
+            stats = outbox.deliver_due(connection=conn)
+        self.assertEqual(stats, {'sent': 1, 'retry': 1, 'dead': 0})
+        # Nach dem Fehler wurde für die nächste Mail neu verbunden
+        self.assertEqual(conn.opened, 2)
+        mail_row = OutboxEmail.objects.get(session=session)
+        self.assertEqual(mail_row.attempts, 1)
+        self.assertGreater(mail_row.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('421', mail_row.last_error)
+        ok.refresh_from_db()
+        self.assertIsNotNone(ok.invitation_sent_at)
+
+        for expected in ('pending', 'dead'):
+            OutboxEmail.objects.filter(pk=mail_row.pk).update(next_attempt_at=timezone.now())
+            with self.assertLogs('questionnaires.outbox', 'WARNING'):
+                outbox.deliver_due(connection=conn)
+            mail_row.refresh_from_db()
+            self.assertEqual(mail_row.status, expected)
+        session.refresh_from_db()
+        self.assertIsNone(session.invitation_sent_at)
+
+    def test_kommando_once(self):
+        self.create('max@example.com')
+        out = io.StringIO()
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            call_command('send_outbox', '--once', stdout=out)
+        from django.core import mail
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertIn('0 Mail(s) ausstehend', out.getvalue())
+
+
+class StandInReceiver:
+    """Lokaler Webhook-Empfänger: zeichnet POSTs auf, antwortet mit den Statuscodes aus `responses`."""
+
+    def __init__(self, responses=None):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        self.requests = []
+        self.responses = list(responses or [])
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.requests.append((dict(self.headers), body))
+                code = receiver.responses.pop(0) if receiver.responses else 200
+                self.send_response(code)
+                if 300 <= code < 400:
+                    self.send_header('Location', '/anderswo/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hook/'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(EVENTS_IN_PROCESS=False, WEBHOOK_MAX_ATTEMPTS=3, WEBHOOK_TIMEOUT_SECONDS=5)
+class WebhookTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.receiver = StandInReceiver()
+        self.addCleanup(self.receiver.close)
+        self.subscription = WebhookSubscription.objects.create(name='Partner', url=self.receiver.url)
+
+    def _complete(self):
+        session = make_session()
+        res = self.client.post(
+            f'/api/submit/{session.token}/', valid_submit_payload(), content_type='application/json',
+        )
+        self.assertEqual(res.status_code, 201)
+        return session
+
+    def test_abschluesse_werden_gebuendelt_und_signiert_zugestellt(self):
+        first, second = self._complete(), self._complete()
+        taskqueue.Worker(batch=10).run_once()  # Event-Handler webhooks.enqueue
+        self.assertEqual(WebhookEvent.objects.filter(status=WebhookEvent.STATUS_PENDING).count(), 2)
+
+        stats = webhooks.deliver_due()
+        self.assertEqual(stats, {'posts': 1, 'sent': 2, 'retry': 0, 'dead': 0})
+        self.assertEqual(len(self.receiver.requests), 1)
+        headers, body = self.receiver.requests[0]
+        self.assertTrue(webhooks.verify_signature(
+            self.subscription.secret, headers[webhooks.SIGNATURE_HEADER], body,
+        ))
+        data = fastjson.loads(body)
+        self.assertEqual(headers[webhooks.ID_HEADER], data['delivery'])
+        self.assertEqual(
+            [event['data']['token'] for event in data['events']], [str(first.token), str(second.token)],
+        )
+        self.assertEqual(data['events'][0]['type'], submission.COMPLETED_EVENT)
+        self.assertEqual(data['events'][0]['data']['ess_total'], 8)
+        self.assertFalse(WebhookEvent.objects.exclude(status=WebhookEvent.STATUS_SENT).exists())
+        delivery = WebhookDelivery.objects.get()
+        self.assertTrue(delivery.ok)
+        self.assertEqual(delivery.status_code, 200)
+        self.assertEqual(len(delivery.event_ids), 2)
+        # Nichts mehr fällig
+        self.assertEqual(webhooks.deliver_due()['posts'], 0)
+
+    def test_vormerken_ist_idempotent_und_ignoriert_inaktive_abos(self):
+        WebhookSubscription.objects.create(name='Alt', url=self.receiver.url, is_active=False)
+        session = self._complete()
+        data = {'session_id': session.pk, 'completed_at': timezone.now().isoformat()}
+        self.assertEqual(webhooks.enqueue_completed(data), 1)
+        # at-least-once: zweiter Lauf legt nichts an
+        self.assertEqual(webhooks.enqueue_completed(data), 0)
+        self.assertEqual(WebhookEvent.objects.get().subscription, self.subscription)
+        # Neues Abonnement: nur dessen Ereignis kommt hinzu
+        WebhookSubscription.objects.create(name='Neu', url=self.receiver.url)
+        self.assertEqual(webhooks.enqueue_completed(data), 1)
+        self.assertEqual(
+            sorted(WebhookEvent.objects.values_list('subscription__name', flat=True)), ['Neu', 'Partner'],
+        )
+
+    def test_fehler_werden_mit_backoff_wiederholt(self):
+        self.receiver.responses = [500, 302]
+        session = self._complete()
+        webhooks.enqueue_completed({'session_id': session.pk, 'completed_at': timezone.now().isoformat()})
+
+        self.assertEqual(webhooks.deliver_due()['retry'], 1)
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('HTTP 500', event.last_error)
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertEqual(webhooks.deliver_due()['posts'], 0)  # Backoff läuft noch
+
+        # Weiterleitungen werden nicht verfolgt und gelten nicht als Zustellung
+        WebhookEvent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(webhooks.deliver_due()['retry'], 1)
+        self.assertEqual(WebhookEvent.objects.get().last_error.split()[:2], ['HTTP', '302'])
+
+        WebhookEvent.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(webhooks.deliver_due()['sent'], 1)
+        self.assertEqual(WebhookEvent.objects.get().attempts, 3)
+        self.assertEqual(
+            list(WebhookDelivery.objects.order_by('created_at', 'id').values_list('status_code', flat=True)),
+            [500, 302, 200],
+        )
+
+    def test_spaeter_ausgang_ueberschreibt_fremde_reservierung_nicht(self):
+        session = self._complete()
+        webhooks.enqueue_completed({'session_id': session.pk, 'completed_at': timezone.now().isoformat()})
+        other_lease = timezone.now() + timedelta(seconds=600)
+        post = webhooks._post
+
+        def slow_post(subscription, events):
+            # Der POST dauert länger als die Reservierung, ein zweiter Worker übernimmt
+            WebhookEvent.objects.update(next_attempt_at=other_lease)
+            return post(subscription, events)
+
+        for responses in ([200], [500]):
+            with self.subTest(responses=responses):
+                self.receiver.responses = list(responses)
+                WebhookEvent.objects.update(next_attempt_at=timezone.now())
+                with mock.patch.object(webhooks, '_post', slow_post), \
+                        self.assertLogs('questionnaires.webhooks', 'WARNING'):
+                    stats = webhooks.deliver_due()
+                self.assertEqual((stats['posts'], stats['sent'], stats['retry']), (1, 0, 0))
+                event = WebhookEvent.objects.get()
+                self.assertEqual((event.status, event.attempts), (WebhookEvent.STATUS_PENDING, 0))
+                self.assertEqual(event.next_attempt_at, other_lease)
+
+    def test_nicht_erreichbarer_empfaenger_landet_als_dead(self):
+        self.receiver.close()
+        session = self._complete()
+        webhooks.enqueue_completed({'session_id': session.pk, 'completed_at': timezone.now().isoformat()})
+        for _ in range(3):
+            WebhookEvent.objects.update(next_attempt_at=timezone.now())
+            webhooks.deliver_due()
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.STATUS_DEAD)
+        self.assertTrue(event.last_error)
+        self.assertFalse(WebhookDelivery.objects.filter(ok=True).exists())
+        self.assertIsNone(WebhookDelivery.objects.first().status_code)
+
+    def test_signatur_pruefung(self):
+        body = b'{"events": []}'
+        header = webhooks.sign('geheim', 1_700_000_000, body)
+        self.assertTrue(webhooks.verify_signature('geheim', header, body, now=1_700_000_010))
+        self.assertFalse(webhooks.verify_signature('geheim', header, body + b' ', now=1_700_000_010))
+        self.assertFalse(webhooks.verify_signature('anders', header, body, now=1_700_000_010))
+        # Zu alt: Replay-Schutz
+        self.assertFalse(webhooks.verify_signature('geheim', header, body, now=1_700_001_000))
+        self.assertFalse(webhooks.verify_signature('geheim', 'kaputt', body))
+
+
+@mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+@override_settings(EMAIL_OUTBOX_RATE_PER_MINUTE=0)
+class BulkInviteTests(TestCase):
+    def setUp(self):
+        QuestionnaireTemplate.objects.create(slug='bulk', version=1, schema_json={}, is_active=True)
+
+    def post(self, patients):
+        return self.client.post(
+            '/api/admin/sessions/bulk/', {'patients': patients},
+            content_type='application/json', HTTP_AUTHORIZATION='Bearer test-key',
+        )
+
+    def test_sammelanlage_mit_status_je_empfaenger(self):
+        patients = [
+            {'patient_last_name': f'Fahrer{i}', 'patient_first_name': 'Max',
+             'patient_email': f'f{i}@example.com', 'patient_birth_date': '01.02.1980'}
+            for i in range(25)
+        ]
+        patients.append({'patient_last_name': 'Ohne', 'patient_first_name': 'Mail'})
+        patients.append({'patient_last_name': 'Kaputt', 'patient_first_name': 'X',
+                         'patient_email': 'keine-mail'})
+        # Je ein INSERT für Sessions und Outbox, unabhängig von der Listenlänge
+        with CaptureQueriesContext(connection) as queries:
+            res = self.post(patients)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(res.status_code, 201)
+        data = res.json()
+        self.assertEqual((data['queued'], data['created'], data['invalid']), (25, 1, 1))
+        self.assertEqual(data['results'][26]['error'], 'Ungültige E-Mail-Adresse.')
+        self.assertEqual(QuestionnaireSession.objects.count(), 26)
+        self.assertEqual(OutboxEmail.objects.count(), 25)
+        first = QuestionnaireSession.objects.get(token=data['results'][0]['token'])
+        self.assertEqual(first.patient_birth_date, date(1980, 2, 1))
+        self.assertIn(str(first.token), OutboxEmail.objects.get(session=first).text_body)
+
+    def test_leere_oder_zu_grosse_liste(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        res = self.client.post(
+            '/api/admin/sessions/bulk/', [{'patient_last_name': 'Liste'}],
+            content_type='application/json', HTTP_AUTHORIZATION='Bearer test-key',
+        )
+        self.assertEqual(res.status_code, 400)
+        with override_settings(BULK_INVITE_MAX=2):
+            self.assertEqual(self.post([{}] * 3).status_code, 400)
+
+    def test_ratenbegrenzung(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = outbox.RateLimiter(30, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual(sleeps, [2.0, 2.0])
+        self.assertEqual(outbox.RateLimiter(0).interval, 0.0)
+
+    def test_kommando_csv_mit_sofortversand(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as fh:
+            fh.write('Nachname;Vorname;E-Mail;Geburtsdatum\n'
+                     'Müller;Anna;anna@example.com;1980-01-01\n'
+                     'Schmidt;;bert@example.com;\n')
+        self.addCleanup(os.unlink, fh.name)
+        out = io.StringIO()
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            call_command('bulk_invite', fh.name, '--send', stdout=out)
+        from django.core import mail
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('queued', out.getvalue())
+        self.assertIn('→ sent', out.getvalue())
+        self.assertIn('Name und Vorname sind erforderlich', out.getvalue())
+        self.assertIsNotNone(
+            QuestionnaireSession.objects.get(patient_last_name='Müller').invitation_sent_at
+        )
+
+    @override_settings(EMAIL_OUTBOX_LEASE_SECONDS=60, EMAIL_TIMEOUT=30)
+    def test_kommando_sendet_in_stapeln_je_reservierung(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as fh:
+            fh.write('Nachname;Vorname;E-Mail\n')
+            for i in range(5):
+                fh.write(f'Fahrer{i};Max;f{i}@example.com\n')
+        self.addCleanup(os.unlink, fh.name)
+        claims = []
+        claim = outbox._claim
+
+        def counting_claim(batch_size, ids=None):
+            mails = claim(batch_size, ids=ids)
+            claims.append(len(mails))
+            return mails
+
+        out = io.StringIO()
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'), \
+                mock.patch.object(outbox, '_claim', counting_claim):
+            call_command('bulk_invite', fh.name, '--send', stdout=out)
+        from django.core import mail
+        self.assertEqual(len(mail.outbox), 5)
+        # 60 s Reservierung ÷ 30 s Timeout → Stapel zu je 2 Mails
+        self.assertEqual(claims, [2, 2, 1])
+        self.assertEqual(out.getvalue().count('→ sent'), 5)
+
+
+@override_settings(REMINDER_AFTER_HOURS=72, EMAIL_OUTBOX_RATE_PER_MINUTE=0)
+class ErinnerungTests(TestCase):
+    def session(self, hours_ago, **kwargs):
+        defaults = {
+            'patient_email': 'p@example.com',
+            'invitation_sent_at': timezone.now() - timedelta(hours=hours_ago),
+        }
+        defaults.update(kwargs)
+        return make_session(**defaults)
+
+    def test_nur_faellige_sessions(self):
+        due = self.session(100)
+        self.session(10)                                        # zu frisch
+        self.session(100, completed=True)                       # erledigt
+        self.session(100, reminder_sent_at=timezone.now())      # schon erinnert
+        self.session(100, patient_email='')                     # keine Adresse
+        self.session(100, expires_at=timezone.now() - timedelta(hours=1))  # abgelaufen
+        make_session(patient_email='p@example.com')             # nie eingeladen
+        self.assertEqual(list(reminders.due_sessions()), [due])
+
+    def test_stapelweise_und_idempotent(self):
+        sessions = [self.session(100 + i) for i in range(5)]
+        self.assertEqual(reminders.enqueue_due(batch_size=2), 5)
+        self.assertEqual(OutboxEmail.objects.filter(kind='reminder').count(), 5)
+        # Zweiter Lauf findet nichts mehr
+        self.assertEqual(reminders.enqueue_due(batch_size=2), 0)
+        outbox.deliver_due(connection=FakeSmtpConnection())
+        for session in sessions:
+            session.refresh_from_db()
+            self.assertIsNotNone(session.reminder_sent_at)
+            # Einladungszeitpunkt bleibt unverändert
+            self.assertLess(session.invitation_sent_at, timezone.now() - timedelta(hours=99))
+        mail_row = OutboxEmail.objects.filter(kind='reminder').first()
+        self.assertTrue(mail_row.subject.startswith('Erinnerung'))
+
+    @mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+    def test_erneute_einladung_setzt_frist_neu(self):
+        cache.clear()
+        session = self.session(100, reminder_sent_at=timezone.now() - timedelta(hours=20))
+        res = self.client.post(
+            f'/api/admin/sessions/{session.token}/resend/', HTTP_AUTHORIZATION='Bearer test-key',
+        )
+        self.assertEqual(res.status_code, 200)
+        session.refresh_from_db()
+        self.assertIsNone(session.invitation_sent_at)
+        # Die alte Einladung löst keine Erinnerung mehr aus …
+        self.assertEqual(reminders.enqueue_batch(), 0)
+        # … die neue erst REMINDER_AFTER_HOURS nach ihrer Zustellung
+        outbox.deliver_due(connection=FakeSmtpConnection())
+        self.assertEqual(reminders.enqueue_batch(), 0)
+        later = timezone.now() + timedelta(hours=73)
+        self.assertEqual(reminders.enqueue_batch(now=later), 1)
+
+    def test_abfrage_nutzt_teilindex(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Planer von PostgreSQL wählt bei leeren Tabellen Seq Scan')
+        plan = reminders.due_sessions().explain()
+        self.assertIn('reminder_due_idx', plan)
+
+    def test_kommando(self):
+        self.session(100)
+        out = io.StringIO()
+        call_command('send_reminders', stdout=out)
+        self.assertIn('1 Erinnerung(en) eingeplant', out.getvalue())
+
+
+_executions = []
+_executions_lock = threading.Lock()
+
+
+@taskqueue.task(name='test.record', max_attempts=3)
+def _record(key, sleep=0.0, fail=False):
+    with _executions_lock:
+        _executions.append(key)
+    if sleep:
+        time.sleep(sleep)
+    if fail:
+        raise RuntimeError('absichtlich')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        _executions.clear()
+
+    def test_prioritaet_und_faelligkeit(self):
+        taskqueue.enqueue('test.record', {'key': 'spaet'}, delay=60)
+        taskqueue.enqueue('test.record', {'key': 'normal'})
+        taskqueue.enqueue(_record, {'key': 'dringend'}, priority=10)
+        worker = taskqueue.Worker('w1')
+        while worker.run_once():
+            pass
+        self.assertEqual(_executions, ['dringend', 'normal'])
+        self.assertEqual(Task.objects.filter(status=Task.STATUS_DONE).count(), 2)
+
+    def test_retry_mit_backoff_und_endgueltiger_fehler(self):
+        job = taskqueue.enqueue('test.record', {'key': 'x', 'fail': True})
+        with self.assertLogs('questionnaires.taskqueue', 'WARNING'):
+            taskqueue.Worker('w1').run_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=8))
+        self.assertIn('absichtlich', job.last_error)
+        for _ in range(2):
+            Task.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            with self.assertLogs('questionnaires.taskqueue', 'WARNING'):
+                taskqueue.Worker('w1').run_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.STATUS_FAILED, 3))
+
+    def test_visibility_timeout_und_verlorene_reservierung(self):
+        job = taskqueue.enqueue('test.record', {'key': 'x'})
+        [stale] = taskqueue.claim('tot')
+        # Reservierung abgelaufen → anderer Worker übernimmt
+        Task.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(taskqueue.Worker('w2').run_once(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Task.STATUS_DONE, 'w2', 2))
+        # Der abgehängte Worker meldet sich zurück: Ergebnis wird verworfen
+        with self.assertLogs('questionnaires.taskqueue', 'WARNING'):
+            taskqueue.execute(stale, 'tot')
+        job.refresh_from_db()
+        self.assertEqual(job.locked_by, 'w2')
+
+    def test_unbekannter_job(self):
+        with self.assertRaises(LookupError):
+            taskqueue.enqueue('gibt.es.nicht')
+
+    def test_eingebaute_jobs(self):
+        make_session(expires_at=timezone.now() - timedelta(days=40))
+        taskqueue.enqueue('sessions.purge', {'days': 30})
+        taskqueue.Worker('w1').run_once()
+        self.assertEqual(QuestionnaireSession.objects.count(), 0)
+
+
+class TaskQueueConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        _executions.clear()
+
+    def run_batch(self, jobs, workers, sleep):
+        Task.objects.bulk_create([
+            Task(name='test.record', payload={'key': f'{workers}-{i}', 'sleep': sleep})
+            for i in range(jobs)
+        ])
+        started = time.perf_counter()
+        processed = taskqueue.run_workers(workers, poll_interval=0.01, burst=True)
+        return time.perf_counter() - started, processed
+
+    def test_keine_doppelte_ausfuehrung(self):
+        _, processed = self.run_batch(jobs=80, workers=6, sleep=0.002)
+        self.assertEqual(sum(processed), 80)
+        self.assertEqual(len(_executions), 80)
+        self.assertEqual(len(set(_executions)), 80)
+        self.assertEqual(Task.objects.exclude(status=Task.STATUS_DONE).count(), 0)
+        self.assertFalse(Task.objects.filter(attempts__gt=1).exists())
+
+    def test_durchsatz_skaliert_mit_workern(self):
+        single, _ = self.run_batch(jobs=24, workers=1, sleep=0.03)
+        quad, processed = self.run_batch(jobs=24, workers=4, sleep=0.03)
+        self.assertGreater(min(processed), 0)
+        self.assertLess(quad, single * 0.6)
+
+
+_periodic_calls = []
+
+
+@scheduler.periodic('test.periodic', every=3600)
+def _periodic(sleep=0.0):
+    _periodic_calls.append(threading.get_ident())
+    time.sleep(sleep)
+    if len(_periodic_calls) > 99:
+        raise RuntimeError('zu oft')
+    return len(_periodic_calls)
+
+
+class SchedulerTests(TransactionTestCase):
+    def setUp(self):
+        _periodic_calls.clear()
+        self.lock_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.lock_dir.cleanup)
+        override = override_settings(SCHEDULER_LOCK_DIR=self.lock_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_tick_ist_fensterbeginn(self):
+        now = timezone.now().replace(minute=42, second=7)
+        self.assertEqual(scheduler.current_tick(3600, now), now.replace(minute=0, second=0, microsecond=0))
+
+    def test_ein_lauf_je_zeitfenster_mit_historie(self):
+        now = timezone.now()
+        runs = scheduler.run_due(now=now, node='a', names={'test.periodic'})
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(scheduler.run_due(now=now, node='b', names={'test.periodic'}), [])
+        run = JobRun.objects.get(name='test.periodic')
+        self.assertEqual(run.status, JobRun.STATUS_OK)
+        self.assertEqual(run.node, 'a')
+        self.assertEqual(run.result, 1)
+        self.assertIsNotNone(run.duration_ms)
+        self.assertIsNotNone(run.finished_at)
+        # nächstes Fenster → neuer Lauf
+        scheduler.run_due(now=now + timedelta(hours=1), node='b', names={'test.periodic'})
+        self.assertEqual(JobRun.objects.filter(name='test.periodic').count(), 2)
+
+    def test_parallele_knoten_fuehren_job_einmal_aus(self):
+        now = timezone.now()
+        barrier = threading.Barrier(4)
+
+        def node(i):
+            barrier.wait()
+            scheduler.run_due(now=now, node=f'n{i}', names={'test.periodic'})
+
+        with mock.patch.dict(scheduler._registry, {
+            'test.periodic': scheduler._registry['test.periodic']._replace(kwargs={'sleep': 0.05}),
+        }):
+            threads = [threading.Thread(target=node, args=(i,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(_periodic_calls), 1)
+        self.assertEqual(JobRun.objects.filter(name='test.periodic').count(), 1)
+
+    def test_sperre_ist_exklusiv(self):
+        with scheduler.job_lock('test.periodic') as first:
+            self.assertTrue(first)
+            with scheduler.job_lock('test.periodic') as second:
+                self.assertFalse(second)
+            self.assertEqual(scheduler.run_due(names={'test.periodic'}), [])
+        with scheduler.job_lock('test.periodic') as again:
+            self.assertTrue(again)
+
+    def test_fehler_wird_protokolliert(self):
+        _periodic_calls.extend([0] * 99)
+        scheduler.run_due(names={'test.periodic'})
+        run = JobRun.objects.get(name='test.periodic')
+        self.assertEqual(run.status, JobRun.STATUS_ERROR)
+        self.assertIn('zu oft', run.error)
+
+    def test_purge_ist_registriert(self):
+        self.assertEqual(scheduler.registered()['sessions.purge'].every, 86400)
+
+
+class _AsyncApiUrls:
+    """URLconf wie unter ASGI (ASYNC_VIEWS=True): heiße Lese-Endpunkte als async Views."""
+    urlpatterns = [
+        path('api/session/<uuid:token>/', async_views.AsyncQuestionnaireSessionView.as_view()),
+        path('api/answers/<uuid:token>/', async_views.AsyncAnswersView.as_view()),
+        path('api/gdt/result/<uuid:token>/', async_views.AsyncGdtResultView.as_view()),
+        path('api/i18n/', async_views.AsyncTranslationView.as_view()),
+        path('api/i18n/<slug:lang>/', async_views.AsyncTranslationView.as_view()),
+        path('', include('config.urls')),
+    ]
+
+
+@mock.patch.dict(os.environ, {'ADMIN_API_KEY': 'test-key'})
+class AsyncViewTests(TestCase):
+    """Async-Views liefern dieselben Antworten wie die DRF-Views."""
+
+    def setUp(self):
+        cache.clear()
+        self.open = make_session(gdt_patient_id='4711')
+        self.done = make_session(completed=True, completed_at=timezone.now(), gdt_patient_id='4712')
+        AnswerSet.objects.create(
+            session=self.done, answers_json=valid_submit_payload(ess_total=8, ess_band='normal'),
+            ess_total=8, ess_band='normal',
+        )
+        self.expired = make_session(expires_at=timezone.now() - timedelta(days=1))
+
+    def fetch_both(self, url, **headers):
+        sync = self.client.get(url, **headers)
+        with override_settings(ROOT_URLCONF=_AsyncApiUrls):
+            resolved = self.client.get(url, **headers)
+            self.assertTrue(resolved.resolver_match.func.view_class.view_is_async)
+        return sync, resolved
+
+    def assertSameResponse(self, url, **headers):
+        sync, async_ = self.fetch_both(url, **headers)
+        self.assertEqual(async_.status_code, sync.status_code, url)
+        self.assertEqual(async_.content and async_.json(), sync.content and sync.json(), url)
+        for header in ('ETag', 'Cache-Control'):
+            self.assertEqual(async_.headers.get(header), sync.headers.get(header), (url, header))
+        return async_
+
+    def test_session_und_fehlerfaelle(self):
+        self.assertEqual(self.assertSameResponse(f'/api/session/{self.open.token}/').status_code, 200)
+        self.assertEqual(self.assertSameResponse(f'/api/session/{self.done.token}/').status_code, 410)
+        self.assertEqual(self.assertSameResponse(f'/api/session/{self.expired.token}/').status_code, 410)
+        self.assertEqual(self.assertSameResponse(f'/api/session/{uuid.uuid4()}/').status_code, 404)
+
+    def test_answers_mit_etag(self):
+        url = f'/api/answers/{self.done.token}/'
+        res = self.assertSameResponse(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertSameResponse(url + '?texts=full')
+        self.assertEqual(self.assertSameResponse(url, HTTP_IF_NONE_MATCH=res['ETag']).status_code, 304)
+        self.assertEqual(self.assertSameResponse(f'/api/answers/{self.open.token}/').status_code, 400)
+
+    def test_gdt_result(self):
+        auth = {'HTTP_AUTHORIZATION': 'Bearer test-key'}
+        self.assertEqual(self.assertSameResponse(f'/api/gdt/result/{self.done.token}/', **auth).status_code, 200)
+        self.assertEqual(self.assertSameResponse(f'/api/gdt/result/{self.open.token}/', **auth).status_code, 202)
+        self.assertEqual(self.assertSameResponse(f'/api/gdt/result/{self.expired.token}/', **auth).status_code, 410)
+        self.assertEqual(self.assertSameResponse(f'/api/gdt/result/{self.done.token}/').status_code, 403)
+
+    def test_gdt_result_eine_abfrage(self):
+        with override_settings(ROOT_URLCONF=_AsyncApiUrls), CaptureQueriesContext(connection) as ctx:
+            self.client.get(f'/api/gdt/result/{self.done.token}/', HTTP_AUTHORIZATION='Bearer test-key')
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_translation(self):
+        self.assertSameResponse('/api/i18n/')
+        self.assertSameResponse('/api/i18n/de/')
+        self.assertSameResponse('/api/i18n/zz/')
+
+    @mock.patch.object(AnonRateThrottle, 'THROTTLE_RATES', {'anon': '2/min'})
+    def test_drosselung_wie_drf(self):
+        with override_settings(ROOT_URLCONF=_AsyncApiUrls):
+            codes = [self.client.get('/api/i18n/').status_code for _ in range(3)]
+            res = self.client.get('/api/i18n/')
+        self.assertEqual(codes, [200, 200, 429])
+        self.assertIn('Retry-After', res.headers)
+
+
 class TranslationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_sprachliste_enthaelt_deutsch(self):
         res = self.client.get('/api/i18n/')
         self.assertEqual(res.status_code, 200)
@@ -358,7 +1731,11 @@ class PurgeSessionsTests(TestCase):
         frisch = make_session(expires_at=timezone.now() - timedelta(days=5))
         aktiv = make_session()
 
-        call_command('purge_sessions', '--days', '30', verbosity=0)
+        out = io.StringIO()
+        call_command('purge_sessions', '--days', '30', '--dry-run', stdout=out)
+        self.assertIn('1 Session(s) würden gelöscht', out.getvalue())
+        call_command('purge_sessions', '--days', '30', stdout=out)
+        self.assertIn('1 abgelaufene Session(s) gelöscht', out.getvalue())
 
         tokens = set(
             QuestionnaireSession.objects.values_list('token', flat=True)
@@ -366,3 +1743,83 @@ class PurgeSessionsTests(TestCase):
         self.assertNotIn(alt.token, tokens)
         self.assertIn(frisch.token, tokens)
         self.assertIn(aktiv.token, tokens)
+
+
+class TemplateRegistryTests(TestCase):
+    def setUp(self):
+        call_command('load_catalog', verbosity=0)
+
+    def test_aktives_template_wird_gecacht(self):
+        first = registry.active_template()
+        self.assertEqual(first.slug, 'verkehrsmedizin-leitlinien')
+        with self.assertNumQueries(0):
+            self.assertIs(registry.active_template(), first)
+            self.assertIs(registry.get_template(first.pk), first)
+
+    def test_schema_ist_unveraenderlich(self):
+        schema = registry.active_template().schema
+        with self.assertRaises(TypeError):
+            schema['title'] = 'x'
+        with self.assertRaises(TypeError):
+            schema['sections'][0]['questions'][0]['label'] = 'x'
+
+    def test_speichern_invalidiert(self):
+        cached = registry.active_template()
+        QuestionnaireTemplate.objects.filter(pk=cached.pk).update(version=99)
+        # update() umgeht Signale → Cache bleibt bewusst stehen
+        self.assertEqual(registry.active_template().version, cached.version)
+        with self.captureOnCommitCallbacks(execute=True):
+            QuestionnaireTemplate.objects.get(pk=cached.pk).save()
+        self.assertEqual(registry.active_template().version, 99)
+
+    def test_invalidierung_erst_nach_commit(self):
+        cached = registry.active_template()
+        version = registry.current_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                template = QuestionnaireTemplate.objects.get(pk=cached.pk)
+                template.version = 77
+                template.save()
+                # Vor dem Commit bleiben Cache und Zähler stehen – ein paralleler
+                # Request lädt bis dahin ohnehin noch die alte Zeile
+                self.assertIs(registry.active_template(), cached)
+                self.assertEqual(registry.current_version(), version)
+            self.assertIs(registry.active_template(), cached)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(registry.current_version(), version + 1)
+        self.assertEqual(registry.active_template().version, 77)
+
+    @override_settings(TEMPLATE_REGISTRY_CHECK_SECONDS=0)
+    def test_zaehler_eines_anderen_workers_wird_erkannt(self):
+        cached = registry.active_template()
+        QuestionnaireTemplate.objects.filter(pk=cached.pk).update(version=42)
+        # Simuliert invalidate() in einem anderen Prozess
+        registry.bump_version()
+        self.assertEqual(registry.active_template().version, 42)
+
+    def test_load_catalog_invalidiert(self):
+        alt = QuestionnaireTemplate.objects.create(
+            slug='alt', version=100, schema_json={'sections': ['ess']}, is_active=True
+        )
+        self.assertEqual(registry.active_template().pk, alt.pk)
+        version = registry.current_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('load_catalog', verbosity=0)
+        self.assertGreater(
+            CacheVersion.objects.get(key=registry.VERSION_KEY).version, version
+        )
+        self.assertEqual(registry.active_template().slug, 'verkehrsmedizin-leitlinien')
+
+    def test_session_get_laedt_schema_nicht_erneut(self):
+        template = registry.active_template()
+        session = QuestionnaireSession.objects.create(
+            template_id=template.pk,
+            patient_last_name='Mustermann', patient_first_name='Max',
+            expires_at=timezone.now() + timedelta(days=14),
+        )
+        # Nur noch der Session-Lookup
+        with self.assertNumQueries(1):
+            res = self.client.get(f'/api/session/{session.token}/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['session']['template_slug'], template.slug)
+        self.assertEqual(len(res.json()['template']['sections']), len(CATALOG['sections']))
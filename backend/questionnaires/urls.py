@@ -1,29 +1,53 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     QuestionnaireSessionView,
     SubmitQuestionnaireView,
     AnswersView,
+    PrintView,
+    PrintTicketView,
+    PrintTicketRedeemView,
     TranslationView,
+    EvaluationRulesView,
     AdminSessionListView,
+    AdminBulkInviteView,
     AdminResendEmailView,
     AdminDeleteSessionView,
     AdminUpdateSessionView,
     GdtSessionCreateView,
     GdtResultView,
+    GdtResultBatchView,
+    GdtCompletionFeedView,
 )
 
+if settings.ASYNC_VIEWS:
+    # ASGI-Profil: heiße Lese-Endpunkte als native async Views (async_views.py)
+    from .async_views import (  # noqa: F811
+        AsyncAnswersView as AnswersView,
+        AsyncGdtResultView as GdtResultView,
+        AsyncQuestionnaireSessionView as QuestionnaireSessionView,
+        AsyncTranslationView as TranslationView,
+    )
+
 urlpatterns = [
     path('session/<uuid:token>/', QuestionnaireSessionView.as_view(), name='session-detail'),
     path('submit/<uuid:token>/', SubmitQuestionnaireView.as_view(), name='submit-questionnaire'),
     path('answers/<uuid:token>/', AnswersView.as_view(), name='answers-data'),
+    path('print/<uuid:token>/', PrintView.as_view(), name='print-data'),
+    path('print/<uuid:token>/ticket/', PrintTicketView.as_view(), name='print-ticket'),
+    path('print/ticket/<str:ticket>/', PrintTicketRedeemView.as_view(), name='print-ticket-redeem'),
     path('i18n/', TranslationView.as_view(), name='i18n-list'),
     path('i18n/<slug:lang>/', TranslationView.as_view(), name='i18n-detail'),
+    path('evaluation/rules/', EvaluationRulesView.as_view(), name='evaluation-rules'),
     # Admin
     path('admin/sessions/', AdminSessionListView.as_view(), name='admin-sessions'),
+    path('admin/sessions/bulk/', AdminBulkInviteView.as_view(), name='admin-bulk-invite'),
     path('admin/sessions/<uuid:token>/resend/', AdminResendEmailView.as_view(), name='admin-resend'),
     path('admin/sessions/<uuid:token>/update/', AdminUpdateSessionView.as_view(), name='admin-update'),
     path('admin/sessions/<uuid:token>/delete/', AdminDeleteSessionView.as_view(), name='admin-delete'),
     # GDT-Schnittstelle
     path('gdt/session/', GdtSessionCreateView.as_view(), name='gdt-session-create'),
     path('gdt/result/<uuid:token>/', GdtResultView.as_view(), name='gdt-result'),
+    path('gdt/results/', GdtResultBatchView.as_view(), name='gdt-results'),
+    path('gdt/completions/', GdtCompletionFeedView.as_view(), name='gdt-completions'),
 ]
@@ -1,44 +1,42 @@
 import logging
 import os
 import secrets
-from datetime import datetime, timedelta
+import uuid
+from datetime import timedelta
 
 from django.conf import settings
 from django.db import IntegrityError, transaction
 from django.utils import timezone
-from django.utils.html import escape
-from django.core.mail import send_mail
+from django.core import signing
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import BasePermission
 from django.shortcuts import get_object_or_404
 
-from .models import QuestionnaireSession, AnswerSet, QuestionnaireTemplate
+from . import bulk, completions, outbox, registry, submission
+from .models import QuestionnaireSession, AnswerSet
 from .serializers import (
     SubmitSerializer,
     QuestionnaireSessionSerializer,
+    parse_birth_date,
 )
 from .schema import is_v2_schema, validate_answers
-from .evaluation import evaluate_answers
+from .evaluation import RULES_VERSION, rules_catalog
+from .gdt_payload import gdt_pending_payload, gdt_result_payload
+from .printing import (
+    answers_etag,
+    answers_model,
+    issue_ticket,
+    print_model,
+    redeem_ticket,
+    ticket_seconds,
+)
 from .translations import available_languages, load_translation
 
 logger = logging.getLogger(__name__)
 
 
-def parse_birth_date(value):
-    """'YYYY-MM-DD' oder 'TT.MM.YYYY' → date | None (None auch bei leerem String)."""
-    value = (value or '').strip()
-    if not value:
-        return None
-    for fmt in ('%Y-%m-%d', '%d.%m.%Y'):
-        try:
-            return datetime.strptime(value, fmt).date()
-        except ValueError:
-            continue
-    raise ValueError(f'Ungültiges Datumsformat: {value}')
-
-
 class AdminApiKeyPermission(BasePermission):
     """Einfacher API-Key-Schutz für Admin-Endpunkte."""
     def has_permission(self, request, view):
@@ -49,44 +47,72 @@ class AdminApiKeyPermission(BasePermission):
         return secrets.compare_digest(auth, f'Bearer {admin_key}')
 
 
+def session_problem(session):
+    """(Status, Meldung), wenn die Session nicht (mehr) ausfüllbar ist, sonst None."""
+    # Prüfe ob Session abgelaufen
+    if session.is_expired():
+        return status.HTTP_410_GONE, 'Dieser Link ist abgelaufen.'
+    # Prüfe ob bereits ausgefüllt
+    if session.completed:
+        return status.HTTP_410_GONE, 'Dieser Fragebogen wurde bereits ausgefüllt.'
+    return None
+
+
+def session_payload(session):
+    """Antwort von GET /api/session/<token>/ (Session + Template-Schema)."""
+    serializer = QuestionnaireSessionSerializer(session)
+    return {
+        'session': serializer.data,
+        'template': registry.get_template(session.template_id).schema
+    }
+
+
 class QuestionnaireSessionView(APIView):
     """
     GET: Hole Fragebogen-Session Details anhand des Tokens
     """
     def get(self, request, token):
         session = get_object_or_404(QuestionnaireSession, token=token)
-        
-        # Prüfe ob Session abgelaufen
-        if session.is_expired():
-            return Response(
-                {'error': 'Dieser Link ist abgelaufen.'},
-                status=status.HTTP_410_GONE
-            )
-        
-        # Prüfe ob bereits ausgefüllt
-        if session.completed:
-            return Response(
-                {'error': 'Dieser Fragebogen wurde bereits ausgefüllt.'},
-                status=status.HTTP_410_GONE
-            )
-        
-        serializer = QuestionnaireSessionSerializer(session)
-        return Response({
-            'session': serializer.data,
-            'template': session.template.schema_json
-        })
+        problem = session_problem(session)
+        if problem is not None:
+            return Response({'error': problem[1]}, status=problem[0])
+        return Response(session_payload(session))
 
 
 class SubmitQuestionnaireView(APIView):
     """
     POST: Fragebogen einreichen
+
+    Optionaler Header Idempotency-Key: Wiederholungen mit demselben Key
+    (z.B. nach Netzabbruch) erhalten die ursprüngliche 201-Antwort
+    (Header Idempotent-Replayed: true) statt 400 "bereits ausgefüllt".
     """
     def post(self, request, token):
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+        if len(idempotency_key) > submission.IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {'error': 'Idempotency-Key ist zu lang.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        replayed = self._replay(token, idempotency_key)
+        if replayed is not None:
+            return replayed
+
         # Schema laden (fuer die Validierung), ohne DB-Lock
         base_session = get_object_or_404(
-            QuestionnaireSession.objects.select_related('template'), token=token
+            QuestionnaireSession.objects.only('id', 'token', 'template_id', 'expires_at', 'completed'),
+            token=token,
         )
-        template_schema = base_session.template.schema_json
+        # Offensichtliche Fälle ohne Validierung abweisen; verbindlich prüft
+        # erst das bedingte UPDATE in submission.complete()
+        if base_session.is_expired():
+            return Response(
+                {'error': 'Dieser Link ist abgelaufen.'},
+                status=status.HTTP_410_GONE
+            )
+        if base_session.completed:
+            return self._already_completed(token, idempotency_key)
+        template_schema = registry.get_template(base_session.template_id).schema
 
         if is_v2_schema(template_schema):
             # Schema-getriebene Validierung: nur bekannte Fragen werden gespeichert
@@ -103,82 +129,184 @@ class SubmitQuestionnaireView(APIView):
                 )
             validated_data = serializer.validated_data
 
-        # Atomar: Doppel-Submit (Doppelklick, paralleler POST) sauber abfangen
-        try:
-            with transaction.atomic():
-                session = get_object_or_404(
-                    QuestionnaireSession.objects.select_for_update(), token=token
-                )
-
-                if session.is_expired():
-                    return Response(
-                        {'error': 'Dieser Link ist abgelaufen.'},
-                        status=status.HTTP_410_GONE
-                    )
-
-                if session.completed:
-                    return Response(
-                        {'error': 'Dieser Fragebogen wurde bereits ausgefüllt.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                AnswerSet.objects.create(
-                    session=session,
-                    answers_json=validated_data,
-                    ess_total=validated_data['ess_total'],
-                    ess_band=validated_data['ess_band']
-                )
-
-                session.completed = True
-                session.completed_at = timezone.now()
-                session.save()
-        except IntegrityError:
+        # Ein bedingtes UPDATE beansprucht die Session, das AnswerSet folgt in
+        # derselben Transaktion – Doppel-Submits ändern keine Zeile (submission.py)
+        outcome, _answer_set = submission.complete(base_session, validated_data, idempotency_key)
+        if outcome == submission.EXPIRED:
             return Response(
-                {'error': 'Dieser Fragebogen wurde bereits ausgefüllt.'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Dieser Link ist abgelaufen.'},
+                status=status.HTTP_410_GONE
             )
+        if outcome == submission.ALREADY_COMPLETED:
+            return self._already_completed(token, idempotency_key)
 
-        return Response({
-            'success': True,
-            'ess_total': validated_data['ess_total'],
-            'ess_band': validated_data['ess_band'],
-            'message': 'Fragebogen erfolgreich eingereicht.'
-        }, status=status.HTTP_201_CREATED)
+        return Response(
+            submission.result_payload(validated_data['ess_total'], validated_data['ess_band']),
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _already_completed(self, token, idempotency_key):
+        # Gleichzeitige Wiederholung desselben Submits: der andere Request hat gespeichert
+        return self._replay(token, idempotency_key) or Response(
+            {'error': 'Dieser Fragebogen wurde bereits ausgefüllt.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    @staticmethod
+    def _replay(token, idempotency_key):
+        payload = submission.replay(token, idempotency_key)
+        if payload is None:
+            return None
+        return Response(
+            payload,
+            status=status.HTTP_201_CREATED,
+            headers={'Idempotent-Replayed': 'true'},
+        )
+
+
+def wants_full_texts(request):
+    """Kompatibilitäts-Flag ?texts=full: Befunde mit vollständigen Texten ausliefern."""
+    return request.GET.get('texts') == 'full'
+
+
+def etag_matches(request, etag):
+    """If-None-Match (auch Listen und schwache ETags) gegen etag prüfen."""
+    header = request.headers.get('If-None-Match', '')
+    if header.strip() == '*':
+        return True
+    return any(
+        candidate.strip().removeprefix('W/') == etag
+        for candidate in header.split(',')
+    )
+
+
+def printable_problem(session):
+    """(Status, Meldung), wenn die Session (noch/nicht mehr) nicht druckbar ist, sonst None."""
+    if session.is_expired():
+        # Zugriffsfenster: Nach Ablauf des Links auch keine Ergebnisse mehr ausliefern
+        return status.HTTP_410_GONE, 'Dieser Link ist abgelaufen.'
+    if not session.completed:
+        return status.HTTP_400_BAD_REQUEST, 'Session noch nicht abgeschlossen.'
+    return None
+
+
+def _printable_error(session):
+    """Fehler-Response, wenn die Session (noch/nicht mehr) nicht druckbar ist."""
+    problem = printable_problem(session)
+    if problem is None:
+        return None
+    return Response({'error': problem[1]}, status=problem[0])
+
+
+def _no_answers():
+    return Response({'error': 'Keine Antworten gefunden.'}, status=status.HTTP_404_NOT_FOUND)
 
 
 class AnswersView(APIView):
     """
     GET: Gibt Antworten als JSON zurück (für Puppeteer-Print-Page)
+
+    Die Auswertung enthält kompakte Befunde (Regel-ID + params); die Texte
+    liefert /api/evaluation/rules/. Ältere Clients erhalten mit ?texts=full
+    das bisherige Format mit befund/konsequenz/disclaimer je Antwort.
+
+    ETag aus completed_at, Template- und Regelstand (siehe
+    printing.answers_etag): Bei passendem If-None-Match → 304, ohne
+    Antworten zu laden oder auszuwerten.
     """
     def get(self, request, token):
         session = get_object_or_404(QuestionnaireSession, token=token)
-        if session.is_expired():
-            # Zugriffsfenster: Nach Ablauf des Links auch keine Ergebnisse mehr ausliefern
-            return Response(
-                {'error': 'Dieser Link ist abgelaufen.'},
-                status=status.HTTP_410_GONE
-            )
-        if not session.completed:
+        error = _printable_error(session)
+        if error is not None:
+            return error
+        texts = wants_full_texts(request)
+        etag = answers_etag(session, texts=texts)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            try:
+                response = Response(answers_model(session, texts=texts))
+            except AnswerSet.DoesNotExist:
+                return _no_answers()
+        response['ETag'] = etag
+        # Gesundheitsdaten: nur im Client cachen und immer revalidieren
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class PrintView(APIView):
+    """
+    GET /api/print/<token>/  – druckfertiges Viewmodel für die Print-Page
+
+    Nur sichtbare Abschnitte/Fragen mit Anzeigetexten, Folgeangaben inline
+    und Auswertung mit Volltexten (siehe printing.py). Legacy-Templates (v1)
+    haben kein strukturiertes Schema → 409, die Print-Page nutzt dann
+    /api/answers/.
+    """
+    def get(self, request, token):
+        session = get_object_or_404(QuestionnaireSession, token=token)
+        error = _printable_error(session)
+        if error is not None:
+            return error
+        if not is_v2_schema(registry.get_template(session.template_id).schema):
             return Response(
-                {'error': 'Session noch nicht abgeschlossen.'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Kein strukturiertes Template – bitte /api/answers/ verwenden.'},
+                status=status.HTTP_409_CONFLICT
             )
         try:
-            answer_set = session.answers
+            return Response(print_model(session))
         except AnswerSet.DoesNotExist:
-            return Response({'error': 'Keine Antworten gefunden.'}, status=status.HTTP_404_NOT_FOUND)
-        return Response({
-            'answers': answer_set.answers_json,
-            'schema': session.template.schema_json,
-            'evaluation': evaluate_answers(answer_set.answers_json),
-            'ess_total': answer_set.ess_total,
-            'ess_band': answer_set.ess_band,
-            'completed_at': session.completed_at.strftime('%d.%m.%Y') if session.completed_at else None,
-            'token': str(token),
-            'patient_last_name': session.patient_last_name,
-            'patient_first_name': session.patient_first_name,
-            'patient_birth_date': session.patient_birth_date.strftime('%d.%m.%Y') if session.patient_birth_date else '',
-        })
+            return _no_answers()
+
+
+class PrintTicketView(APIView):
+    """
+    POST /api/print/<token>/ticket/  – Session validieren, Druck-Ticket ausstellen
+
+    Die Druckdaten (v2-Viewmodel bzw. Legacy-Answers mit Volltexten) werden
+    einmal berechnet und PRINT_TICKET_SECONDS lang unter dem Ticket gecacht.
+    Response 201: {"ticket": "...", "expires_in": 120}; die Art der Druckdaten
+    ("kind") liefert erst das Einlösen (PrintTicketRedeemView).
+    """
+    def post(self, request, token):
+        session = get_object_or_404(QuestionnaireSession, token=token)
+        error = _printable_error(session)
+        if error is not None:
+            return error
+        try:
+            ticket = issue_ticket(session)
+        except AnswerSet.DoesNotExist:
+            return _no_answers()
+        return Response(
+            {'ticket': ticket, 'expires_in': ticket_seconds()},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class PrintTicketRedeemView(APIView):
+    """
+    GET /api/print/ticket/<ticket>/  – Druckdaten zu einem Ticket
+
+    Response: {"kind": "v2"|"legacy", "data": {...}}; 403 bei ungültiger
+    Signatur, 410 bei abgelaufenem Ticket oder nicht mehr druckbarer Session.
+    """
+    def get(self, request, ticket):
+        try:
+            doc = redeem_ticket(ticket)
+        except signing.SignatureExpired:
+            doc = None
+        except signing.BadSignature:
+            return Response({'error': 'Ungültiges Ticket.'}, status=status.HTTP_403_FORBIDDEN)
+        except AnswerSet.DoesNotExist:
+            return _no_answers()
+        if doc is None:
+            return Response(
+                {'error': 'Ticket abgelaufen.'},
+                status=status.HTTP_410_GONE
+            )
+        response = Response(doc)
+        response['Cache-Control'] = 'private, no-store'
+        return response
 
 
 class TranslationView(APIView):
@@ -201,48 +329,33 @@ class TranslationView(APIView):
         return response
 
 
-def _send_invitation_email(session):
-    """Sendet die Einladungs-E-Mail an den Patienten."""
-    url = f"{settings.APP_URL}/q/{session.token}"
-    patient_name = f"{session.patient_first_name} {session.patient_last_name}".strip()
-    valid_until = timezone.localtime(session.expires_at).strftime('%d.%m.%Y')
-    subject = "Ihr verkehrsmedizinischer Fragebogen"
-    text_body = (
-        f"Sehr geehrte/r {patient_name},\n\n"
-        "bitte füllen Sie vor Ihrem Termin den beigefügten Fragebogen aus:\n\n"
-        f"{url}\n\n"
-        f"Der Link ist bis zum {valid_until} gültig.\n\n"
-        "Mit freundlichen Grüßen\n"
-        "Dr. med. Björn Micka\n"
-        "Betriebsmedizin · Notfallmedizin\n"
-        "Christoph-Dassler-Str. 22, 91074 Herzogenaurach"
-    )
-    html_body = (
-        f"<p>Sehr geehrte/r {escape(patient_name)},</p>"
-        "<p>bitte füllen Sie vor Ihrem Termin den folgenden Fragebogen aus:</p>"
-        f'<p><a href="{url}" style="font-size:16px;font-weight:bold;">Fragebogen öffnen</a></p>'
-        f'<p style="color:#666;font-size:12px;">Direktlink: {url}</p>'
-        f"<p>Der Link ist bis zum {valid_until} gültig.</p>"
-        "<hr><p style='font-size:12px;color:#666;'>"
-        "Dr. med. Björn Micka · Betriebsmedizin · Notfallmedizin<br>"
-        "Christoph-Dassler-Str. 22, 91074 Herzogenaurach</p>"
-    )
-    send_mail(
-        subject=subject,
-        message=text_body,
-        from_email=settings.EMAIL_FROM,
-        recipient_list=[session.patient_email],
-        html_message=html_body,
-        fail_silently=False,
-    )
-    session.invitation_sent_at = timezone.now()
-    session.save(update_fields=['invitation_sent_at'])
+class EvaluationRulesView(APIView):
+    """
+    GET /api/evaluation/rules/  – Regelkatalog der automatischen Auswertung
+
+    Texte (bereich, kapitel, befund, konsequenz) je Regel-ID plus Disclaimer.
+    Die Version ist ein Inhalts-Hash (evaluation.RULES_VERSION): Mit
+    ?v=<version> ist die Antwort unveränderlich und wird ein Jahr gecacht,
+    ohne Version eine Stunde; If-None-Match wird per ETag beantwortet.
+    """
+    def get(self, request):
+        etag = f'"{RULES_VERSION}"'
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(rules_catalog())
+        response['ETag'] = etag
+        if request.query_params.get('v') == RULES_VERSION:
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=3600'
+        return response
 
 
 class AdminSessionListView(APIView):
     """
     GET  /api/admin/sessions/  – alle Sessions auflisten
-    POST /api/admin/sessions/  – neue Session anlegen + E-Mail senden
+    POST /api/admin/sessions/  – neue Session anlegen + Einladung in die Outbox
     """
     permission_classes = [AdminApiKeyPermission]
 
@@ -261,6 +374,7 @@ class AdminSessionListView(APIView):
                 'created_at': s.created_at.strftime('%d.%m.%Y %H:%M'),
                 'expires_at': s.expires_at.strftime('%d.%m.%Y'),
                 'invitation_sent_at': s.invitation_sent_at.strftime('%d.%m.%Y %H:%M') if s.invitation_sent_at else None,
+                'reminder_sent_at': s.reminder_sent_at.strftime('%d.%m.%Y %H:%M') if s.reminder_sent_at else None,
                 'gdt_patient_id': s.gdt_patient_id,
             })
         return Response(data)
@@ -287,36 +401,64 @@ class AdminSessionListView(APIView):
         except ValueError:
             return Response({'error': 'Ungültiges Datumsformat.'}, status=400)
 
-        template = QuestionnaireTemplate.objects.filter(is_active=True).order_by('-version').first()
+        template = registry.active_template()
         if not template:
             return Response({'error': 'Kein aktiver Fragebogen-Template gefunden.'}, status=500)
 
-        session = QuestionnaireSession.objects.create(
-            template=template,
-            patient_last_name=last_name,
-            patient_first_name=first_name,
-            patient_email=email,
-            patient_birth_date=birth_date,
-            expires_at=timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS),
-        )
-
-        sent = False
-        error_msg = None
-        if email:
-            try:
-                _send_invitation_email(session)
-                sent = True
-            except Exception as e:
-                sent = False
-                error_msg = str(e)
+        # Session und Einladung atomar; zugestellt wird asynchron (send_outbox)
+        with transaction.atomic():
+            session = QuestionnaireSession.objects.create(
+                template_id=template.pk,
+                patient_last_name=last_name,
+                patient_first_name=first_name,
+                patient_email=email,
+                patient_birth_date=birth_date,
+                expires_at=timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS),
+            )
+            if email:
+                outbox.enqueue_invitation(session)
 
         return Response({
             'token': str(session.token),
-            'email_sent': sent,
-            'email_error': error_msg,
+            'email_sent': False,
+            'email_queued': bool(email),
+            'email_error': None,
         }, status=201)
 
 
+class AdminBulkInviteView(APIView):
+    """
+    POST /api/admin/sessions/bulk/  – Sammel-Einladung (z.B. Fahrerliste eines Betriebs)
+
+    Body: {"patients": [{"patient_last_name": "...", "patient_first_name": "...",
+                         "patient_email": "...", "patient_birth_date": "..."}, ...],
+           "template_slug": "..."}   // optional
+    Ungültige Zeilen brechen die Kampagne nicht ab, sondern werden je Zeile
+    gemeldet; die Mails stellt send_outbox gedrosselt zu (siehe bulk.py).
+
+    Response (201): {"created": n, "queued": n, "invalid": n, "results": [...]}
+    """
+    permission_classes = [AdminApiKeyPermission]
+
+    def post(self, request):
+        patients = request.data.get('patients') if isinstance(request.data, dict) else None
+        if not isinstance(patients, list) or not patients:
+            return Response({'error': 'patients muss eine nicht-leere Liste sein.'}, status=400)
+        limit = settings.BULK_INVITE_MAX
+        if len(patients) > limit:
+            return Response({'error': f'Höchstens {limit} Einträge pro Aufruf.'}, status=400)
+
+        template = registry.active_template(str(request.data.get('template_slug') or '').strip())
+        if not template:
+            return Response({'error': 'Kein aktiver Fragebogen-Template gefunden.'}, status=500)
+
+        results, _ = bulk.invite_many(patients, template)
+        counts = {s: 0 for s in (bulk.STATUS_CREATED, bulk.STATUS_QUEUED, bulk.STATUS_INVALID)}
+        for result in results:
+            counts[result['status']] += 1
+        return Response({**counts, 'results': results}, status=201)
+
+
 class AdminUpdateSessionView(APIView):
     """
     PATCH /api/admin/sessions/<token>/update/  – Patientendaten ändern
@@ -352,7 +494,7 @@ class AdminUpdateSessionView(APIView):
 
 class AdminResendEmailView(APIView):
     """
-    POST /api/admin/sessions/<token>/resend/  – Einladung erneut senden
+    POST /api/admin/sessions/<token>/resend/  – Einladung erneut senden (über die Outbox)
     """
     permission_classes = [AdminApiKeyPermission]
 
@@ -363,13 +505,15 @@ class AdminResendEmailView(APIView):
         if not session.patient_email:
             return Response({'error': 'Keine E-Mail-Adresse hinterlegt.'}, status=400)
         # Gültigkeit verlängern, damit die Angabe in der neuen Mail stimmt
-        session.expires_at = timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS)
-        session.save(update_fields=['expires_at'])
-        try:
-            _send_invitation_email(session)
-            return Response({'success': True})
-        except Exception as e:
-            return Response({'error': str(e)}, status=500)
+        with transaction.atomic():
+            session.expires_at = timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS)
+            # Neue Einladung → Erinnerung erst wieder ab deren Zustellung fällig
+            # (bis dahin kein invitation_sent_at, sonst zählte die alte Einladung)
+            session.invitation_sent_at = None
+            session.reminder_sent_at = None
+            session.save(update_fields=['expires_at', 'invitation_sent_at', 'reminder_sent_at'])
+            outbox.enqueue_invitation(session)
+        return Response({'success': True, 'email_queued': True})
 
 
 class AdminDeleteSessionView(APIView):
@@ -406,10 +550,26 @@ class GdtSessionCreateView(APIView):
         "token": "<uuid>",
         "url":   "https://app.example.com/q/<uuid>"
     }
+
+    Optionaler Header Idempotency-Key: Die Bridge wiederholt Anlagen nach
+    Netzfehlern aus ihrer Offline-Warteschlange; mit demselben Key gibt es
+    dieselbe Session zurück (Header Idempotent-Replayed: true) statt einer
+    zweiten Session samt zweiter Einladung.
     """
     permission_classes = [AdminApiKeyPermission]
 
     def post(self, request):
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+        if len(idempotency_key) > submission.IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {'error': 'Idempotency-Key ist zu lang.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if idempotency_key:
+            existing = QuestionnaireSession.objects.filter(idempotency_key=idempotency_key).first()
+            if existing is not None:
+                return self._created(existing, replayed=True)
+
         d = request.data
         last_name  = d.get('patient_last_name',  '').strip()
         first_name = d.get('patient_first_name', '').strip()
@@ -429,21 +589,17 @@ class GdtSessionCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Template holen
+        # Template holen (aus der Registry, ohne DB-Roundtrip)
         template_slug = d.get('template_slug', '').strip()
         if template_slug:
-            template = QuestionnaireTemplate.objects.filter(
-                slug=template_slug, is_active=True
-            ).order_by('-version').first()
+            template = registry.active_template(template_slug)
             if not template:
                 return Response(
                     {'error': f'Template "{template_slug}" nicht gefunden.'},
                     status=status.HTTP_404_NOT_FOUND,
                 )
         else:
-            template = QuestionnaireTemplate.objects.filter(
-                is_active=True
-            ).order_by('-version').first()
+            template = registry.active_template()
             if not template:
                 return Response(
                     {'error': 'Kein aktiver Fragebogen-Template vorhanden.'},
@@ -452,39 +608,46 @@ class GdtSessionCreateView(APIView):
 
         patient_email = d.get('patient_email', '').strip()
 
-        session = QuestionnaireSession.objects.create(
-            template           = template,
-            patient_last_name  = last_name,
-            patient_first_name = first_name,
-            patient_birth_date = birth_date,
-            patient_email      = patient_email,
-            gdt_patient_id     = d.get('gdt_patient_id',  '').strip(),
-            gdt_request_id     = d.get('gdt_request_id',  '').strip(),
-            expires_at         = timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS),
-        )
-
-        questionnaire_url = f"{settings.APP_URL}/q/{session.token}"
+        try:
+            with transaction.atomic():
+                session = QuestionnaireSession.objects.create(
+                    template_id        = template.pk,
+                    patient_last_name  = last_name,
+                    patient_first_name = first_name,
+                    patient_birth_date = birth_date,
+                    patient_email      = patient_email,
+                    gdt_patient_id     = d.get('gdt_patient_id',  '').strip(),
+                    gdt_request_id     = d.get('gdt_request_id',  '').strip(),
+                    expires_at         = timezone.now() + timedelta(days=settings.SESSION_VALIDITY_DAYS),
+                    idempotency_key    = idempotency_key,
+                )
+                # Kein SMTP im Request: die Bridge wartet höchstens 15 s auf die Antwort
+                if patient_email:
+                    outbox.enqueue_invitation(session)
+        except IntegrityError:
+            # Gleichzeitige Wiederholung mit demselben Key war schneller
+            existing = QuestionnaireSession.objects.filter(idempotency_key=idempotency_key).first()
+            if not idempotency_key or existing is None:
+                raise
+            return self._created(existing, replayed=True)
 
-        email_sent = False
-        email_error = None
-        if patient_email:
-            try:
-                _send_invitation_email(session)
-                email_sent = True
-            except Exception as exc:
-                # E-Mail-Fehler blockiert die GDT-Session nicht, wird aber gemeldet
-                email_error = str(exc)
-                logger.error('Einladungs-Mail fehlgeschlagen (Session %s): %s', session.token, exc)
+        return self._created(session)
 
-        return Response(
+    @staticmethod
+    def _created(session, replayed=False):
+        response = Response(
             {
-                'token':       str(session.token),
-                'url':         questionnaire_url,
-                'email_sent':  email_sent,
-                'email_error': email_error,
+                'token':        str(session.token),
+                'url':          f"{settings.APP_URL}/q/{session.token}",
+                'email_sent':   False,
+                'email_queued': bool(session.patient_email),
+                'email_error':  None,
             },
             status=status.HTTP_201_CREATED,
         )
+        if replayed:
+            response['Idempotent-Replayed'] = 'true'
+        return response
 
 
 class GdtResultView(APIView):
@@ -508,7 +671,7 @@ class GdtResultView(APIView):
     }
 
     Response (202, noch nicht abgeschlossen):
-    { "completed": false }
+    { "completed": false, "expires_at": "2026-04-04T10:00:00+00:00" }
     """
     permission_classes = [AdminApiKeyPermission]
 
@@ -522,7 +685,7 @@ class GdtResultView(APIView):
                     {'error': 'Session abgelaufen.'},
                     status=status.HTTP_410_GONE,
                 )
-            return Response({'completed': False}, status=status.HTTP_202_ACCEPTED)
+            return Response(gdt_pending_payload(session), status=status.HTTP_202_ACCEPTED)
 
         try:
             answer_set = session.answers
@@ -532,26 +695,121 @@ class GdtResultView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        band_map = {
-            'normal':      'Normal (0–9)',
-            'erhöht':      'Erhöht (10–15)',
-            'ausgeprägt':  'Ausgeprägt (≥16) – ärztliche Abklärung erforderlich',
+        return Response(gdt_result_payload(session, answer_set))
+
+
+GDT_STATUS_COMPLETED = 'completed'
+GDT_STATUS_PENDING = 'pending'
+GDT_STATUS_EXPIRED = 'expired'
+GDT_STATUS_NOT_FOUND = 'not_found'
+
+
+def gdt_batch_entry(session):
+    """Eintrag für POST /api/gdt/results/ – dieselben Fälle wie GET /api/gdt/result/<token>/."""
+    if session is None:
+        return {'status': GDT_STATUS_NOT_FOUND}
+    if not session.completed:
+        if session.is_expired():
+            return {'status': GDT_STATUS_EXPIRED}
+        return {'status': GDT_STATUS_PENDING, **gdt_pending_payload(session)}
+    try:
+        answer_set = session.answers
+    except AnswerSet.DoesNotExist:
+        return {'status': GDT_STATUS_NOT_FOUND}
+    return {'status': GDT_STATUS_COMPLETED, **gdt_result_payload(session, answer_set)}
+
+
+class GdtResultBatchView(APIView):
+    """
+    POST /api/gdt/results/
+    Status vieler offener Sessions in einem Aufruf (GDT-Bridge, statt je Token
+    ein GET /api/gdt/result/<token>/). Eine Abfrage inkl. Antworten
+    (select_related), höchstens GDT_RESULTS_BATCH_MAX Tokens pro Aufruf.
+
+    Body: {"tokens": ["<uuid>", ...]}
+
+    Response (200):
+    {
+        "results": {
+            "<uuid>": {"status": "completed", "ess_total": 8, ...},   // wie GET (200)
+            "<uuid>": {"status": "pending", "completed": false, "expires_at": "..."},
+            "<uuid>": {"status": "expired"},                          // wie GET (410)
+            "<uuid>": {"status": "not_found"}                         // wie GET (404)
         }
+    }
+    """
+    permission_classes = [AdminApiKeyPermission]
 
-        evaluation = evaluate_answers(answer_set.answers_json)
+    def post(self, request):
+        tokens = request.data.get('tokens') if isinstance(request.data, dict) else None
+        if not isinstance(tokens, list) or not tokens:
+            return Response({'error': 'tokens muss eine nicht-leere Liste sein.'}, status=400)
+        limit = settings.GDT_RESULTS_BATCH_MAX
+        if len(tokens) > limit:
+            return Response({'error': f'Höchstens {limit} Tokens pro Aufruf.'}, status=400)
+        try:
+            parsed = {str(uuid.UUID(str(token))) for token in tokens}
+        except ValueError:
+            return Response({'error': 'Ungültiger Token in tokens.'}, status=400)
+
+        sessions = {
+            str(session.token): session
+            for session in QuestionnaireSession.objects.select_related('answers').filter(token__in=parsed)
+        }
+        return Response({
+            'results': {token: gdt_batch_entry(sessions.get(token)) for token in parsed},
+        })
+
+
+class GdtCompletionFeedView(APIView):
+    """
+    GET /api/gdt/completions/?since=<cursor>&limit=<n>
+    Abschluss-Feed für die GDT-Bridge: alle seit <cursor> abgeschlossenen
+    Sessions in Abschluss-Reihenfolge (completions.py). Ohne since ab dem
+    Anfang, since=latest liefert nur den aktuellen Cursor (Einstieg).
 
+    Response (200):
+    {
+        "events": [
+            {"cursor": "<cursor>", "token": "<uuid>", "completed": true, "ess_total": 8, ...},
+            ...
+        ],
+        "cursor":   "<cursor>",   // für den nächsten Aufruf (unverändert, wenn nichts neu)
+        "has_more": false         // true: sofort mit dem neuen Cursor weiterlesen
+    }
+    """
+    permission_classes = [AdminApiKeyPermission]
+
+    def get(self, request):
+        since = request.query_params.get('since', '').strip()
+        if since == completions.LATEST:
+            return Response({
+                'events': [], 'cursor': completions.encode_cursor(completions.head()), 'has_more': False,
+            })
+        try:
+            seq = completions.decode_cursor(since)
+        except completions.InvalidCursor:
+            return Response({'error': 'Ungültiger Cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = settings.GDT_COMPLETIONS_PAGE_SIZE
+        try:
+            limit = min(max(int(request.query_params.get('limit', page_size)), 1), page_size)
+        except ValueError:
+            limit = page_size
+
+        sessions = completions.since(seq, limit)
+        has_more = len(sessions) > limit
+        events = []
+        for session in sessions[:limit]:
+            seq = session.completion_seq
+            try:
+                answer_set = session.answers
+            except AnswerSet.DoesNotExist:
+                continue
+            events.append({
+                'cursor': completions.encode_cursor(seq),
+                'token': str(session.token),
+                **gdt_result_payload(session, answer_set),
+            })
         return Response({
-            'completed':          True,
-            'auswertung_kritisch': evaluation['zusammenfassung']['kritisch'],
-            'auswertung_pruefen':  evaluation['zusammenfassung']['pruefen'],
-            'auswertung_hinweis':  evaluation['zusammenfassung']['hinweis'],
-            'completed_at':       session.completed_at.strftime('%d.%m.%Y') if session.completed_at else '',
-            'gdt_patient_id':     session.gdt_patient_id,
-            'gdt_request_id':     session.gdt_request_id,
-            'patient_last_name':  session.patient_last_name,
-            'patient_first_name': session.patient_first_name,
-            'patient_birth_date': session.patient_birth_date.strftime('%d.%m.%Y') if session.patient_birth_date else '',
-            'ess_total':          answer_set.ess_total,
-            'ess_band':           answer_set.ess_band,
-            'ess_band_text':      band_map.get(answer_set.ess_band or '', answer_set.ess_band or ''),
+            'events': events, 'cursor': completions.encode_cursor(seq), 'has_more': has_more,
         })
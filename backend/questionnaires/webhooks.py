@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Ausgehende Webhooks: abgeschlossene Fragebögen an Partnersysteme melden.
+
+Abonnements (WebhookSubscription) werden im Django-Admin gepflegt:
+
+- Der Event-Handler 'webhooks.enqueue' (jobs.py) legt nach jedem
+  'questionnaire.completed' je aktivem Abonnement eine WebhookEvent-Zeile an –
+  idempotent über (Abonnement, Session, Ereignis), da Handler at-least-once laufen.
+- deliver_due() (Job 'webhooks.deliver', periodisch alle
+  WEBHOOK_INTERVAL_SECONDS bzw. `manage.py send_webhooks`) fasst die fälligen
+  Ereignisse eines Abonnements zu einem POST zusammen (höchstens WEBHOOK_BATCH_SIZE):
+
+    POST <url>
+    Content-Type: application/json
+    X-Webhook-Id: <UUID der Zustellung>
+    X-Webhook-Signature: t=<Unix-Zeit>,v1=<hex HMAC-SHA256(secret, "<t>." + Body)>
+
+    {"delivery": "<UUID>", "events": [
+        {"id": 17, "type": "questionnaire.completed", "created_at": "…",
+         "data": {"token": "…", "ess_total": 11, …}}, …]}
+
+- Ergebnisse werden nur verbucht, solange die Reservierung (WEBHOOK_LEASE_SECONDS)
+  noch beim Worker liegt – dauert ein POST länger und ein zweiter Worker hat
+  den Stapel übernommen, überschreibt der späte Ausgang nichts.
+- Nur 2xx gilt als zugestellt (Weiterleitungen werden nicht verfolgt). Sonst
+  wird der Stapel mit exponentiellem Abstand wiederholt (WEBHOOK_BACKOFF_SECONDS
+  · 2^(Versuch-1), höchstens WEBHOOK_MAX_BACKOFF_SECONDS) und nach
+  WEBHOOK_MAX_ATTEMPTS Versuchen als 'dead' abgelegt.
+- Jeder POST wird in WebhookDelivery protokolliert (Statuscode, Dauer, Fehler).
+
+Zustellung at-least-once: Empfänger deduplizieren über events[].id und
+prüfen die Signatur wie verify_signature() (Zeitstempel gegen Replays).
+"""
+import hashlib
+import hmac
+import logging
+import random
+import time
+import uuid
+from datetime import timedelta
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import fastjson
+from .gdt_payload import gdt_result_payload
+from .models import AnswerSet, QuestionnaireSession, WebhookDelivery, WebhookEvent, WebhookSubscription
+from .submission import COMPLETED_EVENT
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+ID_HEADER = 'X-Webhook-Id'
+USER_AGENT = 'Verkehrsmedizin-Webhooks/1.0'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def sign(secret, timestamp, body):
+    """Wert für X-Webhook-Signature: HMAC-SHA256 über "<timestamp>." + body."""
+    mac = hmac.new(secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256)
+    return f't={timestamp},v1={mac.hexdigest()}'
+
+
+def verify_signature(secret, header, body, tolerance=300, now=None):
+    """Prüfung auf Empfängerseite: Signatur gültig und höchstens `tolerance` s alt?"""
+    try:
+        parts = dict(item.strip().split('=', 1) for item in header.split(','))
+        timestamp = int(parts['t'])
+    except (AttributeError, KeyError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    if tolerance and abs(now - timestamp) > tolerance:
+        return False
+    expected = sign(secret, timestamp, body)
+    return hmac.compare_digest(expected, f"t={timestamp},v1={parts.get('v1', '')}")
+
+
+def backoff_seconds(attempts):
+    """Wartezeit vor dem nächsten Versuch nach `attempts` Fehlschlägen (mit ±10 % Jitter)."""
+    base = _setting('WEBHOOK_BACKOFF_SECONDS', 30)
+    cap = _setting('WEBHOOK_MAX_BACKOFF_SECONDS', 6 * 3600)
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def enqueue_completed(data):
+    """Abgeschlossene Session für alle aktiven Abonnements vormerken → Anzahl neuer Ereignisse."""
+    subscription_ids = list(
+        WebhookSubscription.objects.filter(is_active=True).values_list('id', flat=True)
+    )
+    if not subscription_ids:
+        return 0
+    session = (
+        QuestionnaireSession.objects.select_related('answers')
+        .filter(pk=data['session_id']).first()
+    )
+    if session is None:
+        return 0
+    try:
+        answer_set = session.answers
+    except AnswerSet.DoesNotExist:
+        return 0
+    # bulk_create(ignore_conflicts=True) liefert alle übergebenen Objekte zurück,
+    # auch die verworfenen – gezählt wird daher über die vorhandenen Zeilen
+    existing = WebhookEvent.objects.filter(session_id=session.pk, event=COMPLETED_EVENT)
+    before = set(existing.values_list('subscription_id', flat=True))
+    missing = [subscription_id for subscription_id in subscription_ids if subscription_id not in before]
+    if not missing:
+        return 0
+    payload = gdt_result_payload(session, answer_set)
+    payload.update(token=str(session.token), completed_at=data['completed_at'])
+    WebhookEvent.objects.bulk_create(
+        [
+            WebhookEvent(
+                subscription_id=subscription_id,
+                session_id=session.pk,
+                event=COMPLETED_EVENT,
+                payload=payload,
+            )
+            for subscription_id in missing
+        ],
+        ignore_conflicts=True,
+    )
+    return existing.count() - len(before)
+
+
+def _claim(subscription_id, batch_size):
+    """Fällige Ereignisse eines Abonnements reservieren (wie outbox._claim)."""
+    now = timezone.now()
+    lease = timedelta(seconds=_setting('WEBHOOK_LEASE_SECONDS', 120))
+    with transaction.atomic():
+        ids = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                subscription_id=subscription_id,
+                status=WebhookEvent.STATUS_PENDING,
+                next_attempt_at__lte=now,
+            )
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            WebhookEvent.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+    return list(WebhookEvent.objects.filter(id__in=ids).order_by('id'))
+
+
+class _NoRedirect(urlrequest.HTTPRedirectHandler):
+    """Weiterleitungen nicht verfolgen – urllib würde aus dem POST ein GET machen."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urlrequest.build_opener(_NoRedirect)
+
+
+def _post(subscription, events):
+    """Einen Stapel zustellen → (ok, status_code, error); protokolliert als WebhookDelivery."""
+    delivery_id = uuid.uuid4()
+    body = fastjson.dumps({
+        'delivery': str(delivery_id),
+        'events': [
+            {
+                'id': event.pk,
+                'type': event.event,
+                'created_at': event.created_at.isoformat(),
+                'data': event.payload,
+            }
+            for event in events
+        ],
+    })
+    request = urlrequest.Request(
+        subscription.url,
+        data=body,
+        method='POST',
+        headers={
+            'Content-Type': 'application/json',
+            'User-Agent': USER_AGENT,
+            ID_HEADER: str(delivery_id),
+            SIGNATURE_HEADER: sign(subscription.secret, int(time.time()), body),
+        },
+    )
+    status_code = None
+    error = ''
+    started = time.perf_counter()
+    try:
+        with _opener.open(request, timeout=_setting('WEBHOOK_TIMEOUT_SECONDS', 10)) as response:
+            status_code = response.status
+    except urlerror.HTTPError as exc:
+        status_code = exc.code
+        error = f'HTTP {exc.code} {exc.reason}'.strip()
+    except (urlerror.URLError, OSError) as exc:
+        error = str(getattr(exc, 'reason', None) or exc) or exc.__class__.__name__
+    ok = status_code is not None and 200 <= status_code < 300
+    if status_code is not None and not ok and not error:
+        error = f'HTTP {status_code}'
+    WebhookDelivery.objects.create(
+        subscription=subscription,
+        delivery_id=delivery_id,
+        event_ids=[event.pk for event in events],
+        ok=ok,
+        status_code=status_code,
+        error=error,
+        duration_ms=int((time.perf_counter() - started) * 1000),
+    )
+    return ok, status_code, error
+
+
+def _held(event):
+    """Die Zeile, solange die Reservierung noch beim Aufrufer liegt (wie outbox._held)."""
+    return WebhookEvent.objects.filter(
+        pk=event.pk, status=WebhookEvent.STATUS_PENDING, next_attempt_at=event.next_attempt_at,
+    )
+
+
+def _lease_lost(event):
+    logger.warning('Webhook-Ereignis %s: Reservierung verloren, Ergebnis nicht verbucht', event.pk)
+
+
+def _mark_sent(events):
+    """Als zugestellt verbuchen → Anzahl (ohne Ereignisse, die inzwischen ein anderer Worker hält)."""
+    now = timezone.now()
+    sent = 0
+    for event in events:
+        if _held(event).update(
+            status=WebhookEvent.STATUS_SENT, sent_at=now, attempts=event.attempts + 1, last_error='',
+        ):
+            sent += 1
+        else:
+            _lease_lost(event)
+    return sent
+
+
+def _mark_failed(subscription, events, error, stats):
+    max_attempts = _setting('WEBHOOK_MAX_ATTEMPTS', 10)
+    for event in events:
+        attempts = event.attempts + 1
+        if attempts >= max_attempts:
+            if not _held(event).update(
+                status=WebhookEvent.STATUS_DEAD, attempts=attempts, last_error=error,
+            ):
+                _lease_lost(event)
+                continue
+            logger.error('Webhook-Ereignis %s an %s endgültig fehlgeschlagen: %s', event.pk, subscription.url, error)
+            stats['dead'] += 1
+            continue
+        if not _held(event).update(
+            attempts=attempts,
+            last_error=error,
+            next_attempt_at=timezone.now() + timedelta(seconds=backoff_seconds(attempts)),
+        ):
+            _lease_lost(event)
+            continue
+        stats['retry'] += 1
+    logger.warning('Webhook an %s fehlgeschlagen (%s Ereignis(se)): %s', subscription.url, len(events), error)
+
+
+def deliver_due(batch_size=None):
+    """
+    Fällige Ereignisse zustellen: je aktivem Abonnement ein POST mit bis zu
+    batch_size (Default WEBHOOK_BATCH_SIZE) Ereignissen.
+    Rückgabe: {'posts': n, 'sent': n, 'retry': n, 'dead': n}
+    """
+    batch_size = batch_size or _setting('WEBHOOK_BATCH_SIZE', 50)
+    stats = {'posts': 0, 'sent': 0, 'retry': 0, 'dead': 0}
+    due = (
+        WebhookEvent.objects
+        .filter(
+            status=WebhookEvent.STATUS_PENDING,
+            next_attempt_at__lte=timezone.now(),
+            subscription__is_active=True,
+        )
+        .values_list('subscription_id', flat=True)
+        .distinct()
+    )
+    for subscription in WebhookSubscription.objects.filter(pk__in=list(due)):
+        events = _claim(subscription.pk, batch_size)
+        if not events:
+            continue
+        ok, _status_code, error = _post(subscription, events)
+        stats['posts'] += 1
+        if ok:
+            stats['sent'] += _mark_sent(events)
+        else:
+            _mark_failed(subscription, events, error, stats)
+    return stats
+
+
+def pending_count():
+    return WebhookEvent.objects.filter(status=WebhookEvent.STATUS_PENDING).count()
@@ -47,6 +47,7 @@ interface Session {
   created_at: string;
   expires_at: string;
   invitation_sent_at: string | null;
+  reminder_sent_at: string | null;
   gdt_patient_id: string;
 }
 
@@ -256,6 +257,8 @@ function Dashboard({ apiKey, onLogout }: { apiKey: string; onLogout: () => void
           toast.success("Session angelegt (keine E-Mail).");
         } else if (data.email_sent) {
           toast.success("Session angelegt, E-Mail versendet.");
+        } else if (data.email_queued) {
+          toast.success("Session angelegt, E-Mail wird versendet.");
         } else {
           toast.warning(`Session angelegt. E-Mail-Fehler: ${data.email_error}`);
         }
@@ -290,7 +293,7 @@ function Dashboard({ apiKey, onLogout }: { apiKey: string; onLogout: () => void
       const res = await fetch(`/api/admin/sessions/${token}/resend/`, { method: "POST", headers });
       const data = await res.json();
       if (res.ok) {
-        toast.success("Einladung erneut versendet.");
+        toast.success(data.email_queued ? "Einladung wird erneut versendet." : "Einladung erneut versendet.");
       } else {
         toast.error(data.error || "Fehler");
       }
@@ -11,26 +11,31 @@ export async function GET(
 
   // Internal app URL: Puppeteer runs inside the same container
   const appUrl = process.env.NEXT_PUBLIC_APP_URL || "http://localhost:3000";
-  const printUrl = `${appUrl}/print/${token}`;
 
-  // Session erst validieren, bevor eine Chromium-Instanz gestartet wird
+  // Session validieren und Druck-Ticket holen, bevor eine Chromium-Instanz
+  // gestartet wird: Das Backend berechnet die Druckdaten dabei einmal und
+  // hält sie unter dem Ticket bereit – die Print-Page fragt nicht erneut ab.
   const backendUrl = process.env.BACKEND_URL || "http://localhost:8000";
+  let ticket: string;
   try {
-    const check = await fetch(`${backendUrl}/api/answers/${token}/`, {
+    const res = await fetch(`${backendUrl}/api/print/${token}/ticket/`, {
+      method: "POST",
       cache: "no-store",
     });
-    if (!check.ok) {
+    if (!res.ok) {
       return NextResponse.json(
         { error: "Fragebogen nicht gefunden oder noch nicht abgeschlossen" },
-        { status: check.status === 400 ? 409 : 404 }
+        { status: res.status === 400 ? 409 : 404 }
       );
     }
+    ticket = (await res.json()).ticket;
   } catch {
     return NextResponse.json(
       { error: "Backend nicht erreichbar" },
       { status: 502 }
     );
   }
+  const printUrl = `${appUrl}/print/${token}?ticket=${encodeURIComponent(ticket)}`;
 
   // webpackIgnore verhindert dass webpack diesen Import analysiert/bundelt
   const puppeteer = (await import(/* webpackIgnore: true */ "puppeteer-core")).default;
@@ -3,15 +3,12 @@ import fs from "fs";
 import path from "path";
 import { ESS_QUESTIONS } from "@/lib/ess";
 import {
-  answerDisplay,
-  isV2Schema,
-  isVisible,
+  resolveEvaluation,
+  type CompactEvaluation,
   type EvaluationFinding,
   type EvaluationResult,
-  type Question,
-  type Schema,
+  type RuleCatalog,
   type Schwere,
-  type Section as SchemaSection,
 } from "@/lib/schema";
 
 const BACKEND_URL = process.env.BACKEND_URL || "http://localhost:8000";
@@ -39,18 +36,106 @@ interface AnswerData {
   patient_birth_date: string;
 }
 
+/** Druckfertige Zeile aus GET /api/print/<token>/ (nur sichtbare Fragen). */
+interface PrintRow {
+  id: string;
+  type: string;
+  label: string;
+  value?: unknown;
+  display?: string;
+  highlight?: boolean;
+  followup?: { label: string; text: string };
+  total?: number;
+  items?: { id: string; label: string; value: unknown }[];
+}
+
+interface PrintSectionData {
+  id: string;
+  number: number;
+  title: string;
+  pdf_note: string;
+  rows: PrintRow[];
+}
+
+/** Viewmodel für v2-Templates – Sichtbarkeit/Anzeigetexte berechnet das Backend. */
+interface PrintData {
+  title: string;
+  token: string;
+  patient_last_name: string;
+  patient_first_name: string;
+  patient_birth_date: string;
+  completed_at: string | null;
+  ess_total: number;
+  ess_band: string;
+  evaluation?: EvaluationResult;
+  sections: PrintSectionData[];
+}
+
+type PrintPayload =
+  | { kind: "v2"; data: PrintData }
+  | { kind: "legacy"; data: AnswerData };
+
+async function getRuleCatalog(version: string): Promise<RuleCatalog | null> {
+  try {
+    // Versionierte URL: Katalog ändert sich nur mit Deployments → lange cachen
+    const res = await fetch(`${BACKEND_URL}/api/evaluation/rules/?v=${version}`, {
+      next: { revalidate: 86400 },
+    });
+    if (!res.ok) return null;
+    return res.json();
+  } catch {
+    return null;
+  }
+}
+
 async function getAnswerData(token: string): Promise<AnswerData | null> {
   try {
     const res = await fetch(`${BACKEND_URL}/api/answers/${token}/`, {
       cache: "no-store",
     });
     if (!res.ok) return null;
+    const data = await res.json();
+    // Kompakte Befunde (Regel-ID + params) mit den Katalogtexten auflösen
+    const compact = data.evaluation as CompactEvaluation | undefined;
+    if (compact?.rules_version) {
+      const catalog = await getRuleCatalog(compact.rules_version);
+      data.evaluation = catalog ? resolveEvaluation(compact, catalog) : undefined;
+    }
+    return data;
+  } catch {
+    return null;
+  }
+}
+
+/** Druckdaten über ein Ticket der puppeteer-pdf-Route (bereits berechnet). */
+async function getTicketPayload(ticket: string): Promise<PrintPayload | null> {
+  try {
+    const res = await fetch(
+      `${BACKEND_URL}/api/print/ticket/${encodeURIComponent(ticket)}/`,
+      { cache: "no-store" }
+    );
+    if (!res.ok) return null;
     return res.json();
   } catch {
     return null;
   }
 }
 
+async function getPrintPayload(token: string): Promise<PrintPayload | null> {
+  try {
+    const res = await fetch(`${BACKEND_URL}/api/print/${token}/`, {
+      cache: "no-store",
+    });
+    if (res.ok) return { kind: "v2", data: await res.json() };
+    // 409 = Legacy-Template (v1) → bisheriges Layout aus den Rohantworten
+    if (res.status !== 409) return null;
+  } catch {
+    return null;
+  }
+  const data = await getAnswerData(token);
+  return data ? { kind: "legacy", data } : null;
+}
+
 // ─── Helper Components ────────────────────────────────────────────────────────
 
 function Cb({
@@ -289,11 +374,11 @@ function essBandLabel(total: number): string {
 /** ESS-Tabelle (Kopf, 8 Zeilen, Summenzeile) – Labels konfigurierbar. */
 function EssTable({
   labels,
-  answers,
+  values,
   essTotal,
 }: {
   labels: string[];
-  answers: Record<string, unknown>;
+  values: unknown[];
   essTotal: number;
 }) {
   return (
@@ -323,7 +408,7 @@ function EssTable({
         ))}
       </div>
       {labels.map((label, i) => {
-        const val = String(answers[`ess_${i + 1}`] ?? "");
+        const val = String(values[i] ?? "");
         return (
           <div
             key={i}
@@ -371,7 +456,10 @@ function PrintHeader({
   logoDataUrl,
   title,
 }: {
-  data: AnswerData;
+  data: Pick<
+    AnswerData,
+    "patient_last_name" | "patient_first_name" | "patient_birth_date" | "completed_at"
+  >;
   logoDataUrl: string;
   title: string;
 }) {
@@ -485,7 +573,7 @@ function SignatureRow() {
   );
 }
 
-// ─── V2: generisches Rendering aus dem Schema ─────────────────────────────────
+// ─── V2: Rendering aus dem Print-Viewmodel (/api/print/<token>/) ──────────────
 
 // ─── Automatische Auswertung (BASt-Leitlinien) ───────────────────────────────
 
@@ -624,43 +712,30 @@ function EvaluationBlock({ evaluation }: { evaluation: EvaluationResult }) {
   );
 }
 
-function followupText(
-  q: Question,
-  answers: Record<string, unknown>
-): { ft?: string; ftLabel?: string } {
-  const f = q.followup;
-  if (!f || answers[q.id] !== (f.when ?? "yes")) return {};
-  const raw = answers[f.id];
-  if (typeof raw !== "string" || raw.trim() === "") return {};
-  return { ft: raw.trim(), ftLabel: f.label };
-}
-
 function PrintSection({
-  index,
   section,
-  answers,
   essTotal,
 }: {
-  index: number;
-  section: SchemaSection;
-  answers: Record<string, unknown>;
+  section: PrintSectionData;
   essTotal: number;
 }) {
   const rows: React.ReactNode[] = [];
   let rowIdx = 0;
 
-  for (const q of section.questions) {
-    if (!isVisible(q, answers)) continue;
+  for (const row of section.rows) {
     const stripe = rowIdx % 2 === 1;
+    const ft = row.followup?.text;
+    const ftLabel = row.followup?.label;
 
-    if (q.type === "ess_matrix") {
+    if (row.type === "ess_matrix") {
+      const items = row.items ?? [];
       rows.push(
-        <div key={q.id}>
+        <div key={row.id}>
           <SecHeader title="ESS – 0 = Nie · 1 = Gering · 2 = Mittel · 3 = Hoch" />
           <EssTable
-            labels={(q.items ?? []).map((item) => item.label)}
-            answers={answers}
-            essTotal={essTotal}
+            labels={items.map((item) => item.label)}
+            values={items.map((item) => item.value)}
+            essTotal={row.total ?? essTotal}
           />
         </div>
       );
@@ -668,31 +743,29 @@ function PrintSection({
       continue;
     }
 
-    const { ft, ftLabel } = followupText(q, answers);
-
-    if (q.type === "yes_no") {
+    if (row.type === "yes_no") {
       rows.push(
         <YNRow
-          key={q.id}
-          label={q.label}
-          val={answers[q.id]}
+          key={row.id}
+          label={row.label}
+          val={row.value}
           ft={ft}
           ftLabel={ftLabel}
           stripe={stripe}
-          highlight={answers[q.id] === "yes"}
+          highlight={row.highlight}
         />
       );
-    } else if (q.type === "consent") {
+    } else if (row.type === "consent") {
       rows.push(
-        <YNRow key={q.id} label={q.label} val={String(answers[q.id])} target="true" stripe={stripe} />
+        <YNRow key={row.id} label={row.label} val={String(row.value)} target="true" stripe={stripe} />
       );
     } else {
       // choice / multi_choice / text / textarea
       rows.push(
         <TextRow
-          key={q.id}
-          label={q.label}
-          value={answerDisplay(q, answers[q.id])}
+          key={row.id}
+          label={row.label}
+          value={row.display ?? ""}
           ft={ft}
           ftLabel={ftLabel}
           stripe={stripe}
@@ -703,7 +776,7 @@ function PrintSection({
   }
 
   return (
-    <Section title={`${index}. ${section.title}`}>
+    <Section title={`${section.number}. ${section.title}`}>
       {rows}
       {section.pdf_note && (
         <div
@@ -722,37 +795,18 @@ function PrintSection({
   );
 }
 
-function PrintV2({
-  data,
-  schema,
-  logoDataUrl,
-}: {
-  data: AnswerData;
-  schema: Schema;
-  logoDataUrl: string;
-}) {
-  const a = data.answers;
+function PrintV2({ data, logoDataUrl }: { data: PrintData; logoDataUrl: string }) {
   return (
     <div style={{ padding: "12px", maxWidth: "794px", margin: "0 auto" }}>
-      <PrintHeader
-        data={data}
-        logoDataUrl={logoDataUrl}
-        title={schema.title || "Verkehrsmedizinischer Fragebogen"}
-      />
+      <PrintHeader data={data} logoDataUrl={logoDataUrl} title={data.title} />
 
       {/* Automatische Auswertung nach BASt-Leitlinien */}
       {data.evaluation && <EvaluationBlock evaluation={data.evaluation} />}
 
       {/* Sektionen in 2 Spalten (CSS columns) */}
       <div style={{ columns: 2, columnGap: 6 }}>
-        {schema.sections.map((section, i) => (
-          <PrintSection
-            key={section.id}
-            index={i + 1}
-            section={section}
-            answers={a}
-            essTotal={data.ess_total}
-          />
+        {data.sections.map((section) => (
+          <PrintSection key={section.id} section={section} essTotal={data.ess_total} />
         ))}
       </div>
 
@@ -885,7 +939,11 @@ function LegacyPrint({ data, logoDataUrl }: { data: AnswerData; logoDataUrl: str
           {/* ESS */}
           <div style={{ border: "1px solid #c8d0e0", borderRadius: 4, overflow: "hidden", marginBottom: 6 }}>
             <SecHeader title="ESS – 0 = Nie · 1 = Gering · 2 = Mittel · 3 = Hoch" />
-            <EssTable labels={ESS_LABELS} answers={a} essTotal={data.ess_total} />
+            <EssTable
+              labels={ESS_LABELS}
+              values={ESS_LABELS.map((_, i) => a[`ess_${i + 1}`])}
+              essTotal={data.ess_total}
+            />
           </div>
 
         </div>
@@ -930,17 +988,23 @@ function LegacyPrint({ data, logoDataUrl }: { data: AnswerData; logoDataUrl: str
 
 export default async function PrintPage({
   params,
+  searchParams,
 }: {
   params: Promise<{ token: string }>;
+  searchParams: Promise<{ ticket?: string }>;
 }) {
   const { token } = await params;
-  const data = await getAnswerData(token);
-  if (!data) notFound();
+  const { ticket } = await searchParams;
+  // Mit Ticket (PDF-Pipeline) liegen die Daten schon fertig im Backend;
+  // ohne Ticket (Vorschau im Browser) direkt abfragen
+  const payload =
+    (ticket ? await getTicketPayload(ticket) : null) ?? (await getPrintPayload(token));
+  if (!payload) notFound();
 
   const logoDataUrl = getLogoDataUrl();
 
-  if (isV2Schema(data.schema)) {
-    return <PrintV2 data={data} schema={data.schema} logoDataUrl={logoDataUrl} />;
+  if (payload.kind === "v2") {
+    return <PrintV2 data={payload.data} logoDataUrl={logoDataUrl} />;
   }
-  return <LegacyPrint data={data} logoDataUrl={logoDataUrl} />;
+  return <LegacyPrint data={payload.data} logoDataUrl={logoDataUrl} />;
 }
@@ -23,6 +23,27 @@ import { Spinner } from "@/components/ui/spinner";
 
 const API_URL = ""; // Requests go via Next.js proxy rewrites → backend:8000
 
+// Eine ID pro Fragebogen-Abgabe (sessionStorage, übersteht Neuladen): Wiederholt der
+// Patient das Absenden nach einem Netzabbruch, liefert der Server die ursprüngliche
+// Bestätigung statt "bereits ausgefüllt". getRandomValues statt randomUUID – die
+// App läuft im LAN auch über http (kein Secure Context)
+function submissionKey(token: string): string {
+  const storageKey = `submit-key:${token}`;
+  const fresh = () =>
+    Array.from(crypto.getRandomValues(new Uint8Array(16)), (b) =>
+      b.toString(16).padStart(2, "0")
+    ).join("");
+  try {
+    const existing = sessionStorage.getItem(storageKey);
+    if (existing) return existing;
+    const key = fresh();
+    sessionStorage.setItem(storageKey, key);
+    return key;
+  } catch {
+    return fresh();
+  }
+}
+
 // DRF-Fehlerobjekte ({"feld": ["Meldung"]} oder {"error": "..."}) menschenlesbar machen
 function extractApiError(d: unknown): string {
   if (!d || typeof d !== "object") return "Fehler beim Absenden. Bitte versuchen Sie es erneut.";
@@ -123,7 +144,10 @@ export default function QuestionnairePage() {
     try {
       const res = await fetch(`${API_URL}/api/submit/${token}/`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          "Idempotency-Key": submissionKey(token),
+        },
         body: JSON.stringify(data),
       });
       if (!res.ok) {
@@ -71,6 +71,7 @@ export type Answers = Record<string, unknown>;
 export type Schwere = "kritisch" | "pruefen" | "hinweis";
 
 export interface EvaluationFinding {
+  id?: string;
   schwere: Schwere;
   bereich: string;
   kapitel: string;
@@ -83,6 +84,65 @@ export interface EvaluationResult {
   findings: EvaluationFinding[];
   zusammenfassung: Record<Schwere, number>;
   disclaimer: string;
+  rules_version?: string;
+}
+
+/** Kompakter Befund aus /api/answers/: Texte stehen im Regelkatalog. */
+export interface CompactFinding {
+  id: string;
+  schwere: Schwere;
+  params?: Record<string, string | number>;
+}
+
+export interface CompactEvaluation {
+  gruppe2: boolean;
+  findings: CompactFinding[];
+  zusammenfassung: Record<Schwere, number>;
+  rules_version: string;
+}
+
+export interface RuleText {
+  bereich: string;
+  kapitel: string;
+  befund: string;
+  konsequenz: string;
+}
+
+/** Antwort von /api/evaluation/rules/ */
+export interface RuleCatalog {
+  version: string;
+  disclaimer: string;
+  rules: Record<string, RuleText>;
+}
+
+/**
+ * Kompakte Auswertung + Regelkatalog → Auswertung mit Texten
+ * (exakt wie backend/questionnaires/evaluation.py::render_finding).
+ */
+export function resolveEvaluation(
+  evaluation: CompactEvaluation,
+  catalog: RuleCatalog
+): EvaluationResult {
+  return {
+    gruppe2: evaluation.gruppe2,
+    zusammenfassung: evaluation.zusammenfassung,
+    rules_version: evaluation.rules_version,
+    disclaimer: catalog.disclaimer,
+    findings: evaluation.findings.map((f) => {
+      const rule = catalog.rules[f.id];
+      const params = f.params ?? {};
+      return {
+        id: f.id,
+        schwere: f.schwere,
+        bereich: rule?.bereich ?? f.id,
+        kapitel: rule?.kapitel ?? "",
+        befund: (rule?.befund ?? "").replace(/\{(\w+)\}/g, (m, key: string) =>
+          key in params ? String(params[key]) : m
+        ),
+        konsequenz: rule?.konsequenz ?? "",
+      };
+    }),
+  };
 }
 
 /** True, wenn das Schema das strukturierte v2-Format hat (sections als Objekte). */
@@ -0,0 +1,85 @@
+"""
+Durchsatz-Messung für gdt_codec – große Dateien mit vielen Sätzen
+
+  cd gdt_bridge
+  python bench_gdt_codec.py                      # 20 000 Sätze, cp1252
+  python bench_gdt_codec.py --records 100000 --encoding utf-8
+
+Gemessen werden decode (strikt und nachsichtig), encode und zum Vergleich der
+frühere Text-Parser (ganze Datei dekodieren, Zeilen bei Position 3/7 schneiden –
+ohne Längenprüfung, nur ein Satz). Bester Wert aus --repeat Läufen.
+"""
+import argparse
+import random
+import time
+
+import gdt_codec
+
+NAMES = ["Müller", "Schmidt", "Weiß", "Öztürk", "Jäger", "Krämer", "Groß", "Becker"]
+
+
+def sample_records(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        records.append([
+            ("8000", "6310"),
+            ("8100", "SAMAS"),
+            ("3000", f"{100000 + i}"),
+            ("3101", rng.choice(NAMES)),
+            ("3102", rng.choice(["Max", "Erika", "Jürgen", "Anna"])),
+            ("3103", f"{rng.randint(1, 28):02d}{rng.randint(1, 12):02d}{rng.randint(1930, 2005)}"),
+            ("3121", f"patient{i}@example.com"),
+            ("8315", f"REQ-{i:06d}"),
+            ("6220", "Verkehrsmedizinischer Fragebogen – Anforderung " * rng.randint(1, 4)),
+            ("8001", "6310"),
+        ])
+    return records
+
+
+def legacy_parse(data: bytes, encoding: str) -> dict:
+    """Früheres parse_gdt(): Text-Zeilen, Feldkennung fest an Position 3–7."""
+    fields: dict = {}
+    for raw in data.decode(encoding, errors="replace").splitlines():
+        if len(raw) < 8:
+            continue
+        fields.setdefault(raw[3:7], []).append(raw[7:])
+    return fields
+
+
+def best_of(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--encoding", default="cp1252")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    records = sample_records(args.records)
+    data = gdt_codec.encode(records, args.encoding)
+    mb = len(data) / 1e6
+    fields = sum(len(record) for record in records)
+    assert len(gdt_codec.decode(data, args.encoding)) == args.records
+
+    print(f"{args.records} Sätze, {fields} Felder, {mb:.1f} MB ({args.encoding})")
+    print(f"{'':22} {'Sekunden':>9} {'MB/s':>8} {'Felder/s':>11}")
+    for name, func, func_args in [
+        ("decode (strikt)", gdt_codec.decode, (data, args.encoding)),
+        ("decode (nachsichtig)", gdt_codec.decode, (data, args.encoding, None, False)),
+        ("encode", gdt_codec.encode, (records, args.encoding)),
+        ("alter Text-Parser", legacy_parse, (data, args.encoding)),
+    ]:
+        seconds = best_of(args.repeat, func, *func_args)
+        print(f"{name:22} {seconds:9.3f} {mb / seconds:8.1f} {fields / seconds:11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+r"""
+Metriken der GDT-Bridge
+=======================
+Zähler, Histogramme und Momentwerte im Prometheus-Textformat – ohne
+zusätzliche Abhängigkeit. Ausgabe:
+
+- Datei (metrics_file, Default metrics.prom neben dem Dienst), alle
+  metrics_interval_seconds neu geschrieben – erst *.tmp, dann umbenannt,
+  ein Leser sieht nie eine halbe Datei (z.B. Textfile-Collector des
+  windows_exporter)
+- optional HTTP (metrics_port, nur 127.0.0.1, falls nicht anders
+  konfiguriert): /metrics im Textformat, /health als JSON
+
+Stufen einer Anforderung (gdt_bridge_stage_total, gdt_bridge_stage_seconds
+= Sekunden seit der vorigen Stufe):
+
+  detected → staged → session_created → link_written → … → result_written
+
+Die Wartezeit bis result_written (Patient füllt aus) liegt in einem eigenen
+Histogramm mit Buckets bis 15 Tage (gdt_bridge_result_wait_seconds).
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+log = logging.getLogger("gdt_bridge")
+
+# Buckets in Sekunden
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+HTTP_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+RESULT_WAIT_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 14400, 43200, 86400, 259200, 604800, 1296000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Kumulative Buckets wie bei Prometheus (le = "kleiner oder gleich")."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        total, out = 0, []
+        for count in self.counts:
+            total += count
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Näherung aus den Buckets (lineare Interpolation wie histogram_quantile)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, count in zip(self.bounds, self.counts):
+            if seen + count >= rank and count:
+                return lower + (bound - lower) * (rank - seen) / count
+            lower, seen = bound, seen + count
+        return self.bounds[-1]
+
+
+class Metrics:
+    """
+    Thread-sichere Sammlung: Zähler und Histogramme mit Labels, dazu
+    Momentwerte (Gauges), die erst beim Ausgeben abgefragt werden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: dict = {}          # Name → (Typ, Hilfetext, Buckets bzw. Funktion)
+        self._counters: dict = {}      # (Name, Labels) → Wert
+        self._histograms: dict = {}    # (Name, Labels) → Histogram
+
+    # ── Anmelden ─────────────────────────────────────────────────────────
+    def counter(self, name: str, help_text: str) -> None:
+        self._meta[name] = ("counter", help_text, None)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple) -> None:
+        self._meta[name] = ("histogram", help_text, tuple(sorted(buckets)))
+
+    def gauge(self, name: str, help_text: str, func: Callable[[], Optional[float]]) -> None:
+        """func() liefert den aktuellen Wert (None = derzeit kein Wert)."""
+        self._meta[name] = ("gauge", help_text, func)
+
+    # ── Erfassen ─────────────────────────────────────────────────────────
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self._meta[name][2])
+            hist.observe(value)
+
+    # ── Lesen ────────────────────────────────────────────────────────────
+    def value(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def get_histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def gauge_value(self, name: str) -> Optional[float]:
+        try:
+            return self._meta[name][2]()
+        except Exception as exc:
+            log.debug("Metrik %s nicht lesbar: %s", name, exc)
+            return None
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat (Version 0.0.4)."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (hist.bounds, hist.cumulative(), hist.sum, hist.count)
+                for key, hist in self._histograms.items()
+            }
+        lines = []
+        for name, (kind, help_text, _) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "gauge":
+                value = self.gauge_value(name)
+                if value is not None:
+                    lines.append(f"{name} {_number(value)}")
+            elif kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            else:
+                for (metric, labels), (bounds, cumulative, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, seen in zip(bounds, cumulative):
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {seen}")
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                    lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """Atomar schreiben: *.tmp im selben Ordner, dann ersetzen."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8", newline="\n") as fh:
+            fh.write(self.render())
+        os.replace(tmp, path)
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTTP: /metrics und /health
+# ──────────────────────────────────────────────────────────────────────────────
+class MetricsServer:
+    """
+    Kleiner HTTP-Server im Hintergrund-Thread. health() → (ok, Details);
+    ok=False beantwortet /health mit 503, damit ein Monitoring alarmiert.
+    """
+
+    def __init__(self, metrics: Metrics, host: str, port: int,
+                 health: Callable[[], tuple]):
+        metrics_ref, health_ref = metrics, health
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path == "/metrics":
+                    self._send(200, CONTENT_TYPE, metrics_ref.render())
+                elif path == "/health":
+                    ok, details = health_ref()
+                    self._send(200 if ok else 503, "application/json",
+                               json.dumps(details, ensure_ascii=False))
+                else:
+                    self._send(404, "text/plain; charset=utf-8", "nicht gefunden\n")
+
+            def _send(self, status: int, content_type: str, body: str) -> None:
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):   # Abrufe nicht ins bridge.log
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        log.info("Metriken unter http://%s:%d/metrics", host, self.port)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+
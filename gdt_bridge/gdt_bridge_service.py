@@ -9,14 +9,24 @@ ausgefüllt wurde.
 Ablauf
 ------
 1. SAMAS schreibt  → C:\GDT\inbox\<patient>.gdt   (Satz 6310)
-2. Dieser Service liest die Datei, parsed GDT-Felder
+2. Der Inbox-Watcher (inbox_watcher.py: inotify bzw. ReadDirectoryChangesW,
+   sonst Polling) meldet die Datei sofort; der Service liest sie und parsed GDT-Felder
 3. POST /api/gdt/session/  → Django erstellt Session, gibt Token + URL zurück
 4. Service schreibt sofort eine "Link-GDT" → C:\GDT\outbox\<patient>.gdt
-   (SAMAS zeigt den Link zum Fragebogen an)
-5. Service prüft alle N Sekunden per GET /api/gdt/result/<token>/
-   ob der Fragebogen abgeschlossen wurde
+   (SAMAS zeigt den Link zum Fragebogen an). Ist der Server nicht erreichbar,
+   wird die Anlage zurückgestellt (inbox\queued\, Offline-Warteschlange in
+   pending.sqlite3), SAMAS erhält "Link wird erstellt" und der Link folgt,
+   sobald der Server wieder antwortet
+5. Service fragt alle N Sekunden den Abschluss-Feed ab
+   (GET /api/gdt/completions/?since=<cursor>, Cursor in pending.sqlite3);
+   ohne Feed per POST /api/gdt/results/ (Sammel-Abfrage, result_batch_size
+   Tokens pro Request), ob Fragebögen abgeschlossen wurden
 6. Wenn ja: schreibt finale Ergebnis-GDT → C:\GDT\outbox\<patient>_result.gdt
 
+Zähler und Latenzen je Stufe, Warteschlangen und HTTP-Fehler landen in
+metrics.prom bzw. optional unter http://127.0.0.1:<metrics_port>/metrics
+(siehe bridge_metrics.py).
+
 Installation / Deinstallation
 ------------------------------
   install.bat   (als Administrator ausführen)
@@ -28,21 +38,36 @@ Konfiguration
 """
 
 import configparser
-import json
 import logging
 import os
+import random
+import re
 import sys
 import threading
 import time
-from datetime import datetime, timedelta
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 import requests
-import servicemanager
-import win32event
-import win32service
-import win32serviceutil
+from requests.adapters import HTTPAdapter
+
+import gdt_codec
+from bridge_metrics import HTTP_BUCKETS, RESULT_WAIT_BUCKETS, STAGE_BUCKETS, Metrics, MetricsServer
+from inbox_watcher import create_watcher
+from pending_store import PendingStore
+
+try:
+    import servicemanager
+    import win32event
+    import win32service
+    import win32serviceutil
+except ImportError:  # Linux/macOS bzw. ohne pywin32: nur Konsolenmodus
+    win32serviceutil = None
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Pfad-Konstanten
@@ -50,24 +75,35 @@ import win32serviceutil
 SERVICE_DIR  = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
 CONFIG_FILE  = SERVICE_DIR / "config.ini"
 LOG_FILE     = SERVICE_DIR / "bridge.log"
-PENDING_FILE = SERVICE_DIR / "pending.json"  # offene Sessions die noch auf Ergebnis warten
+PENDING_DB   = SERVICE_DIR / "pending.sqlite3"  # offene Sessions die noch auf Ergebnis warten
+PENDING_FILE = SERVICE_DIR / "pending.json"     # bisheriges Format, wird einmalig übernommen
+METRICS_FILE = SERVICE_DIR / "metrics.prom"     # Prometheus-Textformat (bridge_metrics.py)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Logging  (rotierend: max. 1 MB pro Datei, 3 Backups)
 # ──────────────────────────────────────────────────────────────────────────────
-_file_handler = RotatingFileHandler(
-    str(LOG_FILE), maxBytes=1_000_000, backupCount=3, encoding="utf-8"
-)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s  %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[_file_handler],
-)
 log = logging.getLogger("gdt_bridge")
 
 
+def setup_logging() -> None:
+    """
+    bridge.log erst beim Start des Dienstes bzw. Konsolenmodus öffnen –
+    nicht schon beim Import (Lasttest, Tests, diagnose.py).
+    """
+    root = logging.getLogger()
+    if any(isinstance(h, RotatingFileHandler) for h in root.handlers):
+        return
+    handler = RotatingFileHandler(
+        str(LOG_FILE), maxBytes=1_000_000, backupCount=3, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s  %(levelname)-8s  %(message)s", datefmt="%Y-%m-%d %H:%M:%S",
+    ))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Konfiguration laden
 # ──────────────────────────────────────────────────────────────────────────────
@@ -78,32 +114,23 @@ def load_config() -> configparser.ConfigParser:
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# GDT-Parser  (GDT 2.1, Encoding konfigurierbar – siehe gdt_encoding in config.ini)
+# GDT-Parser  (GDT 2.1/3.0 über gdt_codec, Encoding konfigurierbar – siehe gdt_encoding)
 # ──────────────────────────────────────────────────────────────────────────────
 def parse_gdt(path: Path, encoding: str = "cp1252") -> dict:
     """
     Liest eine GDT-Datei (Satz 6310 – Daten einer Untersuchung übermitteln)
-    und gibt ein dict zurück.
-    Zeilenformat:  LLLFFFFFWert  (LLL = 3-stellige Länge, FFFFF = 5-stellige Feldkennung)
+    und gibt ein dict zurück (erster Satz der Datei).
+    Zeilenformat:  LLLFFFFWert  (LLL = Länge in Bytes, FFFF = Feldkennung, siehe gdt_codec)
+    Falsche Längenangaben werden toleriert und geloggt (strict=False).
     """
-    fields: dict[str, list[str]] = {}
     try:
-        with open(path, encoding=encoding, errors="replace") as fh:
-            for raw in fh:
-                line = raw.rstrip("\r\n")
-                if len(line) < 8:
-                    continue
-                # Zeilenlänge (3 Zeichen) + Feldkennung (4 oder 5 Zeichen)
-                # GDT 2.1 verwendet 4-stellige Feldkennungen
-                field_id = line[3:7]
-                value    = line[7:]
-                fields.setdefault(field_id, []).append(value)
+        records = gdt_codec.read_file(path, encoding=encoding, strict=False)
+        if not records:
+            raise gdt_codec.GdtError("Keine GDT-Sätze gefunden")
     except Exception as exc:
         log.error("GDT parse error %s: %s", path, exc)
         raise
-
-    def first(fid: str) -> str:
-        return (fields.get(fid) or [""])[0].strip()
+    first = records[0].first
 
     # Geburtsdatum DDMMYYYY → YYYY-MM-DD
     birth_date_raw = first("3103")
@@ -125,12 +152,22 @@ def parse_gdt(path: Path, encoding: str = "cp1252") -> dict:
 # ──────────────────────────────────────────────────────────────────────────────
 # GDT-Writer  (Ergebnis zurück an SAMAS)
 # ──────────────────────────────────────────────────────────────────────────────
-def _gdt_line(field_id: str, value: str) -> str:
-    """Erzeugt eine korrekte GDT-Zeile mit Längenangabe."""
-    # Länge = 3 (Längenfeld) + 4 (Feldkennung) + len(value) + 2 (CRLF)
-    content = f"{field_id}{value}"
-    length  = 3 + len(content) + 2
-    return f"{length:03d}{content}\r\n"
+def _patient_header(patient: dict) -> list:
+    """Satzbeginn 6311 mit Anforderungs- und Patientenfeldern (für alle Antwort-GDTs)."""
+    fields = [
+        ("8000", "6311"),          # Satzidentifikation: Ergebnis
+        ("8100", "Fragebogen"),    # Gerätename (muss in SAMAS konfiguriert sein)
+        ("8315", patient.get("gdt_request_id", "")),
+        ("3000", patient.get("gdt_patient_id", "")),
+        ("3101", patient.get("patient_last_name", "")),   # FK 3101 = Name
+        ("3102", patient.get("patient_first_name", "")),  # FK 3102 = Vorname
+    ]
+    if patient.get("patient_birth_date"):
+        # Zurück zu DDMMYYYY
+        bd = patient["patient_birth_date"]   # YYYY-MM-DD
+        if len(bd) == 10:
+            fields.append(("3103", f"{bd[8:10]}{bd[5:7]}{bd[0:4]}"))
+    return fields
 
 
 def write_link_gdt(path: Path, patient: dict, questionnaire_url: str,
@@ -139,39 +176,37 @@ def write_link_gdt(path: Path, patient: dict, questionnaire_url: str,
     Schreibt sofortige Antwort an SAMAS: Fragebogen-Link als GDT-Satz 6311.
     SAMAS zeigt diesen Befundtext in der Patientenakte an.
     """
-    today = datetime.now().strftime("%d%m%Y")
-    now   = datetime.now().strftime("%H%M%S")
-
-    lines = [
-        _gdt_line("8000", "6311"),          # Satzidentifikation: Ergebnis
-        _gdt_line("8100", "Fragebogen"),    # Gerätename (muss in SAMAS konfiguriert sein)
-        _gdt_line("8315", patient.get("gdt_request_id", "")),
-        _gdt_line("3000", patient.get("gdt_patient_id", "")),
-        _gdt_line("3101", patient.get("patient_last_name", "")),   # FK 3101 = Name
-        _gdt_line("3102", patient.get("patient_first_name", "")),  # FK 3102 = Vorname
+    fields = _patient_header(patient) + [
+        ("6200", datetime.now().strftime("%d%m%Y")),   # Untersuchungsdatum
+        ("6201", datetime.now().strftime("%H%M%S")),   # Uhrzeit
+        ("6220", "Fragebogen-Link wurde erstellt."),
+        ("6221", questionnaire_url),
+        ("6222", "Bitte senden Sie dem Patienten diesen Link."),
+        ("8001", "6311"),          # Satzende
     ]
-    if patient.get("patient_birth_date"):
-        # Zurück zu DDMMYYYY
-        bd = patient["patient_birth_date"]   # YYYY-MM-DD
-        if len(bd) == 10:
-            lines.append(_gdt_line("3103", f"{bd[8:10]}{bd[5:7]}{bd[0:4]}"))
-
-    lines += [
-        _gdt_line("6200", today),           # Untersuchungsdatum
-        _gdt_line("6201", now),             # Uhrzeit
-        _gdt_line("6220", "Fragebogen-Link wurde erstellt."),
-        _gdt_line("6221", questionnaire_url),
-        _gdt_line("6222", "Bitte senden Sie dem Patienten diesen Link."),
-        _gdt_line("8001", "6311"),          # Satzende
-    ]
-
-    path.parent.mkdir(parents=True, exist_ok=True)
-    # newline="" verhindert, dass Python das \r\n aus _gdt_line nochmals übersetzt
-    with open(path, "w", encoding=encoding, errors="replace", newline="") as fh:
-        fh.writelines(lines)
+    # Zeilenlängen in Bytes der Ziel-Kodierung (gdt_codec.encode_field)
+    gdt_codec.write_file(path, fields, encoding)
     log.info("Link-GDT geschrieben: %s", path)
 
 
+def write_link_pending_gdt(path: Path, patient: dict, encoding: str = "cp1252") -> None:
+    """
+    Vorläufige Antwort an SAMAS, solange der Server nicht erreichbar ist:
+    die Anforderung ist angenommen, der Link folgt (dieselbe Datei wird dann
+    von write_link_gdt überschrieben).
+    """
+    fields = _patient_header(patient) + [
+        ("6200", datetime.now().strftime("%d%m%Y")),
+        ("6201", datetime.now().strftime("%H%M%S")),
+        ("6220", "Fragebogen-Link wird erstellt."),
+        ("6221", "Server derzeit nicht erreichbar – der Link folgt automatisch."),
+        ("6222", "Bitte noch keinen Link an den Patienten senden."),
+        ("8001", "6311"),
+    ]
+    gdt_codec.write_file(path, fields, encoding)
+    log.info("Vorläufige Link-GDT geschrieben (Server offline): %s", path)
+
+
 def write_result_gdt(path: Path, patient: dict, result: dict,
                      encoding: str = "cp1252") -> None:
     """
@@ -187,53 +222,115 @@ def write_result_gdt(path: Path, patient: dict, result: dict,
     if completed_at and len(completed_at) == 10:
         exam_date = f"{completed_at[0:2]}{completed_at[3:5]}{completed_at[6:10]}"
 
-    lines = [
-        _gdt_line("8000", "6311"),
-        _gdt_line("8100", "Fragebogen"),
-        _gdt_line("8315", patient.get("gdt_request_id", "")),
-        _gdt_line("3000", patient.get("gdt_patient_id", "")),
-        _gdt_line("3101", patient.get("patient_last_name", "")),   # FK 3101 = Name
-        _gdt_line("3102", patient.get("patient_first_name", "")),  # FK 3102 = Vorname
-    ]
-    if patient.get("patient_birth_date"):
-        bd = patient["patient_birth_date"]
-        if len(bd) == 10:
-            lines.append(_gdt_line("3103", f"{bd[8:10]}{bd[5:7]}{bd[0:4]}"))
-
-    lines += [
-        _gdt_line("6200", exam_date if exam_date else datetime.now().strftime("%d%m%Y")),
-        _gdt_line("6201", datetime.now().strftime("%H%M%S")),
-        _gdt_line("6220", "Verkehrsmedizinischer Fragebogen ausgefüllt"),
-        _gdt_line("6221", f"Ausgefüllt am: {completed_at}"),
-        _gdt_line("6222", f"ESS-Gesamtscore: {ess_total}/24"),
-        _gdt_line("6223", f"Befund: {ess_band_text}"),
-        _gdt_line("8001", "6311"),
+    fields = _patient_header(patient) + [
+        ("6200", exam_date if exam_date else datetime.now().strftime("%d%m%Y")),
+        ("6201", datetime.now().strftime("%H%M%S")),
+        ("6220", "Verkehrsmedizinischer Fragebogen ausgefüllt"),
+        ("6221", f"Ausgefüllt am: {completed_at}"),
+        ("6222", f"ESS-Gesamtscore: {ess_total}/24"),
+        ("6223", f"Befund: {ess_band_text}"),
+        ("8001", "6311"),
     ]
-
-    path.parent.mkdir(parents=True, exist_ok=True)
-    # newline="" verhindert, dass Python das \r\n aus _gdt_line nochmals übersetzt
-    with open(path, "w", encoding=encoding, errors="replace", newline="") as fh:
-        fh.writelines(lines)
+    gdt_codec.write_file(path, fields, encoding)
     log.info("Ergebnis-GDT geschrieben: %s", path)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Pending-Sessions (warten auf Fragebogen-Abschluss)
+# Abfrageplan für offene Sessions (next_check_at je Eintrag)
 # ──────────────────────────────────────────────────────────────────────────────
-def load_pending() -> list[dict]:
-    if PENDING_FILE.exists():
-        try:
-            return json.loads(PENDING_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    return []
+FRESH_SECONDS  = 15 * 60   # so lange nach dem Anlegen: Abfrage alle poll_result_seconds
+BACKOFF_FACTOR = 0.1       # danach Abstand ≈ 10 % des Alters → exponentiell wachsende Abstände
+JITTER         = 0.2       # ±20 %, damit nicht alle Einträge im selben Zyklus fällig werden
+EXPIRY_GRACE   = 60        # letzte Abfrage kurz nach Ablauf des Links (→ 410, Eintrag weg)
 
 
-def save_pending(pending: list[dict]) -> None:
-    PENDING_FILE.write_text(
-        json.dumps(pending, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+def next_check_delay(age: float, base: float, cap: float) -> float:
+    """
+    Sekunden bis zur nächsten Ergebnis-Abfrage eines Eintrags, der `age`
+    Sekunden alt ist: frisch angelegte Sessions (Patient füllt evtl. gerade
+    aus) alle `base` Sekunden, danach proportional zum Alter bis höchstens
+    `cap` – eine zwei Wochen alte Session wird stündlich statt alle 30 s geprüft.
+    """
+    delay = base if age < FRESH_SECONDS else min(max(base, age * BACKOFF_FACTOR), cap)
+    return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After (Sekunden oder HTTP-Datum) → Sekunden ab jetzt, None wenn fehlend/ungültig."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_expires_at(value) -> Optional[float]:
+    """expires_at aus der 202-Antwort (ISO 8601) → Unix-Zeit, None wenn fehlend/ungültig."""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+# Status einer offenen Session (wie "status" in POST /api/gdt/results/)
+STATUS_COMPLETED = "completed"
+STATUS_PENDING   = "pending"
+STATUS_EXPIRED   = "expired"
+STATUS_NOT_FOUND = "not_found"
+
+FEED_CURSOR_KEY = "completions_cursor"   # Schlüssel in pending_store.state
+
+
+def _entry_age(entry: dict) -> float:
+    try:
+        return max(0.0, (datetime.now() - datetime.fromisoformat(entry["created_at"])).total_seconds())
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Offline-Warteschlange für Session-Anlagen
+# ──────────────────────────────────────────────────────────────────────────────
+# Nur diese Fehler lohnen eine Wiederholung; andere 4xx (ungültige Daten,
+# falscher API-Key) würden bei jedem Versuch gleich ausfallen
+TRANSIENT_STATUS = {408, 425, 429}
+
+
+class TransientError(Exception):
+    """Server vorübergehend nicht erreichbar (Netz, Timeout, 5xx, 408/429) – später erneut."""
+
+
+def offline_retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Wartezeit nach `attempts` fehlgeschlagenen Anlagen: base · 2^(n-1), höchstens cap, ±20 %."""
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Metriken
+# ──────────────────────────────────────────────────────────────────────────────
+# Hängt die Hauptschleife länger, meldet /health 503
+HEALTH_STALL_SECONDS = 300
+
+_TOKEN_SEGMENT = re.compile(r"/[0-9a-fA-F-]{32,36}(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    """API-Pfad als Metrik-Label: Tokens ersetzt, damit je Endpunkt nur eine Reihe entsteht."""
+    return _TOKEN_SEGMENT.sub("/{token}", path)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -247,206 +344,653 @@ class GdtBridge:
         self.processing   = self.inbox / "processing"   # Staging während der Verarbeitung
         self.processed    = self.inbox / "processed"    # erfolgreich verarbeitet
         self.failed       = self.inbox / "failed"       # fehlgeschlagen (manuell prüfen)
+        self.queued       = self.inbox / "queued"       # Server offline, Anlage wird nachgeholt
         self.api_url      = s["api_url"].rstrip("/")
         self.api_key      = s["api_key"]
         self.template_slug = s.get("template_slug", "")
         self.gdt_encoding = s.get("gdt_encoding", "cp1252")
         self.poll_inbox_secs  = int(s.get("poll_inbox_seconds",  "5"))
+        self.inbox_watcher    = s.get("inbox_watcher", "auto")
+        self.inbox_debounce   = float(s.get("inbox_debounce_seconds", "0.5"))
+        self.inbox_rescan_secs = int(s.get("inbox_rescan_seconds", "60"))
         self.poll_result_secs = int(s.get("poll_result_seconds", "30"))
+        self.poll_result_max_secs = int(s.get("poll_result_max_seconds", "3600"))
+        # Sammel-Abfrage POST /api/gdt/results/ (Server: höchstens GDT_RESULTS_BATCH_MAX)
+        self.result_batch_size = max(1, int(s.get("result_batch_size", "200")))
+        self.batch_results     = True
+        # Abschluss-Feed GET /api/gdt/completions/ (false = immer je Session abfragen)
+        self.completion_feed   = s.get("completion_feed", "true").strip().lower() in ("1", "true", "yes", "on")
+        # Bei aktivem Feed: Einzelprüfung je Eintrag nur noch in diesem Abstand (Sicherheitsnetz)
+        self.feed_sweep_secs   = int(s.get("feed_sweep_seconds", "3600"))
+        self._following_feed   = False
+        self.inbox_workers    = max(1, int(s.get("inbox_workers", "4")))
+        self.server_max_concurrency = max(1, int(s.get("server_max_concurrency", "4")))
+        self.offline_retry_secs     = int(s.get("offline_retry_seconds", "30"))
+        self.offline_retry_max_secs = int(s.get("offline_retry_max_seconds", "900"))
+        # Metriken: metrics_file leer = keine Datei, metrics_port leer = kein HTTP
+        metrics_file = s.get("metrics_file", str(METRICS_FILE)).strip()
+        self.metrics_file  = SERVICE_DIR / metrics_file if metrics_file else None   # relativ → neben dem Dienst
+        self.metrics_interval_secs = int(s.get("metrics_interval_seconds", "15"))
+        self.metrics_host  = s.get("metrics_host", "").strip() or "127.0.0.1"
+        self.metrics_port  = s.get("metrics_port", "").strip()
+
+        # Eine gemeinsame Session für alle Worker-Threads; der Verbindungspool
+        # ist so groß wie die erlaubte Parallelität zum Server (Keep-Alive statt
+        # neuer TLS-Handshakes, keine "Connection pool is full"-Warnungen)
         self.session          = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.server_max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type":  "application/json",
         })
+        # Höchstens server_max_concurrency gleichzeitige Requests an den Server
+        self._server_slots = threading.BoundedSemaphore(self.server_max_concurrency)
+        # Offene Sessions (SQLite, WAL); alte pending.json einmalig übernehmen
+        self.pending = PendingStore(Path(s.get("pending_db", "") or PENDING_DB))
+        self.pending.import_json(PENDING_FILE)
+        self._started    = time.time()
+        self._last_cycle = self._started   # letzter Durchlauf der Hauptschleife (für /health)
+        self._metrics_error = False
+        self.metrics = self._create_metrics()
+        # Gesetzt, sobald der Server wieder antwortet → Warteschlange sofort nachholen
+        self._reconnected = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=self.inbox_workers, thread_name_prefix="inbox")
         self.processing.mkdir(parents=True, exist_ok=True)
         self.processed.mkdir(parents=True, exist_ok=True)
         self.failed.mkdir(parents=True, exist_ok=True)
+        self.queued.mkdir(parents=True, exist_ok=True)
         self.outbox.mkdir(parents=True, exist_ok=True)
 
     # ── Hilfsfunktion: Datei kollisionssicher verschieben ──────────────────
     @staticmethod
-    def _move_to(src: Path, dest_dir: Path) -> Path:
-        """Verschiebt src nach dest_dir (Timestamp-Suffix bei Namenskollision)."""
+    def _target(src: Path, dest_dir: Path) -> Path:
+        """Zielpfad in dest_dir (Timestamp-Suffix bei Namenskollision)."""
         dest = dest_dir / src.name
         if dest.exists():
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             dest = dest_dir / f"{src.stem}_{ts}{src.suffix}"
+        return dest
+
+    @classmethod
+    def _move_to(cls, src: Path, dest_dir: Path) -> Path:
+        """Verschiebt src nach dest_dir (Timestamp-Suffix bei Namenskollision)."""
+        dest = cls._target(src, dest_dir)
         src.rename(dest)
         return dest
 
     def _move_to_failed(self, staging: Path) -> None:
         """Verschiebt eine fehlgeschlagene Datei nach failed/ (nicht zurück in die Inbox)."""
+        self.metrics.inc("gdt_bridge_files_total", outcome="failed")
         try:
             dest = self._move_to(staging, self.failed)
             log.error("Datei nach failed/ verschoben: %s", dest.name)
         except OSError as exc:
             log.error("Konnte %s nicht nach failed/ verschieben: %s", staging.name, exc)
 
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """HTTP-Request an den Server (begrenzt auf server_max_concurrency parallel)."""
+        endpoint = endpoint_label(path)
+        with self._server_slots:
+            started = time.monotonic()
+            try:
+                resp = self.session.request(method, f"{self.api_url}{path}", **kwargs)
+            except requests.RequestException:
+                self.metrics.inc("gdt_bridge_http_requests_total", endpoint=endpoint, status="error")
+                raise
+            self.metrics.observe("gdt_bridge_http_request_seconds", time.monotonic() - started,
+                                 endpoint=endpoint)
+        self.metrics.inc("gdt_bridge_http_requests_total", endpoint=endpoint, status=str(resp.status_code))
+        if resp.status_code < 500 and resp.status_code not in TRANSIENT_STATUS:
+            self._reconnected.set()
+        return resp
+
+    # ── Metriken ───────────────────────────────────────────────────────────
+    def _create_metrics(self) -> Metrics:
+        metrics = Metrics()
+        metrics.counter("gdt_bridge_stage_total",
+                        "Anforderungen je erreichter Stufe (detected, staged, session_created, "
+                        "link_written, result_written)")
+        metrics.histogram("gdt_bridge_stage_seconds", "Sekunden seit der vorigen Stufe", STAGE_BUCKETS)
+        metrics.histogram("gdt_bridge_link_seconds",
+                          "Datei erkannt bis Link-GDT geschrieben (ohne Offline-Warteschlange)",
+                          STAGE_BUCKETS)
+        metrics.histogram("gdt_bridge_result_wait_seconds",
+                          "Session angelegt bis Ergebnis-GDT geschrieben", RESULT_WAIT_BUCKETS)
+        metrics.counter("gdt_bridge_files_total", "GDT-Dateien nach Ausgang (processed, queued, failed)")
+        metrics.counter("gdt_bridge_files_locked_total", "Übersprungene Dateien (noch von SAMAS geöffnet)")
+        metrics.counter("gdt_bridge_pending_removed_total",
+                        "Aus pending entfernte Sessions nach Grund (completed, expired, not_found, purged)")
+        metrics.counter("gdt_bridge_http_requests_total",
+                        "Requests an den Server nach Endpunkt und Status (error = keine Antwort)")
+        metrics.histogram("gdt_bridge_http_request_seconds", "Dauer der Requests an den Server",
+                          HTTP_BUCKETS)
+        metrics.gauge("gdt_bridge_pending_sessions", "Offene Sessions (warten auf Ergebnis)",
+                      self.pending.count)
+        metrics.gauge("gdt_bridge_oldest_pending_age_seconds", "Alter der ältesten offenen Session",
+                      lambda: _entry_age({"created_at": self.pending.oldest_created_at()}))
+        metrics.gauge("gdt_bridge_offline_queue_depth", "Zurückgestellte Session-Anlagen (Server offline)",
+                      self.pending.queued_count)
+        metrics.gauge("gdt_bridge_last_cycle_timestamp_seconds",
+                      "Letzter Durchlauf der Hauptschleife (Unix-Zeit)", lambda: self._last_cycle)
+        metrics.gauge("gdt_bridge_start_timestamp_seconds", "Start des Dienstes (Unix-Zeit)",
+                      lambda: self._started)
+        return metrics
+
+    def _stage(self, stage: str, since: Optional[float] = None) -> float:
+        """Stufe zählen, ggf. Dauer seit `since` erfassen → Zeitpunkt (time.monotonic)."""
+        now = time.monotonic()
+        self.metrics.inc("gdt_bridge_stage_total", stage=stage)
+        if since is not None:
+            self.metrics.observe("gdt_bridge_stage_seconds", now - since, stage=stage)
+        return now
+
+    def write_metrics(self) -> None:
+        """metrics_file neu schreiben (ein Fehler wird nur einmal geloggt, bis es wieder klappt)."""
+        if not self.metrics_file:
+            return
+        try:
+            self.metrics.write_textfile(self.metrics_file)
+            self._metrics_error = False
+        except OSError as exc:
+            if not self._metrics_error:
+                log.warning("Metriken nicht schreibbar (%s): %s", self.metrics_file, exc)
+            self._metrics_error = True
+
+    def health(self) -> tuple:
+        """Zustand für /health → (ok, Details); nicht ok, wenn die Hauptschleife hängt."""
+        since_cycle = time.time() - self._last_cycle
+        queued = self.pending.queued_count()
+        oldest = self.metrics.gauge_value("gdt_bridge_oldest_pending_age_seconds") or 0
+        if since_cycle > HEALTH_STALL_SECONDS:
+            status = "stalled"
+        elif queued:
+            status = "offline"      # Bridge läuft, Server nicht erreichbar
+        else:
+            status = "ok"
+        return status != "stalled", {
+            "status":                     status,
+            "pending":                    self.pending.count(),
+            "offline_queue":              queued,
+            "oldest_pending_age_seconds": round(oldest),
+            "last_cycle_seconds_ago":     round(since_cycle, 1),
+        }
+
+    def _start_metrics_server(self) -> Optional[MetricsServer]:
+        if not self.metrics_port:
+            return None
+        try:
+            return MetricsServer(self.metrics, self.metrics_host, int(self.metrics_port), self.health)
+        except (OSError, ValueError) as exc:
+            log.error("Metrik-Endpunkt %s:%s nicht verfügbar: %s", self.metrics_host, self.metrics_port, exc)
+            return None
+
+    def close(self) -> None:
+        """Worker-Threads und Verbindungen freigeben."""
+        self._pool.shutdown(wait=True)
+        self.session.close()
+        self.pending.close()
+
     # ── Eingang verarbeiten ────────────────────────────────────────────────
-    def process_inbox(self) -> None:
+    def process_inbox(self) -> int:
+        """
+        Alle .gdt-Dateien der Inbox verarbeiten → Anzahl noch gesperrter Dateien.
+
+        Die Dateien werden nacheinander ins Staging verschoben und dann von bis
+        zu inbox_workers Threads parallel verarbeitet (Session anlegen, Link-GDT
+        schreiben); die Methode kehrt zurück, wenn alle fertig sind.
+        """
+        locked = 0
+        staged = []
         for gdt_file in sorted(self.inbox.glob("*.gdt")):
+            detected = time.monotonic()
             # Datei ZUERST ins Staging-Verzeichnis verschieben:
             # - rename schlägt fehl, solange SAMAS die Datei noch geöffnet hat
             #   → halb geschriebene Dateien werden übersprungen (nächster Poll)
             # - verhindert doppelte POSTs, falls nach dem POST ein Fehler auftritt
+            # - jede Datei gehört damit genau einem Worker
             try:
                 staging = self._move_to(gdt_file, self.processing)
             except OSError as exc:
                 log.info("Datei %s noch gesperrt, wird übersprungen (%s)", gdt_file.name, exc)
+                self.metrics.inc("gdt_bridge_files_locked_total")
+                locked += 1
                 continue
-
-            log.info("Neue GDT-Datei gefunden: %s", gdt_file.name)
-            try:
-                patient = parse_gdt(staging, encoding=self.gdt_encoding)
-                # Datenschutz: keine Patientennamen ins Log – nur GDT-ID und Dateiname
-                log.info(
-                    "GDT-ID: %s (Datei: %s)",
-                    patient["gdt_patient_id"],
+            self.metrics.inc("gdt_bridge_stage_total", stage="detected")
+            staged.append((gdt_file, staging, detected, self._stage("staged", detected)))
+
+        futures = [self._pool.submit(self._process_file, *item) for item in staged]
+        for future in futures:
+            future.result()
+        return locked
+
+    def _process_file(self, gdt_file: Path, staging: Path, detected_at: Optional[float] = None,
+                      staged_at: Optional[float] = None) -> None:
+        """
+        Eine Datei aus processing/ verarbeiten → processed/ bzw. failed/ (Worker-Thread).
+        detected_at/staged_at (time.monotonic) für die Stufen-Metriken.
+        """
+        log.info("Neue GDT-Datei gefunden: %s", gdt_file.name)
+        try:
+            patient = parse_gdt(staging, encoding=self.gdt_encoding)
+            # Datenschutz: keine Patientennamen ins Log – nur GDT-ID und Dateiname
+            log.info(
+                "GDT-ID: %s (Datei: %s)",
+                patient["gdt_patient_id"],
+                gdt_file.name,
+            )
+            if patient["record_type"] != "6310":
+                log.warning(
+                    "Unerwartete Satzart %r in %s (erwartet 6310) – wird trotzdem verarbeitet",
+                    patient["record_type"],
                     gdt_file.name,
                 )
-                if patient["record_type"] != "6310":
-                    log.warning(
-                        "Unerwartete Satzart %r in %s (erwartet 6310) – wird trotzdem verarbeitet",
-                        patient["record_type"],
-                        gdt_file.name,
-                    )
-
-                # Session beim Django-Server anlegen
-                payload = {
-                    "patient_last_name":  patient["patient_last_name"],
-                    "patient_first_name": patient["patient_first_name"],
-                    "patient_birth_date": patient["patient_birth_date"],
-                    "patient_email":      patient.get("patient_email", ""),
-                    "gdt_patient_id":     patient["gdt_patient_id"],
-                    "gdt_request_id":     patient["gdt_request_id"],
-                }
-                if self.template_slug:
-                    payload["template_slug"] = self.template_slug
-
-                resp = self.session.post(
-                    f"{self.api_url}/gdt/session/",
-                    json=payload,
-                    timeout=15,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                token = data["token"]
-                url   = data["url"]
-                log.info("Session erstellt: token=%s  url=%s", token, url)
-
-                # Sofort Link-GDT für SAMAS schreiben
-                out_name = gdt_file.stem + ".gdt"
-                write_link_gdt(self.outbox / out_name, patient, url,
-                               encoding=self.gdt_encoding)
-
-                # In pending-Liste eintragen (auf Ergebnis warten)
-                pending = load_pending()
-                pending.append({
-                    "token":         token,
-                    "patient":       patient,
-                    "out_stem":      gdt_file.stem,
-                    "created_at":    datetime.now().isoformat(),
-                })
-                save_pending(pending)
-
-                # Erfolgreich verarbeitet → nach processed/ verschieben
-                self._move_to(staging, self.processed)
-
-            except requests.HTTPError as exc:
-                log.error(
-                    "HTTP-Fehler beim Erstellen der Session: %s – %s",
-                    exc,
-                    exc.response.text if exc.response is not None else "",
-                )
-                self._move_to_failed(staging)
-            except Exception as exc:
-                log.error("Fehler bei %s: %s", gdt_file.name, exc)
-                self._move_to_failed(staging)
+
+            # Session beim Django-Server anlegen; der Key bleibt bei allen
+            # Wiederholungen gleich, damit der Server keine zweite Session anlegt
+            idempotency_key = str(uuid.uuid4())
+            try:
+                data = self._create_session(self._session_payload(patient), idempotency_key)
+            except TransientError as exc:
+                self._queue_offline(idempotency_key, patient, gdt_file.stem, staging, str(exc))
+                return
+            created = self._stage("session_created", staged_at)
+            self._session_created(patient, data, gdt_file.stem, staging, created, detected_at)
+
+        except requests.HTTPError as exc:
+            log.error(
+                "HTTP-Fehler beim Erstellen der Session: %s – %s",
+                exc,
+                exc.response.text if exc.response is not None else "",
+            )
+            self._move_to_failed(staging)
+        except Exception as exc:
+            log.error("Fehler bei %s: %s", gdt_file.name, exc)
+            self._move_to_failed(staging)
+
+    def _session_payload(self, patient: dict) -> dict:
+        payload = {
+            "patient_last_name":  patient["patient_last_name"],
+            "patient_first_name": patient["patient_first_name"],
+            "patient_birth_date": patient["patient_birth_date"],
+            "patient_email":      patient.get("patient_email", ""),
+            "gdt_patient_id":     patient["gdt_patient_id"],
+            "gdt_request_id":     patient["gdt_request_id"],
+        }
+        if self.template_slug:
+            payload["template_slug"] = self.template_slug
+        return payload
+
+    def _create_session(self, payload: dict, idempotency_key: str) -> dict:
+        """
+        POST /api/gdt/session/ → Antwort (token, url).
+        TransientError bei Netzfehler, Timeout, 5xx, 408/429 (später erneut
+        versuchen); requests.HTTPError bei anderen 4xx (endgültig).
+        """
+        try:
+            resp = self._request(
+                "POST", "/gdt/session/", json=payload, timeout=15,
+                headers={"Idempotency-Key": idempotency_key},
+            )
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            raise TransientError(f"Server nicht erreichbar: {exc}") from exc
+        if resp.status_code >= 500 or resp.status_code in TRANSIENT_STATUS:
+            raise TransientError(f"HTTP {resp.status_code}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def _session_created(self, patient: dict, data: dict, out_stem: str, source: Path,
+                         created_at: Optional[float] = None, detected_at: Optional[float] = None) -> None:
+        """Link-GDT schreiben, als offen eintragen, GDT-Datei nach processed/."""
+        token = data["token"]
+        url   = data["url"]
+        log.info("Session erstellt: token=%s  url=%s", token, url)
+
+        # Sofort Link-GDT für SAMAS schreiben (ersetzt ggf. die vorläufige)
+        write_link_gdt(self.outbox / f"{out_stem}.gdt", patient, url,
+                       encoding=self.gdt_encoding)
+        linked = self._stage("link_written", created_at)
+        if detected_at is not None:
+            self.metrics.observe("gdt_bridge_link_seconds", linked - detected_at)
+
+        # Als offen eintragen (auf Ergebnis warten)
+        self.pending.add(token, patient, out_stem)
+
+        # Erfolgreich verarbeitet → nach processed/ verschieben
+        self.metrics.inc("gdt_bridge_files_total", outcome="processed")
+        try:
+            self._move_to(source, self.processed)
+        except FileNotFoundError:
+            # Nachgeholte Anlage nach Absturz zwischen Eintrag und Verschieben
+            log.warning("GDT-Datei %s nicht mehr vorhanden", source.name)
+
+    # ── Offline-Warteschlange ─────────────────────────────────────────────
+    def _queue_offline(self, idempotency_key: str, patient: dict, out_stem: str,
+                       staging: Path, error: str) -> None:
+        """
+        Anlage zurückstellen: zuerst der Eintrag in der Datenbank (übersteht
+        einen Neustart), dann die Datei nach queued/, dann die vorläufige
+        Link-GDT für SAMAS.
+        """
+        self._reconnected.clear()
+        dest = self._target(staging, self.queued)
+        next_at = time.time() + offline_retry_delay(1, self.offline_retry_secs, self.offline_retry_max_secs)
+        self.pending.queue_request(idempotency_key, patient, out_stem, dest, 1, next_at, error)
+        try:
+            staging.rename(dest)
+        except OSError:
+            self.pending.remove_request(idempotency_key)
+            raise
+        write_link_pending_gdt(self.outbox / f"{out_stem}.gdt", patient, encoding=self.gdt_encoding)
+        self.metrics.inc("gdt_bridge_files_total", outcome="queued")
+        log.warning("Server nicht erreichbar (%s) – Anlage für %s zurückgestellt", error, dest.name)
+
+    def _replay_due(self) -> bool:
+        """Warteschlange nachholen: Wartezeit abgelaufen oder Server antwortet wieder."""
+        next_at = self.pending.next_request_at()
+        return next_at is not None and (self._reconnected.is_set() or time.time() >= next_at)
+
+    def _replay_one(self, item: dict) -> bool:
+        """Eine zurückgestellte Anlage wiederholen → False, wenn der Server weiter offline ist."""
+        key = item["idempotency_key"]
+        try:
+            data = self._create_session(self._session_payload(item["patient"]), key)
+        except TransientError as exc:
+            attempts = item["attempts"] + 1
+            next_at = time.time() + offline_retry_delay(
+                attempts, self.offline_retry_secs, self.offline_retry_max_secs,
+            )
+            self.pending.request_failed(key, attempts, next_at, str(exc))
+            return False
+        except Exception as exc:
+            # Endgültig abgelehnt (4xx, ungültige Antwort): wie bei einer direkten Anlage
+            log.error("Zurückgestellte Anlage %s fehlgeschlagen: %s", item["file_path"].name, exc)
+            self.pending.remove_request(key)
+            if item["file_path"].exists():
+                self._move_to_failed(item["file_path"])
+            return True
+        created = self._stage("session_created")
+        self._session_created(item["patient"], data, item["out_stem"], item["file_path"], created)
+        self.pending.remove_request(key)
+        return True
+
+    def replay_offline(self) -> int:
+        """
+        Zurückgestellte Anlagen nachholen → Anzahl erledigter Einträge.
+
+        Die älteste fällige Anlage dient als Probe: ist der Server weiter
+        offline, warten alle übrigen mit (exponentieller Abstand, höchstens
+        offline_retry_max_seconds) statt einzeln zu scheitern. Antwortet er,
+        wird die ganze Warteschlange parallel (inbox_workers) abgearbeitet.
+        Hat der Server zwischendurch schon wieder geantwortet, sind alle
+        Einträge sofort fällig – nicht erst nach der Wartezeit.
+        """
+        reconnected = self._reconnected.is_set()
+        self._reconnected.clear()
+        due = self.pending.queued_requests(None if reconnected else time.time())
+        if not due:
+            return 0
+        if not self._replay_one(due[0]):
+            attempts = max(item["attempts"] for item in due) + 1
+            until = time.time() + offline_retry_delay(
+                attempts, self.offline_retry_secs, self.offline_retry_max_secs,
+            )
+            self.pending.postpone_requests(until)
+            log.info("Server weiter nicht erreichbar – %d zurückgestellte Anlage(n), nächster Versuch in %.0f s",
+                     self.pending.queued_count(), until - time.time())
+            return 0
+        rest = self.pending.queued_requests()
+        done = 1 + sum(self._pool.map(self._replay_one, rest))
+        log.info("Server wieder erreichbar – %d zurückgestellte Anlage(n) nachgeholt, %d verbleiben",
+                 done, self.pending.queued_count())
+        return done
 
     # ── Pending-Sessions auf Ergebnis prüfen ──────────────────────────────
+    def _next_check_at(self, entry: dict, now: float, retry_after: Optional[float] = None,
+                       expires_at: Optional[float] = None) -> float:
+        """Nächster Abfragezeitpunkt: adaptiver Abstand, Hinweise des Servers gehen vor."""
+        delay = next_check_delay(_entry_age(entry), self.poll_result_secs, self.poll_result_max_secs)
+        if self._following_feed:
+            # Abschlüsse meldet der Feed; einzeln nur noch als Sicherheitsnetz
+            delay = max(delay, self.feed_sweep_secs)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        at = now + delay
+        if expires_at is not None:
+            # Nach Ablauf des Links genügt eine letzte Abfrage (410 → Eintrag wird entfernt)
+            at = min(at, max(expires_at + EXPIRY_GRACE, now + self.poll_result_secs))
+        return at
+
     def check_pending(self) -> None:
-        pending = load_pending()
-        if not pending:
+        """
+        Offene Sessions auf Ergebnisse prüfen: bevorzugt über den Abschluss-Feed
+        (ein Request pro Zyklus, egal wie viele offen sind), dazu die fälligen
+        Einträge nach ihrem eigenen Plan (siehe next_check_delay). Bei aktivem
+        Feed wird jeder Eintrag höchstens alle feed_sweep_seconds einzeln
+        geprüft – das fängt Abschlüsse, die nie im Feed erscheinen, und
+        entfernt abgelaufene bzw. gelöschte Sessions.
+        """
+        # Abgelaufene Einträge entfernen (Fragebogen wurde nie ausgefüllt)
+        for token in self.pending.purge_older_than(datetime.now() - timedelta(days=15)):
+            log.info("Pending-Eintrag abgelaufen, verworfen: token=%s", token)
+            self.metrics.inc("gdt_bridge_pending_removed_total", reason="purged")
+
+        self._following_feed = self.completion_feed and self._follow_completions()
+
+        now = time.time()
+        due = self.pending.due(now)
+        if not due:
             return
 
-        still_pending = []
-        for entry in pending:
-            token   = entry["token"]
-            patient = entry["patient"]
-
-            # Abgelaufene Einträge entfernen (Fragebogen wurde nie ausgefüllt)
-            created_raw = entry.get("created_at", "")
+        reschedule = {}
+        if self.batch_results:
+            self._check_batches(due, now, reschedule)
+        else:
+            self._check_each(due, now, reschedule)
+        self.pending.reschedule(reschedule)
+
+    def _follow_completions(self) -> bool:
+        """
+        Abschluss-Feed ab dem gespeicherten Cursor lesen (GET /api/gdt/completions/)
+        → False, wenn die Einträge im normalen Abstand einzeln abzufragen sind
+        (erster Start, Server ohne Feed). Der Cursor wird erst nach geschriebener Ergebnis-GDT
+        weitergesetzt; bei einem Fehler folgt derselbe Abschnitt im nächsten Zyklus.
+        """
+        cursor = self.pending.get_state(FEED_CURSOR_KEY)
+        try:
+            if cursor is None:
+                return self._start_completion_feed()
+            while True:
+                resp = self._request("GET", "/gdt/completions/", params={"since": cursor}, timeout=30)
+                if resp.status_code in (404, 405):
+                    return self._completion_feed_unavailable(resp)
+                if resp.status_code in (429, 503):
+                    log.warning("Server ausgelastet (HTTP %s), Abschluss-Feed im nächsten Zyklus",
+                                resp.status_code)
+                    return True
+                resp.raise_for_status()
+                page = resp.json()
+                for event in page["events"]:
+                    entry = self.pending.get(event["token"])
+                    if entry is not None:
+                        try:
+                            self._apply_result(entry, STATUS_COMPLETED, event, time.time(), {})
+                        except Exception as exc:
+                            log.error("Fehler beim Verarbeiten von %s: %s", entry["token"], exc)
+                            self.pending.set_state(FEED_CURSOR_KEY, cursor)
+                            return True
+                    cursor = event["cursor"]
+                cursor = page["cursor"]
+                self.pending.set_state(FEED_CURSOR_KEY, cursor)
+                if not page.get("has_more"):
+                    return True
+        except Exception as exc:
+            log.error("Fehler beim Lesen des Abschluss-Feeds: %s", exc)
+            return True
+
+    def _start_completion_feed(self) -> bool:
+        """Einstieg in den Feed: aktuellen Cursor holen, offene Einträge einmalig einzeln prüfen."""
+        resp = self._request("GET", "/gdt/completions/", params={"since": "latest"}, timeout=30)
+        if resp.status_code in (404, 405):
+            return self._completion_feed_unavailable(resp)
+        resp.raise_for_status()
+        self.pending.set_state(FEED_CURSOR_KEY, resp.json()["cursor"])
+        # Was vor dem Einstieg abgeschlossen wurde, steht nicht im Feed → jetzt alle abfragen
+        self.pending.reschedule({entry["token"]: 0.0 for entry in self.pending.all()})
+        log.info("Abschluss-Feed aktiv – %d offene Session(s) werden einmalig einzeln geprüft",
+                 self.pending.count())
+        return False
+
+    def _completion_feed_unavailable(self, resp: requests.Response) -> bool:
+        log.warning("Server kennt /api/gdt/completions/ nicht (HTTP %s) – Abfrage je Session",
+                    resp.status_code)
+        self.completion_feed = False
+        return False
+
+    def _check_batches(self, due: list, now: float, reschedule: dict) -> None:
+        """
+        Sammel-Abfrage POST /api/gdt/results/: höchstens result_batch_size Tokens
+        pro Request. Ältere Server ohne den Endpunkt (404/405) → Einzelabfragen.
+        """
+        for start in range(0, len(due), self.result_batch_size):
+            chunk = due[start:start + self.result_batch_size]
             try:
-                created_at = datetime.fromisoformat(created_raw)
-            except ValueError:
-                created_at = None
-            if created_at is not None and datetime.now() - created_at > timedelta(days=15):
-                log.info(
-                    "Pending-Eintrag abgelaufen, verworfen: token=%s (erstellt %s)",
-                    token, created_raw,
+                resp = self._request(
+                    "POST", "/gdt/results/", json={"tokens": [entry["token"] for entry in chunk]}, timeout=30,
                 )
-                continue
-
+                if resp.status_code in (404, 405):
+                    log.warning("Server kennt /api/gdt/results/ nicht (HTTP %s) – Einzelabfragen",
+                                resp.status_code)
+                    self.batch_results = False
+                    self._check_each(due[start:], now, reschedule)
+                    return
+                if resp.status_code in (429, 503):
+                    self._postpone(due[start:], now, resp, reschedule)
+                    return
+                resp.raise_for_status()
+                results = resp.json()["results"]
+            except Exception as exc:
+                log.error("Fehler bei der Sammel-Abfrage (%d Sessions): %s", len(chunk), exc)
+                for entry in due[start:]:
+                    reschedule[entry["token"]] = self._next_check_at(entry, now)
+                return
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            for entry in chunk:
+                item = results.get(entry["token"]) or {}
+                try:
+                    self._apply_result(entry, item.get("status", ""), item, now, reschedule, retry_after)
+                except Exception as exc:
+                    log.error("Fehler beim Verarbeiten von %s: %s", entry["token"], exc)
+                    reschedule[entry["token"]] = self._next_check_at(entry, now)
+
+    def _check_each(self, due: list, now: float, reschedule: dict) -> None:
+        """Einzelabfragen GET /api/gdt/result/<token>/ (Server ohne Sammel-Endpunkt)."""
+        for index, entry in enumerate(due):
+            token = entry["token"]
             try:
-                resp = self.session.get(
-                    f"{self.api_url}/gdt/result/{token}/",
-                    timeout=10,
-                )
+                resp = self._request("GET", f"/gdt/result/{token}/", timeout=10)
+                if resp.status_code in (429, 503):
+                    self._postpone(due[index:], now, resp, reschedule)
+                    return
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
                 if resp.status_code == 202:
                     # Noch nicht abgeschlossen
-                    still_pending.append(entry)
-                    continue
-
-                resp.raise_for_status()
-                result = resp.json()
-
-                if result.get("completed"):
-                    out_path = self.outbox / f"{entry['out_stem']}_result.gdt"
-                    write_result_gdt(out_path, patient, result,
-                                     encoding=self.gdt_encoding)
-                    log.info("Ergebnis erhalten und GDT geschrieben für token=%s", token)
-                    # Nicht mehr in pending aufnehmen → fertig
+                    self._apply_result(entry, STATUS_PENDING, resp.json(), now, reschedule, retry_after)
+                elif resp.status_code in (404, 410):
+                    # 404 = Session gelöscht, 410 = abgelaufen
+                    state = STATUS_NOT_FOUND if resp.status_code == 404 else STATUS_EXPIRED
+                    self._apply_result(entry, state, {}, now, reschedule)
                 else:
-                    still_pending.append(entry)
-
-            except requests.HTTPError as exc:
-                if exc.response is not None and exc.response.status_code in (404, 410):
-                    # 404 = Session gelöscht, 410 = abgelaufen → aus pending entfernen
-                    log.warning(
-                        "Session nicht (mehr) verfügbar (%s), wird aus pending entfernt: %s",
-                        exc.response.status_code, token,
-                    )
-                else:
-                    log.error("HTTP-Fehler beim Abfragen von %s: %s", token, exc)
-                    still_pending.append(entry)
+                    resp.raise_for_status()
+                    result = resp.json()
+                    state = STATUS_COMPLETED if result.get("completed") else STATUS_PENDING
+                    self._apply_result(entry, state, result, now, reschedule, retry_after)
             except Exception as exc:
                 log.error("Fehler beim Abfragen von %s: %s", token, exc)
-                still_pending.append(entry)
-
-        save_pending(still_pending)
+                reschedule[token] = self._next_check_at(entry, now)
+
+    def _postpone(self, entries: list, now: float, resp: requests.Response, reschedule: dict) -> None:
+        """Server bittet um Pause (429/503): diesen und alle übrigen Einträge verschieben."""
+        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        wait = retry_after if retry_after is not None else self.poll_result_secs
+        log.warning("Server ausgelastet (HTTP %s), nächste Abfragen in %.0f s", resp.status_code, wait)
+        for entry in entries:
+            reschedule[entry["token"]] = self._next_check_at(entry, now, retry_after=wait)
+
+    def _apply_result(self, entry: dict, state: str, result: dict, now: float, reschedule: dict,
+                      retry_after: Optional[float] = None) -> None:
+        """Status einer offenen Session verarbeiten (Einzel- wie Sammel-Abfrage)."""
+        token = entry["token"]
+        if state == STATUS_COMPLETED:
+            out_path = self.outbox / f"{entry['out_stem']}_result.gdt"
+            write_result_gdt(out_path, entry["patient"], result, encoding=self.gdt_encoding)
+            log.info("Ergebnis erhalten und GDT geschrieben für token=%s", token)
+            self.pending.remove(token)   # fertig
+            self._stage("result_written")
+            self.metrics.observe("gdt_bridge_result_wait_seconds", _entry_age(entry))
+            self.metrics.inc("gdt_bridge_pending_removed_total", reason=state)
+        elif state in (STATUS_EXPIRED, STATUS_NOT_FOUND):
+            log.warning("Session nicht (mehr) verfügbar (%s), wird aus pending entfernt: %s", state, token)
+            self.pending.remove(token)
+            self.metrics.inc("gdt_bridge_pending_removed_total", reason=state)
+        else:
+            expires_at = parse_expires_at(result.get("expires_at"))
+            reschedule[token] = self._next_check_at(entry, now, retry_after, expires_at)
 
     # ── Haupt-Loop (läuft im Service-Thread) ──────────────────────────────
     def run(self, stop_event: threading.Event) -> None:
-        log.info("GDT Bridge gestartet. Inbox: %s", self.inbox)
-        inbox_counter  = 0
-        result_counter = 0
-
-        while not stop_event.is_set():
-            try:
-                inbox_counter += 1
-                if inbox_counter >= self.poll_inbox_secs:
-                    self.process_inbox()
-                    inbox_counter = 0
-
-                result_counter += 1
-                if result_counter >= self.poll_result_secs:
-                    self.check_pending()
-                    result_counter = 0
-
-            except Exception as exc:
-                log.error("Unerwarteter Fehler im Hauptloop: %s", exc)
+        watcher = create_watcher(
+            self.inbox, self.inbox_watcher,
+            debounce=self.inbox_debounce, poll_interval=self.poll_inbox_secs,
+        )
+        log.info("GDT Bridge gestartet. Inbox: %s (Überwachung: %s)", self.inbox, watcher.name)
+        queued = self.pending.queued_count()
+        if queued:
+            log.info("%d zurückgestellte Session-Anlage(n) aus der Offline-Warteschlange", queued)
+        next_scan    = 0.0   # sofort: Dateien, die vor dem Start eingegangen sind
+        next_results = time.monotonic() + self.poll_result_secs
+        next_metrics = 0.0
+        metrics_server = self._start_metrics_server()
 
-            stop_event.wait(1)   # 1 Sekunde warten, dabei auf Stop reagieren
+        try:
+            while not stop_event.is_set():
+                self._last_cycle = time.time()
+                try:
+                    # Höchstens 1 s blockieren, damit der Service-Stop schnell greift
+                    now = time.monotonic()
+                    changed = watcher.wait(max(0.0, min(next_scan, next_results, now + 1) - now))
+
+                    now = time.monotonic()
+                    if changed or now >= next_scan:
+                        locked = self.process_inbox()
+                        # Gesperrte Dateien (SAMAS schreibt noch) bald erneut versuchen,
+                        # sonst nur gelegentlich nachsehen (verlorene Ereignisse, Netzlaufwerke)
+                        next_scan = time.monotonic() + (
+                            self.poll_inbox_secs if locked else self.inbox_rescan_secs
+                        )
+
+                    if self._replay_due():
+                        self.replay_offline()
+
+                    if now >= next_results:
+                        self.check_pending()
+                        next_results = time.monotonic() + self.poll_result_secs
+
+                    if now >= next_metrics:
+                        self.write_metrics()
+                        next_metrics = time.monotonic() + self.metrics_interval_secs
+
+                except Exception as exc:
+                    log.error("Unerwarteter Fehler im Hauptloop: %s", exc)
+                    stop_event.wait(1)
+        finally:
+            watcher.close()
+            if metrics_server is not None:
+                metrics_server.close()
+            self.write_metrics()
+            self.close()
 
         log.info("GDT Bridge gestoppt.")
 
@@ -454,7 +998,8 @@ class GdtBridge:
 # ──────────────────────────────────────────────────────────────────────────────
 # Windows Service
 # ──────────────────────────────────────────────────────────────────────────────
-class GdtBridgeService(win32serviceutil.ServiceFramework):
+# Ohne pywin32 bleibt die Klasse ohne Funktion (nur Konsolenmodus, s.u.)
+class GdtBridgeService(win32serviceutil.ServiceFramework if win32serviceutil else object):
     _svc_name_        = "GdtBridgeService"
     _svc_display_name_ = "GDT Bridge – Fragebogen SAMAS Schnittstelle"
     _svc_description_  = (
@@ -474,6 +1019,7 @@ class GdtBridgeService(win32serviceutil.ServiceFramework):
         self._thread_stop.set()
 
     def SvcDoRun(self):
+        setup_logging()
         servicemanager.LogMsg(
             servicemanager.EVENTLOG_INFORMATION_TYPE,
             servicemanager.PYS_SERVICE_STARTED,
@@ -507,6 +1053,7 @@ class GdtBridgeService(win32serviceutil.ServiceFramework):
 # ──────────────────────────────────────────────────────────────────────────────
 def run_console():
     """Startet den Bridge direkt in der Konsole (Strg+C zum Stoppen)."""
+    setup_logging()
     logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
     log.info("Konsolenmodus – zum Beenden Strg+C drücken")
     try:
@@ -527,14 +1074,14 @@ def run_console():
 # Einstiegspunkt
 # ──────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    if len(sys.argv) == 1:
+    if sys.argv[1:2] == ["console"] or win32serviceutil is None:
+        # python gdt_bridge_service.py console  (ohne pywin32 immer)
+        run_console()
+    elif len(sys.argv) == 1:
         # Kein Argument: als Windows Service starten (von SCM aufgerufen)
         servicemanager.Initialize()
         servicemanager.PrepareToHostSingle(GdtBridgeService)
         servicemanager.StartServiceCtrlDispatcher()
-    elif sys.argv[1] == "console":
-        # python gdt_bridge_service.py console
-        run_console()
     else:
         # install / remove / start / stop / restart / debug
         win32serviceutil.HandleCommandLine(GdtBridgeService)
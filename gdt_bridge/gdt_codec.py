@@ -0,0 +1,235 @@
+r"""
+GDT-Codec der GDT-Bridge
+========================
+Liest und schreibt GDT-Dateien auf Byte-Ebene:
+
+  LLL FFFF Wert CRLF      LLL  = Zeilenlänge in BYTES (inkl. LLL und CRLF), 3-stellig
+                          FFFF = Feldkennung, 4-stellig (GDT 2.1 / 3.0) bzw.
+                                 5-stellig (Exporte mit führender Null)
+
+Lesen (decode / read_file) in einem Durchlauf über die Bytes: jede Zeile wird
+über ihre Längenangabe abgegrenzt, nicht über Zeilenumbrüche. Geprüft wird:
+
+- Längenangabe numerisch, mindestens LLL + Feldkennung + CRLF, Zeile endet
+  genau dort mit CRLF
+- Satzgrenzen: jeder Satz beginnt mit 8000; 8001 (Satzende) trägt dieselbe
+  Satzart; eine numerische 8100 (Satzlänge) stimmt mit den Bytes des Satzes überein
+
+strict=True (Default) bricht mit GdtError ab. strict=False nimmt bei falscher
+Längenangabe das nächste CRLF bzw. LF als Zeilenende (ältere Exporte zählen
+Zeichen statt Bytes) und meldet Abweichungen nur im Log.
+
+Schreiben (encode / write_file) berechnet die Länge aus den kodierten Bytes –
+ein "ü" zählt in cp437/cp1252 ein Byte, in UTF-8 zwei.
+
+  records = read_file(Path("inbox/patient.gdt"), encoding="cp437")
+  records[0].record_type, records[0].first("3101")
+  write_file(Path("outbox/patient.gdt"), [("8000", "6311"), ("3000", "4711")], "cp437")
+"""
+
+import logging
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+log = logging.getLogger("gdt_bridge")
+
+CRLF = b"\r\n"
+MAX_LINE_LENGTH = 999          # LLL ist dreistellig
+RECORD_START = "8000"
+RECORD_END = "8001"
+RECORD_LENGTH = "8100"
+
+Field = tuple[str, str]
+
+
+class GdtError(ValueError):
+    """Ungültige GDT-Daten; offset = Byte-Position der fehlerhaften Zeile."""
+
+    def __init__(self, message: str, offset: Optional[int] = None):
+        super().__init__(message if offset is None else f"{message} (Byte {offset})")
+        self.offset = offset
+
+
+class GdtRecord:
+    """Ein Satz (8000 … 8001) als Liste von (Feldkennung, Wert) in Dateireihenfolge."""
+
+    __slots__ = ("fields", "length")
+
+    def __init__(self, fields: Optional[list[Field]] = None, length: int = 0):
+        self.fields = list(fields or [])
+        self.length = length          # Bytes des Satzes in der Datei (0 = nicht gelesen)
+
+    @property
+    def record_type(self) -> str:
+        return self.first(RECORD_START)
+
+    def first(self, field_id: str, default: str = "") -> str:
+        """Wert des ersten Felds mit dieser Kennung (ohne Leerzeichen am Rand)."""
+        for fid, value in self.fields:
+            if fid == field_id:
+                return value.strip()
+        return default
+
+    def values(self, field_id: str) -> list[str]:
+        return [value for fid, value in self.fields if fid == field_id]
+
+    def __repr__(self) -> str:
+        return f"<GdtRecord {self.record_type or '?'} ({len(self.fields)} Felder)>"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Lesen
+# ──────────────────────────────────────────────────────────────────────────────
+def detect_field_width(data: bytes) -> int:
+    """Breite der Feldkennungen (4 oder 5) anhand der ersten Zeile (muss 8000 sein)."""
+    head = data[3:8]
+    if head[:4] == b"8000":
+        return 4
+    if head == b"08000":
+        return 5
+    raise GdtError("Datei beginnt nicht mit Feld 8000 (Satzbeginn)", 0)
+
+
+def _fail(strict: bool, message: str, offset: int) -> None:
+    if strict:
+        raise GdtError(message, offset)
+    log.warning("GDT: %s (Byte %d)", message, offset)
+
+
+def iter_fields(data: bytes, encoding: str = "cp1252", field_width: Optional[int] = None,
+                strict: bool = True) -> Iterator[tuple[int, int, str, str]]:
+    """
+    Felder der Reihe nach → (Offset, Zeilenlänge in Bytes, Feldkennung, Wert).
+    field_width None = aus der ersten Zeile bestimmen.
+    """
+    if not data:
+        return
+    width = field_width or detect_field_width(data)
+    minimum = 3 + width + len(CRLF)
+    size = len(data)
+    # Einmal dekodieren und per Offset schneiden, solange jedes Byte genau ein
+    # Zeichen ergibt (cp437/cp1252 immer, UTF-8 bei reinem ASCII); sonst Wert für Wert
+    text = data.decode(encoding, errors="replace")
+    if len(text) != size:
+        text = None
+    pos = 0
+    while pos < size:
+        prefix = data[pos:pos + 3]
+        length = int(prefix) if prefix.isdigit() and len(prefix) == 3 else -1
+        end = pos + length
+        if length >= minimum and end <= size and data.startswith(CRLF, end - 2):
+            line_end = end - 2
+        else:
+            if length < 0:
+                message = f"Ungültige Längenangabe {prefix!r}"
+            elif length < minimum or end > size:
+                message = f"Längenangabe {length} passt nicht zur Datei"
+            else:
+                message = f"Längenangabe {length} endet nicht an einem Zeilenende"
+            _fail(strict, message, pos)
+            # Nachsichtig: nächstes Zeilenende (CRLF oder LF) suchen
+            newline = data.find(b"\n", pos)
+            end = size if newline < 0 else newline + 1
+            line_end = end - (2 if data.startswith(CRLF, end - 2) else 1 if data.startswith(b"\n", end - 1) else 0)
+            if line_end - pos < 3 + width:
+                pos = end
+                continue
+        value_start = pos + 3 + width
+        if not data[pos + 3:value_start].isdigit():
+            _fail(strict, f"Ungültige Feldkennung {data[pos + 3:value_start]!r}", pos)
+            pos = end
+            continue
+        # Feldkennung ASCII-Ziffern; 5-stellig ("08000") → übliche 4 Stellen
+        if text is not None:
+            field_id = text[value_start - 4:value_start]
+            value = text[value_start:line_end]
+        else:
+            field_id = data[value_start - 4:value_start].decode("ascii")
+            value = data[value_start:line_end].decode(encoding, errors="replace")
+        yield pos, end - pos, field_id, value
+        pos = end
+
+
+def decode(data: bytes, encoding: str = "cp1252", field_width: Optional[int] = None,
+           strict: bool = True) -> list[GdtRecord]:
+    """
+    GDT-Bytes → Sätze. 5-stellige Feldkennungen werden auf die üblichen
+    4 Stellen normalisiert ("08000" → "8000").
+    """
+    records: list[GdtRecord] = []
+    current: Optional[GdtRecord] = None
+    closed = False                       # 8001 des aktuellen Satzes gelesen
+    for offset, length, field_id, value in iter_fields(data, encoding, field_width, strict):
+        if field_id == RECORD_START:
+            if current is not None and not closed:
+                _check_record(current, strict, offset)
+            current = GdtRecord([(field_id, value)], length)
+            closed = False
+            records.append(current)
+            continue
+        if current is None:
+            _fail(strict, f"Feld {field_id} vor dem ersten Satzbeginn 8000", offset)
+            continue
+        if closed:
+            _fail(strict, f"Feld {field_id} nach Satzende 8001", offset)
+            continue
+        current.fields.append((field_id, value))
+        current.length += length
+        if field_id == RECORD_END:
+            if value.strip() != current.record_type:
+                _fail(strict, f"Satzende 8001 {value!r} passt nicht zu Satzart {current.record_type!r}",
+                      offset)
+            _check_record(current, strict, offset)
+            closed = True
+    if current is not None and not closed:
+        _check_record(current, strict, len(data))
+    return records
+
+
+def _check_record(record: GdtRecord, strict: bool, offset: int) -> None:
+    """Numerische Satzlänge (8100) gegen die gelesenen Bytes prüfen."""
+    declared = record.first(RECORD_LENGTH)
+    if declared.isdigit() and int(declared) != record.length:
+        _fail(strict, f"Satzlänge 8100 = {declared}, tatsächlich {record.length} Bytes", offset)
+
+
+def read_file(path: Path, encoding: str = "cp1252", strict: bool = True) -> list[GdtRecord]:
+    with open(path, "rb") as fh:
+        return decode(fh.read(), encoding, strict=strict)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Schreiben
+# ──────────────────────────────────────────────────────────────────────────────
+def encode_field(field_id: str, value: str, encoding: str = "cp1252") -> bytes:
+    """
+    Eine GDT-Zeile; Länge aus den kodierten Bytes. Nicht darstellbare Zeichen
+    werden ersetzt ("?"), Zeilenumbrüche im Wert durch Leerzeichen.
+    """
+    if not (field_id.isdigit() and len(field_id) in (4, 5)):
+        raise GdtError(f"Ungültige Feldkennung {field_id!r}")
+    if "\r" in value or "\n" in value:
+        value = " ".join(value.splitlines())
+    content = field_id.encode("ascii") + value.encode(encoding, errors="replace")
+    length = 3 + len(content) + len(CRLF)
+    if length > MAX_LINE_LENGTH:
+        raise GdtError(f"Feld {field_id}: {length} Bytes, GDT erlaubt höchstens {MAX_LINE_LENGTH}")
+    return b"%03d%s\r\n" % (length, content)
+
+
+def encode(records: Iterable[Union[GdtRecord, Iterable[Field]]], encoding: str = "cp1252") -> bytes:
+    """Sätze (GdtRecord oder Listen von (Feldkennung, Wert)) → GDT-Bytes."""
+    out = bytearray()
+    for record in records:
+        fields = record.fields if isinstance(record, GdtRecord) else record
+        for field_id, value in fields:
+            out += encode_field(field_id, value, encoding)
+    return bytes(out)
+
+
+def write_file(path: Path, fields: Iterable[Field], encoding: str = "cp1252") -> None:
+    """Einen Satz schreiben (Verzeichnis wird bei Bedarf angelegt)."""
+    data = encode([fields], encoding)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(data)
@@ -0,0 +1,261 @@
+r"""
+Inbox-Überwachung der GDT-Bridge
+================================
+Statt den Eingangsordner in einer Sekunden-Schleife alle poll_inbox_seconds
+zu durchsuchen, meldet ein Watcher neue GDT-Dateien sofort:
+
+  inotify   Linux: IN_CLOSE_WRITE / IN_MOVED_TO (ctypes, ohne Zusatzpaket)
+  windows   ReadDirectoryChangesW (pywin32 – ohnehin für den Dienst installiert)
+  polling   Fallback: Snapshot (Name, Größe, mtime) alle poll_interval Sekunden,
+            z.B. für Netzlaufwerke ohne Änderungsmeldungen
+
+Alle Watcher haben dieselbe Schnittstelle:
+
+  watcher = create_watcher(inbox, mode="auto", debounce=0.5, poll_interval=5)
+  if watcher.wait(timeout):     # True = neue/geänderte .gdt-Datei (entprellt)
+      bridge.process_inbox()
+  watcher.close()
+
+Entprellen: SAMAS schreibt eine Datei evtl. in mehreren Schritten; wait()
+kehrt erst zurück, wenn `debounce` Sekunden lang nichts mehr passiert ist
+(höchstens MAX_DEBOUNCE_FACTOR · debounce). Ob eine Datei wirklich fertig
+ist, entscheidet weiterhin der rename ins Staging-Verzeichnis.
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+log = logging.getLogger("gdt_bridge")
+
+GDT_SUFFIX = ".gdt"
+
+# Dauerhaft geschriebene Dateien dürfen die Verarbeitung nicht endlos aufschieben
+MAX_DEBOUNCE_FACTOR = 10
+
+
+def _is_gdt(name: str) -> bool:
+    return name.lower().endswith(GDT_SUFFIX)
+
+
+class InboxWatcher(abc.ABC):
+    """Basis: wait() mit Entprellung; Unterklassen implementieren _read_events()."""
+
+    name = "base"
+
+    def __init__(self, path: Path, debounce: float = 0.5):
+        self.path = Path(path)
+        self.debounce = max(0.0, debounce)
+
+    @abc.abstractmethod
+    def _read_events(self, timeout: float) -> bool:
+        """Bis zu timeout Sekunden auf eine relevante Änderung warten → True, wenn eine kam."""
+
+    def wait(self, timeout: float) -> bool:
+        """Auf neue GDT-Dateien warten (höchstens timeout Sekunden) → True bei Änderung."""
+        if not self._read_events(max(0.0, timeout)):
+            return False
+        deadline = time.monotonic() + self.debounce * MAX_DEBOUNCE_FACTOR
+        while self.debounce and time.monotonic() < deadline:
+            if not self._read_events(min(self.debounce, max(0.0, deadline - time.monotonic()))):
+                break
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(InboxWatcher):
+    """Fallback: vergleicht alle poll_interval Sekunden einen Verzeichnis-Snapshot."""
+
+    name = "polling"
+
+    def __init__(self, path: Path, debounce: float = 0.5, poll_interval: float = 5.0):
+        super().__init__(path, debounce)
+        self.poll_interval = max(0.1, poll_interval)
+        self._snapshot: dict[str, tuple[int, int]] = {}
+        self._next_scan = 0.0
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if _is_gdt(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+        except OSError as exc:
+            log.warning("Inbox %s nicht lesbar: %s", self.path, exc)
+        return snapshot
+
+    def _read_events(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if now >= self._next_scan:
+                self._next_scan = now + self.poll_interval
+                snapshot = self._scan()
+                # Nur neue oder noch wachsende Dateien zählen – nicht verschwundene
+                changed = any(self._snapshot.get(name) != stat for name, stat in snapshot.items())
+                self._snapshot = snapshot
+                if changed:
+                    return True
+            if now >= deadline:
+                return False
+            time.sleep(max(0.0, min(deadline, self._next_scan) - now))
+
+
+class InotifyWatcher(InboxWatcher):
+    """Linux: inotify auf IN_CLOSE_WRITE (Datei fertig geschrieben) und IN_MOVED_TO."""
+
+    name = "inotify"
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO    = 0x00000080
+    IN_Q_OVERFLOW  = 0x00004000
+    IN_IGNORED     = 0x00008000
+    _EVENT = struct.Struct("iIII")   # wd, mask, cookie, len (danach der Dateiname)
+
+    def __init__(self, path: Path, debounce: float = 0.5):
+        super().__init__(path, debounce)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        wd = libc.inotify_add_watch(
+            self._fd, os.fsencode(str(self.path)), self.IN_CLOSE_WRITE | self.IN_MOVED_TO,
+        )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch({self.path}) fehlgeschlagen")
+
+    def _relevant(self, data: bytes) -> bool:
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(sys.getfilesystemencoding(), "replace")
+            offset += length
+            # Überlauf der Kernel-Queue bzw. entfernte Überwachung: lieber einmal zu viel scannen
+            if mask & (self.IN_Q_OVERFLOW | self.IN_IGNORED) or _is_gdt(name):
+                return True
+        return False
+
+    def _read_events(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            ready, _, _ = select.select([self._fd], [], [], max(0.0, deadline - time.monotonic()))
+            if not ready:
+                return False
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                data = b""
+            if self._relevant(data):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class WindowsWatcher(InboxWatcher):
+    """Windows: ReadDirectoryChangesW (überlappend, damit wait() einen Timeout hat)."""
+
+    name = "windows"
+
+    FILE_LIST_DIRECTORY = 0x0001
+
+    def __init__(self, path: Path, debounce: float = 0.5):
+        super().__init__(path, debounce)
+        import pywintypes
+        import win32con
+        import win32event
+        import win32file
+
+        self._win32event = win32event
+        self._win32file = win32file
+        self._handle = win32file.CreateFile(
+            str(self.path),
+            self.FILE_LIST_DIRECTORY,
+            win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+            None,
+            win32con.OPEN_EXISTING,
+            win32con.FILE_FLAG_BACKUP_SEMANTICS | win32con.FILE_FLAG_OVERLAPPED,
+            None,
+        )
+        self._overlapped = pywintypes.OVERLAPPED()
+        self._overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        self._buffer = win32file.AllocateReadBuffer(64 * 1024)
+        self._filter = (
+            win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+            | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE
+            | win32con.FILE_NOTIFY_CHANGE_SIZE
+        )
+        self._arm()
+
+    def _arm(self) -> None:
+        self._win32file.ReadDirectoryChangesW(
+            self._handle, self._buffer, False, self._filter, self._overlapped,
+        )
+
+    def _read_events(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            rc = self._win32event.WaitForSingleObject(self._overlapped.hEvent, int(remaining * 1000))
+            if rc == self._win32event.WAIT_TIMEOUT:
+                return False
+            nbytes = self._win32file.GetOverlappedResult(self._handle, self._overlapped, True)
+            # 0 Bytes = Puffer übergelaufen → wie ein relevantes Ereignis behandeln
+            changes = self._win32file.FILE_NOTIFY_INFORMATION(self._buffer, nbytes) if nbytes else None
+            self._win32event.ResetEvent(self._overlapped.hEvent)
+            self._arm()
+            if changes is None or any(_is_gdt(name) for _action, name in changes):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        if self._handle is not None:
+            try:
+                self._win32file.CancelIo(self._handle)
+            finally:
+                self._handle.Close()
+                self._handle = None
+
+
+def create_watcher(path: Path, mode: str = "auto", debounce: float = 0.5,
+                   poll_interval: float = 5.0) -> InboxWatcher:
+    """
+    Watcher für den Eingangsordner erzeugen.
+    mode: auto | inotify | windows | polling – bei auto fällt die Bridge auf
+    Polling zurück, wenn die native Überwachung nicht verfügbar ist.
+    """
+    mode = (mode or "auto").strip().lower()
+    if mode == "polling":
+        return PollingWatcher(path, debounce, poll_interval)
+    if mode == "auto":
+        mode = "windows" if sys.platform == "win32" else "inotify" if sys.platform.startswith("linux") else "polling"
+        if mode == "polling":
+            return PollingWatcher(path, debounce, poll_interval)
+    native = {"inotify": InotifyWatcher, "windows": WindowsWatcher}.get(mode)
+    if native is None:
+        raise ValueError(f"Unbekannter inbox_watcher: {mode!r} (auto, inotify, windows, polling)")
+    try:
+        return native(path, debounce)
+    except Exception as exc:   # u.a. ImportError, OSError, pywintypes.error
+        log.warning("Inbox-Überwachung %s nicht verfügbar (%s) – Polling alle %s s",
+                    mode, exc, poll_interval)
+        return PollingWatcher(path, debounce, poll_interval)
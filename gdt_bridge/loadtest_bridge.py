@@ -0,0 +1,433 @@
+"""
+Lasttest der GDT-Bridge gegen einen lokalen Ersatz-Server
+==========================================================
+Startet den plattformunabhängigen Kern (GdtBridge, ohne win32service) in
+einem Arbeitsordner und lässt ihn gegen einen Ersatz-Server im selben
+Prozess laufen (/api/gdt/session/, /gdt/result/<token>/, /gdt/results/,
+/gdt/completions/). Der Server antwortet mit einstellbarer Latenz und
+Fehlerquote (503); ein Anteil der Sessions wird nach einer zufälligen
+Wartezeit "ausgefüllt".
+
+  cd gdt_bridge
+  python loadtest_bridge.py                                   # 1000 Dateien, 5000 offene Sessions
+  python loadtest_bridge.py --files 200 --latency 0.2 --error-rate 0.05
+  python loadtest_bridge.py --no-feed --no-batch              # älterer Server: Abfrage je Token
+  python loadtest_bridge.py --rate 20 --tracemalloc           # 20 Dateien/s, Python-Speicher messen
+
+Gemessen werden Durchsatz (Dateien/s bis zur Link-GDT), Latenzen als
+Perzentile – Datei geschrieben → Link-GDT, ausgefüllt → Ergebnis-GDT –,
+die Stufen-Histogramme der Bridge (bridge_metrics.py), Requests je
+Endpunkt und der Speicher (max. RSS; mit --tracemalloc zusätzlich die
+Python-Allokationen, deutlich langsamer). Server und Bridge laufen im
+selben Prozess, der Speicher enthält also beide.
+
+Nichts davon berührt die Produktion: Ordner, pending.sqlite3 und Log liegen
+im Arbeitsordner (Default: temporär, wird danach gelöscht).
+"""
+import argparse
+import heapq
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from configparser import ConfigParser
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+import gdt_codec
+import gdt_bridge_service
+from gdt_bridge_service import GdtBridge
+
+try:
+    import resource
+except ImportError:  # Windows: kein max. RSS ohne Zusatzpaket
+    resource = None
+
+NAMES = ["Müller", "Schmidt", "Weiß", "Öztürk", "Jäger", "Krämer", "Groß", "Becker"]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Ersatz-Server
+# ──────────────────────────────────────────────────────────────────────────────
+class FakeServer:
+    """
+    Nachbau der GDT-Endpunkte im Speicher. Eine Session wird mit
+    Wahrscheinlichkeit completion_rate innerhalb von completion_delay
+    Sekunden nach der Anlage abgeschlossen; Abschlüsse erscheinen im Feed
+    in der Reihenfolge, in der sie fällig werden.
+    """
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, completion_rate: float = 0.5,
+                 completion_delay: float = 10.0, feed: bool = True, batch: bool = True, seed: int = 1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.completion_rate = completion_rate
+        self.completion_delay = completion_delay
+        self.feed = feed
+        self.batch = batch
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sessions: dict = {}        # token → {"request_id": Feld 8315, "completed_at": Unix-Zeit oder None}
+        self.idempotency: dict = {}     # Idempotency-Key → token
+        self.scheduled: list = []       # Heap (fällig um, token)
+        self.completions: list = []     # Feed: tokens in Abschluss-Reihenfolge
+        self.requests: dict = {}        # Endpunkt → Anzahl
+        self.errors = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self, "GET")
+
+            def do_POST(self):
+                server.handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/api"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-server", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ── Sessions ─────────────────────────────────────────────────────────
+    def add_session(self, request_id: str, now: Optional[float] = None) -> str:
+        """Session anlegen und ggf. Abschluss einplanen (Aufrufer hält self.lock)."""
+        token = str(uuid.uuid4())
+        now = time.time() if now is None else now
+        self.sessions[token] = {"request_id": request_id, "completed_at": None}
+        if self.rng.random() < self.completion_rate:
+            heapq.heappush(self.scheduled, (now + self.rng.uniform(0, self.completion_delay), token))
+        return token
+
+    def _advance(self, now: float) -> None:
+        """Fällige Abschlüsse übernehmen (Aufrufer hält self.lock)."""
+        while self.scheduled and self.scheduled[0][0] <= now:
+            due, token = heapq.heappop(self.scheduled)
+            self.sessions[token]["completed_at"] = due
+            self.completions.append(token)
+
+    def _result(self, token: str) -> dict:
+        session = self.sessions.get(token)
+        if session is None:
+            return {"status": "not_found"}
+        if session["completed_at"] is None:
+            expires = datetime.now(timezone.utc) + timedelta(days=14)
+            return {"status": "pending", "completed": False, "expires_at": expires.isoformat()}
+        return {
+            "status":        "completed",
+            "completed":     True,
+            "completed_at":  datetime.fromtimestamp(session["completed_at"]).strftime("%d.%m.%Y"),
+            "ess_total":     7,
+            "ess_band_text": "Normal",
+        }
+
+    def completed(self) -> tuple:
+        """→ ([(Anforderungsnummer, Abschlusszeit), …], noch eingeplante Abschlüsse)."""
+        with self.lock:
+            self._advance(time.time())
+            done = [
+                (self.sessions[token]["request_id"], self.sessions[token]["completed_at"])
+                for token in self.completions
+            ]
+            return done, len(self.scheduled)
+
+    # ── HTTP ─────────────────────────────────────────────────────────────
+    def handle(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        parts = urlsplit(request.path)
+        path = parts.path[len("/api"):] if parts.path.startswith("/api") else parts.path
+        endpoint = gdt_bridge_service.endpoint_label(path)
+        length = int(request.headers.get("Content-Length") or 0)
+        body = json.loads(request.rfile.read(length)) if length else {}
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            fail = self.rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            self._advance(time.time())
+            if fail:
+                status, payload = 503, {"detail": "Ersatz-Server: simulierter Fehler"}
+            else:
+                status, payload = self._route(method, path, parts.query, body, request.headers)
+
+        data = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _route(self, method: str, path: str, query: str, body: dict, headers) -> tuple:
+        """→ (Status, JSON); Aufrufer hält self.lock."""
+        if method == "POST" and path == "/gdt/session/":
+            key = headers.get("Idempotency-Key")
+            token = self.idempotency.get(key) if key else None
+            if token is None:
+                token = self.add_session(body.get("gdt_request_id", ""))
+                if key:
+                    self.idempotency[key] = token
+            return 201, {"token": token, "url": f"https://fragebogen.example/q/{token}"}
+        if method == "POST" and path == "/gdt/results/":
+            if not self.batch:
+                return 404, {"detail": "Nicht gefunden."}
+            return 200, {"results": {token: self._result(token) for token in body.get("tokens", [])}}
+        if method == "GET" and path == "/gdt/completions/":
+            if not self.feed:
+                return 404, {"detail": "Nicht gefunden."}
+            since = parse_qs(query).get("since", [""])[0]
+            if since == "latest":
+                return 200, {"events": [], "cursor": str(len(self.completions)), "has_more": False}
+            start = int(since or 0)
+            page = self.completions[start:start + 200]
+            events = [
+                {"cursor": str(start + i + 1), "token": token, **self._result(token)}
+                for i, token in enumerate(page)
+            ]
+            return 200, {
+                "events": events, "cursor": str(start + len(page)),
+                "has_more": start + len(page) < len(self.completions),
+            }
+        if method == "GET" and path.startswith("/gdt/result/"):
+            result = self._result(path.strip("/").split("/")[-1])
+            if result["status"] == "not_found":
+                return 404, {"error": "Session nicht gefunden"}
+            return (200 if result["completed"] else 202), result
+        return 404, {"detail": "Nicht gefunden."}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Lastprofil
+# ──────────────────────────────────────────────────────────────────────────────
+def request_fields(i: int, rng: random.Random) -> list:
+    return [
+        ("8000", "6310"),
+        ("3000", f"{100000 + i}"),
+        ("3101", rng.choice(NAMES)),
+        ("3102", rng.choice(["Max", "Erika", "Jürgen", "Anna"])),
+        ("3103", f"{rng.randint(1, 28):02d}{rng.randint(1, 12):02d}{rng.randint(1930, 2005)}"),
+        ("3121", f"patient{i}@example.com"),
+        ("8315", f"REQ-{i:06d}"),
+        ("8001", "6310"),
+    ]
+
+
+def write_inbox_file(inbox: Path, stem: str, fields: list, encoding: str) -> float:
+    """Wie SAMAS: Datei schreiben – hier über *.tmp und Umbenennen, nie halb sichtbar."""
+    tmp = inbox / f"{stem}.tmp"
+    gdt_codec.write_file(tmp, fields, encoding)
+    tmp.replace(inbox / f"{stem}.gdt")
+    return time.time()
+
+
+def seed_pending(bridge: GdtBridge, server: FakeServer, count: int, max_age_hours: float,
+                 rng: random.Random) -> dict:
+    """
+    Offene Sessions vorab auf beiden Seiten anlegen (Alter gleichverteilt bis
+    max_age_hours) → {Anforderungsnummer: Dateiname ohne Endung}.
+    """
+    stems = {f"SEED-{i:05d}": f"seed{i:05d}" for i in range(count)}
+    now = time.time()
+    with server.lock:
+        tokens = [server.add_session(request_id, now) for request_id in stems]
+    for (request_id, stem), token in zip(stems.items(), tokens):
+        created = datetime.now() - timedelta(hours=rng.uniform(0, max_age_hours))
+        bridge.pending.add(token, {"gdt_patient_id": request_id, "gdt_request_id": request_id},
+                           stem, created.isoformat())
+    return stems
+
+
+def percentiles(values: list) -> str:
+    if not values:
+        return "–"
+    values = sorted(values)
+
+    def rank(q: float) -> float:
+        return values[min(len(values) - 1, max(0, round(q * len(values)) - 1))]
+
+    return (f"p50 {rank(0.5):8.3f}  p90 {rank(0.9):8.3f}  p99 {rank(0.99):8.3f}  "
+            f"max {values[-1]:8.3f}  (n={len(values)})")
+
+
+def max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024   # macOS: Bytes, sonst KB
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Ablauf
+# ──────────────────────────────────────────────────────────────────────────────
+def run(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="gdt_loadtest_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # Log in den Arbeitsordner (das bridge.log des Dienstes öffnet erst setup_logging())
+    handler = logging.FileHandler(workdir / "bridge.log", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s  %(levelname)-8s  %(message)s"))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger("gdt_bridge").setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    server = FakeServer(
+        latency=args.latency, error_rate=args.error_rate, completion_rate=args.completion_rate,
+        completion_delay=args.completion_delay, feed=not args.no_feed, batch=not args.no_batch,
+        seed=args.seed,
+    )
+    cfg = ConfigParser()
+    cfg["bridge"] = {
+        "gdt_inbox":                 str(workdir / "inbox"),
+        "gdt_outbox":                str(workdir / "outbox"),
+        "api_url":                   server.url,
+        "api_key":                   "loadtest",
+        "gdt_encoding":              args.encoding,
+        "pending_db":                str(workdir / "pending.sqlite3"),
+        "metrics_file":              str(workdir / "metrics.prom"),
+        "inbox_watcher":             args.watcher,
+        "inbox_debounce_seconds":    "0.1",
+        "poll_inbox_seconds":        "1",
+        "poll_result_seconds":       str(args.poll_result),
+        "inbox_workers":             str(args.workers),
+        "server_max_concurrency":    str(args.concurrency),
+        "offline_retry_seconds":     "1",
+        "offline_retry_max_seconds": "5",
+    }
+    bridge = GdtBridge(cfg)
+    stems = seed_pending(bridge, server, args.pending, args.pending_max_age, rng)
+
+    stop = threading.Event()
+    worker = threading.Thread(target=bridge.run, args=(stop,), name="bridge")
+    started = time.time()
+    worker.start()
+
+    # Dateien einstellen: alle auf einmal (Stapel am Morgen) oder mit --rate pro Sekunde
+    written: dict = {}
+    for i in range(args.files):
+        stem = f"load{i:05d}"
+        stems[f"REQ-{i:06d}"] = stem
+        written[stem] = write_inbox_file(bridge.inbox, stem, request_fields(i, rng), args.encoding)
+        if args.rate:
+            time.sleep(max(0.0, started + (i + 1) / args.rate - time.time()))
+    print(f"{args.files} Dateien eingestellt, {args.pending} offene Sessions, Arbeitsordner {workdir}")
+
+    # Warten, bis jede Datei ihre Link-GDT hat (oder in failed/ liegt) und alle
+    # Abschlüsse des Servers als Ergebnis-GDT angekommen sind
+    deadline = started + args.timeout
+    while time.time() < deadline:
+        done_files = sum(1 for _ in bridge.processed.glob("*.gdt")) + sum(1 for _ in bridge.failed.glob("*.gdt"))
+        completed, scheduled = server.completed()
+        delivered = sum(1 for request_id, _ in completed
+                        if (bridge.outbox / f"{stems[request_id]}_result.gdt").exists())
+        if done_files >= args.files and not scheduled and delivered >= len(completed):
+            break
+        time.sleep(0.25)
+    else:
+        print(f"Zeitlimit {args.timeout:.0f} s erreicht – Auswertung mit dem bisherigen Stand")
+    elapsed = time.time() - started
+
+    # ── Auswertung (Zeitpunkte aus dem Änderungsdatum der Ausgabedateien) ─
+    link_latency = []
+    last_link = started
+    for stem, at in written.items():
+        link = bridge.outbox / f"{stem}.gdt"
+        if link.exists():
+            mtime = link.stat().st_mtime
+            link_latency.append(max(0.0, mtime - at))
+            last_link = max(last_link, mtime)
+    result_latency = []
+    for request_id, completed_at in completed:
+        result = bridge.outbox / f"{stems[request_id]}_result.gdt"
+        if result.exists():
+            result_latency.append(max(0.0, result.stat().st_mtime - completed_at))
+    failed = sum(1 for _ in bridge.failed.glob("*.gdt"))
+    queued = bridge.pending.queued_count()
+    metrics = bridge.metrics
+
+    stop.set()
+    worker.join()
+    server.close()
+
+    throughput = len(link_latency) / max(last_link - started, 1e-9)
+    print()
+    print(f"Laufzeit            {elapsed:8.1f} s")
+    print(f"Dateien             {len(link_latency)} mit Link-GDT, {failed} failed/, {queued} in der "
+          f"Offline-Warteschlange – {throughput:.1f} Dateien/s")
+    print(f"Datei → Link-GDT    {percentiles(link_latency)}  [s]")
+    print(f"Ergebnis-GDT        {len(result_latency)} von {len(completed)} Abschlüssen am Server")
+    print(f"Abschluss → Ergebnis {percentiles(result_latency)}  [s]")
+    print()
+    print("Stufen der Bridge (bridge_metrics, aus Histogramm-Buckets genähert):")
+    for stage in ("staged", "session_created", "link_written"):
+        hist = metrics.get_histogram("gdt_bridge_stage_seconds", stage=stage)
+        if hist is not None:
+            print(f"  {stage:16} p50 {hist.quantile(0.5):8.3f}  p90 {hist.quantile(0.9):8.3f}  "
+                  f"p99 {hist.quantile(0.99):8.3f}  (n={hist.count})")
+    print()
+    print(f"Requests am Server  ({server.errors} simulierte Fehler)")
+    for endpoint, count in sorted(server.requests.items()):
+        print(f"  {endpoint:24} {count:8}")
+    print()
+    rss = max_rss_mb()
+    print(f"Speicher            max. RSS {rss:.0f} MB" if rss is not None else "Speicher            max. RSS –")
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"                    Python-Allokationen {current / 1e6:.1f} MB, Spitze {peak / 1e6:.1f} MB")
+
+    if not args.workdir and not args.keep:
+        logging.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if len(link_latency) + failed + queued == args.files else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000, help="Anforderungs-GDTs in der Inbox")
+    parser.add_argument("--rate", type=float, default=0, help="Dateien pro Sekunde (0 = alle auf einmal)")
+    parser.add_argument("--pending", type=int, default=5000, help="vorab offene Sessions")
+    parser.add_argument("--pending-max-age", type=float, default=48, help="Alter der offenen Sessions bis (Stunden)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Antwortzeit des Servers (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil 503-Antworten (0–1)")
+    parser.add_argument("--completion-rate", type=float, default=0.5, help="Anteil ausgefüllter Sessions (0–1)")
+    parser.add_argument("--completion-delay", type=float, default=10, help="ausgefüllt innerhalb von … s")
+    parser.add_argument("--no-feed", action="store_true", help="Server ohne /gdt/completions/")
+    parser.add_argument("--no-batch", action="store_true", help="Server ohne /gdt/results/")
+    parser.add_argument("--poll-result", type=int, default=2, help="poll_result_seconds der Bridge")
+    parser.add_argument("--workers", type=int, default=4, help="inbox_workers der Bridge")
+    parser.add_argument("--concurrency", type=int, default=4, help="server_max_concurrency der Bridge")
+    parser.add_argument("--watcher", default="auto", choices=["auto", "polling"])
+    parser.add_argument("--encoding", default="cp1252")
+    parser.add_argument("--timeout", type=float, default=120, help="höchstens so lange warten (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workdir", help="Arbeitsordner (bleibt erhalten); Default: temporär")
+    parser.add_argument("--keep", action="store_true", help="temporären Arbeitsordner nicht löschen")
+    parser.add_argument("--tracemalloc", action="store_true", help="Python-Allokationen messen (langsamer)")
+    parser.add_argument("--verbose", action="store_true", help="INFO-Meldungen ins Log des Arbeitsordners")
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+r"""
+Pending-Store der GDT-Bridge
+============================
+Offene Sessions, die noch auf das Ergebnis warten, liegen in einer lokalen
+SQLite-Datenbank (pending.sqlite3 neben dem Dienst) statt in pending.json:
+
+- WAL-Modus: ein Absturz mitten im Schreiben verliert höchstens die letzte
+  Transaktion, die Datei bleibt konsistent (kein stilles "[]" mehr).
+- Einfügen, Entfernen und Neuplanen betreffen je eine Zeile; nichts wird
+  komplett neu geschrieben, wenn sich nichts geändert hat.
+- Indizes auf token (Primärschlüssel), next_check_at und created_at:
+  fällige bzw. abgelaufene Einträge per Indexzugriff.
+
+Eine vorhandene pending.json wird beim ersten Start einmalig übernommen und
+danach in pending.json.migrated umbenannt.
+
+Zweite Tabelle: die Offline-Warteschlange (session_requests). Ist der Server
+nicht erreichbar, wartet die Anlage einer Session dort – samt Patientendaten
+und Idempotency-Key – bis zum nächsten Versuch, auch über Neustarts hinweg.
+
+Dritte Tabelle: state (Schlüssel → Wert), z.B. der Cursor des
+Abschluss-Feeds (GET /api/gdt/completions/).
+
+Thread-sicher: eine Verbindung, serialisiert über ein Lock (die Inbox-Worker
+tragen parallel ein).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+log = logging.getLogger("gdt_bridge")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    token         TEXT PRIMARY KEY,
+    patient       TEXT NOT NULL,               -- JSON wie aus parse_gdt()
+    out_stem      TEXT NOT NULL,
+    created_at    TEXT NOT NULL,               -- ISO-Zeit (lokal), sortierbar
+    next_check_at REAL NOT NULL DEFAULT 0      -- Unix-Zeit der nächsten Abfrage
+);
+CREATE INDEX IF NOT EXISTS pending_next_check_idx ON pending (next_check_at);
+CREATE INDEX IF NOT EXISTS pending_created_idx ON pending (created_at);
+
+CREATE TABLE IF NOT EXISTS session_requests (
+    idempotency_key TEXT PRIMARY KEY,          -- gleicher Key bei jeder Wiederholung
+    patient         TEXT NOT NULL,             -- JSON wie aus parse_gdt()
+    out_stem        TEXT NOT NULL,
+    file_path       TEXT NOT NULL,             -- GDT-Datei in queued/
+    created_at      TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error      TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS session_requests_due_idx ON session_requests (next_attempt_at);
+
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class PendingStore:
+    """Offene Sessions (token → Patient, Ausgabename, Zeitpunkte) in SQLite."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=10, isolation_level=None, check_same_thread=False,
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Mit WAL sicher gegen Absturz des Dienstes; nur ein Stromausfall
+            # kann die letzte Transaktion kosten
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    # ── Schreiben ────────────────────────────────────────────────────────
+    def add(self, token: str, patient: dict, out_stem: str,
+            created_at: Optional[str] = None, next_check_at: float = 0.0) -> None:
+        """Neue offene Session eintragen (ein INSERT)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pending (token, patient, out_stem, created_at, next_check_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    token,
+                    json.dumps(patient, ensure_ascii=False),
+                    out_stem,
+                    created_at or datetime.now().isoformat(),
+                    next_check_at,
+                ),
+            )
+
+    def remove(self, token: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM pending WHERE token = ?", (token,))
+
+    def reschedule(self, schedule: dict[str, float]) -> None:
+        """next_check_at für mehrere Einträge setzen ({token: Unix-Zeit}, eine Transaktion)."""
+        if not schedule:
+            return
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "UPDATE pending SET next_check_at = ? WHERE token = ?",
+                [(when, token) for token, when in schedule.items()],
+            )
+
+    def purge_older_than(self, cutoff: datetime) -> list[str]:
+        """Einträge vor cutoff entfernen (nie ausgefüllt) → entfernte Tokens."""
+        with self._lock, self._transaction():
+            tokens = [
+                row["token"] for row in self._conn.execute(
+                    "SELECT token FROM pending WHERE created_at < ?", (cutoff.isoformat(),),
+                )
+            ]
+            if tokens:
+                self._conn.execute("DELETE FROM pending WHERE created_at < ?", (cutoff.isoformat(),))
+        return tokens
+
+    # ── Lesen ────────────────────────────────────────────────────────────
+    def due(self, now: Optional[float] = None, limit: Optional[int] = None) -> list[dict]:
+        """Fällige Einträge (next_check_at <= now), früheste zuerst."""
+        now = time.time() if now is None else now
+        sql = "SELECT * FROM pending WHERE next_check_at <= ? ORDER BY next_check_at, created_at"
+        params: tuple = (now,)
+        if limit:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return [self._entry(row) for row in self._conn.execute(sql, params)]
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pending WHERE token = ?", (token,)).fetchone()
+        return self._entry(row) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def oldest_created_at(self) -> Optional[str]:
+        """created_at des ältesten offenen Eintrags (Index), None bei leerer Tabelle."""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(created_at) FROM pending").fetchone()[0]
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            return [self._entry(row) for row in self._conn.execute(
+                "SELECT * FROM pending ORDER BY created_at"
+            )]
+
+    # ── Offline-Warteschlange (Session-Anlage) ──────────────────────────
+    def queue_request(self, idempotency_key: str, patient: dict, out_stem: str, file_path: Path,
+                      attempts: int, next_attempt_at: float, error: str) -> None:
+        """Anlage zurückstellen, bis der Server wieder erreichbar ist."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_requests (idempotency_key, patient, out_stem,"
+                " file_path, created_at, attempts, next_attempt_at, last_error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    idempotency_key,
+                    json.dumps(patient, ensure_ascii=False),
+                    out_stem,
+                    str(file_path),
+                    datetime.now().isoformat(),
+                    attempts,
+                    next_attempt_at,
+                    error,
+                ),
+            )
+
+    def request_failed(self, idempotency_key: str, attempts: int, next_attempt_at: float,
+                       error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE session_requests SET attempts = ?, next_attempt_at = ?, last_error = ?"
+                " WHERE idempotency_key = ?",
+                (attempts, next_attempt_at, error, idempotency_key),
+            )
+
+    def postpone_requests(self, until: float) -> None:
+        """Alle bis `until` fälligen Anlagen auf `until` verschieben (Server weiter offline)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE session_requests SET next_attempt_at = ? WHERE next_attempt_at < ?",
+                (until, until),
+            )
+
+    def remove_request(self, idempotency_key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM session_requests WHERE idempotency_key = ?", (idempotency_key,),
+            )
+
+    def queued_requests(self, now: Optional[float] = None) -> list[dict]:
+        """Zurückgestellte Anlagen (nur fällige, wenn now gesetzt), älteste zuerst."""
+        sql = "SELECT * FROM session_requests"
+        params: tuple = ()
+        if now is not None:
+            sql += " WHERE next_attempt_at <= ?"
+            params = (now,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY created_at", params).fetchall()
+        return [
+            {
+                "idempotency_key": row["idempotency_key"],
+                "patient":         json.loads(row["patient"]),
+                "out_stem":        row["out_stem"],
+                "file_path":       Path(row["file_path"]),
+                "created_at":      row["created_at"],
+                "attempts":        row["attempts"],
+                "next_attempt_at": row["next_attempt_at"],
+                "last_error":      row["last_error"],
+            }
+            for row in rows
+        ]
+
+    def next_request_at(self) -> Optional[float]:
+        """Zeitpunkt der nächsten fälligen Anlage, None bei leerer Warteschlange."""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(next_attempt_at) FROM session_requests").fetchone()[0]
+
+    def queued_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM session_requests").fetchone()[0]
+
+    # ── Zustand (Schlüssel → Wert) ─────────────────────────────────────────
+    def get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    # ── Migration aus pending.json ───────────────────────────────────────
+    def import_json(self, json_path: Path) -> int:
+        """
+        Einträge aus einer alten pending.json übernehmen (einmalig) → Anzahl.
+        Danach wird die Datei in *.migrated umbenannt; eine unlesbare Datei
+        bleibt liegen und wird gemeldet statt ignoriert.
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        try:
+            entries = json.loads(json_path.read_text(encoding="utf-8"))
+            rows = [
+                (
+                    entry["token"],
+                    json.dumps(entry.get("patient", {}), ensure_ascii=False),
+                    entry.get("out_stem") or entry["token"],
+                    entry.get("created_at") or datetime.now().isoformat(),
+                )
+                for entry in entries
+            ]
+        except (OSError, ValueError, TypeError, KeyError) as exc:
+            log.error("pending.json nicht lesbar, bitte manuell prüfen (%s): %s", json_path, exc)
+            return 0
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pending (token, patient, out_stem, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        json_path.replace(json_path.with_name(json_path.name + ".migrated"))
+        log.info("%d offene Session(s) aus %s übernommen", len(rows), json_path.name)
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ── intern ───────────────────────────────────────────────────────────
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> dict:
+        return {
+            "token":         row["token"],
+            "patient":       json.loads(row["patient"]),
+            "out_stem":      row["out_stem"],
+            "created_at":    row["created_at"],
+            "next_check_at": row["next_check_at"],
+        }
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE … COMMIT bzw. ROLLBACK (Verbindung im Autocommit-Modus)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,102 @@
+"""
+Tests für bridge_metrics – Textformat und HTTP-Endpunkt
+
+  cd gdt_bridge
+  python -m unittest test_bridge_metrics
+"""
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+from bridge_metrics import CONTENT_TYPE, Metrics, MetricsServer
+
+
+def fetch(port: int, path: str) -> tuple:
+    """GET auf 127.0.0.1 → (Status, Content-Type, Text), auch bei 4xx/5xx."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as resp:
+            return resp.status, resp.headers["Content-Type"], resp.read().decode("utf-8")
+    except urllib.error.HTTPError as exc:
+        with exc:
+            return exc.code, exc.headers["Content-Type"], exc.read().decode("utf-8")
+
+
+def sample_metrics() -> Metrics:
+    metrics = Metrics()
+    metrics.counter("gdt_files_total", "Verarbeitete Dateien")
+    metrics.histogram("gdt_stage_seconds", "Dauer je Stufe", (1, 0.1, 10))   # unsortiert angemeldet
+    metrics.gauge("gdt_pending", "Offene Sessions", lambda: 3)
+    metrics.gauge("gdt_oldest_seconds", "Älteste Session", lambda: None)
+    metrics.inc("gdt_files_total", result="ok")
+    metrics.inc("gdt_files_total", 2, result="ok")
+    metrics.inc("gdt_files_total", result="error")
+    for value in (0.05, 0.5, 0.7, 20):
+        metrics.observe("gdt_stage_seconds", value, stage="staged")
+    return metrics
+
+
+class RenderTests(unittest.TestCase):
+    def test_textformat(self):
+        self.assertEqual(sample_metrics().render().splitlines(), [
+            "# HELP gdt_files_total Verarbeitete Dateien",
+            "# TYPE gdt_files_total counter",
+            'gdt_files_total{result="error"} 1',
+            'gdt_files_total{result="ok"} 3',
+            "# HELP gdt_stage_seconds Dauer je Stufe",
+            "# TYPE gdt_stage_seconds histogram",
+            'gdt_stage_seconds_bucket{stage="staged",le="0.1"} 1',
+            'gdt_stage_seconds_bucket{stage="staged",le="1"} 3',
+            'gdt_stage_seconds_bucket{stage="staged",le="10"} 3',
+            'gdt_stage_seconds_bucket{stage="staged",le="+Inf"} 4',
+            'gdt_stage_seconds_sum{stage="staged"} 21.25',
+            'gdt_stage_seconds_count{stage="staged"} 4',
+            "# HELP gdt_pending Offene Sessions",
+            "# TYPE gdt_pending gauge",
+            "gdt_pending 3",
+            "# HELP gdt_oldest_seconds Älteste Session",
+            "# TYPE gdt_oldest_seconds gauge",   # ohne Wert keine Zeile
+        ])
+
+    def test_labels_escaped_und_sortiert(self):
+        metrics = Metrics()
+        metrics.counter("gdt_errors_total", "Fehler")
+        metrics.inc("gdt_errors_total", stage="link", reason='"kaputt"\\\n')
+        self.assertIn('gdt_errors_total{reason="\\"kaputt\\"\\\\\\n",stage="link"} 1',
+                      metrics.render().splitlines())
+
+    def test_fehlerhafte_gauge(self):
+        metrics = Metrics()
+        metrics.gauge("gdt_broken", "Wirft", lambda: 1 / 0)
+        self.assertEqual(metrics.render(), "# HELP gdt_broken Wirft\n# TYPE gdt_broken gauge\n")
+
+
+class MetricsServerTests(unittest.TestCase):
+    def server(self, metrics: Metrics, health) -> MetricsServer:
+        server = MetricsServer(metrics, "127.0.0.1", 0, health)
+        self.addCleanup(server.close)
+        self.assertNotEqual(server.port, 0)
+        return server
+
+    def test_metrics(self):
+        metrics = sample_metrics()
+        server = self.server(metrics, lambda: (True, {}))
+        status, content_type, body = fetch(server.port, "/metrics")
+        self.assertEqual((status, content_type), (200, CONTENT_TYPE))
+        self.assertEqual(body, metrics.render())
+        self.assertEqual(fetch(server.port, "/metrics/?x=1")[0], 200)
+        self.assertEqual(fetch(server.port, "/")[0], 404)
+
+    def test_health(self):
+        state = {"ok": True}
+        server = self.server(Metrics(), lambda: (state["ok"], {"status": "ok" if state["ok"] else "stalled"}))
+        status, content_type, body = fetch(server.port, "/health")
+        self.assertEqual((status, content_type, json.loads(body)), (200, "application/json", {"status": "ok"}))
+
+        state["ok"] = False
+        status, _, body = fetch(server.port, "/health")
+        self.assertEqual((status, json.loads(body)), (503, {"status": "stalled"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,304 @@
+"""
+Tests für den Zustand der Bridge (pending.sqlite3) – ohne SAMAS und ohne
+Django: Ordner und Datenbank in einem temporären Verzeichnis, der Server
+ist der Ersatz-Server aus loadtest_bridge.py.
+
+  cd gdt_bridge
+  python -m unittest test_bridge_state
+"""
+import json
+import random
+import tempfile
+import time
+import unittest
+from configparser import ConfigParser
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from unittest import mock
+
+import gdt_bridge_service
+from gdt_bridge_service import (
+    EXPIRY_GRACE, FEED_CURSOR_KEY, FRESH_SECONDS, HEALTH_STALL_SECONDS, JITTER, GdtBridge,
+    next_check_delay, parse_expires_at, parse_retry_after,
+)
+from loadtest_bridge import FakeServer, request_fields, write_inbox_file
+from test_bridge_metrics import fetch
+
+
+class BridgeTestCase(unittest.TestCase):
+    """Arbeitsordner je Test; bridge() legt eine GdtBridge darin an."""
+
+    api_url = "http://127.0.0.1:9/api"   # nicht erreichbar, falls kein Server gebraucht wird
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory(prefix="gdt_bridge_test_")
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.pending_file = self.dir / "pending.json"
+        # Nie die pending.json neben dem Dienst übernehmen
+        patcher = mock.patch.object(gdt_bridge_service, "PENDING_FILE", self.pending_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def bridge(self, **options) -> GdtBridge:
+        cfg = ConfigParser()
+        cfg["bridge"] = {
+            "gdt_inbox":    str(self.dir / "inbox"),
+            "gdt_outbox":   str(self.dir / "outbox"),
+            "api_url":      self.api_url,
+            "api_key":      "test",
+            "pending_db":   str(self.dir / "pending.sqlite3"),
+            "metrics_file": "",
+            **{key: str(value) for key, value in options.items()},
+        }
+        bridge = GdtBridge(cfg)
+        self.addCleanup(bridge.close)
+        return bridge
+
+
+def without_jitter():
+    """random.uniform(a, b) → Mitte, damit Abstände exakt vergleichbar sind."""
+    return mock.patch.object(gdt_bridge_service.random, "uniform", side_effect=lambda a, b: (a + b) / 2)
+
+
+class CheckScheduleTests(BridgeTestCase):
+    def entry(self, age: float) -> dict:
+        created = datetime.now() - timedelta(seconds=age)
+        return {"token": "t1", "created_at": created.isoformat(timespec="seconds")}
+
+    def test_abstand_nach_alter(self):
+        with without_jitter():
+            self.assertEqual(next_check_delay(0, 30, 3600), 30)
+            self.assertEqual(next_check_delay(FRESH_SECONDS - 1, 30, 3600), 30)
+            # danach 10 % des Alters, aber nie unter base
+            self.assertEqual(next_check_delay(FRESH_SECONDS, 30, 3600), FRESH_SECONDS * 0.1)
+            self.assertEqual(next_check_delay(FRESH_SECONDS, 300, 3600), 300)
+            self.assertEqual(next_check_delay(2 * 3600, 30, 3600), 720)
+            self.assertEqual(next_check_delay(14 * 86400, 30, 3600), 3600)   # gedeckelt
+
+    def test_jitter_grenzen(self):
+        rng = random.Random(7)
+        with mock.patch.object(gdt_bridge_service.random, "uniform", rng.uniform):
+            delays = [next_check_delay(14 * 86400, 30, 3600) for _ in range(500)]
+        self.assertGreaterEqual(min(delays), 3600 * (1 - JITTER))
+        self.assertLessEqual(max(delays), 3600 * (1 + JITTER))
+        # tatsächlich gestreut, nicht alle im selben Zyklus
+        self.assertGreater(max(delays) - min(delays), 3600 * JITTER)
+
+    def test_retry_after(self):
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertEqual(parse_retry_after("-5"), 0)
+        for value in (None, "", "bald"):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_retry_after(value))
+        later = datetime.now(timezone.utc) + timedelta(seconds=90)
+        self.assertAlmostEqual(parse_retry_after(format_datetime(later, usegmt=True)), 90, delta=2)
+        self.assertEqual(parse_retry_after("Wed, 01 May 2024 08:00:00 GMT"), 0)
+
+    def test_expires_at(self):
+        utc = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc).timestamp()
+        self.assertEqual(parse_expires_at("2024-05-01T08:00:00Z"), utc)
+        self.assertEqual(parse_expires_at("2024-05-01T10:00:00+02:00"), utc)
+        self.assertEqual(parse_expires_at("2024-05-01T08:00:00"), utc)   # ohne Zone: UTC
+        for value in (None, "", "morgen"):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_expires_at(value))
+
+    def test_naechster_abfragezeitpunkt(self):
+        bridge = self.bridge(poll_result_seconds=30, poll_result_max_seconds=3600, feed_sweep_seconds=1800)
+        now = 1_000_000.0
+        fresh, old = self.entry(0), self.entry(14 * 86400)
+        with without_jitter():
+            self.assertEqual(bridge._next_check_at(fresh, now), now + 30)
+            self.assertEqual(bridge._next_check_at(old, now), now + 3600)
+            # Retry-After verlängert, verkürzt aber nie
+            self.assertEqual(bridge._next_check_at(fresh, now, retry_after=300), now + 300)
+            self.assertEqual(bridge._next_check_at(old, now, retry_after=300), now + 3600)
+            # Link läuft bald ab: eine letzte Abfrage kurz danach
+            self.assertEqual(bridge._next_check_at(old, now, expires_at=now + 100), now + 100 + EXPIRY_GRACE)
+            self.assertEqual(bridge._next_check_at(fresh, now, expires_at=now + 7200), now + 30)
+            # längst abgelaufen: nicht öfter als poll_result_seconds
+            self.assertEqual(bridge._next_check_at(old, now, expires_at=now - 86400), now + 30)
+
+            bridge._following_feed = True
+            self.assertEqual(bridge._next_check_at(fresh, now), now + 1800)
+            self.assertEqual(bridge._next_check_at(fresh, now, expires_at=now + 100), now + 100 + EXPIRY_GRACE)
+
+
+class PendingJsonMigrationTests(BridgeTestCase):
+    def test_uebernahme_beim_ersten_start(self):
+        self.pending_file.write_text(json.dumps([
+            {"token": "t1", "patient": {"gdt_patient_id": "1"}, "out_stem": "anf1",
+             "created_at": "2024-05-01T08:00:00"},
+            {"token": "t2", "patient": {"gdt_patient_id": "2"}},   # ältere Einträge ohne out_stem
+        ]), encoding="utf-8")
+
+        bridge = self.bridge()
+        self.assertEqual(bridge.pending.count(), 2)
+        first, second = bridge.pending.get("t1"), bridge.pending.get("t2")
+        self.assertEqual((first["out_stem"], first["created_at"]), ("anf1", "2024-05-01T08:00:00"))
+        self.assertEqual(first["patient"], {"gdt_patient_id": "1"})
+        self.assertEqual(second["out_stem"], "t2")
+        # sofort fällig, damit nach der Umstellung nichts liegen bleibt
+        self.assertEqual(len(bridge.pending.due()), 2)
+
+        self.assertFalse(self.pending_file.exists())
+        self.assertTrue((self.dir / "pending.json.migrated").exists())
+
+    def test_nur_einmal_uebernommen(self):
+        self.pending_file.write_text(json.dumps([{"token": "t1", "patient": {}}]), encoding="utf-8")
+        self.bridge().pending.remove("t1")
+        # Zweiter Start: die Datei ist umbenannt, der erledigte Eintrag kommt nicht wieder
+        self.assertEqual(self.bridge().pending.count(), 0)
+
+    def test_unlesbare_datei_bleibt_liegen(self):
+        for content in ('[{"token": "t1"', '[{"patient": {}}]', '{"token": "t1"}'):
+            with self.subTest(content=content):
+                self.pending_file.write_text(content, encoding="utf-8")
+                with self.assertLogs("gdt_bridge", "ERROR"):
+                    bridge = self.bridge()
+                self.assertEqual(bridge.pending.count(), 0)
+                self.assertEqual(self.pending_file.read_text(encoding="utf-8"), content)
+                self.assertFalse((self.dir / "pending.json.migrated").exists())
+
+
+class OfflineQueueTests(BridgeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeServer(latency=0, error_rate=1.0, completion_rate=0)   # jede Antwort 503
+        self.addCleanup(self.server.close)
+        self.api_url = self.server.url
+
+    def test_probe_dann_ganze_warteschlange(self):
+        bridge = self.bridge(offline_retry_seconds=60, inbox_workers=2)
+        rng = random.Random(1)
+        for i in range(3):
+            write_inbox_file(bridge.inbox, f"anf{i}", request_fields(i, rng), bridge.gdt_encoding)
+        with self.assertLogs("gdt_bridge", "WARNING"):
+            bridge.process_inbox()
+        self.assertEqual(bridge.pending.queued_count(), 3)
+        self.assertEqual(len(list(bridge.queued.glob("*.gdt"))), 3)
+        self.assertTrue((bridge.outbox / "anf0.gdt").exists())   # vorläufige Link-GDT
+        queued = bridge.pending.queued_requests()
+        keys = {item["idempotency_key"] for item in queued}
+
+        # Wartezeit abgelaufen, Server weiter offline: nur die älteste Anlage
+        # fragt an, alle übrigen werden mit ihr verschoben
+        for item in queued:
+            bridge.pending.request_failed(item["idempotency_key"], item["attempts"], 0, item["last_error"])
+        self.assertEqual(bridge.replay_offline(), 0)
+        self.assertEqual(self.server.requests["/gdt/session/"], 3 + 1)
+        self.assertEqual(bridge.pending.queued_requests(time.time()), [])
+        self.assertEqual(sorted(item["attempts"] for item in bridge.pending.queued_requests()), [1, 1, 2])
+        self.assertFalse(bridge._replay_due())
+
+        # Eine Anlage hat den Server trotz Fehler erreicht (Antwort verloren)
+        with self.server.lock:
+            self.server.idempotency[queued[0]["idempotency_key"]] = self.server.add_session("REQ-000000")
+        # Server antwortet wieder (hier auf die Ergebnisabfrage) → sofort nachholen,
+        # nicht erst nach der Wartezeit
+        self.server.error_rate = 0.0
+        bridge.check_pending()
+        self.assertTrue(bridge._replay_due())
+        self.assertEqual(bridge.replay_offline(), 3)
+
+        self.assertEqual(bridge.pending.queued_count(), 0)
+        self.assertEqual(bridge.pending.count(), 3)
+        # gleicher Idempotency-Key bei jeder Wiederholung → keine doppelte Session
+        self.assertEqual(set(self.server.idempotency), keys)
+        self.assertEqual(len(self.server.sessions), 3)
+        self.assertEqual(list(bridge.queued.iterdir()), [])
+        self.assertEqual(len(list(bridge.processed.glob("*.gdt"))), 3)
+        self.assertIn(b"fragebogen.example/q/", (bridge.outbox / "anf0.gdt").read_bytes())
+
+
+class CompletionFeedTests(BridgeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeServer(latency=0, completion_rate=0)   # Abschlüsse setzt der Test
+        self.addCleanup(self.server.close)
+        self.api_url = self.server.url
+
+    def open_sessions(self, bridge: GdtBridge, count: int) -> list:
+        with self.server.lock:
+            tokens = [self.server.add_session(f"REQ-{i}") for i in range(count)]
+        for i, token in enumerate(tokens):
+            bridge.pending.add(token, {"gdt_patient_id": str(i), "gdt_request_id": f"REQ-{i}"}, f"anf{i}")
+        return tokens
+
+    def complete(self, tokens: list, in_feed: bool = True) -> None:
+        with self.server.lock:
+            for token in tokens:
+                self.server.sessions[token]["completed_at"] = time.time()
+                if in_feed:
+                    self.server.completions.append(token)
+
+    def test_cursor_bleibt_vor_fehlgeschlagener_ergebnis_gdt(self):
+        bridge = self.bridge()
+        tokens = self.open_sessions(bridge, 3)
+        bridge.check_pending()   # Einstieg in den Feed, alle einmal einzeln geprüft
+        self.assertEqual(bridge.pending.get_state(FEED_CURSOR_KEY), "0")
+
+        self.complete(tokens)
+        (bridge.outbox / "anf1_result.gdt").mkdir()   # Ergebnis-GDT nicht schreibbar
+        with self.assertLogs("gdt_bridge", "ERROR"):
+            bridge.check_pending()
+        # Cursor hinter dem letzten geschriebenen Ergebnis, der Rest folgt im nächsten Zyklus
+        self.assertEqual(bridge.pending.get_state(FEED_CURSOR_KEY), "1")
+        self.assertEqual({entry["token"] for entry in bridge.pending.all()}, set(tokens[1:]))
+        self.assertTrue((bridge.outbox / "anf0_result.gdt").is_file())
+        self.assertFalse((bridge.outbox / "anf2_result.gdt").exists())
+
+        (bridge.outbox / "anf1_result.gdt").rmdir()
+        bridge.check_pending()
+        self.assertEqual(bridge.pending.get_state(FEED_CURSOR_KEY), "3")
+        self.assertEqual(bridge.pending.count(), 0)
+        for i in range(3):
+            self.assertTrue((bridge.outbox / f"anf{i}_result.gdt").is_file())
+
+    def test_sicherheitsnetz_bei_aktivem_feed(self):
+        bridge = self.bridge(feed_sweep_seconds=3600)
+        completed, deleted, still_open = self.open_sessions(bridge, 3)
+        bridge.check_pending()
+        bridge.pending.reschedule({token: 0.0 for token in (completed, deleted, still_open)})
+
+        # Abschluss ohne Feed-Eintrag, gelöschte Session
+        self.complete([completed], in_feed=False)
+        with self.server.lock:
+            del self.server.sessions[deleted]
+        with self.assertLogs("gdt_bridge", "WARNING"):
+            bridge.check_pending()
+        self.assertTrue((bridge.outbox / "anf0_result.gdt").is_file())
+        self.assertEqual([entry["token"] for entry in bridge.pending.all()], [still_open])
+        # Offene Einträge nur noch im Abstand feed_sweep_seconds einzeln
+        self.assertGreater(bridge.pending.get(still_open)["next_check_at"], time.time() + 3500)
+
+
+class HealthTests(BridgeTestCase):
+    def test_metrics_und_health(self):
+        bridge = self.bridge(metrics_port=0)
+        server = bridge._start_metrics_server()
+        self.addCleanup(server.close)
+        bridge.pending.add("t1", {"gdt_patient_id": "1"}, "anf1")
+
+        status, _, body = fetch(server.port, "/metrics")
+        self.assertEqual(status, 200)
+        values = dict(line.split(" ", 1) for line in body.splitlines() if not line.startswith("#"))
+        self.assertAlmostEqual(float(values["gdt_bridge_last_cycle_timestamp_seconds"]), bridge._last_cycle)
+
+        status, _, body = fetch(server.port, "/health")
+        details = json.loads(body)
+        self.assertEqual((status, details["status"], details["pending"], details["offline_queue"]),
+                         (200, "ok", 1, 0))
+
+        # Hauptschleife hängt → 503, damit das Monitoring alarmiert
+        bridge._last_cycle = time.time() - HEALTH_STALL_SECONDS - 10
+        status, _, body = fetch(server.port, "/health")
+        details = json.loads(body)
+        self.assertEqual((status, details["status"]), (503, "stalled"))
+        self.assertGreater(details["last_cycle_seconds_ago"], HEALTH_STALL_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
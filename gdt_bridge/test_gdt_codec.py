@@ -0,0 +1,146 @@
+"""
+Tests für gdt_codec – inkl. Fuzzing mit festem Seed
+
+  cd gdt_bridge
+  python -m unittest test_gdt_codec
+  GDT_FUZZ_ITERATIONS=50000 python -m unittest test_gdt_codec   # gründlicher
+"""
+import logging
+import os
+import random
+import unittest
+from pathlib import Path
+
+import gdt_codec
+from gdt_codec import GdtError
+
+FUZZ_ITERATIONS = int(os.environ.get("GDT_FUZZ_ITERATIONS", "2000"))
+SEED = int(os.environ.get("GDT_FUZZ_SEED", "4711"))
+
+HERE = Path(__file__).parent
+ALPHABET = "abcdefghijklmnopqrstuvwxyzABCXYZ0123456789 .-/:@ÄÖÜäöüß"
+
+
+def random_record(rng: random.Random, record_type: str = "6310") -> list:
+    fields = [("8000", record_type)]
+    for _ in range(rng.randint(0, 12)):
+        field_id = f"{rng.randint(1000, 9999)}"
+        if field_id in (gdt_codec.RECORD_START, gdt_codec.RECORD_END, gdt_codec.RECORD_LENGTH):
+            continue
+        value = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+        fields.append((field_id, value))
+    fields.append(("8001", record_type))
+    return fields
+
+
+def mutate(rng: random.Random, data: bytes) -> bytes:
+    buf = bytearray(data)
+    for _ in range(rng.randint(1, 4)):
+        action = rng.randrange(4)
+        pos = rng.randrange(len(buf) + 1)
+        if action == 0 and buf:
+            buf[min(pos, len(buf) - 1)] = rng.randrange(256)
+        elif action == 1:
+            buf.insert(pos, rng.choice(b"0123456789\r\n\x00\xfc"))
+        elif action == 2:
+            del buf[pos:pos + rng.randint(1, 5)]
+        else:
+            buf = buf[:pos]
+    return bytes(buf)
+
+
+class BeispielDateienTests(unittest.TestCase):
+    def test_testdateien_strikt_lesbar(self):
+        for path in sorted(HERE.glob("test_patient*.gdt")):
+            with self.subTest(path.name):
+                records = gdt_codec.read_file(path)
+                self.assertEqual(len(records), 1)
+                self.assertEqual(records[0].record_type, "6310")
+                self.assertEqual(records[0].length, path.stat().st_size)
+
+
+class KodierungTests(unittest.TestCase):
+    def test_laenge_in_bytes(self):
+        self.assertEqual(gdt_codec.encode_field("3101", "Müller", "cp437"), b"0153101M\x81ller\r\n")
+        self.assertEqual(gdt_codec.encode_field("3101", "Müller", "utf-8"), b"0163101M\xc3\xbcller\r\n")
+
+    def test_zeilenumbruch_und_ueberlaenge(self):
+        self.assertEqual(gdt_codec.encode_field("6220", "a\r\nb"), b"0126220a b\r\n")
+        with self.assertRaises(GdtError):
+            gdt_codec.encode_field("6220", "x" * 1000)
+        with self.assertRaises(GdtError):
+            gdt_codec.encode_field("62a0", "x")
+
+    def test_fuenfstellige_feldkennungen(self):
+        data = gdt_codec.encode([[("08000", "6310"), ("03101", "Muster"), ("08001", "6310")]])
+        record, = gdt_codec.decode(data)
+        self.assertEqual(record.fields, [("8000", "6310"), ("3101", "Muster"), ("8001", "6310")])
+
+
+class SatzgrenzenTests(unittest.TestCase):
+    def test_mehrere_saetze(self):
+        data = gdt_codec.encode([
+            [("8000", "6310"), ("3000", "1"), ("8001", "6310")],
+            [("8000", "6311"), ("8100", "00040"), ("8001", "6311")],
+        ])
+        first, second = gdt_codec.decode(data)
+        self.assertEqual((first.first("3000"), second.record_type, second.length), ("1", "6311", 40))
+
+    def test_verletzte_satzgrenzen(self):
+        cases = {
+            "falsche Satzlänge": [("8000", "6311"), ("8100", "00041"), ("8001", "6311")],
+            "Satzende passt nicht": [("8000", "6310"), ("8001", "6311")],
+        }
+        for name, fields in cases.items():
+            with self.subTest(name), self.assertRaises(GdtError):
+                gdt_codec.decode(gdt_codec.encode([fields]))
+        trailing = gdt_codec.encode([[("8000", "6310"), ("8001", "6310")]]) + gdt_codec.encode_field("3000", "1")
+        with self.assertRaises(GdtError):
+            gdt_codec.decode(trailing)
+
+    def test_zeichen_statt_bytes_gezaehlt(self):
+        # Ältere Exporte: Länge in Zeichen → strikt abgelehnt, nachsichtig gelesen
+        data = b"01380006310\r\n0153101M\xc3\xbcller\r\n01380016310\r\n"
+        with self.assertRaises(GdtError):
+            gdt_codec.decode(data, "utf-8")
+        with self.assertLogs("gdt_bridge", "WARNING"):
+            record, = gdt_codec.decode(data, "utf-8", strict=False)
+        self.assertEqual(record.first("3101"), "Müller")
+
+
+class FuzzTests(unittest.TestCase):
+    def setUp(self):
+        # Warnungen des nachsichtigen Modus beim Fuzzing nicht ausgeben
+        logger = logging.getLogger("gdt_bridge")
+        self.addCleanup(setattr, logger, "disabled", logger.disabled)
+        logger.disabled = True
+
+    def test_roundtrip(self):
+        rng = random.Random(SEED)
+        for i in range(FUZZ_ITERATIONS):
+            encoding = rng.choice(["cp1252", "cp437", "utf-8"])
+            records = [random_record(rng, rng.choice(["6310", "6311"])) for _ in range(rng.randint(1, 4))]
+            data = gdt_codec.encode(records, encoding)
+            decoded = gdt_codec.decode(data, encoding)
+            with self.subTest(iteration=i, encoding=encoding):
+                self.assertEqual([record.fields for record in decoded], records)
+                self.assertEqual(sum(record.length for record in decoded), len(data))
+
+    def test_beschaedigte_daten(self):
+        """Beliebig beschädigte Dateien: nur GdtError, nie ein anderer Fehler oder eine Endlosschleife."""
+        rng = random.Random(SEED + 1)
+        for i in range(FUZZ_ITERATIONS):
+            data = mutate(rng, gdt_codec.encode([random_record(rng) for _ in range(rng.randint(1, 3))]))
+            for strict in (True, False):
+                try:
+                    records = gdt_codec.decode(data, strict=strict)
+                except GdtError:
+                    continue
+                except Exception as exc:  # pragma: no cover - nur bei einem Fehler im Codec
+                    self.fail(f"Iteration {i} (strict={strict}): {exc!r} bei {data!r}")
+                for record in records:
+                    self.assertEqual(record.fields[0][0], gdt_codec.RECORD_START)
+
+
+if __name__ == "__main__":
+    unittest.main()
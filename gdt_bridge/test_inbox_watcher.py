@@ -0,0 +1,139 @@
+"""
+Tests für inbox_watcher – echte Dateien in einem temporären Verzeichnis
+
+  cd gdt_bridge
+  python -m unittest test_inbox_watcher
+"""
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import inbox_watcher
+from inbox_watcher import MAX_DEBOUNCE_FACTOR, InboxWatcher, InotifyWatcher, PollingWatcher, create_watcher
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory(prefix="gdt_inbox_test_")
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def watch(self, watcher: InboxWatcher) -> InboxWatcher:
+        self.addCleanup(watcher.close)
+        return watcher
+
+    def write_slowly(self, path: Path, chunks: int, pause: float) -> threading.Thread:
+        """Datei in mehreren Schritten schreiben, wie SAMAS es evtl. tut."""
+        def run():
+            for i in range(chunks):
+                with path.open("ab") as fh:
+                    fh.write(b"01380006310\r\n")
+                time.sleep(pause)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+
+class PollingWatcherTests(WatcherTestCase):
+    def watcher(self, debounce: float = 0.1) -> PollingWatcher:
+        return self.watch(PollingWatcher(self.dir, debounce=debounce, poll_interval=0.02))
+
+    def test_neue_datei(self):
+        watcher = self.watcher()
+        self.assertFalse(watcher.wait(0.1))
+        (self.dir / "anf1.txt").write_text("x")
+        self.assertFalse(watcher.wait(0.1))   # nur .gdt zählt
+        (self.dir / "anf1.GDT").write_bytes(b"01380006310\r\n")
+        self.assertTrue(watcher.wait(1))
+        self.assertFalse(watcher.wait(0.1))   # schon gemeldet
+
+    def test_geloeschte_datei_ignoriert(self):
+        watcher = self.watcher()
+        path = self.dir / "anf1.gdt"
+        path.write_bytes(b"01380006310\r\n")
+        self.assertTrue(watcher.wait(1))
+        path.unlink()
+        self.assertFalse(watcher.wait(0.2))
+
+    def test_entprellt_bis_datei_fertig(self):
+        watcher = self.watcher(debounce=0.15)
+        writer = self.write_slowly(self.dir / "anf1.gdt", chunks=6, pause=0.05)
+        self.assertTrue(watcher.wait(2))
+        # wait() kehrt erst zurück, wenn debounce lang nichts mehr geschrieben wurde
+        self.assertFalse(writer.is_alive())
+        self.assertFalse(watcher.wait(0.1))
+
+    def test_entprellen_begrenzt(self):
+        watcher = self.watcher(debounce=0.05)
+        writer = self.write_slowly(self.dir / "anf1.gdt", chunks=60, pause=0.02)
+        start = time.monotonic()
+        self.assertTrue(watcher.wait(2))
+        # Dauerhaft geschriebene Datei: spätestens nach MAX_DEBOUNCE_FACTOR · debounce
+        self.assertLess(time.monotonic() - start, 0.05 * MAX_DEBOUNCE_FACTOR + 0.3)
+        self.assertTrue(writer.is_alive())
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify nur unter Linux")
+class InotifyWatcherTests(WatcherTestCase):
+    def test_geschlossene_und_umbenannte_dateien(self):
+        watcher = self.watch(InotifyWatcher(self.dir, debounce=0.05))
+        (self.dir / "anf1.txt").write_text("x")
+        self.assertFalse(watcher.wait(0.1))
+        (self.dir / "anf1.gdt").write_bytes(b"01380006310\r\n")   # IN_CLOSE_WRITE
+        self.assertTrue(watcher.wait(1))
+
+        (self.dir / "anf2.tmp").write_bytes(b"01380006310\r\n")
+        self.assertFalse(watcher.wait(0.1))
+        (self.dir / "anf2.tmp").rename(self.dir / "anf2.gdt")     # IN_MOVED_TO
+        self.assertTrue(watcher.wait(1))
+
+        (self.dir / "anf1.gdt").unlink()
+        self.assertFalse(watcher.wait(0.1))
+
+    def test_entprellt_bis_datei_fertig(self):
+        watcher = self.watch(InotifyWatcher(self.dir, debounce=0.15))
+        writer = self.write_slowly(self.dir / "anf1.gdt", chunks=6, pause=0.05)
+        self.assertTrue(watcher.wait(2))
+        self.assertFalse(writer.is_alive())
+
+
+class CreateWatcherTests(WatcherTestCase):
+    def test_polling(self):
+        watcher = self.watch(create_watcher(self.dir, "Polling", debounce=0.2, poll_interval=3))
+        self.assertIsInstance(watcher, PollingWatcher)
+        self.assertEqual((watcher.debounce, watcher.poll_interval), (0.2, 3))
+
+    def test_fallback_auf_polling(self):
+        for mode in ("inotify", "windows"):
+            with self.subTest(mode=mode), \
+                    mock.patch.object(inbox_watcher, "InotifyWatcher", side_effect=OSError(24, "too many")), \
+                    mock.patch.object(inbox_watcher, "WindowsWatcher", side_effect=ImportError("pywintypes")):
+                with self.assertLogs("gdt_bridge", "WARNING"):
+                    watcher = self.watch(create_watcher(self.dir, mode, poll_interval=2))
+                self.assertIsInstance(watcher, PollingWatcher)
+                self.assertEqual(watcher.poll_interval, 2)
+
+    @unittest.skipUnless(sys.platform.startswith("linux") or sys.platform == "win32", "ohne native Überwachung")
+    def test_fallback_bei_fehlendem_ordner(self):
+        with self.assertLogs("gdt_bridge", "WARNING"):
+            watcher = self.watch(create_watcher(self.dir / "fehlt", "auto"))
+        self.assertIsInstance(watcher, PollingWatcher)
+
+    def test_unbekannter_modus(self):
+        with self.assertRaises(ValueError):
+            create_watcher(self.dir, "fanotify")
+
+    def test_unvollstaendige_unterklasse(self):
+        class Incomplete(InboxWatcher):
+            name = "incomplete"
+        with self.assertRaises(TypeError):
+            Incomplete(self.dir)
+
+
+if __name__ == "__main__":
+    unittest.main()